@@ -13,7 +13,7 @@
 # limitations under the License.
 from abc import ABC, abstractmethod
 from enum import Enum
-from typing import List, Tuple, Union
+from typing import List, Optional, Tuple, Union
 
 DATA = "data"
 JOB_ZIP = "job.zip"
@@ -207,6 +207,21 @@ class StorageSpec(ABC):
         """
         pass
 
+    def get_data_file(self, uri: str, component_name: str = DATA) -> Optional[str]:
+        """Gets the path of the local file that holds the data of the specified object.
+
+        Storages that keep data in local files can override this so the data can be read directly from the file,
+        for example by memory-mapping it.
+
+        Args:
+            uri: URI of the object
+            component_name: storage component name
+
+        Returns: path of the data file, or None if the data is not kept in a local file.
+
+        """
+        return None
+
     @abstractmethod
     def get_detail(self, uri: str) -> Tuple[dict, bytes]:
         """Gets both data and meta of the specified object.
@@ -22,6 +22,11 @@ import numpy as np
 from nvflare.fuel.utils import fobs
 from nvflare.fuel.utils.fobs.datum import DatumManager
 
+ARRAY_DTYPE = "dtype"
+ARRAY_SHAPE = "shape"
+ARRAY_ORDER = "order"
+ARRAY_DATA = "data"
+
 
 class NumpyScalarDecomposer(fobs.Decomposer, ABC):
     """Decomposer base class for all numpy types with item method."""
@@ -54,15 +59,63 @@ class Int32ScalarDecomposer(NumpyScalarDecomposer):
 
 
 class NumpyArrayDecomposer(fobs.Decomposer):
+    """Decomposer for numpy arrays.
+
+    Arrays of plain (non-object, non-structured) dtypes are encoded as a small header (dtype, shape and memory order)
+    plus a memoryview of the array data, so the data is never copied into an intermediate buffer. Large buffers are
+    turned into BLOB datums by the DatumManager. On the receiving side, the array is rebuilt with np.frombuffer
+    directly over the received buffer.
+
+    Other arrays, and payloads created by older versions, use the np.save format.
+    """
+
     def supported_type(self):
         return np.ndarray
 
     def decompose(self, target: np.ndarray, manager: DatumManager = None) -> Any:
+        if not self._is_raw_supported(target.dtype):
+            return self._npy_serialize(target)
+
+        if target.flags.c_contiguous:
+            order = "C"
+        elif target.flags.f_contiguous:
+            order = "F"
+        else:
+            target = np.ascontiguousarray(target)
+            order = "C"
+
+        # 1-D uint8 view over the array memory, so its len() is the size in bytes
+        buffer = memoryview(target.reshape(-1, order=order).view(np.uint8))
+        return {
+            ARRAY_DTYPE: target.dtype.str,
+            ARRAY_SHAPE: list(target.shape),
+            ARRAY_ORDER: order,
+            ARRAY_DATA: buffer,
+        }
+
+    def recompose(self, data: Any, manager: DatumManager = None) -> np.ndarray:
+        if not isinstance(data, dict):
+            return self._npy_deserialize(data)
+
+        array = np.frombuffer(data[ARRAY_DATA], dtype=np.dtype(data[ARRAY_DTYPE]))
+        if not array.flags.writeable:
+            # Read-only buffer (e.g. bytes from msgpack). Arrays are expected to be writable, same as np.load
+            array = array.copy()
+
+        return array.reshape(data[ARRAY_SHAPE], order=data[ARRAY_ORDER])
+
+    @staticmethod
+    def _is_raw_supported(dtype: np.dtype) -> bool:
+        return not dtype.hasobject and dtype.fields is None and dtype.itemsize > 0
+
+    @staticmethod
+    def _npy_serialize(target: np.ndarray) -> bytes:
         stream = BytesIO()
         np.save(stream, target, allow_pickle=False)
         return stream.getvalue()
 
-    def recompose(self, data: Any, manager: DatumManager = None) -> np.ndarray:
+    @staticmethod
+    def _npy_deserialize(data: Any) -> np.ndarray:
         stream = BytesIO(data)
         return np.load(stream, allow_pickle=False)
 
@@ -58,7 +58,7 @@ class StorageStatePersistor(StatePersistor):
         all_items = self.storage.list_objects(self.uri_root)
         fl_snapshot = FLSnapshot()
         for item in all_items:
-            snapshot = fobs.loads(self.storage.get_data(item))
+            snapshot = self._load_snapshot(item)
             fl_snapshot.add_snapshot(snapshot.job_id, snapshot)
         return fl_snapshot
 
@@ -73,9 +73,17 @@ class StorageStatePersistor(StatePersistor):
 
         """
         path = os.path.join(self.uri_root, job_id)
-        snapshot = fobs.loads(self.storage.get_data(uri=path))
+        snapshot = self._load_snapshot(path)
         return snapshot
 
+    def _load_snapshot(self, uri: str) -> RunSnapshot:
+        # memory-map the snapshot if it's in a local file, so large data is only read when accessed
+        file_path = self.storage.get_data_file(uri)
+        if file_path:
+            return fobs.loadf(file_path, use_mmap=True)
+        else:
+            return fobs.loads(self.storage.get_data(uri))
+
     def delete(self):
         """Deletes the FL snapshot."""
 
@@ -20,7 +20,7 @@ import shutil
 import tempfile
 import uuid
 from pathlib import Path
-from typing import List, Tuple
+from typing import List, Optional, Tuple
 
 from nvflare.apis.storage import DATA, META, StorageException, StorageSpec
 from nvflare.apis.utils.format_check import validate_class_methods_args
@@ -356,6 +356,30 @@ class FilesystemStorage(StorageSpec):
 
         return _read(os.path.join(full_uri, component_name))
 
+    def get_data_file(self, uri: str, component_name: str = DATA) -> Optional[str]:
+        """Gets the path of the file that holds the data of the specified object.
+
+        Args:
+            uri: URI of the object
+            component_name: storage component name
+
+        Returns:
+            path of the data file.
+
+        Raises:
+            StorageException: if object does not exist
+
+        """
+        full_uri = self._object_path(uri)
+
+        if not StorageSpec.is_valid_component(component_name):
+            raise StorageException(f"{component_name} is not a valid component for storage object.")
+
+        if not _object_exists(full_uri):
+            raise StorageException("object {} does not exist".format(uri))
+
+        return os.path.join(full_uri, component_name)
+
     def get_data_for_download(self, uri: str, component_name: str = DATA, download_file: str = None):
         full_uri = self._object_path(uri)
 
@@ -21,6 +21,14 @@ import torch
 from nvflare.fuel.utils import fobs
 from nvflare.fuel.utils.fobs.datum import DatumManager
 
+TENSOR_FORMAT = "format"
+TENSOR_DTYPE = "dtype"
+TENSOR_SHAPE = "shape"
+TENSOR_STRIDES = "strides"
+TENSOR_BUFFER = "buffer"
+
+FORMAT_RAW = "raw"
+
 
 class SerializationModule(torch.nn.Module):
     def __init__(self, tensor):
@@ -29,18 +37,34 @@ class SerializationModule(torch.nn.Module):
 
 
 class TensorDecomposer(fobs.Decomposer):
+    """Decomposer for torch tensors.
+
+    Dense tensors of any dtype (including bfloat16, float8 and complex types) are sent as the raw bytes of their
+    storage, together with dtype, shape and strides. The bytes are a memoryview of the tensor memory, so large
+    tensors become datums without being copied. They are recomposed with torch.frombuffer over the received buffer.
+
+    Other tensors (e.g. sparse or quantized), and payloads created by older versions, use the numpy or
+    torch.jit format.
+    """
+
     def supported_type(self):
         return torch.Tensor
 
     def decompose(self, target: torch.Tensor, manager: DatumManager = None) -> Any:
-        if target.dtype == torch.bfloat16:
-            return self._jit_serialize(target)
-        else:
-            return self._numpy_serialize(target)
+        tensor = target.detach()
+        if tensor.layout != torch.strided or tensor.is_quantized:
+            if tensor.dtype == torch.bfloat16:
+                return self._jit_serialize(tensor)
+            else:
+                return self._numpy_serialize(tensor)
+
+        return self._raw_serialize(tensor)
 
     def recompose(self, data: Any, manager: DatumManager = None) -> torch.Tensor:
         if isinstance(data, dict):
-            if data["dtype"] == "torch.bfloat16":
+            if data.get(TENSOR_FORMAT) == FORMAT_RAW:
+                return self._raw_deserialize(data)
+            elif data["dtype"] == "torch.bfloat16":
                 return self._jit_deserialize(data)
             else:
                 buf = data["buffer"]
@@ -49,6 +73,57 @@ class TensorDecomposer(fobs.Decomposer):
 
         return self._numpy_deserialize(buf)
 
+    @staticmethod
+    def _is_dense(tensor: torch.Tensor) -> bool:
+        """Check if the elements of the tensor occupy a gap-free, non-overlapping block of its storage"""
+        expected_stride = 1
+        for size, stride in sorted(zip(tensor.shape, tensor.stride()), key=lambda x: x[1]):
+            if size == 1:
+                continue
+            if stride != expected_stride:
+                return False
+            expected_stride *= size
+        return True
+
+    @staticmethod
+    def _raw_serialize(tensor: torch.Tensor) -> dict:
+        if tensor.device.type != "cpu":
+            tensor = tensor.cpu()
+
+        if not TensorDecomposer._is_dense(tensor):
+            tensor = tensor.contiguous()
+
+        # Flat view of the memory block holding the tensor, reinterpreted as bytes
+        flat = torch.as_strided(tensor, (tensor.numel(),), (1,), tensor.storage_offset())
+        buffer = memoryview(flat.view(torch.uint8).numpy())
+        return {
+            TENSOR_FORMAT: FORMAT_RAW,
+            TENSOR_DTYPE: str(tensor.dtype),
+            TENSOR_SHAPE: list(tensor.shape),
+            TENSOR_STRIDES: list(tensor.stride()),
+            TENSOR_BUFFER: buffer,
+        }
+
+    @staticmethod
+    def _raw_deserialize(data: dict) -> torch.Tensor:
+        dtype_name = data[TENSOR_DTYPE]
+        dtype = getattr(torch, dtype_name.split(".")[-1], None)
+        if not isinstance(dtype, torch.dtype):
+            raise TypeError(f"Unknown tensor dtype {dtype_name}")
+
+        shape = data[TENSOR_SHAPE]
+        buffer = data[TENSOR_BUFFER]
+        if not len(buffer):
+            # torch.frombuffer doesn't accept empty buffers
+            return torch.empty(shape, dtype=dtype)
+
+        if memoryview(buffer).readonly:
+            # Tensors are expected to be writable, torch.frombuffer doesn't copy read-only buffers
+            buffer = bytearray(buffer)
+
+        flat = torch.frombuffer(buffer, dtype=torch.uint8).view(dtype)
+        return torch.as_strided(flat, shape, data[TENSOR_STRIDES])
+
     @staticmethod
     def _numpy_serialize(tensor: torch.Tensor) -> dict:
         stream = BytesIO()
@@ -12,6 +12,7 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import asyncio
 import concurrent.futures
 import copy
 import threading
@@ -22,12 +23,13 @@ from nvflare.apis.signal import Signal
 from nvflare.fuel.f3.cellnet.core_cell import CoreCell, TargetMessage
 from nvflare.fuel.f3.cellnet.defs import CellChannel, MessageHeaderKey, MessagePropKey, MessageType, ReturnCode
 from nvflare.fuel.f3.cellnet.utils import decode_payload, encode_payload, make_reply
+from nvflare.fuel.f3.drivers.aio_context import AioContext
 from nvflare.fuel.f3.message import Message
 from nvflare.fuel.f3.stream_cell import StreamCell
 from nvflare.fuel.f3.streaming.stream_const import StreamHeaderKey
 from nvflare.fuel.f3.streaming.stream_types import StreamFuture
 from nvflare.fuel.utils.log_utils import get_obj_logger
-from nvflare.fuel.utils.waiter_utils import WaiterRC, conditional_wait
+from nvflare.fuel.utils.waiter_utils import WaiterRC, async_conditional_wait, conditional_wait
 from nvflare.security.logging import secure_format_exception
 
 CHANNELS_TO_EXCLUDE = (
@@ -52,13 +54,31 @@ def _is_stream_channel(channel: str) -> bool:
 
 
 class SimpleWaiter:
-    def __init__(self, req_id, result):
+    def __init__(self, req_id, result, loop: asyncio.AbstractEventLoop = None):
         super().__init__()
         self.req_id = req_id
         self.result = result
         self.receiving_future = None
         self.in_receiving = threading.Event()
 
+        # for coroutines waiting in the loop
+        self.loop = loop
+        self.aio_in_receiving = loop.create_future() if loop else None
+
+    def set_receiving(self, future: StreamFuture):
+        self.receiving_future = future
+        self.in_receiving.set()
+        if self.loop:
+            try:
+                self.loop.call_soon_threadsafe(self._set_aio_in_receiving)
+            except RuntimeError:
+                # the loop is closed, nobody is waiting
+                pass
+
+    def _set_aio_in_receiving(self):
+        if not self.aio_in_receiving.done():
+            self.aio_in_receiving.set_result(True)
+
 
 class Adapter:
     def __init__(self, cb, my_info, cell):
@@ -68,9 +88,13 @@ class Adapter:
         self.logger = get_obj_logger(self)
 
     def call(self, future, *args, **kwargs):  # this will be called by StreamCell upon receiving the first byte of blob
+        request = self._get_request(future)
+        response = self.cb(request, *args, **kwargs)
+        self._send_response(request, response)
+
+    def _get_request(self, future) -> Message:
         headers = future.headers
         stream_req_id = headers.get(StreamHeaderKey.STREAM_REQ_ID, "")
-        origin = headers.get(MessageHeaderKey.ORIGIN, None)
         result = future.result()
         self.logger.debug(f"{stream_req_id=}: {headers=}, incoming data={result}")
         request = Message(headers, result)
@@ -82,12 +106,16 @@ class Adapter:
         topic = request.get_header(StreamHeaderKey.TOPIC)
         request.set_header(MessageHeaderKey.TOPIC, topic)
         self.logger.debug(f"Call back on {stream_req_id=}: {channel=}, {topic=}")
+        return request
 
+    def _send_response(self, request: Message, response: Message):
+        stream_req_id = request.get_header(StreamHeaderKey.STREAM_REQ_ID, "")
+        origin = request.get_header(MessageHeaderKey.ORIGIN, None)
+        channel = request.get_header(MessageHeaderKey.CHANNEL)
+        topic = request.get_header(MessageHeaderKey.TOPIC)
         req_id = request.get_header(MessageHeaderKey.REQ_ID, "")
         secure = request.get_header(MessageHeaderKey.SECURE, False)
         optional = request.get_header(MessageHeaderKey.OPTIONAL, False)
-        self.logger.debug(f"{stream_req_id=}: on {channel=}, {topic=}")
-        response = self.cb(request, *args, **kwargs)
         self.logger.debug(f"response available: {stream_req_id=}: on {channel=}, {topic=}")
 
         if not stream_req_id:
@@ -111,6 +139,25 @@ class Adapter:
         self.logger.debug(f"Done sending: {stream_req_id=}: {reply_future=}")
 
 
+class AsyncAdapter(Adapter):
+    """Adapter of a coroutine function. The request is processed in the event loop of the global AioContext"""
+
+    def call(self, future, *args, **kwargs):
+        request = self._get_request(future)
+        AioContext.get_global_context().run_coro(self._call(request, args, kwargs))
+
+    async def _call(self, request: Message, args, kwargs):
+        try:
+            response = await self.cb(request, *args, **kwargs)
+        except Exception as ex:
+            self.logger.error(f"exception from async CB {self.cb.__name__}: {secure_format_exception(ex)}")
+            response = make_reply(ReturnCode.PROCESS_EXCEPTION)
+
+        # encoding and sending may block, so it's done out of the event loop
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, self._send_response, request, response)
+
+
 class Cell(StreamCell):
     def __init__(self, *args, **kwargs):
         self.core_cell = CoreCell(*args, **kwargs)
@@ -204,6 +251,123 @@ class Cell(StreamCell):
         self.logger.debug("About to return from broadcast_request")
         return results
 
+    async def async_send_request(
+        self,
+        channel: str,
+        topic: str,
+        target: str,
+        request: Message,
+        timeout=None,
+        secure=False,
+        optional=False,
+        abort_signal: Signal = None,
+    ) -> Message:
+        """
+        Send a request to the target and await the reply in the event loop, without blocking a thread
+
+        Args:
+            channel: channel for the message
+            topic: topic of the message
+            target: FQCN of the destination cell
+            request: message to be sent
+            timeout: how long to wait for the reply
+            secure: End-end encryption
+            optional: whether the message is optional
+            abort_signal: signal to abort the message
+
+        Returns: the reply message
+
+        """
+        if not _is_stream_channel(channel):
+            return await self.core_cell.async_send_request(channel, topic, target, request, timeout, secure, optional)
+
+        # encoding and sending may block, so they are done out of the event loop
+        await asyncio.get_running_loop().run_in_executor(None, self._encode_message, request)
+        return await self._async_send_one_request(
+            channel, target, topic, request, timeout or self.core_cell.max_timeout, secure, optional, abort_signal
+        )
+
+    async def async_broadcast_request(
+        self,
+        channel: str,
+        topic: str,
+        targets: Union[str, List[str]],
+        request: Message,
+        timeout=None,
+        secure=False,
+        optional=False,
+        abort_signal: Signal = None,
+    ) -> Dict[str, Message]:
+        """
+        Send a message to the targets and await the replies in the event loop.
+        Unlike broadcast_request() on stream channels, no thread is created for each target.
+
+        Args:
+            channel: channel for the message
+            topic: topic of the message
+            targets: FQCN of the destination cell(s)
+            request: message to be sent
+            timeout: how long to wait for replies
+            secure: End-end encryption
+            optional: whether the message is optional
+            abort_signal: signal to abort the message
+
+        Returns: a dict of: cell_id => reply message
+
+        """
+        if not _is_stream_channel(channel):
+            return await self.core_cell.async_broadcast_request(
+                channel, topic, targets, request, timeout, secure, optional
+            )
+
+        if isinstance(targets, str):
+            targets = [targets]
+
+        # encode the request now so it's not encoded again for each target
+        await asyncio.get_running_loop().run_in_executor(None, self._encode_message, request)
+        timeout = timeout or self.core_cell.max_timeout
+        requests = []
+        for t in targets:
+            req = Message(copy.deepcopy(request.headers), request.payload)
+            req = TargetMessage(t, channel, topic, req).message
+            requests.append(
+                self._async_send_one_request(channel, t, topic, req, timeout, secure, optional, abort_signal)
+            )
+
+        replies = await asyncio.gather(*requests, return_exceptions=True)
+        results = {}
+        for target, reply in zip(targets, replies):
+            if isinstance(reply, BaseException):
+                self.logger.warning(f"{target} raises {reply}")
+                reply = make_reply(ReturnCode.TIMEOUT)
+            results[target] = reply
+        return results
+
+    def register_async_request_cb(self, channel: str, topic: str, cb, *args, **kwargs):
+        """
+        Register a coroutine function for handling request. It's called like the CB of register_request_cb().
+
+        The CB runs in the event loop of the global AioContext, so it must not block.
+
+        Args:
+            channel: the channel of the request
+            topic: topic of the request
+            cb: the coroutine function
+            *args:
+            **kwargs:
+
+        Returns:
+
+        """
+        if not asyncio.iscoroutinefunction(cb):
+            raise ValueError(f"specified request_cb {type(cb)} is not a coroutine function")
+
+        self.core_cell.register_async_request_cb(channel, topic, cb, *args, **kwargs)
+        if _is_stream_channel(channel):
+            self.logger.info(f"Register async blob CB for {channel=}, {topic=}")
+            adapter = AsyncAdapter(cb, self.core_cell.my_info, self)
+            self.register_blob_cb(channel, topic, adapter.call, *args, **kwargs)
+
     def _fire_and_forget(
         self,
         channel: str,
@@ -281,6 +445,28 @@ class Cell(StreamCell):
         else:
             return True
 
+    async def _async_future_wait(self, future: StreamFuture, timeout, abort_signal: Signal):
+        # same as _future_wait() but waits in the event loop
+        aio_future = future.as_aio_future()
+        last_progress = 0
+        while True:
+            rc = await async_conditional_wait(
+                aio_future, timeout, abort_signal, condition_cb=self._check_error, future=future
+            )
+            if rc == WaiterRC.IS_SET:
+                break
+            elif rc == WaiterRC.TIMEOUT:
+                current_progress = future.get_progress()
+                if last_progress == current_progress:
+                    return False
+                else:
+                    self.logger.debug(f"{current_progress=}")
+                    last_progress = current_progress
+            else:
+                return False
+
+        return not future.error
+
     def _encode_message(self, msg: Message) -> int:
         try:
             return encode_payload(msg, StreamHeaderKey.PAYLOAD_ENCODING)
@@ -379,6 +565,51 @@ class Cell(StreamCell):
             self.logger.error(f"exception sending request: {secure_format_exception(ex)}")
             return self._get_result(req_id)
 
+    async def _async_send_one_request(
+        self,
+        channel,
+        target,
+        topic,
+        request,
+        timeout=10.0,
+        secure=False,
+        optional=False,
+        abort_signal=None,
+    ):
+        # same stages as _send_one_request(), but the waiting is done in the event loop
+        req_id = str(uuid.uuid4())
+        request.add_headers({StreamHeaderKey.STREAM_REQ_ID: req_id})
+        self.logger.debug(f"{req_id=}, {channel=}, {topic=}, {target=}, {timeout=}: async send_request")
+
+        loop = asyncio.get_running_loop()
+        waiter = SimpleWaiter(req_id=req_id, result=make_reply(ReturnCode.TIMEOUT), loop=loop)
+        self.requests_dict[req_id] = waiter
+
+        try:
+            future = await loop.run_in_executor(None, self.send_blob, channel, topic, target, request, secure, optional)
+
+            if not await self._async_future_wait(future, timeout, abort_signal):
+                self.logger.debug(f"{req_id=}: sending timeout {timeout=}")
+                return self._get_result(req_id)
+
+            waiter_rc = await async_conditional_wait(waiter.aio_in_receiving, timeout, abort_signal)
+            if waiter_rc != WaiterRC.IS_SET:
+                self.logger.debug(f"{req_id=}: remote processing timeout {timeout=} {waiter_rc=}")
+                return self._get_result(req_id)
+
+            r_future = waiter.receiving_future
+            if not await self._async_future_wait(r_future, timeout, abort_signal):
+                self.logger.info(f"{req_id=}: receiving timeout {timeout=}")
+                return self._get_result(req_id)
+
+            waiter.result = Message(r_future.headers, r_future.result())
+            await loop.run_in_executor(None, decode_payload, waiter.result, StreamHeaderKey.PAYLOAD_ENCODING)
+            self.logger.debug(f"{req_id=}: return result {waiter.result=}")
+            return self._get_result(req_id)
+        except Exception as ex:
+            self.logger.error(f"exception sending request: {secure_format_exception(ex)}")
+            return self._get_result(req_id)
+
     def _process_reply(self, future: StreamFuture):
         headers = future.headers
         req_id = headers.get(StreamHeaderKey.STREAM_REQ_ID, -1)
@@ -388,8 +619,7 @@ class Cell(StreamCell):
         except KeyError as e:
             self.logger.warning(f"Receiving unknown {req_id=}, discarded: {e} headers: {headers}")
             return
-        waiter.receiving_future = future
-        waiter.in_receiving.set()
+        waiter.set_receiving(future)
 
     def _register_request_cb(self, channel: str, topic: str, cb, *args, **kwargs):
         """
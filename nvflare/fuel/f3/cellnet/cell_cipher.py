@@ -13,11 +13,17 @@
 # limitations under the License.
 
 import os
+import struct
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, List, Union
 
 from cryptography.exceptions import InvalidKey, InvalidSignature
 from cryptography.hazmat.primitives import asymmetric, ciphers, hashes, padding
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
 from cryptography.x509 import Certificate
 
+from nvflare.fuel.utils.buffer_list import BufferList
+
 HASH_LENGTH = 4  # Adjustable to avoid collision
 NONCE_LENGTH = 16  # For AES, this is 128 bits (i.e. block size)
 KEY_LENGTH = 32  # AES 256.  Choose from 16, 24, 32
@@ -27,6 +33,25 @@ KEY_ENC_LENGTH = 256
 SIGNATURE_LENGTH = 256
 SIMPLE_HEADER_LENGTH = NONCE_LENGTH + KEY_ENC_LENGTH + SIGNATURE_LENGTH
 
+# Chunked AES-GCM
+GCM_NONCE_LENGTH = 12
+GCM_TAG_LENGTH = 16
+# Chunk size and the kind of the message, unicast or multicast
+CHUNK_INFO_FORMAT = ">IB"
+CHUNK_INFO_LENGTH = struct.calcsize(CHUNK_INFO_FORMAT)
+CHUNKED_HEADER_LENGTH = GCM_NONCE_LENGTH + KEY_ENC_LENGTH + SIGNATURE_LENGTH + CHUNK_INFO_LENGTH
+DEFAULT_CIPHER_CHUNK_SIZE = 1024 * 1024
+
+
+class ChunkedKind:
+
+    UNICAST = 0
+    MULTICAST = 1
+
+
+# Decrypted session keys are only cached up to this many
+MAX_CACHED_DEC_KEYS = 1024
+
 
 def get_hash(value):
     hash = hashes.Hash(hashes.SHA256())
@@ -106,6 +131,66 @@ def _sym_dec(k: bytes, n: bytes, m: bytes):
     return unpadder.update(plain_text) + unpadder.finalize()
 
 
+def _chunk_nonce(nonce: bytes, index: int) -> bytes:
+    # Like TLS 1.3, the chunk index is XORed into the random nonce of the message
+    return (int.from_bytes(nonce, "big") ^ index).to_bytes(GCM_NONCE_LENGTH, "big")
+
+
+def _chunk_aad(index: int, last: bool) -> bytes:
+    # The index and the last flag are authenticated, so chunks can't be reordered or truncated
+    return struct.pack(">Q?", index, last)
+
+
+def _process_chunks(func: Callable[[int], Any], num_chunks: int, num_workers: int) -> List[Any]:
+    if num_workers <= 1 or num_chunks <= 1:
+        return [func(i) for i in range(num_chunks)]
+
+    with ThreadPoolExecutor(max_workers=min(num_workers, num_chunks), thread_name_prefix="cipher") as executor:
+        return list(executor.map(func, range(num_chunks)))
+
+
+def _check_chunk_size(chunk_size: int):
+    if chunk_size <= 0:
+        raise ValueError(f"invalid chunk size: {chunk_size}")
+
+
+def _encrypt_chunks(key: bytes, nonce: bytes, message, chunk_size: int, num_workers: int) -> List[bytes]:
+    aead = AESGCM(key)
+    source = BufferList(message if isinstance(message, list) else [message])
+    size = source.get_size()
+    # An empty message still has one chunk, so truncation is always detected
+    num_chunks = max(1, (size + chunk_size - 1) // chunk_size)
+
+    def encrypt_chunk(index: int) -> bytes:
+        start = index * chunk_size
+        end = min(start + chunk_size, size)
+        data = source.read(start, end) if end > start else bytes(0)
+        return aead.encrypt(_chunk_nonce(nonce, index), data, _chunk_aad(index, index == num_chunks - 1))
+
+    return _process_chunks(encrypt_chunk, num_chunks, num_workers)
+
+
+def _content_digest(nonce: bytes, chunk_size: int, tags: List[bytes]) -> bytes:
+    # The GCM tags authenticate the chunks, so signing them binds the whole content
+    return get_hash(nonce + struct.pack(">I", chunk_size) + b"".join(bytes(t) for t in tags))
+
+
+class MulticastCipherText:
+    """Chunks of a payload encrypted once under a content key, to be sent to multiple receivers.
+
+    Only the content key is encrypted for each receiver, in the header of its copy. Every receiver learns the
+    content key, so the signature in each header covers the digest of the content too. Otherwise, a receiver
+    could put the header of another one in front of chunks it encrypted itself.
+    """
+
+    def __init__(self, key: bytes, nonce: bytes, chunk_size: int, chunks: List[bytes]):
+        self.key = key
+        self.nonce = nonce
+        self.chunk_size = chunk_size
+        self.chunks = chunks
+        self.digest = _content_digest(nonce, chunk_size, [c[-GCM_TAG_LENGTH:] for c in chunks])
+
+
 class SessionKeyManager:
     def __init__(self, root_ca):
         self.key_hash_dict = dict()
@@ -173,7 +258,7 @@ class SimpleCellCipher:
             cert.signature, cert.tbs_certificate_bytes, asymmetric.padding.PKCS1v15(), cert.signature_hash_algorithm
         )
 
-    def encrypt(self, message: bytes, target_cert: Certificate):
+    def _get_enc_secret(self, target_cert: Certificate):
         cert_hash = hash(target_cert)
         secret = self._cached_enc.get(cert_hash)
         if secret is None:
@@ -182,9 +267,36 @@ class SimpleCellCipher:
             remote_pub_key = target_cert.public_key()
             key_enc = _asym_enc(remote_pub_key, key)
             signature = _sign(self._pri_key, key_enc)
-            self._cached_enc[cert_hash] = (key, key_enc, signature)
-        else:
-            (key, key_enc, signature) = secret
+            secret = (key, key_enc, signature)
+            self._cached_enc[cert_hash] = secret
+        return secret
+
+    def _get_dec_key(self, key_enc, signature, origin_cert: Certificate) -> bytes:
+        if not isinstance(key_enc, bytes):
+            key_enc = bytes(key_enc)
+
+        key_hash = hash(key_enc)
+        key = self._cached_dec.get(key_hash)
+        if key is None:
+            self._validate_cert_chain(origin_cert)
+            public_key = origin_cert.public_key()
+            _verify(public_key, key_enc, signature)
+            key = _asym_dec(self._pri_key, key_enc)
+            if len(self._cached_dec) >= MAX_CACHED_DEC_KEYS:
+                # Drop the oldest key
+                self._cached_dec.pop(next(iter(self._cached_dec)))
+            self._cached_dec[key_hash] = key
+        return key
+
+    def _get_multicast_key(self, key_enc, signature, digest: bytes, origin_cert: Certificate) -> bytes:
+        # Each multicast has its own content key, so it's not cached. The signature is always checked, it binds
+        # the content known to every receiver.
+        self._validate_cert_chain(origin_cert)
+        _verify(origin_cert.public_key(), bytes(key_enc) + digest, signature)
+        return _asym_dec(self._pri_key, bytes(key_enc))
+
+    def encrypt(self, message: bytes, target_cert: Certificate):
+        key, key_enc, signature = self._get_enc_secret(target_cert)
         nonce = os.urandom(NONCE_LENGTH)
         ct = nonce + key_enc + signature + _sym_enc(key, nonce, message)
         return ct
@@ -196,17 +308,122 @@ class SimpleCellCipher:
             message[NONCE_LENGTH + KEY_ENC_LENGTH : SIMPLE_HEADER_LENGTH],
         )
 
-        if not isinstance(key_enc, bytes):
-            key_enc = bytes(key_enc)
+        key = self._get_dec_key(key_enc, signature, origin_cert)
+        return _sym_dec(key, nonce, message[SIMPLE_HEADER_LENGTH:])
 
-        key_hash = hash(key_enc)
-        dec = self._cached_dec.get(key_hash)
-        if dec is None:
-            self._validate_cert_chain(origin_cert)
-            public_key = origin_cert.public_key()
-            _verify(public_key, key_enc, signature)
-            key = _asym_dec(self._pri_key, key_enc)
-            self._cached_dec[key_hash] = key
+    def encrypt_chunked(
+        self,
+        message: Union[bytes, bytearray, memoryview, list],
+        target_cert: Certificate,
+        chunk_size: int = DEFAULT_CIPHER_CHUNK_SIZE,
+        num_workers: int = 0,
+    ) -> list:
+        """Encrypt the message with AES-GCM, chunk by chunk.
+
+        Each chunk is encrypted and authenticated independently, so no full-size copy of the message is made and
+        the chunks can be encrypted in parallel. The session key is exchanged the same way as encrypt().
+
+        Args:
+            message: the message, a buffer or a list of buffers
+            target_cert: certificate of the receiver
+            chunk_size: size of the clear text of each chunk
+            num_workers: number of threads to encrypt chunks concurrently. No threads are used if less than 2
+
+        Returns: a list of buffers, the header followed by the encrypted chunks
+        """
+        _check_chunk_size(chunk_size)
+        key, key_enc, signature = self._get_enc_secret(target_cert)
+        nonce = os.urandom(GCM_NONCE_LENGTH)
+        header = nonce + key_enc + signature + struct.pack(CHUNK_INFO_FORMAT, chunk_size, ChunkedKind.UNICAST)
+        return [header] + _encrypt_chunks(key, nonce, message, chunk_size, num_workers)
+
+    @staticmethod
+    def encrypt_multicast(
+        message: Union[bytes, bytearray, memoryview, list],
+        chunk_size: int = DEFAULT_CIPHER_CHUNK_SIZE,
+        num_workers: int = 0,
+    ) -> MulticastCipherText:
+        """Encrypt the message once with a new content key, the same way as encrypt_chunked().
+
+        Use wrap_multicast() to get the encrypted message for each receiver.
+        """
+        _check_chunk_size(chunk_size)
+        key = os.urandom(KEY_LENGTH)
+        nonce = os.urandom(GCM_NONCE_LENGTH)
+        return MulticastCipherText(
+            key, nonce, chunk_size, _encrypt_chunks(key, nonce, message, chunk_size, num_workers)
+        )
+
+    def wrap_multicast(self, cipher_text: MulticastCipherText, target_cert: Certificate) -> list:
+        """Returns the encrypted message for the receiver. Only the content key is encrypted, the chunks are shared.
+
+        The signature covers the encrypted key and the content digest. The result is decrypted by decrypt_chunked(),
+        the same as the result of encrypt_chunked().
+        """
+        self._validate_cert_chain(target_cert)
+        key_enc = _asym_enc(target_cert.public_key(), cipher_text.key)
+        signature = _sign(self._pri_key, key_enc + cipher_text.digest)
+        chunk_info = struct.pack(CHUNK_INFO_FORMAT, cipher_text.chunk_size, ChunkedKind.MULTICAST)
+        return [cipher_text.nonce + key_enc + signature + chunk_info] + cipher_text.chunks
+
+    def decrypt_chunked(
+        self, message: Union[bytes, bytearray, memoryview, list], origin_cert: Certificate, num_workers: int = 0
+    ) -> bytearray:
+        """Decrypt a message encrypted by encrypt_chunked()
+
+        Args:
+            message: the encrypted message, a buffer or a list of buffers
+            origin_cert: certificate of the sender
+            num_workers: number of threads to decrypt chunks concurrently. No threads are used if less than 2
+
+        Returns: the clear text
+
+        Exception:
+            cryptography.exceptions.InvalidTag: if any chunk fails authentication
+            cryptography.exceptions.InvalidSignature: if the header is not signed by the sender for the content
+        """
+        source = BufferList(message if isinstance(message, list) else [message])
+        size = source.get_size()
+        if size < CHUNKED_HEADER_LENGTH + GCM_TAG_LENGTH:
+            raise ValueError(f"encrypted message is too short: {size}")
+
+        header = bytes(source.read(0, CHUNKED_HEADER_LENGTH))
+        nonce = header[:GCM_NONCE_LENGTH]
+        key_enc = header[GCM_NONCE_LENGTH : GCM_NONCE_LENGTH + KEY_ENC_LENGTH]
+        signature = header[GCM_NONCE_LENGTH + KEY_ENC_LENGTH : CHUNKED_HEADER_LENGTH - CHUNK_INFO_LENGTH]
+        chunk_size, kind = struct.unpack(CHUNK_INFO_FORMAT, header[CHUNKED_HEADER_LENGTH - CHUNK_INFO_LENGTH :])
+        _check_chunk_size(chunk_size)
+
+        enc_chunk_size = chunk_size + GCM_TAG_LENGTH
+        body_size = size - CHUNKED_HEADER_LENGTH
+        num_chunks = (body_size + enc_chunk_size - 1) // enc_chunk_size
+        if body_size - (num_chunks - 1) * enc_chunk_size < GCM_TAG_LENGTH:
+            raise ValueError(f"last chunk is truncated in encrypted message of {size} bytes")
+
+        if kind == ChunkedKind.UNICAST:
+            key = self._get_dec_key(key_enc, signature, origin_cert)
+        elif kind == ChunkedKind.MULTICAST:
+            tags = []
+            for index in range(num_chunks):
+                end = min(CHUNKED_HEADER_LENGTH + (index + 1) * enc_chunk_size, size)
+                tags.append(source.read(end - GCM_TAG_LENGTH, end))
+            key = self._get_multicast_key(key_enc, signature, _content_digest(nonce, chunk_size, tags), origin_cert)
         else:
-            key = dec
-        return _sym_dec(key, nonce, message[SIMPLE_HEADER_LENGTH:])
+            raise ValueError(f"unknown kind of encrypted message: {kind}")
+
+        aead = AESGCM(key)
+
+        result = bytearray(body_size - num_chunks * GCM_TAG_LENGTH)
+
+        def decrypt_chunk(index: int) -> int:
+            start = CHUNKED_HEADER_LENGTH + index * enc_chunk_size
+            end = min(start + enc_chunk_size, size)
+            data = aead.decrypt(
+                _chunk_nonce(nonce, index), source.read(start, end), _chunk_aad(index, index == num_chunks - 1)
+            )
+            offset = index * chunk_size
+            result[offset : offset + len(data)] = data
+            return len(data)
+
+        _process_chunks(decrypt_chunk, num_chunks, num_workers)
+        return result
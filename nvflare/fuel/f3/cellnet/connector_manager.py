@@ -11,6 +11,7 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
+import importlib
 import os
 import time
 from typing import Union
@@ -32,11 +33,19 @@ _KEY_SCHEME = "scheme"
 _KEY_HOST = "host"
 _KEY_PORTS = "ports"
 
+# Drivers for cells on the same host: scheme => (module, function to check platform support)
+_SAME_HOST_DRIVERS = {
+    "shm": ("nvflare.fuel.f3.drivers.shm_driver", "shm_supported"),
+    "uds": ("nvflare.fuel.f3.drivers.uds_driver", "uds_supported"),
+}
+
 
 class _Defaults:
 
     ALLOW_ADHOC_CONNECTIONS = False
     SCHEME_FOR_INTERNAL_CONNECTIONS = "tcp"
+    SHM_FOR_INTERNAL_CONNECTIONS = False
+    UDS_FOR_INTERNAL_CONNECTIONS = False
     SCHEME_FOR_ADHOC_CONNECTIONS = "tcp"
 
 
@@ -70,6 +79,10 @@ class ConnectorManager:
 
         # set up default drivers
         self.int_scheme = comm_configurator.get_internal_connection_scheme(_Defaults.SCHEME_FOR_INTERNAL_CONNECTIONS)
+        if comm_configurator.use_shm_internal_connections(_Defaults.SHM_FOR_INTERNAL_CONNECTIONS):
+            self.int_scheme = self._get_same_host_scheme("shm", self.int_scheme)
+        elif comm_configurator.use_uds_internal_connections(_Defaults.UDS_FOR_INTERNAL_CONNECTIONS):
+            self.int_scheme = self._get_same_host_scheme("uds", self.int_scheme)
         self.int_resources = {
             _KEY_HOST: "localhost",
         }
@@ -99,6 +112,19 @@ class ConnectorManager:
         self.logger.debug(f"adhoc scheme={self.adhoc_scheme}, resources={self.adhoc_resources}")
         self.comm_config = comm_config
 
+    def _get_same_host_scheme(self, scheme: str, default_scheme: str) -> str:
+        # the driver modules can't be loaded on platforms without Unix domain sockets
+        module_name, supported = _SAME_HOST_DRIVERS[scheme]
+        try:
+            module = importlib.import_module(module_name)
+            if getattr(module, supported)():
+                return scheme
+        except ImportError as ex:
+            self.logger.debug(f"driver for {scheme} is not available: {secure_format_exception(ex)}")
+
+        self.logger.warning(f"{scheme} is not supported, {default_scheme} is used for internal connections")
+        return default_scheme
+
     def get_config_info(self):
         return {
             "allow_adhoc": self.adhoc_allowed,
@@ -12,6 +12,7 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import asyncio
 import copy
 import logging
 import os
@@ -19,7 +20,7 @@ import random
 import threading
 import time
 import uuid
-from typing import Dict, List, Tuple, Union
+from typing import Dict, List, Optional, Tuple, Union
 from urllib.parse import urlparse
 
 from nvflare.apis.fl_constant import ConnectionSecurity
@@ -29,6 +30,7 @@ from nvflare.fuel.f3.cellnet.defs import (
     AbortRun,
     AuthenticationError,
     CellPropertyKey,
+    CipherMode,
     InvalidRequest,
     InvalidSession,
     MessageHeaderKey,
@@ -40,16 +42,20 @@ from nvflare.fuel.f3.cellnet.defs import (
 )
 from nvflare.fuel.f3.cellnet.fqcn import FQCN, FqcnInfo, same_family
 from nvflare.fuel.f3.cellnet.registry import Callback, Registry
-from nvflare.fuel.f3.cellnet.utils import decode_payload, encode_payload, format_log_message, make_reply
+from nvflare.fuel.f3.cellnet.tracing import MessageTracer, TraceStage
+from nvflare.fuel.f3.cellnet.utils import buffer_len, decode_payload, encode_payload, format_log_message, make_reply
 from nvflare.fuel.f3.comm_config import CommConfigurator
 from nvflare.fuel.f3.communicator import Communicator, MessageReceiver
 from nvflare.fuel.f3.connection import Connection
+from nvflare.fuel.f3.drivers.aio_context import AioContext
 from nvflare.fuel.f3.drivers.driver_params import DriverParams
 from nvflare.fuel.f3.drivers.net_utils import enhance_credential_info
 from nvflare.fuel.f3.endpoint import Endpoint, EndpointMonitor, EndpointState
-from nvflare.fuel.f3.message import Message
+from nvflare.fuel.f3.message import Message, TransportPropKey
 from nvflare.fuel.f3.mpm import MainProcessMonitor
+from nvflare.fuel.f3.sfm.constants import HandshakeKeys
 from nvflare.fuel.f3.stats_pool import StatsPoolManager
+from nvflare.fuel.utils.buffer_list import BufferList
 from nvflare.fuel.utils.log_utils import get_obj_logger
 from nvflare.security.logging import secure_format_exception, secure_format_traceback
 
@@ -127,6 +133,27 @@ class _Waiter(threading.Event):
         self.received_replies = {}
 
 
+class _AsyncWaiter(_Waiter):
+    """A waiter for coroutines. Its future is done in the event loop when the waiter is set"""
+
+    def __init__(self, targets: List[str], loop: asyncio.AbstractEventLoop):
+        super().__init__(targets)
+        self.loop = loop
+        self.future = loop.create_future()
+
+    def set(self):
+        super().set()
+        try:
+            self.loop.call_soon_threadsafe(self._set_future)
+        except RuntimeError:
+            # the loop is closed, nobody is waiting
+            pass
+
+    def _set_future(self):
+        if not self.future.done():
+            self.future.set_result(True)
+
+
 def log_messaging_error(
     logger, log_text: str, cell, msg: Union[Message, None], log_except=False, log_level=logging.ERROR
 ):
@@ -228,6 +255,29 @@ class _CounterName:
     REP_FILTER_ERROR = "rep_filter_error"
 
 
+class _SharedPayload:
+    """The payload of a message sent to multiple targets, encoded and encrypted only once.
+
+    It only lives for a single send, so the payload is encoded again if the message is sent again, and the
+    encoded payload is released once it's sent.
+    """
+
+    def __init__(self, message: Message):
+        self.message = message
+        self.encoded = False
+        self.encoding = None
+        self.payload = None
+        self.cipher_text = None
+
+    def encode(self):
+        if not self.encoded:
+            encoded_msg = Message(copy.copy(self.message.headers), self.message.payload)
+            encode_payload(encoded_msg)
+            self.encoding = encoded_msg.get_header(MessageHeaderKey.PAYLOAD_ENCODING)
+            self.payload = encoded_msg.payload
+            self.encoded = True
+
+
 class CertificateExchanger:
     """This class handles cert-exchange messages"""
 
@@ -397,9 +447,18 @@ class CoreCell(MessageReceiver, EndpointMonitor):
             conn_props=credentials,
             properties={
                 CellPropertyKey.FQCN: self.my_info.fqcn,
+                CellPropertyKey.FAN_OUT: True,
             },
         )
 
+        # Messages to multiple targets behind the same next hop are sent to it once
+        self.fan_out = comm_configurator.use_broadcast_fan_out(True)
+
+        # Large streams to the server are striped over this many connections
+        self.parallel_connections = comm_configurator.get_parallel_connections(1)
+        if self.parallel_connections > 1:
+            ep.set_prop(HandshakeKeys.MAX_CONNECTIONS, self.parallel_connections)
+
         self.communicator = Communicator(local_endpoint=ep)
 
         self.endpoint = ep
@@ -452,6 +511,7 @@ class CoreCell(MessageReceiver, EndpointMonitor):
 
         # a cell could have any number of connectors: some for backbone, some for ad-hoc
         self.bb_ext_connector = None  # backbone external connector - only for Client cells
+        self.bb_ext_extra_connectors = []  # parallel backbone external connectors
         self.bb_int_connector = None  # backbone internal connector - only for non-root cells
 
         # ad-hoc connectors: currently only support ad-hoc external connectors
@@ -463,25 +523,27 @@ class CoreCell(MessageReceiver, EndpointMonitor):
         self.register_request_cb(channel=_CHANNEL, topic=_TOPIC_BYE, cb=self._peer_goodbye)
 
         self.cleanup_waiter = None
-        self.msg_stats_pool = StatsPoolManager.add_time_hist_pool(
+        self.tracer = MessageTracer.get_instance()
+        self.msg_stats_pool = StatsPoolManager.add_hdr_time_pool(
             "Request_Response", "Request/response time in secs (sender)", scope=self.my_info.fqcn
         )
 
-        self.req_cb_stats_pool = StatsPoolManager.add_time_hist_pool(
+        self.req_cb_stats_pool = StatsPoolManager.add_hdr_time_pool(
             "Request_Processing",
             "Time spent (secs) by request processing callbacks (receiver)",
             scope=self.my_info.fqcn,
         )
 
+        # A category per origin, too many HDR histograms on a server with many clients
         self.msg_travel_stats_pool = StatsPoolManager.add_time_hist_pool(
             "Msg_Travel", "Time taken (secs) to get here (receiver)", scope=self.my_info.fqcn
         )
 
-        self.sent_msg_size_pool = StatsPoolManager.add_msg_size_pool(
+        self.sent_msg_size_pool = StatsPoolManager.add_hdr_msg_size_pool(
             "Sent_Msg_Sizes", "Sizes of messages sent (MBs)", scope=self.my_info.fqcn
         )
 
-        self.received_msg_size_pool = StatsPoolManager.add_msg_size_pool(
+        self.received_msg_size_pool = StatsPoolManager.add_hdr_msg_size_pool(
             "Received_Msg_Sizes", "Sizes of messages received (MBs)", scope=self.my_info.fqcn
         )
 
@@ -644,6 +706,16 @@ class CoreCell(MessageReceiver, EndpointMonitor):
                 )
             self.bb_ext_connector = None
 
+        for connector in self.bb_ext_extra_connectors:
+            try:
+                self.communicator.remove_connector(connector.handle)
+            except Exception as ex:
+                self.log_error(
+                    msg=None,
+                    log_text=f"{self.my_info.fqcn}: error removing parallel connector {secure_format_exception(ex)}",
+                )
+        self.bb_ext_extra_connectors = []
+
         # drop ad-hoc connectors to cells on server
         with self.adhoc_connector_lock:
             cells_to_delete = []
@@ -795,6 +867,19 @@ class CoreCell(MessageReceiver, EndpointMonitor):
         else:
             raise RuntimeError(f"{self.my_info.fqcn}: cannot create backbone external connector to {self.root_url}")
 
+        for _ in range(self.parallel_connections - 1):
+            connector = self.connector_manager.get_external_connector(self.root_url, False)
+            if connector:
+                self.bb_ext_extra_connectors.append(connector)
+            else:
+                self.logger.warning(f"{self.my_info.fqcn}: cannot create parallel connector to {self.root_url}")
+
+        if self.bb_ext_extra_connectors:
+            self.logger.info(
+                f"{self.my_info.fqcn}: created {len(self.bb_ext_extra_connectors)} parallel connectors "
+                f"to {self.root_url}"
+            )
+
     def _create_internal_connector(self, url: str, resources=None):
         self.bb_int_connector = self.connector_manager.get_internal_connector(url, resources)
         if self.bb_int_connector:
@@ -945,6 +1030,59 @@ class CoreCell(MessageReceiver, EndpointMonitor):
             raise ValueError(f"specified request_cb {type(cb)} is not callable")
         self.req_reg.set(channel, topic, Callback(cb, args, kwargs))
 
+    def register_async_request_cb(self, channel: str, topic: str, cb, *args, **kwargs):
+        """
+        Register a coroutine function for handling request. It's called like the CB of register_request_cb().
+
+        The CB runs in the event loop of the global AioContext, so it must not block. The reply is sent when the
+        CB completes, no thread is held while the request is being processed.
+
+        Args:
+            channel: the channel of the request
+            topic: topic of the request
+            cb: the coroutine function
+            *args:
+            **kwargs:
+
+        Returns:
+
+        """
+        if not asyncio.iscoroutinefunction(cb):
+            raise ValueError(f"specified request_cb {type(cb)} is not a coroutine function")
+        self.register_request_cb(channel, topic, self._start_async_request, cb, args, kwargs)
+
+    def _start_async_request(self, request: Message, cb, cb_args, cb_kwargs):
+        request.set_prop(MessagePropKey.ASYNC_REPLY, True)
+        AioContext.get_global_context().run_coro(self._run_async_request_cb(request, cb, cb_args, cb_kwargs))
+
+        # the reply is sent by the coroutine
+        return None
+
+    async def _run_async_request_cb(self, request: Message, cb, cb_args, cb_kwargs):
+        try:
+            self.logger.debug(f"{self.my_info.fqcn}: calling async CB {cb.__name__}")
+            reply = await cb(request, *cb_args, **cb_kwargs)
+        except Exception as ex:
+            reply = self._cb_exception_reply(request, cb, ex)
+
+        if not reply:
+            self.received_msg_counter_pool.increment(
+                category=self._stats_category(request), counter_name=_CounterName.REPLY_NONE
+            )
+            return
+
+        reply = self._check_cb_reply(request, reply)
+        endpoint = request.get_prop(MessagePropKey.ENDPOINT)
+        if not endpoint and request.get_header(MessageHeaderKey.REPLY_EXPECTED, False):
+            self.log_error("no endpoint to send the reply back", request)
+            return
+
+        # sending may block, so it's done out of the event loop
+        origin = request.get_header(MessageHeaderKey.ORIGIN)
+        my_conn_url = request.get_prop(MessagePropKey.CONN_URL)
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, self._reply_request, request, reply, endpoint, origin, my_conn_url)
+
     def encrypt_payload(self, message: Message):
 
         if not message.get_header(MessageHeaderKey.SECURE, False):
@@ -960,24 +1098,34 @@ class CoreCell(MessageReceiver, EndpointMonitor):
         if not target:
             raise RuntimeError("Message destination missing")
 
+        target_cert = self.cert_ex.get_certificate(target)
+        mode = self.credential_manager.get_cipher_mode(target)
+
         if message.payload is None:
             message.payload = bytes(0)
+        elif mode == CipherMode.CHUNKED_GCM:
+            # Chunks are encrypted from the views or buffer list without copying the whole payload
+            if not isinstance(message.payload, (bytes, bytearray, memoryview, list)):
+                raise RuntimeError(f"Payload type of {type(message.payload)} is not supported.")
+        elif isinstance(message.payload, list):
+            message.payload = bytes(BufferList(message.payload).flatten() or bytes(0))
         elif isinstance(message.payload, memoryview) or isinstance(message.payload, bytearray):
             message.payload = bytes(message.payload)
         elif not isinstance(message.payload, bytes):
             raise RuntimeError(f"Payload type of {type(message.payload)} is not supported.")
 
-        payload_len = len(message.payload)
+        payload_len = buffer_len(message.payload)
         message.add_headers(
             {
                 MessageHeaderKey.CLEAR_PAYLOAD_LEN: payload_len,
                 MessageHeaderKey.ENCRYPTED: True,
             }
         )
+        if mode != CipherMode.CBC:
+            message.set_header(MessageHeaderKey.CIPHER_MODE, mode)
 
-        target_cert = self.cert_ex.get_certificate(target)
-        message.payload = self.credential_manager.encrypt(target_cert, message.payload)
-        self.logger.debug(f"Payload ({payload_len} bytes) is encrypted ({len(message.payload)} bytes)")
+        message.payload = self.credential_manager.encrypt(target_cert, message.payload, mode)
+        self.logger.debug(f"Payload ({payload_len} bytes) is encrypted ({buffer_len(message.payload)} bytes)")
 
     def decrypt_payload(self, message: Message):
 
@@ -990,6 +1138,8 @@ class CoreCell(MessageReceiver, EndpointMonitor):
             return
 
         message.remove_header(MessageHeaderKey.ENCRYPTED)
+        mode = message.get_header(MessageHeaderKey.CIPHER_MODE, CipherMode.CBC)
+        message.remove_header(MessageHeaderKey.CIPHER_MODE)
 
         origin = message.get_header(MessageHeaderKey.ORIGIN)
         if not origin:
@@ -997,7 +1147,7 @@ class CoreCell(MessageReceiver, EndpointMonitor):
 
         payload_len = message.get_header(MessageHeaderKey.CLEAR_PAYLOAD_LEN)
         origin_cert = self.cert_ex.get_certificate(origin)
-        message.payload = self.credential_manager.decrypt(origin_cert, message.payload)
+        message.payload = self.credential_manager.decrypt(origin_cert, message.payload, mode)
         if len(message.payload) != payload_len:
             raise RuntimeError(f"Payload size changed after decryption {len(message.payload)} <> {payload_len}")
 
@@ -1138,17 +1288,22 @@ class CoreCell(MessageReceiver, EndpointMonitor):
         self.log_warning(f"no connection to {target_fqcn}", for_msg)
         return None
 
-    def _send_to_endpoint(self, to_endpoint: Endpoint, message: Message) -> str:
+    def _send_to_endpoint(
+        self, to_endpoint: Endpoint, message: Message, shared_payload: Optional[_SharedPayload] = None
+    ) -> str:
         err = ""
+        fqcn = self.my_info.fqcn
         try:
-            encode_payload(message)
-            self.encrypt_payload(message)
+            with self.tracer.span(fqcn, message, TraceStage.ENCODE):
+                if shared_payload is not None:
+                    self._use_shared_payload(shared_payload, message)
+                encode_payload(message)
+
+            with self.tracer.span(fqcn, message, TraceStage.ENCRYPT):
+                self.encrypt_payload(message)
 
             message.set_header(MessageHeaderKey.SEND_TIME, time.time())
-            if not message.payload:
-                msg_size = 0
-            else:
-                msg_size = len(message.payload)
+            msg_size = buffer_len(message.payload)
 
             if msg_size > self.max_msg_size:
                 err_text = f"message is too big ({msg_size} > {self.max_msg_size}"
@@ -1163,7 +1318,8 @@ class CoreCell(MessageReceiver, EndpointMonitor):
                     self._send_direct_message(direct_cell, message)
 
                 else:
-                    self.communicator.send(to_endpoint, CoreCell.APP_ID, message)
+                    with self.tracer.span(fqcn, message, TraceStage.SEND):
+                        self.communicator.send(to_endpoint, CoreCell.APP_ID, message)
                 self.sent_msg_size_pool.record_value(category=self._stats_category(message), value=msg_size_mbs)
         except Exception as ex:
             err_text = f"Failed to send message to {to_endpoint.name}: {secure_format_exception(ex)}"
@@ -1177,6 +1333,40 @@ class CoreCell(MessageReceiver, EndpointMonitor):
             endpoint=Endpoint(self.my_info.fqcn), connection=None, app_id=self.APP_ID, message=message
         )
 
+    def _use_shared_payload(self, shared: _SharedPayload, message: Message):
+        """Use the payload of a message sent to multiple targets, which is encoded only once.
+
+        In secure mode, if the target supports chunked AES-GCM, the payload is also encrypted only once under a
+        content key, and only the content key is encrypted for each target.
+        """
+        shared.encode()
+        message.payload = shared.payload
+        message.set_header(MessageHeaderKey.PAYLOAD_ENCODING, shared.encoding)
+
+        if not message.get_header(MessageHeaderKey.SECURE, False) or message.get_header(
+            MessageHeaderKey.ENCRYPTED, False
+        ):
+            return
+
+        target = message.get_header(MessageHeaderKey.DESTINATION)
+        target_cert = self.cert_ex.get_certificate(target)
+        if self.credential_manager.get_cipher_mode(target) != CipherMode.CHUNKED_GCM:
+            # The payload is encrypted for this target only
+            return
+
+        payload = shared.payload if shared.payload is not None else bytes(0)
+        if shared.cipher_text is None:
+            shared.cipher_text = self.credential_manager.encrypt_multicast(payload)
+
+        message.add_headers(
+            {
+                MessageHeaderKey.CLEAR_PAYLOAD_LEN: buffer_len(payload),
+                MessageHeaderKey.ENCRYPTED: True,
+                MessageHeaderKey.CIPHER_MODE: CipherMode.CHUNKED_GCM,
+            }
+        )
+        message.payload = self.credential_manager.wrap_multicast(target_cert, shared.cipher_text)
+
     def _send_target_messages(
         self,
         target_msgs: Dict[str, TargetMessage],
@@ -1186,6 +1376,7 @@ class CoreCell(MessageReceiver, EndpointMonitor):
 
         send_errs = {}
         reachable_targets = {}  # target fqcn => endpoint
+        fan_outs = {}  # (next hop, message id) => [(target, endpoint, request, shared payload)]
         for t, tm in target_msgs.items():
             err, ep = self._find_endpoint(t, tm.message)
             if ep:
@@ -1205,8 +1396,19 @@ class CoreCell(MessageReceiver, EndpointMonitor):
                 self.log_error(f"cannot send to '{t}': {err}", msg)
                 send_errs[t] = err
 
+        # Messages shared by multiple targets are encoded and encrypted only once in this send
+        shared_payloads = {}  # message id => _SharedPayload
+        msg_targets = {}
+        for t in reachable_targets:
+            msg_id = id(target_msgs[t].message)
+            msg_targets[msg_id] = msg_targets.get(msg_id, 0) + 1
+
+        trace_ids = {}  # message id => trace ID, decided once for all targets of a message
         for t, ep in reachable_targets.items():
             tm = target_msgs[t]
+            msg_id = id(tm.message)
+            if msg_id not in trace_ids:
+                trace_ids[msg_id] = self.tracer.sample(tm.message)
             req = Message(headers=copy.copy(tm.message.headers), payload=tm.message.payload)
 
             req.add_headers(
@@ -1221,6 +1423,11 @@ class CoreCell(MessageReceiver, EndpointMonitor):
                     MessageHeaderKey.ROUTE: [(self.my_info.fqcn, time.time())],
                 }
             )
+            if trace_ids[msg_id]:
+                req.set_header(MessageHeaderKey.TRACE_ID, trace_ids[msg_id])
+            else:
+                # the message may have been received in a trace
+                req.remove_header(MessageHeaderKey.TRACE_ID)
 
             # invoke outgoing req filters
             req_filters = self.out_req_filter_reg.find(tm.channel, tm.topic)
@@ -1248,14 +1455,106 @@ class CoreCell(MessageReceiver, EndpointMonitor):
                     if listener:
                         conn_url = listener.get_connection_url()
                         req.set_header(MessageHeaderKey.CONN_URL, conn_url)
-            err = self._send_to_endpoint(ep, req)
-            if err:
-                self.log_error(f"failed to send to endpoint {ep.name}: {err}", req)
+
+            # Filters may have changed the payload for this target
+            shared_payload = None
+            if msg_targets[msg_id] > 1 and req.payload is tm.message.payload:
+                shared_payload = shared_payloads.get(msg_id)
+                if not shared_payload:
+                    shared_payload = shared_payloads[msg_id] = _SharedPayload(tm.message)
+
+                if self._can_fan_out(t, ep, req):
+                    group = fan_outs.setdefault((ep.name, msg_id), [])
+                    if not group or self._same_fan_out_headers(group[0][2], req):
+                        group.append((t, ep, req, shared_payload))
+                        continue
+
+            send_errs[t] = self._send_to_next_hop(ep, req, shared_payload)
+
+        for group in fan_outs.values():
+            if len(group) == 1:
+                t, ep, req, shared_payload = group[0]
+                send_errs[t] = self._send_to_next_hop(ep, req, shared_payload)
             else:
-                self.sent_msg_counter_pool.increment(category=self._stats_category(req), counter_name=_CounterName.SENT)
-            send_errs[t] = err
+                send_errs.update(self._send_fan_out(group))
         return send_errs
 
+    def _send_to_next_hop(self, ep: Endpoint, req: Message, shared_payload: Optional[_SharedPayload]) -> str:
+        err = self._send_to_endpoint(ep, req, shared_payload=shared_payload)
+        if err:
+            self.log_error(f"failed to send to endpoint {ep.name}: {err}", req)
+        else:
+            self.sent_msg_counter_pool.increment(category=self._stats_category(req), counter_name=_CounterName.SENT)
+        return err
+
+    def _can_fan_out(self, target: str, ep: Endpoint, req: Message) -> bool:
+        """The message to the target can be sent to the next hop together with other targets behind it.
+
+        Secure messages are encrypted for each target, so they are always sent separately.
+        """
+        return (
+            self.fan_out
+            and target != ep.name
+            and ep.get_prop(CellPropertyKey.FAN_OUT)
+            and not req.get_header(MessageHeaderKey.SECURE, False)
+        )
+
+    @staticmethod
+    def _same_fan_out_headers(first: Message, req: Message) -> bool:
+        # Filters may have added different headers for each target
+        per_target = (MessageHeaderKey.DESTINATION, MessageHeaderKey.ROUTE)
+        return {k: v for k, v in first.headers.items() if k not in per_target} == {
+            k: v for k, v in req.headers.items() if k not in per_target
+        }
+
+    def _send_fan_out(self, group: List[Tuple[str, Endpoint, Message, Optional[_SharedPayload]]]) -> Dict[str, str]:
+        """Send one copy of the message to the next hop, which forwards it to the targets behind it.
+
+        The replies come back from each target individually, as if the message were sent to it directly.
+        """
+        _, ep, req, shared_payload = group[0]
+        targets = [t for t, _, _, _ in group]
+        msg = Message(headers=copy.copy(req.headers), payload=req.payload)
+        msg.add_headers({MessageHeaderKey.DESTINATION: ep.name, MessageHeaderKey.FAN_OUT_TARGETS: targets})
+        self.logger.debug(f"{self.my_info.fqcn}: sending to {len(targets)} targets through {ep.name}")
+
+        err = self._send_to_endpoint(ep, msg, shared_payload=shared_payload)
+        if err:
+            self.log_error(f"failed to send to endpoint {ep.name} for {len(targets)} targets: {err}", msg)
+        else:
+            for _, _, req, _ in group:
+                self.sent_msg_counter_pool.increment(category=self._stats_category(req), counter_name=_CounterName.SENT)
+        return {t: err for t in targets}
+
+    def _fan_out(self, endpoint: Endpoint, origin: str, msg_type: str, message: Message):
+        """Forward a message received once for multiple targets. Targets behind the same next hop are grouped
+        again, so the message travels down a relay tree only once per branch.
+        """
+        targets = message.get_header(MessageHeaderKey.FAN_OUT_TARGETS)
+        message.remove_header(MessageHeaderKey.FAN_OUT_TARGETS)
+        route = message.get_header(MessageHeaderKey.ROUTE, [])
+
+        fan_outs = {}
+        for t in targets:
+            msg = Message(headers=copy.copy(message.headers), payload=message.payload)
+            msg.add_headers({MessageHeaderKey.DESTINATION: t, MessageHeaderKey.ROUTE: list(route)})
+            err, ep = self._find_endpoint(t, msg)
+            if ep and self._can_fan_out(t, ep, msg):
+                fan_outs.setdefault(ep.name, []).append(msg)
+            else:
+                self._forward(endpoint, origin, t, msg_type, msg)
+
+        for ep_name, msgs in fan_outs.items():
+            msg = msgs[0]
+            if len(msgs) > 1:
+                msg.add_headers(
+                    {
+                        MessageHeaderKey.DESTINATION: ep_name,
+                        MessageHeaderKey.FAN_OUT_TARGETS: [m.get_header(MessageHeaderKey.DESTINATION) for m in msgs],
+                    }
+                )
+            self._forward(endpoint, origin, msg.get_header(MessageHeaderKey.DESTINATION), msg_type, msg)
+
     def _send_to_targets(
         self,
         channel: str,
@@ -1312,66 +1611,115 @@ class CoreCell(MessageReceiver, EndpointMonitor):
         targets = [t for t in target_msgs]
         self.logger.debug(f"{self.my_info.fqcn}: broadcasting to {targets} ...")
         waiter = _Waiter(targets)
-        if waiter.id in self.waiters:
-            raise RuntimeError("waiter not unique!")
-        self.waiters[waiter.id] = waiter
-        now = time.time()
+        self._add_waiter(waiter)
         if not timeout:
             timeout = self.max_timeout
-        result = {}
         try:
-            for _, tm in target_msgs.items():
-                request = tm.message
-                request.add_headers(
-                    {
-                        MessageHeaderKey.REQ_ID: waiter.id,
-                        MessageHeaderKey.REPLY_EXPECTED: True,
-                        MessageHeaderKey.SECURE: secure,
-                        MessageHeaderKey.OPTIONAL: optional,
-                    }
-                )
-            send_errs = self._send_target_messages(target_msgs)
-            send_count = 0
-            timeout_reply = make_reply(ReturnCode.TIMEOUT)
-
-            # NOTE: it is possible that reply is already received and the waiter is triggered by now!
-            # if waiter.received_replies:
-            #     self.logger.info(f"{self.my_info.fqcn}: the network is extremely fast - response already received!")
-
-            topics = []
-            for_msg = None
-            for t, err in send_errs.items():
-                if not err:
-                    send_count += 1
-                    result[t] = timeout_reply
-                    tm = target_msgs[t]
-                    topic = tm.message.get_header(MessageHeaderKey.TOPIC, "?")
-                    if topic not in topics:
-                        topics.append(topic)
-                    if not for_msg:
-                        for_msg = tm.message
-                else:
-                    result[t] = make_reply(rc=err)
-                    waiter.reply_time[t] = now
-
+            result, send_count, topics, for_msg = self._send_requests(waiter, target_msgs, secure, optional)
             if send_count > 0:
-                self.num_sar_reqs += 1
-                num_reqs = len(self.waiters)
-                if self.req_hw < num_reqs:
-                    self.req_hw = num_reqs
-
                 # wait for reply
                 self.logger.debug(f"{self.my_info.fqcn}: set up waiter {waiter.id} to wait for {timeout} secs")
                 if not waiter.wait(timeout=timeout):
-                    # timeout
-                    self.log_error(f"timeout on Request {waiter.id} for {topics} after {timeout} secs", for_msg)
-                    with self.stats_lock:
-                        self.num_timeout_reqs += 1
-        except Exception as ex:
-            raise ex
+                    self._request_timed_out(waiter, topics, timeout, for_msg)
         finally:
             self.waiters.pop(waiter.id, None)
             self.logger.debug(f"released waiter on REQ {waiter.id}")
+        return self._collect_replies(waiter, result)
+
+    async def async_broadcast_multi_requests(
+        self, target_msgs: Dict[str, TargetMessage], timeout=None, secure=False, optional=False
+    ) -> Dict[str, Message]:
+        """
+        Same as broadcast_multi_requests(), but replies are awaited in the event loop, so no thread is blocked while
+        waiting. Messages are sent in the default executor of the loop since sending may block.
+
+        Args:
+            target_msgs: messages to be sent
+            timeout: timeout value
+            secure: End-end encryption
+            optional: whether the message is optional
+
+        Returns: a dict of: target name => reply message
+
+        """
+        targets = [t for t in target_msgs]
+        self.logger.debug(f"{self.my_info.fqcn}: async broadcasting to {targets} ...")
+        loop = asyncio.get_running_loop()
+        waiter = _AsyncWaiter(targets, loop)
+        self._add_waiter(waiter)
+        if not timeout:
+            timeout = self.max_timeout
+        try:
+            result, send_count, topics, for_msg = await loop.run_in_executor(
+                None, self._send_requests, waiter, target_msgs, secure, optional
+            )
+            if send_count > 0:
+                self.logger.debug(f"{self.my_info.fqcn}: set up async waiter {waiter.id} to wait for {timeout} secs")
+                try:
+                    await asyncio.wait_for(waiter.future, timeout)
+                except asyncio.TimeoutError:
+                    self._request_timed_out(waiter, topics, timeout, for_msg)
+        finally:
+            self.waiters.pop(waiter.id, None)
+            self.logger.debug(f"released async waiter on REQ {waiter.id}")
+        return self._collect_replies(waiter, result)
+
+    def _add_waiter(self, waiter: _Waiter):
+        if waiter.id in self.waiters:
+            raise RuntimeError("waiter not unique!")
+        self.waiters[waiter.id] = waiter
+
+    def _send_requests(self, waiter: _Waiter, target_msgs: Dict[str, TargetMessage], secure: bool, optional: bool):
+        now = time.time()
+        result = {}
+        for _, tm in target_msgs.items():
+            request = tm.message
+            request.add_headers(
+                {
+                    MessageHeaderKey.REQ_ID: waiter.id,
+                    MessageHeaderKey.REPLY_EXPECTED: True,
+                    MessageHeaderKey.SECURE: secure,
+                    MessageHeaderKey.OPTIONAL: optional,
+                }
+            )
+        send_errs = self._send_target_messages(target_msgs)
+        send_count = 0
+        timeout_reply = make_reply(ReturnCode.TIMEOUT)
+
+        # NOTE: it is possible that reply is already received and the waiter is triggered by now!
+        # if waiter.received_replies:
+        #     self.logger.info(f"{self.my_info.fqcn}: the network is extremely fast - response already received!")
+
+        topics = []
+        for_msg = None
+        for t, err in send_errs.items():
+            if not err:
+                send_count += 1
+                result[t] = timeout_reply
+                tm = target_msgs[t]
+                topic = tm.message.get_header(MessageHeaderKey.TOPIC, "?")
+                if topic not in topics:
+                    topics.append(topic)
+                if not for_msg:
+                    for_msg = tm.message
+            else:
+                result[t] = make_reply(rc=err)
+                waiter.reply_time[t] = now
+
+        if send_count > 0:
+            self.num_sar_reqs += 1
+            num_reqs = len(self.waiters)
+            if self.req_hw < num_reqs:
+                self.req_hw = num_reqs
+
+        return result, send_count, topics, for_msg
+
+    def _request_timed_out(self, waiter: _Waiter, topics: List[str], timeout, for_msg: Message):
+        self.log_error(f"timeout on Request {waiter.id} for {topics} after {timeout} secs", for_msg)
+        with self.stats_lock:
+            self.num_timeout_reqs += 1
+
+    def _collect_replies(self, waiter: _Waiter, result: Dict[str, Message]) -> Dict[str, Message]:
         if waiter.received_replies:
             result.update(waiter.received_replies)
         for t, reply in result.items():
@@ -1411,6 +1759,33 @@ class CoreCell(MessageReceiver, EndpointMonitor):
             target_msgs[t] = TargetMessage(t, channel, topic, request)
         return self.broadcast_multi_requests(target_msgs, timeout, secure=secure, optional=optional)
 
+    async def async_broadcast_request(
+        self,
+        channel: str,
+        topic: str,
+        targets: Union[str, List[str]],
+        request: Message,
+        timeout=None,
+        secure=False,
+        optional=False,
+    ) -> Dict[str, Message]:
+        """Same as broadcast_request(), but replies are awaited in the event loop"""
+        if isinstance(targets, str):
+            targets = [targets]
+        target_msgs = {}
+        for t in targets:
+            target_msgs[t] = TargetMessage(t, channel, topic, request)
+        return await self.async_broadcast_multi_requests(target_msgs, timeout, secure=secure, optional=optional)
+
+    async def async_send_request(
+        self, channel: str, topic: str, target: str, request: Message, timeout=None, secure=False, optional=False
+    ) -> Message:
+        """Same as send_request(), but the reply is awaited in the event loop"""
+        self.logger.debug(f"{self.my_info.fqcn}: async sending request {channel}:{topic} to {target}")
+        result = await self.async_broadcast_request(channel, topic, [target], request, timeout, secure, optional)
+        assert isinstance(result, dict)
+        return result.get(target)
+
     def fire_and_forget(
         self, channel: str, topic: str, targets: Union[str, List[str]], message: Message, secure=False, optional=False
     ) -> Dict[str, str]:
@@ -1570,6 +1945,9 @@ class CoreCell(MessageReceiver, EndpointMonitor):
             }
         )
 
+        trace_id = self.tracer.sample(reply)
+        if trace_id:
+            reply.set_header(MessageHeaderKey.TRACE_ID, trace_id)
         err, ep = self._find_endpoint(to_cell, reply)
         if err:
             return err
@@ -1580,21 +1958,23 @@ class CoreCell(MessageReceiver, EndpointMonitor):
         try:
             self.logger.debug(f"{self.my_info.fqcn}: calling CB {cb.__name__}")
             return cb(message, *args, **kwargs)
-        except ServiceUnavailable:
+        except Exception as ex:
+            return self._cb_exception_reply(message, cb, ex)
+
+    def _cb_exception_reply(self, message: Message, cb, ex: Exception) -> Message:
+        if isinstance(ex, ServiceUnavailable):
             return make_reply(ReturnCode.SERVICE_UNAVAILABLE)
-        except InvalidSession:
+        if isinstance(ex, InvalidSession):
             return make_reply(ReturnCode.INVALID_SESSION)
-        except InvalidRequest:
+        if isinstance(ex, InvalidRequest):
             return make_reply(ReturnCode.INVALID_REQUEST)
-        except AuthenticationError:
+        if isinstance(ex, AuthenticationError):
             return make_reply(ReturnCode.AUTHENTICATION_ERROR)
-        except AbortRun:
+        if isinstance(ex, AbortRun):
             return make_reply(ReturnCode.ABORT_RUN)
-        except Exception as ex:
-            self.log_error(
-                f"exception from CB {cb.__name__}: {secure_format_exception(ex)}", msg=message, log_except=True
-            )
-            return make_reply(ReturnCode.PROCESS_EXCEPTION)
+
+        self.log_error(f"exception from CB {cb.__name__}: {secure_format_exception(ex)}", msg=message, log_except=True)
+        return make_reply(ReturnCode.PROCESS_EXCEPTION)
 
     def process_message(self, endpoint: Endpoint, connection: Connection, app_id: int, message: Message):
         # this is the receiver callback
@@ -1608,8 +1988,7 @@ class CoreCell(MessageReceiver, EndpointMonitor):
     def _process_request(self, origin: str, message: Message) -> Union[None, Message]:
         self.logger.debug(f"{self.my_info.fqcn}: processing incoming request")
 
-        self.decrypt_payload(message)
-        decode_payload(message)
+        self._decrypt_and_decode(message)
         # this is a request for me - dispatch to the right CB
         channel = message.get_header(MessageHeaderKey.CHANNEL, "")
         topic = message.get_header(MessageHeaderKey.TOPIC, "")
@@ -1632,14 +2011,26 @@ class CoreCell(MessageReceiver, EndpointMonitor):
         assert isinstance(_cb, Callback)
         self.logger.debug(f"{self.my_info.fqcn}: calling registered request CB")
         cb_start = time.perf_counter()
-        reply = self._try_cb(message, _cb.cb, *_cb.args, **_cb.kwargs)
+        with self.tracer.span(self.my_info.fqcn, message, TraceStage.CALLBACK):
+            reply = self._try_cb(message, _cb.cb, *_cb.args, **_cb.kwargs)
         cb_end = time.perf_counter()
         self.req_cb_stats_pool.record_value(category=self._stats_category(message), value=cb_end - cb_start)
         if not reply:
             # the CB doesn't have anything to reply
             return None
 
+        return self._check_cb_reply(message, reply)
+
+    def _decrypt_and_decode(self, message: Message):
+        with self.tracer.span(self.my_info.fqcn, message, TraceStage.DECRYPT):
+            self.decrypt_payload(message)
+        with self.tracer.span(self.my_info.fqcn, message, TraceStage.DECODE):
+            decode_payload(message)
+
+    def _check_cb_reply(self, message: Message, reply) -> Message:
         if not isinstance(reply, Message):
+            channel = message.get_header(MessageHeaderKey.CHANNEL, "")
+            topic = message.get_header(MessageHeaderKey.TOPIC, "")
             self.log_error(
                 f"bad result from request CB for topic {topic} on channel {channel}: "
                 f"expect Message but got {type(reply)}",
@@ -1686,28 +2077,45 @@ class CoreCell(MessageReceiver, EndpointMonitor):
                 self.logger.debug(f"{self.my_info.fqcn}: can't forward: drop the message since reply is not expected")
                 return
 
-            # tell the requester that message couldn't be delivered
-            req_id = message.get_header(MessageHeaderKey.REQ_ID, "")
-            reply = make_reply(ReturnCode.COMM_ERROR, error="cannot forward")
-            reply.add_headers(
-                {
-                    MessageHeaderKey.ORIGINAL_HEADERS: message.headers,
-                    MessageHeaderKey.FROM_CELL: self.my_info.fqcn,
-                    MessageHeaderKey.TO_CELL: endpoint.name,
-                    MessageHeaderKey.ORIGIN: self.my_info.fqcn,
-                    MessageHeaderKey.DESTINATION: origin,
-                    MessageHeaderKey.REQ_ID: [req_id],
-                    MessageHeaderKey.MSG_TYPE: MessageType.RETURN,
-                    MessageHeaderKey.ROUTE: [(self.my_info.fqcn, time.time())],
-                    MessageHeaderKey.RETURN_REASON: ReturnReason.CANT_FORWARD,
-                }
-            )
-            self._send_to_endpoint(endpoint, reply)
-            self.logger.debug(f"{self.my_info.fqcn}: sent RETURN message back to {endpoint.name}")
+            # tell the requester that message couldn't be delivered, to each target if it's a fan-out
+            for original_headers in self._headers_per_target(message, destination):
+                self._return_to_origin(endpoint, origin, original_headers)
         else:
             # msg_type is either RETURN or REPLY - drop it.
             self.logger.debug(format_log_message(self.my_info.fqcn, message, "dropped forwarded message"))
 
+    @staticmethod
+    def _headers_per_target(message: Message, destination: str) -> List[dict]:
+        """Headers of the message as sent to each of its targets. A fan-out message is returned to the origin
+        once for each target, since the origin is waiting for each of them.
+        """
+        result = []
+        for t in message.get_header(MessageHeaderKey.FAN_OUT_TARGETS) or [destination]:
+            headers = copy.copy(message.headers)
+            headers[MessageHeaderKey.DESTINATION] = t
+            headers.pop(MessageHeaderKey.FAN_OUT_TARGETS, None)
+            result.append(headers)
+        return result
+
+    def _return_to_origin(self, endpoint: Endpoint, origin: str, original_headers: dict):
+        req_id = original_headers.get(MessageHeaderKey.REQ_ID, "")
+        reply = make_reply(ReturnCode.COMM_ERROR, error="cannot forward")
+        reply.add_headers(
+            {
+                MessageHeaderKey.ORIGINAL_HEADERS: original_headers,
+                MessageHeaderKey.FROM_CELL: self.my_info.fqcn,
+                MessageHeaderKey.TO_CELL: endpoint.name,
+                MessageHeaderKey.ORIGIN: self.my_info.fqcn,
+                MessageHeaderKey.DESTINATION: origin,
+                MessageHeaderKey.REQ_ID: [req_id],
+                MessageHeaderKey.MSG_TYPE: MessageType.RETURN,
+                MessageHeaderKey.ROUTE: [(self.my_info.fqcn, time.time())],
+                MessageHeaderKey.RETURN_REASON: ReturnReason.CANT_FORWARD,
+            }
+        )
+        self._send_to_endpoint(endpoint, reply)
+        self.logger.debug(f"{self.my_info.fqcn}: sent RETURN message back to {endpoint.name}")
+
     def _stats_category(self, message: Message):
         channel = message.get_header(MessageHeaderKey.CHANNEL, "?")
         topic = message.get_header(MessageHeaderKey.TOPIC, "?")
@@ -1737,8 +2145,7 @@ class CoreCell(MessageReceiver, EndpointMonitor):
         topic = message.get_header(MessageHeaderKey.TOPIC, "")
         now = time.time()
         self.logger.debug(f"{self.my_info.fqcn}: processing reply from {origin} for type {msg_type}")
-        self.decrypt_payload(message)
-        decode_payload(message)
+        self._decrypt_and_decode(message)
 
         req_ids = message.get_header(MessageHeaderKey.REQ_ID)
         if not req_ids:
@@ -1827,13 +2234,24 @@ class CoreCell(MessageReceiver, EndpointMonitor):
 
     @staticmethod
     def _msg_size_mbs(message: Message):
-        if message.payload:
-            msg_size = len(message.payload)
-        else:
-            msg_size = 0
-        return msg_size / _ONE_MB
+        return buffer_len(message.payload) / _ONE_MB
+
+    def _trace_arrival(self, message: Message):
+        """Record the time taken by the message to get to the connection and to be dispatched to this cell"""
+        now = time.time()
+        send_time = message.get_header(MessageHeaderKey.SEND_TIME)
+        receive_time = message.get_prop(TransportPropKey.RECEIVE_TIME)
+        if receive_time is None:
+            # delivered directly in the same process
+            receive_time = now
+        if send_time:
+            self.tracer.record(self.my_info.fqcn, message, TraceStage.WIRE, send_time, receive_time - send_time)
+        self.tracer.record(self.my_info.fqcn, message, TraceStage.FRAME_QUEUE, receive_time, now - receive_time)
 
     def _process_received_msg(self, endpoint: Endpoint, connection: Connection, message: Message):
+        if self.tracer.is_traced(message):
+            self._trace_arrival(message)
+
         route = message.get_header(MessageHeaderKey.ROUTE)
         if route:
             origin_name = route[0][0]
@@ -1898,23 +2316,31 @@ class CoreCell(MessageReceiver, EndpointMonitor):
                     return
 
                 req_id = message.get_header(MessageHeaderKey.REQ_ID, "")
-                reply.add_headers(
-                    {
-                        MessageHeaderKey.ORIGINAL_HEADERS: message.headers,
-                        MessageHeaderKey.FROM_CELL: self.my_info.fqcn,
-                        MessageHeaderKey.TO_CELL: endpoint.name,
-                        MessageHeaderKey.ORIGIN: self.my_info.fqcn,
-                        MessageHeaderKey.DESTINATION: origin,
-                        MessageHeaderKey.REQ_ID: [req_id],
-                        MessageHeaderKey.MSG_TYPE: MessageType.RETURN,
-                        MessageHeaderKey.ROUTE: [(self.my_info.fqcn, time.time())],
-                        MessageHeaderKey.RETURN_REASON: ReturnReason.INTERCEPT,
-                    }
-                )
-                self._send_reply(reply, endpoint)
+                # a fan-out message is returned for each target
+                for original_headers in self._headers_per_target(message, destination):
+                    ret = Message(copy.copy(reply.headers), reply.payload)
+                    ret.add_headers(
+                        {
+                            MessageHeaderKey.ORIGINAL_HEADERS: original_headers,
+                            MessageHeaderKey.FROM_CELL: self.my_info.fqcn,
+                            MessageHeaderKey.TO_CELL: endpoint.name,
+                            MessageHeaderKey.ORIGIN: self.my_info.fqcn,
+                            MessageHeaderKey.DESTINATION: origin,
+                            MessageHeaderKey.REQ_ID: [req_id],
+                            MessageHeaderKey.MSG_TYPE: MessageType.RETURN,
+                            MessageHeaderKey.ROUTE: [(self.my_info.fqcn, time.time())],
+                            MessageHeaderKey.RETURN_REASON: ReturnReason.INTERCEPT,
+                        }
+                    )
+                    self._send_reply(ret, endpoint)
                 self.logger.debug(f"{self.my_info.fqcn}: returned intercepted message")
                 return
 
+        if destination == self.my_info.fqcn and message.get_header(MessageHeaderKey.FAN_OUT_TARGETS):
+            # sent to me once for multiple targets behind me
+            self._fan_out(endpoint, origin, msg_type, message)
+            return
+
         if destination != self.my_info.fqcn:
             # not for me - need to forward it
             self.sent_msg_counter_pool.increment(
@@ -1961,65 +2387,77 @@ class CoreCell(MessageReceiver, EndpointMonitor):
 
         if msg_type == MessageType.REQ:
             # this is a request for me - dispatch to the right CB
-            channel = message.get_header(MessageHeaderKey.CHANNEL, "")
-            topic = message.get_header(MessageHeaderKey.TOPIC, "")
+            if my_conn_url:
+                # async CBs reply later
+                message.set_prop(MessagePropKey.CONN_URL, my_conn_url)
             reply = self._process_request(origin, message)
 
             if not reply:
-                self.received_msg_counter_pool.increment(
-                    category=self._stats_category(message), counter_name=_CounterName.REPLY_NONE
-                )
-                return
-
-            is_optional = message.get_header(MessageHeaderKey.OPTIONAL, False)
-            reply.set_header(MessageHeaderKey.OPTIONAL, is_optional)
-            reply_expected = message.get_header(MessageHeaderKey.REPLY_EXPECTED, False)
-            if not reply_expected:
-                # this is fire and forget
-                self.logger.debug(f"{self.my_info.fqcn}: don't send response - request expects no reply")
-                self.received_msg_counter_pool.increment(
-                    category=self._stats_category(message), counter_name=_CounterName.REPLY_NOT_EXPECTED
-                )
+                if not message.get_prop(MessagePropKey.ASYNC_REPLY):
+                    self.received_msg_counter_pool.increment(
+                        category=self._stats_category(message), counter_name=_CounterName.REPLY_NONE
+                    )
                 return
 
-            # send the reply back
-            if not reply.headers.get(MessageHeaderKey.RETURN_CODE):
-                self.logger.debug(f"{self.my_info.fqcn}: added return code OK")
-                reply.set_header(MessageHeaderKey.RETURN_CODE, ReturnCode.OK)
+            self._reply_request(message, reply, endpoint, origin, my_conn_url)
+        else:
+            # the message is either a reply or a return for a previous request: handle replies
+            self._process_reply(origin, message, msg_type)
 
-            req_id = message.get_header(MessageHeaderKey.REQ_ID, "")
-            reply.add_headers(
-                {
-                    MessageHeaderKey.CHANNEL: channel,
-                    MessageHeaderKey.TOPIC: topic,
-                    MessageHeaderKey.FROM_CELL: self.my_info.fqcn,
-                    MessageHeaderKey.TO_CELL: endpoint.name,
-                    MessageHeaderKey.ORIGIN: self.my_info.fqcn,
-                    MessageHeaderKey.DESTINATION: origin,
-                    MessageHeaderKey.REQ_ID: req_id,
-                    MessageHeaderKey.MSG_TYPE: MessageType.REPLY,
-                    MessageHeaderKey.ROUTE: [(self.my_info.fqcn, time.time())],
-                }
+    def _reply_request(self, message: Message, reply: Message, endpoint: Endpoint, origin: str, my_conn_url=None):
+        channel = message.get_header(MessageHeaderKey.CHANNEL, "")
+        topic = message.get_header(MessageHeaderKey.TOPIC, "")
+        is_optional = message.get_header(MessageHeaderKey.OPTIONAL, False)
+        reply.set_header(MessageHeaderKey.OPTIONAL, is_optional)
+        reply_expected = message.get_header(MessageHeaderKey.REPLY_EXPECTED, False)
+        if not reply_expected:
+            # this is fire and forget
+            self.logger.debug(f"{self.my_info.fqcn}: don't send response - request expects no reply")
+            self.received_msg_counter_pool.increment(
+                category=self._stats_category(message), counter_name=_CounterName.REPLY_NOT_EXPECTED
             )
+            return
 
-            if my_conn_url:
-                reply.set_header(MessageHeaderKey.CONN_URL, my_conn_url)
+        # send the reply back
+        if not reply.headers.get(MessageHeaderKey.RETURN_CODE):
+            self.logger.debug(f"{self.my_info.fqcn}: added return code OK")
+            reply.set_header(MessageHeaderKey.RETURN_CODE, ReturnCode.OK)
 
-            # invoke outgoing reply filters
-            reply_filters = self.out_reply_filter_reg.find(channel, topic)
-            if reply_filters:
-                self.logger.debug(f"{self.my_info.fqcn}: invoking outgoing reply filters")
-                assert isinstance(reply_filters, list)
-                for f in reply_filters:
-                    assert isinstance(f, Callback)
-                    r = self._try_cb(reply, f.cb, *f.args, **f.kwargs)
-                    if r:
-                        reply = r
-                        break
-            self._send_reply(reply, endpoint)
-        else:
-            # the message is either a reply or a return for a previous request: handle replies
-            self._process_reply(origin, message, msg_type)
+        req_id = message.get_header(MessageHeaderKey.REQ_ID, "")
+        reply.add_headers(
+            {
+                MessageHeaderKey.CHANNEL: channel,
+                MessageHeaderKey.TOPIC: topic,
+                MessageHeaderKey.FROM_CELL: self.my_info.fqcn,
+                MessageHeaderKey.TO_CELL: endpoint.name,
+                MessageHeaderKey.ORIGIN: self.my_info.fqcn,
+                MessageHeaderKey.DESTINATION: origin,
+                MessageHeaderKey.REQ_ID: req_id,
+                MessageHeaderKey.MSG_TYPE: MessageType.REPLY,
+                MessageHeaderKey.ROUTE: [(self.my_info.fqcn, time.time())],
+            }
+        )
+
+        if my_conn_url:
+            reply.set_header(MessageHeaderKey.CONN_URL, my_conn_url)
+
+        # The reply is in the trace of the request
+        trace_id = message.get_header(MessageHeaderKey.TRACE_ID)
+        if trace_id:
+            reply.set_header(MessageHeaderKey.TRACE_ID, trace_id)
+
+        # invoke outgoing reply filters
+        reply_filters = self.out_reply_filter_reg.find(channel, topic)
+        if reply_filters:
+            self.logger.debug(f"{self.my_info.fqcn}: invoking outgoing reply filters")
+            assert isinstance(reply_filters, list)
+            for f in reply_filters:
+                assert isinstance(f, Callback)
+                r = self._try_cb(reply, f.cb, *f.args, **f.kwargs)
+                if r:
+                    reply = r
+                    break
+        self._send_reply(reply, endpoint)
 
     def _send_reply(self, reply: Message, endpoint: Endpoint):
         self.logger.debug(f"{self.my_info.fqcn}: sending reply back to {endpoint.name}")
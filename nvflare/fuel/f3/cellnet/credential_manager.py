@@ -13,14 +13,16 @@
 # limitations under the License.
 import logging
 import threading
+from typing import Union
 
 from cryptography import x509
 from cryptography.hazmat.primitives import serialization
 from cryptography.hazmat.primitives.asymmetric.rsa import RSAPrivateKey
 from cryptography.x509 import Certificate
 
-from nvflare.fuel.f3.cellnet.cell_cipher import SimpleCellCipher
-from nvflare.fuel.f3.cellnet.defs import MessageHeaderKey
+from nvflare.fuel.f3.cellnet.cell_cipher import DEFAULT_CIPHER_CHUNK_SIZE, MulticastCipherText, SimpleCellCipher
+from nvflare.fuel.f3.cellnet.defs import CipherMode, MessageHeaderKey
+from nvflare.fuel.f3.comm_config import CommConfigurator
 from nvflare.fuel.f3.drivers.driver_params import DriverParams
 from nvflare.fuel.f3.endpoint import Endpoint
 from nvflare.fuel.f3.message import Message
@@ -32,6 +34,7 @@ CERT_TARGET = "cert_target"
 CERT_ORIGIN = "cert_origin"
 CERT_CONTENT = "cert_content"
 CERT_CA_CONTENT = "cert_ca_content"
+CERT_CIPHER_MODES = "cert_cipher_modes"
 CERT_REQ_TIMEOUT = 10
 
 
@@ -42,8 +45,18 @@ class CredentialManager:
 
         self.local_endpoint = local_endpoint
         self.cert_cache = {}
+        # Cipher modes supported by the peers, learned from cert exchange. Older peers only support CBC
+        self.peer_cipher_modes = {}
         self.lock = threading.Lock()
 
+        config = CommConfigurator()
+        if config.use_chunked_cipher(True):
+            self.cipher_modes = [CipherMode.CHUNKED_GCM, CipherMode.CBC]
+        else:
+            self.cipher_modes = [CipherMode.CBC]
+        self.cipher_chunk_size = config.get_cipher_chunk_size(DEFAULT_CIPHER_CHUNK_SIZE)
+        self.cipher_workers = config.get_cipher_workers(0)
+
         conn_props = self.local_endpoint.conn_props
         ca_cert_path = conn_props.get(DriverParams.CA_CERT)
         server_cert_path = conn_props.get(DriverParams.SERVER_CERT)
@@ -72,19 +85,49 @@ class CredentialManager:
         else:
             self.cell_cipher = SimpleCellCipher(self.get_ca_cert(), self.get_local_key(), self.get_local_cert())
 
-    def encrypt(self, target_cert: bytes, payload: bytes) -> bytes:
+    def encrypt(self, target_cert: bytes, payload: Union[bytes, list], mode: str = CipherMode.CBC):
 
         if not self.cell_cipher:
             raise RuntimeError("Secure message not supported, Cell not running in secure mode")
 
-        return self.cell_cipher.encrypt(payload, x509.load_pem_x509_certificate(target_cert))
+        cert = x509.load_pem_x509_certificate(target_cert)
+        if mode == CipherMode.CHUNKED_GCM:
+            return self.cell_cipher.encrypt_chunked(payload, cert, self.cipher_chunk_size, self.cipher_workers)
 
-    def decrypt(self, origin_cert: bytes, cipher: bytes) -> bytes:
+        return self.cell_cipher.encrypt(payload, cert)
+
+    def decrypt(self, origin_cert: bytes, cipher, mode: str = CipherMode.CBC):
 
         if not self.cell_cipher:
             raise RuntimeError("Secure message not supported, Cell not running in secure mode")
 
-        return self.cell_cipher.decrypt(cipher, x509.load_pem_x509_certificate(origin_cert))
+        cert = x509.load_pem_x509_certificate(origin_cert)
+        if mode == CipherMode.CHUNKED_GCM:
+            return self.cell_cipher.decrypt_chunked(cipher, cert, self.cipher_workers)
+
+        return self.cell_cipher.decrypt(cipher, cert)
+
+    def encrypt_multicast(self, payload) -> MulticastCipherText:
+
+        if not self.cell_cipher:
+            raise RuntimeError("Secure message not supported, Cell not running in secure mode")
+
+        return self.cell_cipher.encrypt_multicast(payload, self.cipher_chunk_size, self.cipher_workers)
+
+    def wrap_multicast(self, target_cert: bytes, cipher_text: MulticastCipherText) -> list:
+
+        if not self.cell_cipher:
+            raise RuntimeError("Secure message not supported, Cell not running in secure mode")
+
+        return self.cell_cipher.wrap_multicast(cipher_text, x509.load_pem_x509_certificate(target_cert))
+
+    def get_cipher_mode(self, fqcn: str) -> str:
+        """Returns the cipher mode to encrypt messages to the cell, the best mode supported by both sides"""
+        peer_modes = self.peer_cipher_modes.get(fqcn, [CipherMode.CBC])
+        for mode in self.cipher_modes:
+            if mode in peer_modes:
+                return mode
+        return CipherMode.CBC
 
     def get_certificate(self, fqcn: str) -> bytes:
         if not self.cell_cipher:
@@ -95,6 +138,7 @@ class CredentialManager:
         req = {
             CERT_CONTENT: self.local_cert,
             CERT_CA_CONTENT: self.ca_cert,
+            CERT_CIPHER_MODES: self.cipher_modes,
         }
 
         return req
@@ -111,9 +155,11 @@ class CredentialManager:
 
             # Save cert from requester in the cache
             self.cert_cache[origin] = cert
+            self.peer_cipher_modes[origin] = payload.get(CERT_CIPHER_MODES, [CipherMode.CBC])
 
             reply[CERT_CONTENT] = self.local_cert
             reply[CERT_CA_CONTENT] = self.ca_cert
+            reply[CERT_CIPHER_MODES] = self.cipher_modes
 
         return reply
 
@@ -126,6 +172,7 @@ class CredentialManager:
 
         cert = reply.get(CERT_CONTENT)
         self.cert_cache[origin] = cert
+        self.peer_cipher_modes[origin] = reply.get(CERT_CIPHER_MODES, [CipherMode.CBC])
         return cert
 
     def get_local_cert(self) -> Certificate:
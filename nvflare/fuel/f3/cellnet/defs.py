@@ -44,7 +44,16 @@ class MessageHeaderKey:
     PAYLOAD_LEN = CELLNET_PREFIX + "payload_len"
     CLEAR_PAYLOAD_LEN = CELLNET_PREFIX + "clear_payload_len"
     ENCRYPTED = CELLNET_PREFIX + "encrypted"
+    CIPHER_MODE = CELLNET_PREFIX + "cipher_mode"
     OPTIONAL = CELLNET_PREFIX + "optional"
+    FAN_OUT_TARGETS = CELLNET_PREFIX + "fan_out_targets"
+    TRACE_ID = CELLNET_PREFIX + "trace_id"
+
+
+class CipherMode:
+
+    CBC = "cbc"  # AES-CBC over the whole payload, used if the header is missing
+    CHUNKED_GCM = "chunked_gcm"  # AES-GCM, each chunk is encrypted and authenticated independently
 
 
 class ReturnReason:
@@ -58,6 +67,10 @@ class MessagePropKey:
     ENDPOINT = CELLNET_PREFIX + "endpoint"
     COMMON_NAME = CELLNET_PREFIX + "common_name"
     FUTURES = CELLNET_PREFIX + "futures"
+    # URL of the ad-hoc listener offered to the origin in the reply
+    CONN_URL = CELLNET_PREFIX + "conn_url"
+    # the reply is sent by an async request CB
+    ASYNC_REPLY = CELLNET_PREFIX + "async_reply"
 
 
 class Encoding:
@@ -112,6 +125,8 @@ class MessageType:
 
 class CellPropertyKey:
     FQCN = "fqcn"
+    # The cell forwards messages sent once for multiple targets behind it
+    FAN_OUT = "fan_out"
 
 
 class TargetCellUnreachable(Exception):
@@ -0,0 +1,222 @@
+# Copyright (c) 2025, NVIDIA CORPORATION.  All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import atexit
+import json
+import logging
+import os
+import random
+import tempfile
+import threading
+import time
+import uuid
+from typing import Optional
+
+from nvflare.fuel.f3.cellnet.defs import MessageHeaderKey
+from nvflare.fuel.f3.comm_config import CommConfigurator
+from nvflare.fuel.f3.message import Message
+from nvflare.security.logging import secure_format_exception
+
+log = logging.getLogger(__name__)
+
+# Traces are written at most this long after they are recorded
+FLUSH_INTERVAL = 1.0
+MAX_PENDING_EVENTS = 1000
+
+
+class TraceStage:
+
+    ENCODE = "encode"
+    ENCRYPT = "encrypt"
+    # ConnManager sending the frames, including batching and writing to the connection
+    SEND = "send"
+    # From the SEND_TIME of the previous hop to the frame being read, so it overlaps the send stage.
+    # Across hosts, it includes the clock offset.
+    WIRE = "wire"
+    # From the frame being read to the cell processing the message
+    FRAME_QUEUE = "frame_queue"
+    DECRYPT = "decrypt"
+    DECODE = "decode"
+    CALLBACK = "callback"
+
+
+class _NoSpan:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        return False
+
+
+_NO_SPAN = _NoSpan()
+
+
+class _Span:
+    def __init__(self, tracer: "MessageTracer", cell: str, message: Message, stage: str):
+        self.tracer = tracer
+        self.cell = cell
+        self.message = message
+        self.stage = stage
+        self.start = 0.0
+        self.start_perf = 0.0
+
+    def __enter__(self):
+        self.start = time.time()
+        self.start_perf = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.tracer.record(self.cell, self.message, self.stage, self.start, time.perf_counter() - self.start_perf)
+        return False
+
+
+class MessageTracer:
+    """Records the time spent by sampled messages in each stage of the pipeline, on every hop.
+
+    The origin of a message decides whether it's traced, and marks it with the TRACE_ID header, so only the
+    sampled messages pay for the tracing. The ID is the REQ_ID of the message, so a request and its reply are in
+    the same trace. The spans are written to a file per process in the Chrome trace event format, which can be
+    loaded into chrome://tracing or Perfetto. Files of different processes can be merged by concatenating
+    their event lists.
+    """
+
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    def __init__(self, sample_rate: float, trace_dir: str):
+        self.sample_rate = sample_rate
+        self.enabled = sample_rate > 0
+        self.file_name = os.path.join(trace_dir, f"cellnet_trace_{os.getpid()}.json")
+        self.pid = os.getpid()
+        self.lock = threading.Lock()
+        self.file = None
+        self.num_events = 0
+        self.pending = []
+        self.closed = False
+        self.flush_timer = None
+
+    @classmethod
+    def get_instance(cls) -> "MessageTracer":
+        with cls._instance_lock:
+            if not cls._instance:
+                config = CommConfigurator()
+                sample_rate = config.get_trace_sample_rate(0.0)
+                trace_dir = config.get_trace_dir(tempfile.gettempdir())
+                cls._instance = MessageTracer(sample_rate, trace_dir)
+                if cls._instance.enabled:
+                    atexit.register(cls._instance.close)
+            return cls._instance
+
+    def sample(self, message: Message) -> Optional[str]:
+        """Decide whether a new message is traced
+
+        Returns:
+            The trace ID to set in the TRACE_ID header, or None if the message is not traced
+        """
+        if not self.enabled or random.random() >= self.sample_rate:
+            return None
+        return message.get_header(MessageHeaderKey.REQ_ID) or str(uuid.uuid4())
+
+    def is_traced(self, message: Message) -> bool:
+        return self.enabled and message.headers is not None and MessageHeaderKey.TRACE_ID in message.headers
+
+    def span(self, cell: str, message: Message, stage: str):
+        """Get a context manager timing a stage of the message. It does nothing if the message is not traced"""
+        if not self.enabled or not message.headers or MessageHeaderKey.TRACE_ID not in message.headers:
+            return _NO_SPAN
+        return _Span(self, cell, message, stage)
+
+    def record(self, cell: str, message: Message, stage: str, start: float, duration: float):
+        """Record a stage of a traced message
+
+        Args:
+            cell: FQCN of the cell recording it
+            message: The message
+            stage: Name of the stage
+            start: Start time of the stage, from time.time()
+            duration: Time spent in secs
+        """
+        headers = message.headers
+        route = headers.get(MessageHeaderKey.ROUTE)
+        event = {
+            "name": stage,
+            "cat": "cellnet",
+            "ph": "X",
+            "ts": int(start * 1e6),
+            "dur": max(int(duration * 1e6), 0),
+            "pid": self.pid,
+            "tid": threading.get_ident(),
+            "args": {
+                "trace_id": headers.get(MessageHeaderKey.TRACE_ID),
+                "cell": cell,
+                "msg_type": headers.get(MessageHeaderKey.MSG_TYPE),
+                "origin": headers.get(MessageHeaderKey.ORIGIN),
+                "destination": headers.get(MessageHeaderKey.DESTINATION),
+                "channel": headers.get(MessageHeaderKey.CHANNEL),
+                "topic": headers.get(MessageHeaderKey.TOPIC),
+                "hop": len(route) if isinstance(route, list) else 0,
+            },
+        }
+        self._write(event)
+
+    def _write(self, event: dict):
+        try:
+            data = json.dumps(event, default=str)
+        except Exception as ex:
+            log.error(f"Can't write trace event: {secure_format_exception(ex)}")
+            return
+
+        with self.lock:
+            if self.closed:
+                return
+            self.pending.append(data)
+            self.num_events += 1
+            if len(self.pending) >= MAX_PENDING_EVENTS:
+                self._flush()
+            elif not self.flush_timer:
+                self.flush_timer = threading.Timer(FLUSH_INTERVAL, self.flush)
+                self.flush_timer.daemon = True
+                self.flush_timer.start()
+
+    def flush(self):
+        with self.lock:
+            self.flush_timer = None
+            self._flush()
+
+    def _flush(self):
+        # Only whole events are written, so the file is usable if the process dies.
+        # The closing bracket is optional in the format.
+        if not self.pending:
+            return
+        try:
+            if self.file is None:
+                self.file = open(self.file_name, "w")
+                self.file.write("[\n")
+            else:
+                self.file.write(",\n")
+            self.file.write(",\n".join(self.pending))
+            self.file.flush()
+        except Exception as ex:
+            log.error(f"Error writing trace file {self.file_name}: {secure_format_exception(ex)}")
+        self.pending = []
+
+    def close(self):
+        with self.lock:
+            if self.flush_timer:
+                self.flush_timer.cancel()
+                self.flush_timer = None
+            self._flush()
+            if self.file is not None:
+                self.file.write("\n]\n")
+                self.file.close()
+            self.closed = True
@@ -15,6 +15,7 @@ from typing import Any
 
 import nvflare.fuel.utils.fobs as fobs
 from nvflare.fuel.f3.cellnet.defs import Encoding, MessageHeaderKey
+from nvflare.fuel.f3.comm_config import CommConfigurator
 from nvflare.fuel.f3.message import Message
 from nvflare.fuel.f3.streaming.stream_const import StreamHeaderKey
 from nvflare.fuel.utils.buffer_list import BufferList
@@ -114,7 +115,14 @@ def encode_payload(message: Message, encoding_key=MessageHeaderKey.PAYLOAD_ENCOD
             encoding = Encoding.BYTES
         else:
             encoding = Encoding.FOBS
-            message.payload = fobs.dumps(message.payload, buffer_list=True)
+            # large datums are compressed with the configured codec if it pays off
+            configurator = CommConfigurator()
+            message.payload = fobs.dumps(
+                message.payload,
+                buffer_list=True,
+                compression=configurator.get_payload_compression(None),
+                num_workers=configurator.get_payload_encoding_workers(None),
+            )
         message.set_header(encoding_key, encoding)
 
     size = buffer_len(message.payload)
@@ -131,7 +139,9 @@ def decode_payload(message: Message, encoding_key=MessageHeaderKey.PAYLOAD_ENCOD
         return
 
     if encoding == Encoding.FOBS:
-        message.payload = fobs.loads(message.payload)
+        # in lazy mode, large objects like arrays/tensors are only decoded when the receiver accesses them
+        lazy = CommConfigurator().use_lazy_payload_decoding(False)
+        message.payload = fobs.loads(message.payload, lazy=lazy)
     elif encoding == Encoding.NONE:
         message.payload = None
     else:
@@ -27,6 +27,9 @@ class VarName:
     ALLOW_ADHOC_CONNS = "allow_adhoc_conns"
     ADHOC_CONN_SCHEME = "adhoc_conn_scheme"
     INTERNAL_CONN_SCHEME = "internal_conn_scheme"
+    SHM_INTERNAL_CONNS = "shm_internal_conns"
+    SHM_RING_SIZE = "shm_ring_size"
+    UDS_INTERNAL_CONNS = "uds_internal_conns"
     BACKBONE_CONN_GEN = "backbone_conn_gen"
     SUBNET_HEARTBEAT_INTERVAL = "subnet_heartbeat_interval"
     SUBNET_TROUBLE_THRESHOLD = "subnet_trouble_threshold"
@@ -39,6 +42,33 @@ class VarName:
     STREAMING_ACK_INTERVAL = "streaming_ack_interval"
     STREAMING_MAX_OUT_SEQ_CHUNKS = "streaming_max_out_seq_chunks"
     STREAMING_READ_TIMEOUT = "streaming_read_timeout"
+    STREAMING_ADAPTIVE_WINDOW = "streaming_adaptive_window"
+    STREAMING_MIN_WINDOW_SIZE = "streaming_min_window_size"
+    STREAMING_MAX_WINDOW_SIZE = "streaming_max_window_size"
+    STREAMING_MAX_CHUNK_SIZE = "streaming_max_chunk_size"
+    STREAMING_RESUME_TIMEOUT = "streaming_resume_timeout"
+    LAZY_PAYLOAD_DECODING = "lazy_payload_decoding"
+    PAYLOAD_COMPRESSION = "payload_compression"
+    PAYLOAD_ENCODING_WORKERS = "payload_encoding_workers"
+    CHUNKED_CIPHER = "chunked_cipher"
+    CIPHER_CHUNK_SIZE = "cipher_chunk_size"
+    CIPHER_WORKERS = "cipher_workers"
+    FRAME_QUEUE_HIGH_BYTES = "frame_queue_high_bytes"
+    FRAME_QUEUE_LOW_BYTES = "frame_queue_low_bytes"
+    FRAME_QUEUE_HIGH_ITEMS = "frame_queue_high_items"
+    FRAME_QUEUE_LOW_ITEMS = "frame_queue_low_items"
+    CONN_FRAME_QUEUE_HIGH_BYTES = "conn_frame_queue_high_bytes"
+    CONN_FRAME_QUEUE_LOW_BYTES = "conn_frame_queue_low_bytes"
+    CONN_FRAME_QUEUE_HIGH_ITEMS = "conn_frame_queue_high_items"
+    CONN_FRAME_QUEUE_LOW_ITEMS = "conn_frame_queue_low_items"
+    FRAME_QUEUE_MAX_WAIT = "frame_queue_max_wait"
+    PARALLEL_CONNECTIONS = "parallel_connections"
+    FRAME_BATCHING = "frame_batching"
+    FRAME_BATCH_SIZE = "frame_batch_size"
+    FRAME_BATCH_DELAY = "frame_batch_delay"
+    BROADCAST_FAN_OUT = "broadcast_fan_out"
+    TRACE_SAMPLE_RATE = "trace_sample_rate"
+    TRACE_DIR = "trace_dir"
 
 
 class CommConfigurator:
@@ -78,6 +108,15 @@ class CommConfigurator:
     def get_internal_connection_scheme(self, default):
         return ConfigService.get_str_var(VarName.INTERNAL_CONN_SCHEME, self.config, default=default)
 
+    def use_shm_internal_connections(self, default):
+        return ConfigService.get_bool_var(VarName.SHM_INTERNAL_CONNS, self.config, default=default)
+
+    def get_shm_ring_size(self, default):
+        return ConfigService.get_int_var(VarName.SHM_RING_SIZE, self.config, default=default)
+
+    def use_uds_internal_connections(self, default):
+        return ConfigService.get_bool_var(VarName.UDS_INTERNAL_CONNS, self.config, default=default)
+
     def get_backbone_connection_generation(self, default):
         return ConfigService.get_int_var(VarName.BACKBONE_CONN_GEN, self.config, default=default)
 
@@ -114,6 +153,81 @@ class CommConfigurator:
     def get_streaming_read_timeout(self, default):
         return ConfigService.get_int_var(VarName.STREAMING_READ_TIMEOUT, self.config, default)
 
+    def use_streaming_adaptive_window(self, default):
+        return ConfigService.get_bool_var(VarName.STREAMING_ADAPTIVE_WINDOW, self.config, default)
+
+    def get_streaming_min_window_size(self, default):
+        return ConfigService.get_int_var(VarName.STREAMING_MIN_WINDOW_SIZE, self.config, default)
+
+    def get_streaming_max_window_size(self, default):
+        return ConfigService.get_int_var(VarName.STREAMING_MAX_WINDOW_SIZE, self.config, default)
+
+    def get_streaming_max_chunk_size(self, default):
+        return ConfigService.get_int_var(VarName.STREAMING_MAX_CHUNK_SIZE, self.config, default)
+
+    def get_streaming_resume_timeout(self, default):
+        return ConfigService.get_float_var(VarName.STREAMING_RESUME_TIMEOUT, self.config, default)
+
+    def use_lazy_payload_decoding(self, default):
+        return ConfigService.get_bool_var(VarName.LAZY_PAYLOAD_DECODING, self.config, default)
+
+    def get_payload_compression(self, default=None):
+        return ConfigService.get_str_var(VarName.PAYLOAD_COMPRESSION, self.config, default)
+
+    def get_payload_encoding_workers(self, default=None):
+        return ConfigService.get_int_var(VarName.PAYLOAD_ENCODING_WORKERS, self.config, default)
+
+    def use_chunked_cipher(self, default):
+        return ConfigService.get_bool_var(VarName.CHUNKED_CIPHER, self.config, default)
+
+    def get_cipher_chunk_size(self, default):
+        return ConfigService.get_int_var(VarName.CIPHER_CHUNK_SIZE, self.config, default)
+
+    def get_cipher_workers(self, default):
+        return ConfigService.get_int_var(VarName.CIPHER_WORKERS, self.config, default)
+
+    def get_frame_queue_watermarks(self, default_high_bytes, default_high_items):
+        """Returns (high_bytes, low_bytes, high_items, low_items) of the frame queue of all connections"""
+        return (
+            ConfigService.get_int_var(VarName.FRAME_QUEUE_HIGH_BYTES, self.config, default_high_bytes),
+            ConfigService.get_int_var(VarName.FRAME_QUEUE_LOW_BYTES, self.config, 0),
+            ConfigService.get_int_var(VarName.FRAME_QUEUE_HIGH_ITEMS, self.config, default_high_items),
+            ConfigService.get_int_var(VarName.FRAME_QUEUE_LOW_ITEMS, self.config, 0),
+        )
+
+    def get_conn_frame_queue_watermarks(self, default_high_bytes, default_high_items):
+        """Returns (high_bytes, low_bytes, high_items, low_items) of the frame queue of each connection"""
+        return (
+            ConfigService.get_int_var(VarName.CONN_FRAME_QUEUE_HIGH_BYTES, self.config, default_high_bytes),
+            ConfigService.get_int_var(VarName.CONN_FRAME_QUEUE_LOW_BYTES, self.config, 0),
+            ConfigService.get_int_var(VarName.CONN_FRAME_QUEUE_HIGH_ITEMS, self.config, default_high_items),
+            ConfigService.get_int_var(VarName.CONN_FRAME_QUEUE_LOW_ITEMS, self.config, 0),
+        )
+
+    def get_frame_queue_max_wait(self, default):
+        return ConfigService.get_float_var(VarName.FRAME_QUEUE_MAX_WAIT, self.config, default)
+
+    def get_parallel_connections(self, default=1):
+        return ConfigService.get_int_var(VarName.PARALLEL_CONNECTIONS, self.config, default)
+
+    def use_frame_batching(self, default):
+        return ConfigService.get_bool_var(VarName.FRAME_BATCHING, self.config, default)
+
+    def get_frame_batch_size(self, default):
+        return ConfigService.get_int_var(VarName.FRAME_BATCH_SIZE, self.config, default)
+
+    def get_frame_batch_delay(self, default):
+        return ConfigService.get_float_var(VarName.FRAME_BATCH_DELAY, self.config, default)
+
+    def use_broadcast_fan_out(self, default):
+        return ConfigService.get_bool_var(VarName.BROADCAST_FAN_OUT, self.config, default)
+
+    def get_trace_sample_rate(self, default):
+        return ConfigService.get_float_var(VarName.TRACE_SAMPLE_RATE, self.config, default)
+
+    def get_trace_dir(self, default):
+        return ConfigService.get_str_var(VarName.TRACE_DIR, self.config, default)
+
     def get_int_var(self, name: str, default=None):
         return ConfigService.get_int_var(name, self.config, default=default)
 
@@ -15,10 +15,11 @@ import logging
 import threading
 from abc import ABC, abstractmethod
 from enum import Enum
-from typing import Union
+from typing import List, Union
 
 from nvflare.fuel.f3.drivers.connector_info import ConnectorInfo, Mode
 from nvflare.fuel.f3.drivers.driver_params import DriverParams
+from nvflare.fuel.utils.buffer_list import BufferList
 
 log = logging.getLogger(__name__)
 lock = threading.Lock()
@@ -63,6 +64,9 @@ class Connection(ABC):
         self.frame_receiver = None
         self.connector = connector
 
+        # Set by the frame receiver to limit the frames queued for processing
+        self.flow_control = None
+
     @abstractmethod
     def get_conn_properties(self) -> dict:
         """Get connection specific properties, like peer address, TLS certificate etc
@@ -93,6 +97,25 @@ class Connection(ABC):
         """
         pass
 
+    def send_frames(self, frames: List[BytesAlike]):
+        """Send a SFM frame that is made of a list of buffers, like prefix, headers and payload.
+
+        Drivers supporting vectored I/O override this method to send the buffers without assembling them.
+        By default, the buffers are joined and sent with send_frame.
+
+        The buffers belong to the caller, they are not used after this method returns.
+
+        Args:
+            frames: The buffers of the frame, in order
+
+        Raises:
+            CommError: If any error happens while sending the frame
+        """
+        if len(frames) == 1:
+            self.send_frame(frames[0])
+        else:
+            self.send_frame(BufferList(frames).flatten())
+
     def register_frame_receiver(self, receiver: FrameReceiver):
         """Register frame receiver
 
@@ -116,6 +139,20 @@ class Connection(ABC):
         else:
             log.error(f"Frame receiver not registered for {self}")
 
+    def wait_for_flow(self):
+        """Block while too many received frames are waiting to be processed.
+
+        Drivers reading in a thread call this after process_frame, so the peer is slowed down by the transport
+        when the receiver can't keep up.
+        """
+        if self.flow_control:
+            self.flow_control.wait()
+
+    async def async_wait_for_flow(self):
+        """Same as wait_for_flow() but for drivers reading in an event loop"""
+        if self.flow_control:
+            await self.flow_control.async_wait()
+
     def __str__(self):
 
         if self.state != ConnState.CONNECTED:
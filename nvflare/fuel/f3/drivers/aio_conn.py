@@ -11,8 +11,10 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
+import asyncio
 import logging
 from asyncio import CancelledError, IncompleteReadError, StreamReader, StreamWriter
+from typing import List
 
 from nvflare.fuel.f3.comm_error import CommError
 from nvflare.fuel.f3.connection import BytesAlike, Connection
@@ -62,11 +64,37 @@ class AioConnection(Connection):
         except Exception as ex:
             log.error(f"Error calling send coroutine for connection {self}: {secure_format_exception(ex)}")
 
+    def send_frames(self, frames: List[BytesAlike]):
+        try:
+            future = self.aio_ctx.run_coro(self._async_send_frames(frames))
+        except Exception as ex:
+            log.error(f"Error calling send coroutine for connection {self}: {secure_format_exception(ex)}")
+            return
+
+        if self._in_event_loop():
+            # can't wait for the coroutine on the loop thread
+            return
+
+        # The buffers belong to the caller, wait until they are handed to the transport
+        try:
+            future.result()
+        except Exception as ex:
+            log.error(f"Error sending frame for connection {self}: {secure_format_exception(ex)}")
+
+    @staticmethod
+    def _in_event_loop() -> bool:
+        try:
+            asyncio.get_running_loop()
+            return True
+        except RuntimeError:
+            return False
+
     async def read_loop(self):
         try:
             while not self.closing:
                 frame = await self._async_read_frame()
                 self.process_frame(frame)
+                await self.async_wait_for_flow()
 
         except IncompleteReadError:
             if log.isEnabledFor(logging.DEBUG):
@@ -87,6 +115,14 @@ class AioConnection(Connection):
             if not self.closing:
                 log.error(f"Error sending frame for connection {self}: {secure_format_exception(ex)}")
 
+    async def _async_send_frames(self, frames: List[BytesAlike]):
+        try:
+            self.writer.writelines(frames)
+            await self.writer.drain()
+        except Exception as ex:
+            if not self.closing:
+                log.error(f"Error sending frame for connection {self}: {secure_format_exception(ex)}")
+
     async def _async_read_frame(self):
 
         prefix_buf = await self.reader.readexactly(PREFIX_LEN)
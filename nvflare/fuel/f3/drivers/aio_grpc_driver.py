@@ -133,6 +133,7 @@ class AioStreamSession(Connection):
                 if self.closing:
                     return
                 self.process_frame(f.data)
+                await self.async_wait_for_flow()
 
         except grpc.aio.AioRpcError as error:
             if not self.closing:
@@ -180,6 +180,7 @@ class AioHttpDriver(BaseDriver):
         async for msg in conn.websocket:
             if msg.type == aiohttp.WSMsgType.BINARY:
                 conn.process_frame(msg.data)
+                await conn.async_wait_for_flow()
             elif msg.type == aiohttp.WSMsgType.CLOSE:
                 log.info(f"{conn} is closed by peer")
                 break
@@ -38,9 +38,12 @@ class DriverParams(str, Enum):
     SECURE = "secure"
     PORTS = "ports"
     SOCKET = "socket"
+    SOCKET_DIR = "socket_dir"
     LOCAL_ADDR = "local_addr"
     PEER_ADDR = "peer_addr"
     PEER_CN = "peer_cn"
+    PEER_PID = "peer_pid"
+    PEER_UID = "peer_uid"
     IMPLEMENTED_CONN_SEC = "implemented_conn_sec"
 
 
@@ -102,6 +102,7 @@ class StreamConnection(Connection):
                 self.logger.debug(f"{self.side} in {ct.name}: incoming frame #{f.seq}")
                 if self.frame_receiver:
                     self.frame_receiver.process_frame(f.data)
+                    self.wait_for_flow()
                 else:
                     self.logger.error(f"{self.side}: Frame receiver not registered for connection: {self.name}")
         except Exception as ex:
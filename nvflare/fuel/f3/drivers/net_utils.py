@@ -16,6 +16,8 @@ import os
 import random
 import socket
 import ssl
+import tempfile
+import uuid
 from ssl import SSLContext
 from typing import Any, Optional
 from urllib.parse import parse_qsl, urlencode, urlparse
@@ -40,6 +42,9 @@ MAX_FRAME_SIZE = 2 * 1024 * 1024 * 1024 - (2 * 1024 * 1024)
 MAX_HEADER_SIZE = 1024 * 1024
 MAX_PAYLOAD_SIZE = MAX_FRAME_SIZE - 16 - MAX_HEADER_SIZE
 
+# Max length of the path of a Unix domain socket (sun_path is 108 bytes on Linux, 104 on macOS)
+MAX_SOCKET_PATH = 100
+
 SSL_SERVER_PRIVATE_KEY = "server.key"
 SSL_SERVER_CERT = "server.crt"
 SSL_CLIENT_PRIVATE_KEY = "client.key"
@@ -295,6 +300,29 @@ def get_tcp_urls(scheme: str, resources: dict) -> (str, str):
     return connect_url, listening_url
 
 
+def get_socket_path_urls(scheme: str, resources: dict) -> (str, str):
+    """Generate URL pairs for protocols listening on a Unix domain socket, like shm://localhost/tmp/name.sock
+
+    Args:
+        scheme: The transport scheme
+        resources: The resource restrictions, socket_dir is the folder for the socket file
+
+    Returns:
+        a tuple with connecting and listening URL, they are the same
+    """
+
+    folder = resources.get(DriverParams.SOCKET_DIR.value) if resources else None
+    if not folder:
+        folder = tempfile.gettempdir()
+
+    path = os.path.join(folder, f"nvflare_{scheme}_{os.getpid()}_{uuid.uuid4().hex[:8]}.sock")
+    if len(path) > MAX_SOCKET_PATH:
+        raise CommError(CommError.BAD_CONFIG, f"Socket path is too long: {path}")
+
+    url = f"{scheme}://localhost{path}"
+    return url, url
+
+
 def enhance_credential_info(params: dict):
     """Enhance the params by loading additional cert and key from the folder that contains the CA cert.
 
@@ -0,0 +1,349 @@
+# Copyright (c) 2025, NVIDIA CORPORATION.  All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import json
+import logging
+import mmap
+import os
+import queue
+import socket
+import struct
+import tempfile
+import threading
+from typing import Any, List
+
+from nvflare.fuel.f3.comm_config import CommConfigurator
+from nvflare.fuel.f3.comm_error import CommError
+from nvflare.fuel.f3.connection import BytesAlike
+from nvflare.fuel.f3.drivers.driver import ConnectorInfo
+from nvflare.fuel.f3.drivers.socket_conn import SocketConnection
+from nvflare.fuel.f3.drivers.unix_socket_driver import UnixSocketDriver
+from nvflare.security.logging import secure_format_exception
+
+log = logging.getLogger(__name__)
+
+SHM_SCHEME = "shm"
+
+DEFAULT_RING_SIZE = 4 * 1024 * 1024
+HANDSHAKE_TIMEOUT = 10.0
+
+# The writer announces written bytes and the reader announces freed bytes in pieces of this fraction of the ring
+ACK_FRACTION = 4
+
+# Messages on the doorbell socket: type and byte count
+MSG_DATA = 1  # bytes written to the sender's ring
+MSG_FREED = 2  # bytes read from the receiver's ring
+MSG_FORMAT = struct.Struct(">BQ")
+
+HELLO_LEN_FORMAT = struct.Struct(">I")
+KEY_RING_SIZE = "ring_size"
+
+
+def shm_supported() -> bool:
+    """Shared memory segments are passed to the peer as file descriptors over a Unix domain socket"""
+    return hasattr(socket, "AF_UNIX") and hasattr(socket, "send_fds")
+
+
+class ShmRing:
+    """A byte ring in a shared memory segment, used in one direction of a connection.
+
+    The read and write positions are not shared. The writer tells the reader how many bytes are written and
+    the reader tells the writer how many bytes are freed, over the doorbell socket.
+    """
+
+    def __init__(self, fd: int, size: int):
+        self.size = size
+        self.mm = mmap.mmap(fd, size)
+        self.buf = memoryview(self.mm)
+        self.pos = 0
+
+    @staticmethod
+    def create_segment(size: int) -> int:
+        """Create an anonymous shared memory segment, returns its file descriptor"""
+        if hasattr(os, "memfd_create"):
+            fd = os.memfd_create("nvflare_shm", os.MFD_CLOEXEC)
+        else:
+            # The file is removed right away, only the descriptor is passed to the peer
+            fd, path = tempfile.mkstemp(prefix="nvflare_shm_")
+            os.unlink(path)
+        os.ftruncate(fd, size)
+        return fd
+
+    def write(self, data: memoryview):
+        """Copy data into the ring. The caller makes sure there is enough free space"""
+        self.pos = self._copy(len(data), lambda start, end, offset: self._put(start, end, data, offset))
+
+    def read_into(self, view: memoryview):
+        """Copy the next len(view) bytes out of the ring. The caller makes sure they are written"""
+        self.pos = self._copy(len(view), lambda start, end, offset: self._get(start, end, view, offset))
+
+    def _put(self, start: int, end: int, data: memoryview, offset: int):
+        self.buf[start:end] = data[offset : offset + end - start]
+
+    def _get(self, start: int, end: int, view: memoryview, offset: int):
+        view[offset : offset + end - start] = self.buf[start:end]
+
+    def _copy(self, length: int, copy_func) -> int:
+        pos = self.pos
+        offset = 0
+        while offset < length:
+            n = min(length - offset, self.size - pos)
+            copy_func(pos, pos + n, offset)
+            offset += n
+            pos = (pos + n) % self.size
+        return pos
+
+    def close(self):
+        try:
+            self.buf.release()
+            self.mm.close()
+        except Exception as ex:
+            log.debug(f"Error closing shared memory ring: {secure_format_exception(ex)}")
+
+
+class ShmConnection(SocketConnection):
+    """A connection sending frames through shared memory rings, with a Unix domain socket as the doorbell.
+
+    Each side writes to its own ring and reads from the peer's. A frame larger than the ring is sent in pieces,
+    the writer waits for the reader to free some space.
+    """
+
+    def __init__(self, sock: Any, connector: ConnectorInfo, tx_ring: ShmRing, rx_ring: ShmRing):
+        super().__init__(sock, connector)
+        self.tx_ring = tx_ring
+        self.rx_ring = rx_ring
+
+        self.send_lock = threading.Lock()
+        self.sock_lock = threading.Lock()
+        self.tx_cond = threading.Condition()
+        self.tx_free = tx_ring.size
+        self.piece_size = max(1, tx_ring.size // ACK_FRACTION)
+        self.peer_closed = False
+
+        # Counts of bytes written by the peer, None when the doorbell is closed
+        self.rx_queue = queue.SimpleQueue()
+        self.rx_available = 0
+        self.rx_unacked = 0
+        self.ack_size = max(1, rx_ring.size // ACK_FRACTION)
+
+    def close(self):
+        super().close()
+        self._wake_up_writers()
+
+    def send_frame(self, frame: BytesAlike):
+        self.send_frames([frame])
+
+    def send_frames(self, frames: List[BytesAlike]):
+        try:
+            with self.send_lock:
+                self._write_frames(frames)
+        except CommError:
+            if not self.closing:
+                raise
+        except Exception as ex:
+            if not self.closing:
+                raise CommError(CommError.ERROR, f"Error sending frame on conn {self}: {secure_format_exception(ex)}")
+
+    def _write_frames(self, frames: List[BytesAlike]):
+        pending = 0
+        for frame in frames:
+            view = memoryview(frame).cast("B")
+            while view:
+                with self.tx_cond:
+                    free = self.tx_free
+                if not free:
+                    # The reader can only free the space after it's told about the written bytes
+                    if pending:
+                        self._ring_doorbell(MSG_DATA, pending)
+                        pending = 0
+                    free = self._wait_for_space()
+
+                n = min(free, len(view), self.piece_size)
+                self.tx_ring.write(view[:n])
+                with self.tx_cond:
+                    self.tx_free -= n
+                pending += n
+                view = view[n:]
+
+                # Large frames are announced in pieces, so the reader copies while the writer is copying
+                if pending >= self.piece_size:
+                    self._ring_doorbell(MSG_DATA, pending)
+                    pending = 0
+
+        if pending:
+            self._ring_doorbell(MSG_DATA, pending)
+
+    def _wait_for_space(self) -> int:
+        with self.tx_cond:
+            while not self.tx_free:
+                if self.peer_closed or self.closing:
+                    raise CommError(CommError.CLOSED, f"Connection {self.name} is closed")
+                self.tx_cond.wait()
+            return self.tx_free
+
+    def _wake_up_writers(self):
+        with self.tx_cond:
+            self.peer_closed = True
+            self.tx_cond.notify_all()
+
+    def _ring_doorbell(self, msg_type: int, count: int):
+        with self.sock_lock:
+            self.sock.sendall(MSG_FORMAT.pack(msg_type, count))
+
+    def read_loop(self):
+        doorbell = threading.Thread(target=self._doorbell_loop, name=f"shm_doorbell_{self.name}", daemon=True)
+        doorbell.start()
+        try:
+            super().read_loop()
+        finally:
+            self.close()
+            doorbell.join()
+            with self.send_lock:
+                self.tx_ring.close()
+            self.rx_ring.close()
+
+    def _doorbell_loop(self):
+        msg = bytearray(MSG_FORMAT.size)
+        view = memoryview(msg)
+        try:
+            while True:
+                received = 0
+                while received < len(msg):
+                    n = self.sock.recv_into(view[received:])
+                    if not n:
+                        return
+                    received += n
+
+                msg_type, count = MSG_FORMAT.unpack(msg)
+                if msg_type == MSG_DATA:
+                    self.rx_queue.put(count)
+                elif msg_type == MSG_FREED:
+                    with self.tx_cond:
+                        self.tx_free += count
+                        self.tx_cond.notify_all()
+                else:
+                    log.error(f"Connection {self.name} received bad doorbell message type {msg_type}")
+                    return
+        except Exception as ex:
+            if not self.closing:
+                log.debug(f"Doorbell of connection {self.name} is closed: {secure_format_exception(ex)}")
+        finally:
+            self.rx_queue.put(None)
+            self._wake_up_writers()
+
+    def read_into(self, buffer: BytesAlike, offset: int, length: int):
+        view = memoryview(buffer)[offset : offset + length]
+        while view:
+            if not self.rx_available:
+                count = self.rx_queue.get()
+                if count is None:
+                    raise CommError(CommError.CLOSED, f"Connection {self.name} is closed by peer")
+                self.rx_available = count
+
+            n = min(self.rx_available, len(view))
+            self.rx_ring.read_into(view[:n])
+            view = view[n:]
+            self.rx_available -= n
+            self.rx_unacked += n
+
+            # The writer may be waiting for space once all the written bytes are read
+            if not self.rx_available or self.rx_unacked >= self.ack_size:
+                self._ring_doorbell(MSG_FREED, self.rx_unacked)
+                self.rx_unacked = 0
+
+
+def _send_hello(sock: socket.socket, ring_size: int, fd: int):
+    hello = json.dumps({KEY_RING_SIZE: ring_size}).encode("utf-8")
+    socket.send_fds(sock, [HELLO_LEN_FORMAT.pack(len(hello)) + hello], [fd])
+
+
+def _receive_hello(sock: socket.socket) -> (int, int):
+    data, fds, _, _ = socket.recv_fds(sock, 4096, 1)
+    if not fds:
+        raise CommError(CommError.BAD_DATA, "No shared memory segment is received from peer")
+
+    try:
+        (length,) = HELLO_LEN_FORMAT.unpack_from(data)
+        hello = json.loads(data[HELLO_LEN_FORMAT.size : HELLO_LEN_FORMAT.size + length])
+        ring_size = hello[KEY_RING_SIZE]
+
+        # A size of 0 would map the whole segment, and the ring can't be larger than the segment
+        if not isinstance(ring_size, int) or isinstance(ring_size, bool) or ring_size <= 0:
+            raise ValueError(f"invalid ring size {ring_size}")
+        segment_size = os.fstat(fds[0]).st_size
+        if ring_size > segment_size:
+            raise ValueError(f"ring size {ring_size} exceeds segment size {segment_size}")
+        return ring_size, fds[0]
+    except Exception as ex:
+        os.close(fds[0])
+        raise CommError(CommError.BAD_DATA, f"Bad shared memory handshake: {secure_format_exception(ex)}")
+
+
+def _map_ring(fd: int, size: int) -> ShmRing:
+    try:
+        return ShmRing(fd, size)
+    finally:
+        # The mapping stays valid after the descriptor is closed
+        os.close(fd)
+
+
+def shm_handshake(sock: socket.socket, ring_size: int, active: bool) -> (ShmRing, ShmRing):
+    """Exchange the shared memory segments with the peer. The active side sends its segment first.
+
+    Returns:
+        A tuple with the ring to write and the ring to read
+    """
+    sock.settimeout(HANDSHAKE_TIMEOUT)
+    try:
+        if active:
+            tx_ring = _map_ring(_send_new_segment(sock, ring_size), ring_size)
+            peer_size, peer_fd = _receive_hello(sock)
+            rx_ring = _map_ring(peer_fd, peer_size)
+        else:
+            peer_size, peer_fd = _receive_hello(sock)
+            rx_ring = _map_ring(peer_fd, peer_size)
+            tx_ring = _map_ring(_send_new_segment(sock, ring_size), ring_size)
+    finally:
+        sock.settimeout(None)
+
+    return tx_ring, rx_ring
+
+
+def _send_new_segment(sock: socket.socket, ring_size: int) -> int:
+    fd = ShmRing.create_segment(ring_size)
+    try:
+        _send_hello(sock, ring_size, fd)
+    except Exception:
+        os.close(fd)
+        raise
+    return fd
+
+
+class ShmDriver(UnixSocketDriver):
+    """Transport for cells on the same host. Frames are copied through shared memory instead of the socket stack.
+
+    The URL is the path of the Unix domain socket used for the handshake and doorbell, like
+    shm://localhost/tmp/nvflare_shm_123.sock
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.ring_size = CommConfigurator().get_shm_ring_size(DEFAULT_RING_SIZE)
+
+    @staticmethod
+    def supported_transports() -> List[str]:
+        return [SHM_SCHEME]
+
+    def create_connection(self, sock: Any, connector: ConnectorInfo, active: bool) -> SocketConnection:
+        tx_ring, rx_ring = shm_handshake(sock, self.ring_size, active)
+        return ShmConnection(sock, connector, tx_ring, rx_ring)
@@ -13,8 +13,9 @@
 # limitations under the License.
 import logging
 import socket
+import ssl
 from socketserver import BaseRequestHandler
-from typing import Any, Union
+from typing import Any, List, Union
 
 from nvflare.fuel.f3.comm_error import CommError
 from nvflare.fuel.f3.connection import BytesAlike, Connection
@@ -27,6 +28,12 @@ from nvflare.security.logging import secure_format_exception
 
 log = logging.getLogger(__name__)
 
+# Max number of buffers in one sendmsg call (IOV_MAX is 1024 on most systems)
+MAX_IOV = 1024
+
+# Small buffers are joined before sending on sockets without sendmsg, to avoid tiny TCP segments or TLS records
+MIN_SEND_SIZE = 64 * 1024
+
 
 class SocketConnection(Connection):
     def __init__(self, sock: Any, connector: ConnectorInfo, secure: bool = False):
@@ -57,6 +64,52 @@ class SocketConnection(Connection):
             if not self.closing:
                 raise CommError(CommError.ERROR, f"Error sending frame on conn {self}: {secure_format_exception(ex)}")
 
+    def send_frames(self, frames: List[BytesAlike]):
+        try:
+            if isinstance(self.sock, ssl.SSLSocket) or not hasattr(self.sock, "sendmsg"):
+                # SSL sockets don't support sendmsg
+                for frame in self._join_small_frames(frames):
+                    self.sock.sendall(frame)
+            else:
+                self._sendmsg_all(frames)
+        except Exception as ex:
+            if not self.closing:
+                raise CommError(CommError.ERROR, f"Error sending frame on conn {self}: {secure_format_exception(ex)}")
+
+    def _sendmsg_all(self, frames: List[BytesAlike]):
+        """Send all buffers with vectored I/O, the buffers are not copied"""
+        views = [memoryview(frame).cast("B") for frame in frames]
+        index = 0
+        while index < len(views):
+            sent = self.sock.sendmsg(views[index : index + MAX_IOV])
+            # skip the buffers that are fully sent and trim the partially sent one
+            while sent:
+                size = len(views[index])
+                if sent >= size:
+                    sent -= size
+                    index += 1
+                else:
+                    views[index] = views[index][sent:]
+                    sent = 0
+
+    @staticmethod
+    def _join_small_frames(frames: List[BytesAlike]) -> list:
+        result = []
+        pending = []
+        for frame in frames:
+            if len(frame) < MIN_SEND_SIZE:
+                pending.append(frame)
+                continue
+
+            if pending:
+                result.append(b"".join(pending))
+                pending = []
+            result.append(frame)
+
+        if pending:
+            result.append(b"".join(pending))
+        return result
+
     def read_loop(self):
         try:
             self.read_frame_loop()
@@ -76,6 +129,7 @@ class SocketConnection(Connection):
         while not self.closing:
             frame = self.read_frame()
             self.process_frame(frame)
+            self.wait_for_flow()
 
     def read_frame(self) -> BytesAlike:
 
@@ -0,0 +1,40 @@
+# Copyright (c) 2025, NVIDIA CORPORATION.  All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import socket
+from typing import Any, List
+
+from nvflare.fuel.f3.drivers.driver import ConnectorInfo
+from nvflare.fuel.f3.drivers.socket_conn import SocketConnection
+from nvflare.fuel.f3.drivers.unix_socket_driver import UnixSocketDriver
+
+UDS_SCHEME = "uds"
+
+
+def uds_supported() -> bool:
+    return hasattr(socket, "AF_UNIX")
+
+
+class UdsDriver(UnixSocketDriver):
+    """Transport for cells on the same host using Unix domain sockets.
+
+    It skips the TCP/IP stack of the loopback interface. The URL is the path of the socket, like
+    uds://localhost/tmp/nvflare_uds_123.sock
+    """
+
+    @staticmethod
+    def supported_transports() -> List[str]:
+        return [UDS_SCHEME]
+
+    def create_connection(self, sock: Any, connector: ConnectorInfo, active: bool) -> SocketConnection:
+        return SocketConnection(sock, connector)
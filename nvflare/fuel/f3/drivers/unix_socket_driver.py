@@ -0,0 +1,189 @@
+# Copyright (c) 2025, NVIDIA CORPORATION.  All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import logging
+import os
+import socket
+import struct
+from abc import ABC, abstractmethod
+from socketserver import BaseRequestHandler, ThreadingUnixStreamServer
+from typing import Any, Dict, Optional, Tuple
+
+from nvflare.fuel.f3.comm_error import CommError
+from nvflare.fuel.f3.drivers.base_driver import BaseDriver
+from nvflare.fuel.f3.drivers.driver import ConnectorInfo
+from nvflare.fuel.f3.drivers.driver_params import DriverCap, DriverParams
+from nvflare.fuel.f3.drivers.net_utils import get_socket_path_urls
+from nvflare.fuel.f3.drivers.socket_conn import SocketConnection
+from nvflare.security.logging import secure_format_exception
+
+log = logging.getLogger(__name__)
+
+# struct ucred {pid_t pid; uid_t uid; gid_t gid;}
+UCRED_FORMAT = "3i"
+
+
+def get_peer_credentials(sock: socket.socket) -> Optional[Tuple[int, int, int]]:
+    """Get the credentials of the process on the other end of a Unix domain socket
+
+    Args:
+        sock: A connected AF_UNIX socket
+
+    Returns:
+        A tuple of (pid, uid, gid) or None if SO_PEERCRED is not supported by the platform
+    """
+    if not hasattr(socket, "SO_PEERCRED"):
+        return None
+
+    creds = sock.getsockopt(socket.SOL_SOCKET, socket.SO_PEERCRED, struct.calcsize(UCRED_FORMAT))
+    return struct.unpack(UCRED_FORMAT, creds)
+
+
+def check_peer_credentials(sock: socket.socket) -> Optional[Tuple[int, int, int]]:
+    """Only processes running as the same user (or root) are allowed on the other end.
+
+    The kernel fills in the credentials so the check doesn't cost a round trip like a
+    TLS handshake does.
+
+    Returns:
+        The peer credentials if known
+
+    Raises:
+        CommError: If the peer is running as another user
+    """
+    creds = get_peer_credentials(sock)
+    if creds:
+        pid, uid, _ = creds
+        if uid not in (os.getuid(), 0):
+            raise CommError(CommError.ERROR, f"Peer process {pid} is running as uid {uid}, not {os.getuid()}")
+    return creds
+
+
+class UnixSocketConnectionHandler(BaseRequestHandler):
+    def handle(self):
+        # noinspection PyUnresolvedReferences
+        self.server.driver.handle_accepted(self.request, self.server.connector)
+
+
+class UnixSocketServer(ThreadingUnixStreamServer):
+
+    daemon_threads = True
+
+    def __init__(self, driver: "UnixSocketDriver", connector: ConnectorInfo, path: str):
+        self.driver = driver
+        self.connector = connector
+        self.path = path
+
+        # A stale socket file is left behind if the previous process was killed
+        if os.path.exists(path):
+            os.unlink(path)
+
+        ThreadingUnixStreamServer.__init__(self, path, UnixSocketConnectionHandler)
+        os.chmod(path, 0o600)
+
+
+class UnixSocketDriver(BaseDriver, ABC):
+    """Base of the drivers for cells on the same host, which connect through a Unix domain socket.
+
+    The URL is the path of the socket. Only peers running as the same user (or root) are accepted on both ends,
+    the peer pid and uid are added to the connection properties.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.server: Optional[UnixSocketServer] = None
+
+    @staticmethod
+    def capabilities() -> Dict[str, Any]:
+        return {DriverCap.SEND_HEARTBEAT.value: True, DriverCap.SUPPORT_SSL.value: False}
+
+    @abstractmethod
+    def create_connection(self, sock: Any, connector: ConnectorInfo, active: bool) -> SocketConnection:
+        """Create the connection on a socket connected to an accepted peer
+
+        Args:
+            sock: The connected socket
+            connector: The connector
+            active: True if this end connected to the peer
+
+        Returns:
+            The connection. An exception is raised if it can't be created.
+        """
+        pass
+
+    def listen(self, connector: ConnectorInfo):
+        self.connector = connector
+        path = self._get_path(connector)
+        try:
+            self.server = UnixSocketServer(self, connector, path)
+        except Exception as ex:
+            raise CommError(CommError.ERROR, f"Can't listen on {path}: {secure_format_exception(ex)}")
+        self.server.serve_forever()
+
+    def connect(self, connector: ConnectorInfo):
+        self.connector = connector
+        path = self._get_path(connector)
+
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            sock.connect(path)
+            connection = self._create_connection(sock, connector, True)
+        except Exception as ex:
+            sock.close()
+            raise CommError(CommError.ERROR, f"Can't connect to {path}: {secure_format_exception(ex)}")
+
+        self._run_connection(connection)
+
+    def handle_accepted(self, sock: Any, connector: ConnectorInfo):
+        try:
+            connection = self._create_connection(sock, connector, False)
+        except Exception as ex:
+            log.error(f"Connection is rejected: {secure_format_exception(ex)}")
+            return
+
+        self._run_connection(connection)
+
+    def _create_connection(self, sock: Any, connector: ConnectorInfo, active: bool) -> SocketConnection:
+        creds = check_peer_credentials(sock)
+        connection = self.create_connection(sock, connector, active)
+        if creds:
+            pid, uid, _ = creds
+            connection.conn_props[DriverParams.PEER_PID.value] = pid
+            connection.conn_props[DriverParams.PEER_UID.value] = uid
+        return connection
+
+    def _run_connection(self, connection: SocketConnection):
+        self.add_connection(connection)
+        connection.read_loop()
+        self.close_connection(connection)
+
+    def shutdown(self):
+        self.close_all()
+        if self.server:
+            self.server.shutdown()
+            self.server.server_close()
+            try:
+                os.unlink(self.server.path)
+            except OSError:
+                pass
+
+    @staticmethod
+    def get_urls(scheme: str, resources: dict) -> (str, str):
+        return get_socket_path_urls(scheme, resources)
+
+    @staticmethod
+    def _get_path(connector: ConnectorInfo) -> str:
+        path = connector.params.get(DriverParams.PATH.value)
+        if not path:
+            raise CommError(CommError.BAD_CONFIG, f"Socket path is missing in {connector.params}")
+        return path
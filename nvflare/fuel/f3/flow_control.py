@@ -0,0 +1,185 @@
+# Copyright (c) 2025, NVIDIA CORPORATION.  All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import asyncio
+import logging
+import threading
+import time
+from typing import Optional
+
+from nvflare.fuel.f3.stats_pool import GaugePool
+
+log = logging.getLogger(__name__)
+
+# Interval to check the state when waiting in the event loop
+ASYNC_CHECK_INTERVAL = 0.01
+
+DEFAULT_MAX_WAIT = 60.0
+
+GAUGE_BYTES = "bytes"
+GAUGE_ITEMS = "items"
+GAUGE_PAUSED = "paused"
+
+
+class Watermarks:
+    """High and low watermarks of a queue, in bytes and number of items. A value of 0 disables the limit."""
+
+    def __init__(self, high_bytes: int = 0, low_bytes: int = 0, high_items: int = 0, low_items: int = 0):
+        if high_bytes < 0 or high_items < 0:
+            raise ValueError(f"high watermarks must not be negative: {high_bytes=} {high_items=}")
+
+        # Without a low watermark, reading resumes at half of the high watermark
+        self.high_bytes = high_bytes
+        self.low_bytes = low_bytes if 0 < low_bytes < high_bytes else high_bytes // 2
+        self.high_items = high_items
+        self.low_items = low_items if 0 < low_items < high_items else high_items // 2
+
+    def is_enabled(self) -> bool:
+        return self.high_bytes > 0 or self.high_items > 0
+
+    def __str__(self):
+        return f"bytes: {self.low_bytes}/{self.high_bytes} items: {self.low_items}/{self.high_items}"
+
+
+class FlowControl:
+    """Flow control of a queue of received items, like frames waiting to be processed.
+
+    The readers add items when they are queued and remove them when they are processed. When the queued bytes or
+    items exceed a high watermark, the queue is paused. It's resumed when both go below the low watermarks.
+    Readers call wait() after queueing an item, so they stop reading while the queue is paused.
+
+    A flow control can have a parent, for example a global limit over all connections. The items are counted in the
+    parent too, and the readers wait while either one is paused.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        watermarks: Watermarks,
+        parent: Optional["FlowControl"] = None,
+        gauge_pool: Optional[GaugePool] = None,
+        max_wait: float = DEFAULT_MAX_WAIT,
+    ):
+        """Constructor of FlowControl
+
+        Args:
+            name: name of the queue
+            watermarks: the watermarks
+            parent: the parent flow control, if any
+            gauge_pool: the pool to record the queue depth to
+            max_wait: max time in seconds a reader waits for the queue to resume. The wait is limited so a handler
+                waiting for a frame from a paused connection doesn't block forever.
+        """
+        self.name = name
+        self.watermarks = watermarks
+        self.parent = parent
+        self.gauge_pool = gauge_pool
+        self.queued_bytes = 0
+        self.queued_items = 0
+        self.paused = False
+        self.max_wait = max_wait
+
+        # All flow controls of a tree share the condition, so a resume of the parent wakes up the readers
+        self.cond = parent.cond if parent else threading.Condition()
+
+    def create_child(self, name: str, watermarks: Watermarks) -> "FlowControl":
+        return FlowControl(name, watermarks, parent=self, max_wait=self.max_wait)
+
+    def add(self, size: int):
+        with self.cond:
+            self._update(size, 1)
+
+    def remove(self, size: int):
+        with self.cond:
+            self._update(-size, -1)
+
+    def is_paused(self) -> bool:
+        fc = self
+        while fc:
+            if fc.paused:
+                return True
+            fc = fc.parent
+        return False
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Block while the queue is paused
+
+        Args:
+            timeout: max time to wait in seconds, max_wait if not specified
+
+        Returns: True if the queue is not paused, False if timed out
+
+        """
+        if not self.is_paused():
+            return True
+
+        if timeout is None:
+            timeout = self.max_wait
+
+        start = time.time()
+        with self.cond:
+            resumed = self.cond.wait_for(lambda: not self.is_paused(), timeout)
+        self._log_wait(start, resumed)
+        return resumed
+
+    async def async_wait(self, timeout: Optional[float] = None) -> bool:
+        """Same as wait() but for readers running in an event loop"""
+        if not self.is_paused():
+            return True
+
+        if timeout is None:
+            timeout = self.max_wait
+
+        start = time.time()
+        resumed = True
+        while self.is_paused():
+            if time.time() - start > timeout:
+                resumed = False
+                break
+            await asyncio.sleep(ASYNC_CHECK_INTERVAL)
+        self._log_wait(start, resumed)
+        return resumed
+
+    def _update(self, size_delta: int, items_delta: int):
+        self.queued_bytes += size_delta
+        self.queued_items += items_delta
+
+        wm = self.watermarks
+        if wm.is_enabled():
+            if self.paused:
+                if (not wm.high_bytes or self.queued_bytes <= wm.low_bytes) and (
+                    not wm.high_items or self.queued_items <= wm.low_items
+                ):
+                    self.paused = False
+                    log.debug(f"Reading is resumed for {self.name}: {self.queued_bytes=} {self.queued_items=}")
+                    self.cond.notify_all()
+            elif (wm.high_bytes and self.queued_bytes > wm.high_bytes) or (
+                wm.high_items and self.queued_items > wm.high_items
+            ):
+                self.paused = True
+                log.debug(f"Reading is paused for {self.name}: {self.queued_bytes=} {self.queued_items=}")
+
+        if self.gauge_pool:
+            self.gauge_pool.set(self.name, GAUGE_BYTES, self.queued_bytes)
+            self.gauge_pool.set(self.name, GAUGE_ITEMS, self.queued_items)
+            self.gauge_pool.set(self.name, GAUGE_PAUSED, int(self.paused))
+
+        if self.parent:
+            self.parent._update(size_delta, items_delta)
+
+    def _log_wait(self, start: float, resumed: bool):
+        wait_time = time.time() - start
+        if resumed:
+            log.debug(f"{self.name} waited {wait_time:.3f} seconds for the queue to drain")
+        else:
+            log.warning(f"{self.name} resumed reading after waiting {wait_time:.3f} seconds, the queue is still full")
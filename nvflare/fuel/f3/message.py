@@ -27,6 +27,13 @@ class AppIds:
     PUB_SUB = 3
 
 
+class TransportPropKey:
+    """Properties set by the communication layer on received messages"""
+
+    # time.time() when the frame of the message was read from the connection
+    RECEIVE_TIME = "f3_receive_time"
+
+
 class Message:
     def __init__(self, headers: Optional[dict] = None, payload: Any = None):
         """Construct an FCI message"""
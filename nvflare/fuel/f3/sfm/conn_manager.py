@@ -20,6 +20,7 @@ from typing import Dict, List, Optional
 
 import msgpack
 
+from nvflare.fuel.f3.comm_config import CommConfigurator
 from nvflare.fuel.f3.comm_error import CommError
 from nvflare.fuel.f3.connection import BytesAlike, Connection, ConnState, FrameReceiver
 from nvflare.fuel.f3.drivers.connector_info import ConnectorInfo, Mode
@@ -27,12 +28,15 @@ from nvflare.fuel.f3.drivers.driver import ConnMonitor, Driver
 from nvflare.fuel.f3.drivers.driver_params import DriverCap, DriverParams
 from nvflare.fuel.f3.drivers.net_utils import ssl_required
 from nvflare.fuel.f3.endpoint import Endpoint, EndpointMonitor, EndpointState
-from nvflare.fuel.f3.message import Message, MessageReceiver
-from nvflare.fuel.f3.sfm.constants import HandshakeKeys, Types
+from nvflare.fuel.f3.flow_control import FlowControl, Watermarks
+from nvflare.fuel.f3.message import Message, MessageReceiver, TransportPropKey
+from nvflare.fuel.f3.sfm.constants import HandshakeKeys, HeaderKeys, Types
+from nvflare.fuel.f3.sfm.frame_batcher import split_batch
 from nvflare.fuel.f3.sfm.heartbeat_monitor import HeartbeatMonitor
+from nvflare.fuel.f3.sfm.ordered_dispatcher import OrderedDispatcher
 from nvflare.fuel.f3.sfm.prefix import PREFIX_LEN, Prefix
 from nvflare.fuel.f3.sfm.sfm_conn import SfmConnection
-from nvflare.fuel.f3.sfm.sfm_endpoint import SfmEndpoint
+from nvflare.fuel.f3.sfm.sfm_endpoint import MAX_CONN_PER_ENDPOINT, MAX_PARALLEL_CONNECTIONS, SfmEndpoint
 from nvflare.fuel.f3.stats_pool import StatsPoolManager
 from nvflare.fuel.utils.buffer_list import BufferList
 from nvflare.security.logging import secure_format_exception, secure_format_traceback
@@ -44,6 +48,17 @@ MAX_WAIT = 10
 SILENT_RECONNECT_TIME = 5
 SELF_ADDR = "0.0.0.0:0"
 
+# Limits of received frames waiting to be processed, reading from connections is paused when exceeded
+FRAME_QUEUE_HIGH_BYTES = 2 * 1024 * 1024 * 1024
+FRAME_QUEUE_HIGH_ITEMS = 10000
+CONN_FRAME_QUEUE_HIGH_BYTES = 256 * 1024 * 1024
+CONN_FRAME_QUEUE_HIGH_ITEMS = 1000
+FRAME_QUEUE_MAX_WAIT = 60.0
+
+# Small frames to the same peer are sent together when the batch reaches the size or after the delay
+FRAME_BATCH_SIZE = 64 * 1024
+FRAME_BATCH_DELAY = 0.0002
+
 log = logging.getLogger(__name__)
 
 handle_lock = threading.Lock()
@@ -85,16 +100,40 @@ class ConnManager(ConnMonitor):
         self.stopped = False
         self.conn_mgr_executor = ThreadPoolExecutor(CONN_THREAD_POOL_SIZE, "conn_mgr")
         self.frame_mgr_executor = ThreadPoolExecutor(FRAME_THREAD_POOL_SIZE, "frame_mgr")
+        self.frame_dispatcher = OrderedDispatcher(self.frame_mgr_executor)
         self.lock = threading.Lock()
         self.null_conn = NullConnection()
         stats = StatsPoolManager.get_pool("sfm_send_frame")
         if not stats:
-            stats = StatsPoolManager.add_time_hist_pool(
+            stats = StatsPoolManager.add_hdr_time_pool(
                 "sfm_send_frame", "SFM send_frame time in secs", scope=local_endpoint.name
             )
         self.send_frame_stats = stats
         self.heartbeat_monitor = HeartbeatMonitor(self.sfm_conns)
 
+        config = CommConfigurator()
+        queue_stats = StatsPoolManager.get_pool("sfm_frame_queue")
+        if not queue_stats:
+            queue_stats = StatsPoolManager.add_gauge_pool(
+                "sfm_frame_queue", "SFM received frames waiting to be processed", [], scope=local_endpoint.name
+            )
+        self.frame_flow = FlowControl(
+            local_endpoint.name,
+            Watermarks(*config.get_frame_queue_watermarks(FRAME_QUEUE_HIGH_BYTES, FRAME_QUEUE_HIGH_ITEMS)),
+            gauge_pool=queue_stats,
+            max_wait=config.get_frame_queue_max_wait(FRAME_QUEUE_MAX_WAIT),
+        )
+        self.conn_watermarks = Watermarks(
+            *config.get_conn_frame_queue_watermarks(CONN_FRAME_QUEUE_HIGH_BYTES, CONN_FRAME_QUEUE_HIGH_ITEMS)
+        )
+
+        # Peers only batch frames to this endpoint if it's in the handshake
+        self.frame_batching = config.use_frame_batching(True)
+        self.frame_batch_size = config.get_frame_batch_size(FRAME_BATCH_SIZE)
+        self.frame_batch_delay = config.get_frame_batch_delay(FRAME_BATCH_DELAY)
+        if self.frame_batching:
+            local_endpoint.set_prop(HandshakeKeys.FRAME_BATCHING, True)
+
     def add_connector(self, driver: Driver, params: dict, mode: Mode) -> str:
 
         # Validate parameters
@@ -203,14 +242,11 @@ class ConnManager(ConnMonitor):
             CommError: If any error happens while sending the data
         """
 
-        # Flatten buffer list so drivers don't have to deal with it
-        if isinstance(payload, list):
-            flat_payload = BufferList(payload).flatten()
-        else:
-            flat_payload = payload
-
         if endpoint.name == self.local_endpoint.name:
-            self.send_loopback_message(endpoint, app_id, headers, flat_payload)
+            # Flatten buffer list so receivers don't have to deal with it
+            if isinstance(payload, list):
+                payload = BufferList(payload).flatten()
+            self.send_loopback_message(endpoint, app_id, headers, payload)
             return
 
         sfm_endpoint = self.sfm_endpoints.get(endpoint.name)
@@ -223,8 +259,12 @@ class ConnManager(ConnMonitor):
 
         stream_id = sfm_endpoint.next_stream_id()
 
-        # When multiple connections, round-robin by stream ID
-        sfm_conn = sfm_endpoint.get_connection(stream_id)
+        # When multiple connections, messages reassembled by the receiver are striped by stream ID.
+        # Other messages stay on one connection so their order is kept.
+        if headers and HeaderKeys.ORDER_KEY in headers:
+            sfm_conn = sfm_endpoint.get_connection(stream_id)
+        else:
+            sfm_conn = sfm_endpoint.get_primary_connection()
         if not sfm_conn:
             log.error("Logic error, ready endpoint has no connections")
             raise CommError(CommError.ERROR, f"Endpoint {endpoint.name} has no connection")
@@ -232,7 +272,8 @@ class ConnManager(ConnMonitor):
         # TODO: If multiple connections, should retry a diff connection on errors
         start = time.perf_counter()
 
-        sfm_conn.send_data(app_id, stream_id, headers, flat_payload)
+        # Buffer list is passed down, so drivers with vectored I/O can send it without assembling the frame
+        sfm_conn.send_data(app_id, stream_id, headers, payload)
 
         self.send_frame_stats.record_value(
             category=sfm_conn.conn.connector.driver.get_name(), value=time.perf_counter() - start
@@ -330,17 +371,16 @@ class ConnManager(ConnMonitor):
             log.error(f"Error handling state change: {secure_format_exception(ex)}")
             log.debug(secure_format_traceback())
 
-    def process_frame_task(self, sfm_conn: SfmConnection, frame: BytesAlike):
+    def process_frame_task(
+        self,
+        sfm_conn: SfmConnection,
+        frame: BytesAlike,
+        prefix: Prefix,
+        headers: Optional[dict],
+        receive_time: float,
+    ):
 
         try:
-            prefix = Prefix.from_bytes(frame)
-            log.debug(f"Received frame: {prefix} on {sfm_conn.conn}")
-
-            if prefix.header_len == 0:
-                headers = None
-            else:
-                headers = msgpack.unpackb(frame[PREFIX_LEN : PREFIX_LEN + prefix.header_len])
-
             if prefix.type in (Types.HELLO, Types.READY):
                 if prefix.type == Types.HELLO:
                     sfm_conn.send_handshake(Types.READY)
@@ -354,11 +394,13 @@ class ConnManager(ConnMonitor):
                 # No action is needed for PONG. The last_activity is already updated
             elif prefix.type == Types.DATA:
                 if prefix.length > PREFIX_LEN + prefix.header_len:
-                    payload = frame[PREFIX_LEN + prefix.header_len :]
+                    # Slices of the view don't copy the frame
+                    payload = memoryview(frame)[PREFIX_LEN + prefix.header_len :]
                 else:
                     payload = None
 
                 message = Message(headers, payload)
+                message.set_prop(TransportPropKey.RECEIVE_TIME, receive_time)
                 receiver = self.receivers.get(prefix.app_id)
                 if receiver:
                     receiver.process_message(sfm_conn.sfm_endpoint.endpoint, sfm_conn.conn, prefix.app_id, message)
@@ -370,13 +412,53 @@ class ConnManager(ConnMonitor):
         except Exception as ex:
             log.error(f"Error processing frame: {secure_format_exception(ex)}")
             log.debug(secure_format_traceback())
+        finally:
+            flow_control = sfm_conn.conn.flow_control
+            if flow_control:
+                flow_control.remove(len(frame))
 
     def process_frame(self, sfm_conn: SfmConnection, frame: BytesAlike):
         if self.stopped:
             log.debug(f"Frame received after shutdown for connection {sfm_conn.get_name()}")
             return
 
-        self.frame_mgr_executor.submit(self.process_frame_task, sfm_conn, frame)
+        try:
+            prefix = Prefix.from_bytes(frame)
+            log.debug(f"Received frame: {prefix} on {sfm_conn.conn}")
+
+            if prefix.header_len == 0:
+                headers = None
+            else:
+                headers = msgpack.unpackb(memoryview(frame)[PREFIX_LEN : PREFIX_LEN + prefix.header_len])
+        except Exception as ex:
+            log.error(f"Error parsing frame on {sfm_conn.get_name()}: {secure_format_exception(ex)}")
+            log.debug(secure_format_traceback())
+            return
+
+        if prefix.type == Types.BATCH:
+            self.process_batch(sfm_conn, frame, prefix)
+            return
+
+        # Frames with an order key are processed in order, all others in parallel
+        key = None
+        if headers and prefix.type == Types.DATA:
+            order_key = headers.get(HeaderKeys.ORDER_KEY)
+            if order_key is not None and sfm_conn.sfm_endpoint:
+                key = (sfm_conn.sfm_endpoint.endpoint.name, order_key)
+
+        flow_control = sfm_conn.conn.flow_control
+        if flow_control:
+            flow_control.add(len(frame))
+        self.frame_dispatcher.submit(key, self.process_frame_task, sfm_conn, frame, prefix, headers, time.time())
+
+    def process_batch(self, sfm_conn: SfmConnection, frame: BytesAlike, prefix: Prefix):
+        """Process the frames in a BATCH frame as if they were received one by one"""
+        try:
+            for inner_frame in split_batch(frame, prefix):
+                self.process_frame(sfm_conn, inner_frame)
+        except Exception as ex:
+            log.error(f"Error processing batch on {sfm_conn.get_name()}: {secure_format_exception(ex)}")
+            log.debug(secure_format_traceback())
 
     def update_endpoint(self, sfm_conn: SfmConnection, data: dict):
 
@@ -403,8 +485,10 @@ class ConnManager(ConnMonitor):
             old_state = EndpointState.IDLE
             sfm_endpoint = SfmEndpoint(endpoint)
 
-        sfm_endpoint.add_connection(sfm_conn)
+        sfm_endpoint.add_connection(sfm_conn, self.get_max_connections(endpoint))
         sfm_conn.sfm_endpoint = sfm_endpoint
+        if self.frame_batching and endpoint.get_prop(HandshakeKeys.FRAME_BATCHING):
+            sfm_conn.enable_batching(self.frame_batch_size, self.frame_batch_delay)
         self.sfm_endpoints[endpoint_name] = sfm_endpoint
 
         if endpoint.state != old_state:
@@ -419,6 +503,16 @@ class ConnManager(ConnMonitor):
         for monitor in self.monitors:
             monitor.state_change(endpoint)
 
+    def get_max_connections(self, endpoint: Endpoint) -> int:
+        """Number of connections allowed to the endpoint, the larger of the numbers requested by both sides"""
+        requested = [MAX_CONN_PER_ENDPOINT]
+        for ep in (self.local_endpoint, endpoint):
+            value = ep.get_prop(HandshakeKeys.MAX_CONNECTIONS)
+            if isinstance(value, int):
+                requested.append(value)
+
+        return min(max(requested), MAX_PARALLEL_CONNECTIONS)
+
     @staticmethod
     def get_dict_payload(prefix, frame):
         mv = memoryview(frame)
@@ -430,6 +524,7 @@ class ConnManager(ConnMonitor):
         with self.lock:
             self.sfm_conns[sfm_conn.get_name()] = sfm_conn
 
+        connection.flow_control = self.frame_flow.create_child(connection.name, self.conn_watermarks)
         connection.register_frame_receiver(SfmFrameReceiver(self, sfm_conn))
 
         if connection.connector.mode == Mode.ACTIVE:
@@ -444,6 +539,7 @@ class ConnManager(ConnMonitor):
                 return
 
             sfm_conn = self.sfm_conns.pop(name)
+            sfm_conn.stop_batching()
             sfm_endpoint = sfm_conn.sfm_endpoint
             if sfm_endpoint is None:
                 log.debug(f"Connection {name} is closed before SFM handshake")
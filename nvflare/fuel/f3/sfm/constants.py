@@ -21,11 +21,17 @@ class Types:
     READY = 5
     PING = 6
     PONG = 7
+    # Small frames sent together, only to the peers with FRAME_BATCHING in handshake
+    BATCH = 8
 
 
 class HandshakeKeys:
     ENDPOINT_NAME = "endpoint_name"
     TIMESTAMP = "timestamp"
+    # Number of parallel connections the endpoint opens to its peers
+    MAX_CONNECTIONS = "max_connections"
+    # The endpoint can receive BATCH frames
+    FRAME_BATCHING = "frame_batching"
 
 
 class Flags:
@@ -39,3 +45,9 @@ class Flags:
     RESP = 0x1000
     # PUB/SUB message, topic is in the header
     PUB_SUB = 0x0800
+
+
+class HeaderKeys:
+    # Messages from the same endpoint with the same value of this header are processed in the order they are received.
+    # These messages are reassembled by sequence by the receiver, so they are striped over all the connections.
+    ORDER_KEY = "sfm_ok"
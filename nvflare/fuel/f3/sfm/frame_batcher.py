@@ -0,0 +1,176 @@
+# Copyright (c) 2025, NVIDIA CORPORATION.  All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import heapq
+import itertools
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Iterator, List, Optional
+
+from nvflare.fuel.f3.comm_error import CommError
+from nvflare.fuel.f3.connection import BytesAlike
+from nvflare.fuel.f3.sfm.constants import Types
+from nvflare.fuel.f3.sfm.prefix import PREFIX_LEN, Prefix
+from nvflare.security.logging import secure_format_exception
+
+# Frames larger than this are never batched
+MAX_BATCHED_FRAME_SIZE = 8 * 1024
+# Max number of connections flushed at the same time
+FLUSH_THREAD_POOL_SIZE = 8
+
+log = logging.getLogger(__name__)
+
+
+class FrameBatch:
+    """Small frames to the same peer, waiting to be sent together as one BATCH frame.
+
+    The BATCH frame is a prefix followed by the complete frames, each with its own prefix,
+    so the receiver splits it by the length in the prefixes.
+    """
+
+    def __init__(self, max_size: int, delay: float):
+        self.max_size = max_size
+        self.delay = delay
+        self.buffer = bytearray(PREFIX_LEN)
+        self.count = 0
+        self.scheduled = False
+        self.last_send = 0.0
+
+    def is_idle(self) -> bool:
+        """No frames are pending and nothing was sent within the delay.
+
+        The first frame after an idle period is sent right away, so a lone request doesn't wait. Only the
+        frames following it closely are batched.
+        """
+        return not self.count and not self.scheduled and time.perf_counter() - self.last_send > self.delay
+
+    def fits(self, length: int) -> bool:
+        return len(self.buffer) + length <= self.max_size
+
+    def add(self, frames: List[BytesAlike]):
+        """Add a frame made of a list of buffers. The buffers are copied, they can be reused by the caller"""
+        for buf in frames:
+            self.buffer += buf
+        self.count += 1
+
+    def is_empty(self) -> bool:
+        return self.count == 0
+
+    def take(self, sequence: int) -> Optional[BytesAlike]:
+        """Get the frame to send and start a new batch
+
+        Args:
+            sequence: Sequence number of the BATCH frame
+
+        Returns:
+            The BATCH frame, the only frame if there is just one or None if empty
+        """
+        if not self.count:
+            return None
+
+        buffer = self.buffer
+        if self.count == 1:
+            frame = memoryview(buffer)[PREFIX_LEN:]
+        else:
+            Prefix(len(buffer), 0, Types.BATCH, 0, 0, 0, 0, sequence).to_buffer(buffer, 0)
+            frame = buffer
+
+        self.buffer = bytearray(PREFIX_LEN)
+        self.count = 0
+        self.last_send = time.perf_counter()
+        return frame
+
+
+def split_batch(frame: BytesAlike, prefix: Prefix) -> Iterator[memoryview]:
+    """Get the frames in a BATCH frame. The frames are views of the BATCH frame, they are not copied"""
+    mv = memoryview(frame)
+    offset = PREFIX_LEN
+    while offset < prefix.length:
+        inner = Prefix.from_bytes(mv[offset : offset + PREFIX_LEN])
+        if inner.length < PREFIX_LEN or offset + inner.length > prefix.length:
+            raise CommError(CommError.BAD_DATA, f"Invalid frame length {inner.length} at offset {offset} of batch")
+        if inner.type == Types.BATCH:
+            raise CommError(CommError.BAD_DATA, "Nested batch frame")
+
+        yield mv[offset : offset + inner.length]
+        offset += inner.length
+
+
+class BatchFlusher:
+    """One timer thread for the batches of all connections, which are sent by a pool of threads when due.
+
+    The send blocks if the peer stops reading. So the timer thread never sends, and a connection is flushed by
+    one thread of the pool at a time. A blocked connection only holds up its own batches.
+    """
+
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    def __init__(self):
+        self.cond = threading.Condition()
+        self.heap = []
+        self.counter = itertools.count()
+        self.flushing = set()  # flush functions running in the pool
+        self.pending = set()  # flush functions scheduled again while running
+        self.executor = ThreadPoolExecutor(FLUSH_THREAD_POOL_SIZE, "sfm_batch")
+        self.thread = threading.Thread(target=self._run, name="sfm_batch_flusher", daemon=True)
+        self.thread.start()
+
+    @classmethod
+    def get_instance(cls) -> "BatchFlusher":
+        with cls._instance_lock:
+            if not cls._instance:
+                cls._instance = BatchFlusher()
+            return cls._instance
+
+    def schedule(self, flush: Callable, delay: float):
+        deadline = time.perf_counter() + delay
+        with self.cond:
+            heapq.heappush(self.heap, (deadline, next(self.counter), flush))
+            if self.heap[0][2] is flush:
+                self.cond.notify()
+
+    def _run(self):
+        while True:
+            with self.cond:
+                while not self.heap:
+                    self.cond.wait()
+
+                deadline, _, flush = self.heap[0]
+                wait = deadline - time.perf_counter()
+                if wait > 0:
+                    self.cond.wait(wait)
+                    continue
+
+                heapq.heappop(self.heap)
+                if flush in self.flushing:
+                    self.pending.add(flush)
+                    continue
+                self.flushing.add(flush)
+
+            self.executor.submit(self._flush, flush)
+
+    def _flush(self, flush: Callable):
+        while True:
+            try:
+                flush()
+            except Exception as ex:
+                log.error(f"Error sending batched frames: {secure_format_exception(ex)}")
+
+            with self.cond:
+                if flush not in self.pending:
+                    self.flushing.discard(flush)
+                    return
+                self.pending.discard(flush)
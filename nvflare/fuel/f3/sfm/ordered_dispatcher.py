@@ -0,0 +1,93 @@
+# Copyright (c) 2025, NVIDIA CORPORATION.  All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import logging
+import threading
+from collections import deque
+from concurrent.futures import Executor
+from typing import Callable, Deque, Dict, Hashable, Optional, Tuple
+
+from nvflare.security.logging import secure_format_exception, secure_format_traceback
+
+log = logging.getLogger(__name__)
+
+_Task = Tuple[Callable, tuple, dict]
+
+
+class OrderedDispatcher:
+    """Dispatch tasks to a thread pool with keyed serial queues.
+
+    Tasks with the same key run one at a time, in the order they are submitted. Tasks with different keys run in
+    parallel. Tasks without a key are submitted to the pool directly.
+
+    A key doesn't hold a thread while it has no tasks. After each task, the next task of the same key is submitted
+    to the end of the pool queue, so a busy key can't starve the others.
+    """
+
+    def __init__(self, executor: Executor):
+        self.executor = executor
+        self.queues: Dict[Hashable, Deque[_Task]] = {}
+        self.lock = threading.Lock()
+
+    def submit(self, key: Optional[Hashable], fn: Callable, *args, **kwargs):
+        """Submit a task
+
+        Args:
+            key: tasks with the same key are run in order. None if the task can run in any order
+            fn: the function to run
+            *args: args of the function
+            **kwargs: kwargs of the function
+
+        Returns: None
+
+        """
+        if key is None:
+            self.executor.submit(fn, *args, **kwargs)
+            return
+
+        with self.lock:
+            queue = self.queues.get(key)
+            if queue is not None:
+                # A task of the key is running, it submits this one when it's done
+                queue.append((fn, args, kwargs))
+                return
+
+            self.queues[key] = deque()
+
+        self.executor.submit(self._run, key, fn, args, kwargs)
+
+    def get_num_keys(self) -> int:
+        """Returns the number of keys with a running or pending task"""
+        return len(self.queues)
+
+    def _run(self, key: Hashable, fn: Callable, args: tuple, kwargs: dict):
+        try:
+            fn(*args, **kwargs)
+        except Exception as ex:
+            log.error(f"Error running task for key {key}: {secure_format_exception(ex)}")
+            log.debug(secure_format_traceback())
+
+        with self.lock:
+            queue = self.queues[key]
+            if not queue:
+                self.queues.pop(key)
+                return
+            next_fn, next_args, next_kwargs = queue.popleft()
+
+        try:
+            self.executor.submit(self._run, key, next_fn, next_args, next_kwargs)
+        except RuntimeError as ex:
+            # The executor is shut down
+            log.debug(f"Pending tasks for key {key} are dropped: {secure_format_exception(ex)}")
+            with self.lock:
+                self.queues.pop(key, None)
@@ -22,7 +22,9 @@ import msgpack
 from nvflare.fuel.f3.connection import BytesAlike, Connection
 from nvflare.fuel.f3.endpoint import Endpoint
 from nvflare.fuel.f3.sfm.constants import HandshakeKeys, Types
+from nvflare.fuel.f3.sfm.frame_batcher import MAX_BATCHED_FRAME_SIZE, BatchFlusher, FrameBatch
 from nvflare.fuel.f3.sfm.prefix import PREFIX_LEN, Prefix
+from nvflare.security.logging import secure_format_exception
 
 log = logging.getLogger(__name__)
 
@@ -62,7 +64,9 @@ class SfmConnection:
         self.sfm_endpoint = None
         self.last_activity = 0
         self.sequence = 0
+        self.sequence_lock = threading.Lock()
         self.lock = threading.Lock()
+        self.batch: Optional[FrameBatch] = None
 
     def get_name(self) -> str:
         return self.conn.name
@@ -73,10 +77,27 @@ class SfmConnection:
         Sequence is used to detect lost frames.
         """
 
-        with self.lock:
+        with self.sequence_lock:
             self.sequence = (self.sequence + 1) & 0xFFFF
             return self.sequence
 
+    def enable_batching(self, max_size: int, delay: float):
+        """Send small frames together. The peer must support BATCH frames.
+
+        Args:
+            max_size: The batch is sent when it reaches this size in bytes
+            delay: The batch is sent at most this many seconds after the first frame is added
+        """
+        with self.lock:
+            self.batch = FrameBatch(max_size, delay)
+
+    def stop_batching(self):
+        """Drop the batched frames, called when the connection is closed.
+
+        The lock is not taken, it may be held by a flush blocked on the connection.
+        """
+        self.batch = None
+
     def send_handshake(self, frame_type: int):
         """Send HELLO/READY frame"""
 
@@ -116,36 +137,83 @@ class SfmConnection:
         self.send_frame(prefix, None, payload)
 
     def send_frame(self, prefix: Prefix, headers: Optional[dict], payload: Optional[BytesAlike]):
+        """Send a frame. The payload can be a list of buffers.
+
+        The prefix, headers and payload buffers are passed to the connection as a list, so drivers with vectored
+        I/O can send them without copying them into one buffer.
+        """
 
         headers_bytes = self.headers_to_bytes(headers)
         header_len = len(headers_bytes) if headers_bytes else 0
 
-        length = PREFIX_LEN + header_len
+        if not payload:
+            payload_buffers = []
+        elif isinstance(payload, list):
+            payload_buffers = [buf for buf in payload if len(buf)]
+        else:
+            payload_buffers = [payload]
 
-        if payload:
-            length += len(payload)
+        length = PREFIX_LEN + header_len + sum(len(buf) for buf in payload_buffers)
 
         prefix.length = length
         prefix.header_len = header_len
         prefix.sequence = self.next_sequence()
 
-        buffer: bytearray = bytearray(length)
-
-        offset = 0
-        prefix.to_buffer(buffer, offset)
-        offset += PREFIX_LEN
+        prefix_buf = bytearray(PREFIX_LEN)
+        prefix.to_buffer(prefix_buf, 0)
 
+        frames = [prefix_buf]
         if headers_bytes:
-            buffer[offset:] = headers_bytes
-            offset += header_len
-
-        if payload:
-            buffer[offset:] = payload
+            frames.append(headers_bytes)
+        frames.extend(payload_buffers)
 
         log.debug(f"Sending frame: {prefix} on {self.conn}")
         # Only one thread can send data on a connection. Otherwise, the frames may interleave.
         with self.lock:
-            self.conn.send_frame(buffer)
+            batch = self.batch
+            if batch and length <= MAX_BATCHED_FRAME_SIZE and not batch.is_idle():
+                if not batch.fits(length):
+                    self._send_batch()
+                batch.add(frames)
+                if not batch.scheduled:
+                    batch.scheduled = True
+                    BatchFlusher.get_instance().schedule(self.flush_batch, batch.delay)
+                return
+
+            # Frames queued earlier go first to keep the order
+            if batch:
+                self._send_batch()
+                batch.last_send = time.perf_counter()
+            self.conn.send_frames(frames)
+
+    def flush_batch(self):
+        """Send the batched frames now.
+
+        The senders of the frames are gone, so if they can't be sent, the connection is closed. The loss is then
+        seen by the endpoint like any broken connection.
+        """
+        with self.lock:
+            batch = self.batch
+            if not batch:
+                return
+
+            batch.scheduled = False
+            count = batch.count
+            try:
+                self._send_batch()
+            except Exception as ex:
+                log.error(
+                    f"Closing connection {self.get_name()}, {count} batched frames can't be sent: "
+                    f"{secure_format_exception(ex)}"
+                )
+                self.conn.close()
+
+    def _send_batch(self):
+        if self.batch.is_empty():
+            return
+
+        frame = self.batch.take(self.next_sequence())
+        self.conn.send_frames([frame])
 
     @staticmethod
     def headers_to_bytes(headers: Optional[dict]) -> Optional[bytes]:
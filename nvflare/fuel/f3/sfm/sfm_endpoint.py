@@ -21,6 +21,8 @@ from nvflare.fuel.f3.sfm.sfm_conn import SfmConnection
 # Hard-coded stream ID to be used by packets before handshake
 RESERVED_STREAM_ID = 16
 MAX_CONN_PER_ENDPOINT = 1
+# Upper limit of the parallel connections an endpoint can request
+MAX_PARALLEL_CONNECTIONS = 16
 
 log = logging.getLogger(__name__)
 
@@ -34,16 +36,16 @@ class SfmEndpoint:
         self.lock = threading.Lock()
         self.connections: List[SfmConnection] = []
 
-    def add_connection(self, sfm_conn: SfmConnection):
+    def add_connection(self, sfm_conn: SfmConnection, max_conns: int = MAX_CONN_PER_ENDPOINT):
 
         with self.lock:
-            while len(self.connections) >= MAX_CONN_PER_ENDPOINT:
+            while len(self.connections) >= max_conns:
                 first_conn = self.connections[0]
                 first_conn.conn.close()
                 self.connections.pop(0)
                 log.info(
                     f"Connection {first_conn.get_name()} is evicted for {sfm_conn.get_name()} "
-                    f"from endpoint {self.endpoint.name} for exceeding limit {MAX_CONN_PER_ENDPOINT}"
+                    f"from endpoint {self.endpoint.name} for exceeding limit {max_conns}"
                 )
 
             self.connections.append(sfm_conn)
@@ -69,11 +71,21 @@ class SfmEndpoint:
                 log.debug(f"Connection {sfm_conn.get_name()} is already removed from endpoint {self.endpoint.name}")
 
     def get_connection(self, stream_id: int) -> Optional[SfmConnection]:
-        if not self.connections:
+        """Get a connection by round-robin on stream_id"""
+        connections = self.connections
+        if not connections:
+            return None
+
+        index = stream_id % len(connections)
+        return connections[index]
+
+    def get_primary_connection(self) -> Optional[SfmConnection]:
+        """Get the oldest connection. Messages that must stay in order are all sent on it"""
+        connections = self.connections
+        if not connections:
             return None
 
-        index = stream_id % len(self.connections)
-        return self.connections[index]
+        return connections[0]
 
     def next_stream_id(self) -> int:
         """Get next stream_id for the endpoint
@@ -14,10 +14,11 @@
 
 import csv
 import json
+import math
 import sys
 import threading
 import time
-from typing import List, Tuple, Union
+from typing import Dict, List, Optional, Tuple, Union
 
 _KEY_MAX = "max"
 _KEY_MIN = "min"
@@ -29,6 +30,16 @@ _KEY_UNIT = "unit"
 _KEY_MARKS = "marks"
 _KEY_COUNTER_NAMES = "counter_names"
 _KEY_CAT_DATA = "cat_data"
+_KEY_GAUGE_NAMES = "gauge_names"
+_KEY_RESOLUTION = "resolution"
+_KEY_PRECISION_BITS = "precision_bits"
+_KEY_MAX_VALUE = "max_value"
+_KEY_COUNTS = "counts"
+
+HDR_PERCENTILES = (50.0, 90.0, 99.0, 99.9)
+
+# Threads recording into an HdrHistPool are spread over this many stripes
+HDR_NUM_STRIPES = 8
 
 
 class StatsMode:
@@ -351,6 +362,332 @@ class CounterPool(StatsPool):
         return p
 
 
+class GaugePool(StatsPool):
+    """A pool of gauges. A gauge keeps the current value of a level, like a queue depth, and its peak value."""
+
+    def __init__(self, name: str, description: str, gauge_names: List[str]):
+        StatsPool.__init__(self, name, description)
+        self.gauge_names = list(gauge_names) if gauge_names else []
+        self.cat_gauges = {}  # dict of cat_name => gauge dict (gauge_name => [current, peak])
+        self.update_lock = threading.Lock()
+
+    def set(self, category: str, gauge_name: str, value: float):
+        with self.update_lock:
+            if gauge_name not in self.gauge_names:
+                self.gauge_names.append(gauge_name)
+
+            gauges = self.cat_gauges.get(category)
+            if gauges is None:
+                gauges = {}
+                self.cat_gauges[category] = gauges
+
+            g = gauges.get(gauge_name)
+            if g is None:
+                gauges[gauge_name] = [value, value]
+            else:
+                g[0] = value
+                if value > g[1]:
+                    g[1] = value
+
+    def get(self, category: str, gauge_name: str, peak=False):
+        with self.update_lock:
+            g = self.cat_gauges.get(category, {}).get(gauge_name)
+            if g is None:
+                return None
+            return g[1] if peak else g[0]
+
+    def get_table(self, mode=""):
+        with self.update_lock:
+            headers = ["category"]
+            for gn in self.gauge_names:
+                headers.extend([gn, f"{gn} (peak)"])
+
+            rows = []
+            for cat_name in sorted(self.cat_gauges.keys()):
+                gauges = self.cat_gauges[cat_name]
+                r = [cat_name]
+                for gn in self.gauge_names:
+                    g = gauges.get(gn)
+                    if g is None:
+                        r.extend(["", ""])
+                    else:
+                        r.extend([str(g[0]), str(g[1])])
+                rows.append(r)
+            return headers, rows
+
+    def to_dict(self):
+        with self.update_lock:
+            return {
+                _KEY_NAME: self.name,
+                _KEY_DESC: self.description,
+                _KEY_GAUGE_NAMES: list(self.gauge_names),
+                _KEY_CAT_DATA: {k: {n: list(g) for n, g in v.items()} for k, v in self.cat_gauges.items()},
+            }
+
+    @staticmethod
+    def from_dict(d: dict):
+        p = GaugePool(name=d.get(_KEY_NAME, ""), description=d.get(_KEY_DESC, ""), gauge_names=d.get(_KEY_GAUGE_NAMES))
+        p.cat_gauges = d.get(_KEY_CAT_DATA)
+        return p
+
+
+def _hdr_bucket_index(ticks: int, precision_bits: int) -> int:
+    if ticks < (1 << precision_bits):
+        return max(ticks, 0)
+    shift = ticks.bit_length() - precision_bits
+    return (shift << (precision_bits - 1)) + (ticks >> shift)
+
+
+def _hdr_bucket_range(index: int, precision_bits: int) -> Tuple[int, int]:
+    """Get the range of ticks [low, high) counted by a bucket"""
+    if index < (1 << precision_bits):
+        return index, index + 1
+    half = 1 << (precision_bits - 1)
+    shift = index // half - 1
+    low = (index - shift * half) << shift
+    return low, low + (1 << shift)
+
+
+class HdrHistogram:
+    """Counts of values in log-linear buckets, like HdrHistogram.
+
+    A value is converted to integer ticks of the resolution. Each tick below 2 ** precision_bits has its own
+    bucket, above that every power of two is split into 2 ** (precision_bits - 1) buckets. The bucket of a value
+    is found in O(1) and the relative error of a percentile is less than 1 / 2 ** (precision_bits - 1).
+
+    Only the buckets used are stored, most values fall into a few dozen of them.
+    """
+
+    def __init__(self, resolution: float, precision_bits: int, num_buckets: int):
+        self.resolution = resolution
+        self.precision_bits = precision_bits
+        self.num_buckets = num_buckets
+        self.counts = {}  # bucket index => count
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def add(self, other: "HdrHistogram"):
+        counts = self.counts
+        for i, c in other.counts.items():
+            counts[i] = counts.get(i, 0) + c
+        self.count += other.count
+        self.total += other.total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    def subtract(self, earlier: "HdrHistogram") -> "HdrHistogram":
+        """Get the values recorded since an earlier copy of this histogram.
+
+        Min and max of the difference are only known to the precision of the buckets.
+        """
+        result = HdrHistogram(self.resolution, self.precision_bits, self.num_buckets)
+        for i, c in self.counts.items():
+            c -= earlier.counts.get(i, 0)
+            if c:
+                result.counts[i] = c
+        result.count = self.count - earlier.count
+        result.total = self.total - earlier.total
+        used = sorted(result.counts)
+        if used:
+            result.min = max(_hdr_bucket_range(used[0], self.precision_bits)[0] * self.resolution, self.min)
+            if used[-1] < self.num_buckets - 1:
+                result.max = min(_hdr_bucket_range(used[-1], self.precision_bits)[1] * self.resolution, self.max)
+            else:
+                result.max = self.max
+        return result
+
+    def get_percentile(self, percentile: float) -> Optional[float]:
+        """Get the value that the percentile of the recorded values are less than or equal to
+
+        Args:
+            percentile: 0 to 100
+
+        Returns:
+            The upper bound of the bucket of the value, or None if nothing is recorded
+        """
+        if not self.count:
+            return None
+        if percentile <= 0:
+            return self.min
+
+        target = max(math.ceil(self.count * percentile / 100.0), 1)
+        seen = 0
+        for i, c in sorted(self.counts.items()):
+            seen += c
+            if seen >= target:
+                if i == self.num_buckets - 1:
+                    # values over max_value are counted in the last bucket
+                    return self.max
+                high = _hdr_bucket_range(i, self.precision_bits)[1] * self.resolution
+                return max(min(high, self.max), self.min)
+        return self.max
+
+    def get_mean(self) -> Optional[float]:
+        return self.total / self.count if self.count else None
+
+    def to_dict(self) -> dict:
+        return {
+            _KEY_COUNT: self.count,
+            _KEY_TOTAL: self.total,
+            _KEY_MIN: self.min if self.count else "",
+            _KEY_MAX: self.max if self.count else "",
+            _KEY_COUNTS: dict(sorted(self.counts.items())),
+        }
+
+    def load_dict(self, d: dict):
+        self.count = d.get(_KEY_COUNT, 0)
+        self.total = d.get(_KEY_TOTAL, 0.0)
+        if self.count:
+            self.min = d.get(_KEY_MIN)
+            self.max = d.get(_KEY_MAX)
+        for i, c in d.get(_KEY_COUNTS, {}).items():
+            # keys become strings in JSON
+            self.counts[int(i)] = c
+
+
+class _HdrStripe:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.histograms = {}  # category => HdrHistogram
+
+
+class HdrHistPool(StatsPool):
+    """A histogram pool for hot paths, reporting percentiles.
+
+    Unlike HistPool, recording a value doesn't scan the bins or take a lock shared by all threads. Threads are
+    spread over a fixed number of stripes, each with its own lock and histograms, which are merged when the pool
+    is read. So the memory doesn't grow with the number of threads. Raw records are not written.
+    """
+
+    def __init__(
+        self, name: str, description: str, unit: str, resolution: float, max_value: float, precision_bits: int = 6
+    ):
+        if resolution <= 0:
+            raise ValueError(f"resolution must be positive but got {resolution}")
+        if max_value <= resolution:
+            raise ValueError(f"max_value must be larger than resolution {resolution} but got {max_value}")
+        if precision_bits < 1:
+            raise ValueError(f"precision_bits must be at least 1 but got {precision_bits}")
+
+        StatsPool.__init__(self, name, description)
+        self.unit = unit
+        self.resolution = resolution
+        self.max_value = max_value
+        self.precision_bits = precision_bits
+        self.num_buckets = _hdr_bucket_index(int(max_value / resolution), precision_bits) + 1
+        self.ticks_per_unit = 1.0 / resolution
+        self.sub_bucket_count = 1 << precision_bits
+        self.half_bits = precision_bits - 1
+        self.update_lock = threading.Lock()
+        self.stripes = [_HdrStripe() for _ in range(HDR_NUM_STRIPES)]
+        self.last_snapshot = {}
+
+    def _new_histogram(self) -> HdrHistogram:
+        return HdrHistogram(self.resolution, self.precision_bits, self.num_buckets)
+
+    def record_value(self, category: str, value: float):
+        ticks = int(value * self.ticks_per_unit)
+        if ticks < self.sub_bucket_count:
+            index = ticks if ticks > 0 else 0
+        else:
+            shift = ticks.bit_length() - self.precision_bits
+            index = (shift << self.half_bits) + (ticks >> shift)
+            if index >= self.num_buckets:
+                index = self.num_buckets - 1
+
+        stripe = self.stripes[threading.get_native_id() % HDR_NUM_STRIPES]
+        with stripe.lock:
+            h = stripe.histograms.get(category)
+            if h is None:
+                h = self._new_histogram()
+                stripe.histograms[category] = h
+
+            counts = h.counts
+            counts[index] = counts.get(index, 0) + 1
+            h.count += 1
+            h.total += value
+            if value < h.min:
+                h.min = value
+            if value > h.max:
+                h.max = value
+
+    def get_snapshot(self) -> Dict[str, HdrHistogram]:
+        """Get the merged histograms of all values recorded so far"""
+        result = {}
+        for stripe in self.stripes:
+            with stripe.lock:
+                self._merge(result, stripe.histograms)
+        return result
+
+    def get_interval_snapshot(self) -> Dict[str, HdrHistogram]:
+        """Get the histograms of values recorded since the previous call, for percentiles of a time window"""
+        current = self.get_snapshot()
+        with self.update_lock:
+            last, self.last_snapshot = self.last_snapshot, current
+
+        result = {}
+        for cat, h in current.items():
+            prev = last.get(cat)
+            result[cat] = h.subtract(prev) if prev else h
+        return result
+
+    def _merge(self, target: dict, source: dict):
+        for cat, h in source.items():
+            merged = target.get(cat)
+            if merged is None:
+                merged = self._new_histogram()
+                target[cat] = merged
+            merged.add(h)
+
+    def get_percentile(self, category: str, percentile: float) -> Optional[float]:
+        h = self.get_snapshot().get(category)
+        return h.get_percentile(percentile) if h else None
+
+    def get_table(self, mode=""):
+        headers = ["category", "count", "avg", "min"]
+        headers.extend(f"p{p:g}" for p in HDR_PERCENTILES)
+        headers.append("max")
+
+        rows = []
+        snapshot = self.get_snapshot()
+        for cat_name in sorted(snapshot.keys()):
+            h = snapshot[cat_name]
+            r = [cat_name, str(h.count), format_value(h.get_mean()), format_value(h.min)]
+            r.extend(format_value(h.get_percentile(p)) for p in HDR_PERCENTILES)
+            r.append(format_value(h.max))
+            rows.append(r)
+        return headers, rows
+
+    def to_dict(self):
+        return {
+            _KEY_NAME: self.name,
+            _KEY_DESC: self.description,
+            _KEY_UNIT: self.unit,
+            _KEY_RESOLUTION: self.resolution,
+            _KEY_MAX_VALUE: self.max_value,
+            _KEY_PRECISION_BITS: self.precision_bits,
+            _KEY_CAT_DATA: {k: v.to_dict() for k, v in self.get_snapshot().items()},
+        }
+
+    @staticmethod
+    def from_dict(d: dict):
+        p = HdrHistPool(
+            name=d.get(_KEY_NAME, ""),
+            description=d.get(_KEY_DESC, ""),
+            unit=d.get(_KEY_UNIT, ""),
+            resolution=d.get(_KEY_RESOLUTION),
+            max_value=d.get(_KEY_MAX_VALUE),
+            precision_bits=d.get(_KEY_PRECISION_BITS),
+        )
+        for cat, hd in (d.get(_KEY_CAT_DATA) or {}).items():
+            h = p._new_histogram()
+            h.load_dict(hd)
+            p.stripes[0].histograms[cat] = h
+        return p
+
+
 def new_time_pool(name: str, description="", marks=None, record_writer=None) -> HistPool:
     if not marks:
         marks = (0.0001, 0.0005, 0.001, 0.002, 0.004, 0.008, 0.01, 0.02, 0.04, 0.08, 0.1, 0.2, 0.4, 0.8, 1.0, 2.0)
@@ -363,6 +700,16 @@ def new_message_size_pool(name: str, description="", marks=None, record_writer=N
     return HistPool(name=name, description=description, marks=marks, unit="MB", record_writer=record_writer)
 
 
+def new_hdr_time_pool(name: str, description="") -> HdrHistPool:
+    # microseconds up to an hour
+    return HdrHistPool(name=name, description=description, unit="second", resolution=1e-6, max_value=3600.0)
+
+
+def new_hdr_message_size_pool(name: str, description="") -> HdrHistPool:
+    # bytes up to a TB
+    return HdrHistPool(name=name, description=description, unit="MB", resolution=1e-6, max_value=1e6)
+
+
 def parse_hist_mode(mode: str) -> str:
     if not mode:
         return StatsMode.COUNT
@@ -441,6 +788,35 @@ class StatsPoolManager:
         cls.pools[name] = p
         return p
 
+    @classmethod
+    def add_hist_pool(cls, name: str, description: str, marks, unit: str, scope=None):
+        keep_records = cls._keep_hist_records(name)
+        name = cls._check_name(name, scope)
+        record_writer = cls.record_writer if keep_records else None
+        p = HistPool(name=name, description=description, marks=marks, unit=unit, record_writer=record_writer)
+        cls.pools[name] = p
+        return p
+
+    @classmethod
+    def add_hdr_time_pool(cls, name: str, description: str, scope=None):
+        """Add a time pool for a hot path. A HistPool is added instead if raw records are configured for it"""
+        if cls._keep_hist_records(name):
+            return cls.add_time_hist_pool(name, description, scope=scope)
+        name = cls._check_name(name, scope)
+        p = new_hdr_time_pool(name, description)
+        cls.pools[name] = p
+        return p
+
+    @classmethod
+    def add_hdr_msg_size_pool(cls, name: str, description: str, scope=None):
+        """Add a message size pool for a hot path. A HistPool is added instead if raw records are configured for it"""
+        if cls._keep_hist_records(name):
+            return cls.add_msg_size_pool(name, description, scope=scope)
+        name = cls._check_name(name, scope)
+        p = new_hdr_message_size_pool(name, description)
+        cls.pools[name] = p
+        return p
+
     @classmethod
     def add_counter_pool(cls, name: str, description: str, counter_names: list, scope=None):
         name = cls._check_name(name, scope)
@@ -448,6 +824,13 @@ class StatsPoolManager:
         cls.pools[name] = p
         return p
 
+    @classmethod
+    def add_gauge_pool(cls, name: str, description: str, gauge_names: list, scope=None):
+        name = cls._check_name(name, scope)
+        p = GaugePool(name, description, gauge_names)
+        cls.pools[name] = p
+        return p
+
     @classmethod
     def get_pool(cls, name: str):
         name = name.lower()
@@ -469,8 +852,12 @@ class StatsPoolManager:
                 r = [v.name]
                 if isinstance(v, HistPool):
                     t = "hist"
+                elif isinstance(v, HdrHistPool):
+                    t = "hdr"
                 elif isinstance(v, CounterPool):
                     t = "counter"
+                elif isinstance(v, GaugePool):
+                    t = "gauge"
                 else:
                     t = "?"
                 r.append(t)
@@ -486,8 +873,12 @@ class StatsPoolManager:
                 v = cls.pools[k]
                 if isinstance(v, HistPool):
                     t = "hist"
+                elif isinstance(v, HdrHistPool):
+                    t = "hdr"
                 elif isinstance(v, CounterPool):
                     t = "counter"
+                elif isinstance(v, GaugePool):
+                    t = "gauge"
                 else:
                     raise ValueError(f"unknown type of pool '{k}'")
                 result[k] = {"type": t, "pool": v.to_dict()}
@@ -506,8 +897,12 @@ class StatsPoolManager:
 
             if t == "hist":
                 p = HistPool.from_dict(pd)
+            elif t == "hdr":
+                p = HdrHistPool.from_dict(pd)
             elif t == "counter":
                 p = CounterPool.from_dict(pd)
+            elif t == "gauge":
+                p = GaugePool.from_dict(pd)
             else:
                 raise ValueError(f"invalid pool type {t}")
             cls.pools[k] = p
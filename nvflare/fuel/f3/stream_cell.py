@@ -11,14 +11,18 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
+import asyncio
 from typing import Callable
 
 from nvflare.fuel.f3.cellnet.core_cell import CoreCell
+from nvflare.fuel.f3.drivers.aio_context import AioContext
 from nvflare.fuel.f3.message import Message
 from nvflare.fuel.f3.streaming.blob_streamer import BlobStreamer
 from nvflare.fuel.f3.streaming.byte_receiver import ByteReceiver
 from nvflare.fuel.f3.streaming.byte_streamer import STREAM_TYPE_BYTE, ByteStreamer
 from nvflare.fuel.f3.streaming.stream_types import Stream, StreamError, StreamFuture
+from nvflare.fuel.utils.log_utils import get_obj_logger
+from nvflare.security.logging import secure_format_exception
 
 
 class StreamCell:
@@ -139,3 +143,58 @@ class StreamCell:
             blob_cb: The callback to handle the stream
         """
         self.blob_streamer.register_blob_callback(channel, topic, blob_cb, *args, **kwargs)
+
+    async def async_send_stream(
+        self, channel: str, topic: str, target: str, message: Message, secure=False, optional=False
+    ) -> int:
+        """Same as send_stream(), but waits for the streaming to complete in the event loop.
+
+        Returns:
+            The number of bytes sent
+        """
+        # the setup of the stream may block, so it's done out of the event loop
+        loop = asyncio.get_running_loop()
+        future = await loop.run_in_executor(None, self.send_stream, channel, topic, target, message, secure, optional)
+        return await future.async_result()
+
+    async def async_send_blob(
+        self, channel: str, topic: str, target: str, message: Message, secure=False, optional=False
+    ) -> int:
+        """Same as send_blob(), but waits for the streaming to complete in the event loop.
+
+        Returns:
+            The total number of bytes sent
+        """
+        loop = asyncio.get_running_loop()
+        future = await loop.run_in_executor(None, self.send_blob, channel, topic, target, message, secure, optional)
+        return await future.async_result()
+
+    def register_async_blob_cb(self, channel: str, topic: str, blob_cb, *args, **kwargs):
+        """Registers a coroutine function for receiving the blob.
+
+        Same as register_blob_cb(), but the callback runs in the event loop of the global AioContext, so it must
+        not block. No thread is held while the callback is running.
+
+        Args:
+            channel: the channel of the request
+            topic: topic of the request
+            blob_cb: The coroutine function to handle the blob
+        """
+        if not asyncio.iscoroutinefunction(blob_cb):
+            raise ValueError(f"specified blob_cb {type(blob_cb)} is not a coroutine function")
+        self.register_blob_cb(channel, topic, _AsyncBlobCallback(blob_cb).call, *args, **kwargs)
+
+
+class _AsyncBlobCallback:
+    def __init__(self, blob_cb):
+        self.blob_cb = blob_cb
+        self.logger = get_obj_logger(self)
+
+    def call(self, future: StreamFuture, *args, **kwargs):
+        AioContext.get_global_context().run_coro(self._run(future, args, kwargs))
+
+    async def _run(self, future: StreamFuture, args, kwargs):
+        try:
+            await self.blob_cb(future, *args, **kwargs)
+        except Exception as ex:
+            self.logger.error(f"exception from async blob CB {self.blob_cb.__name__}: {secure_format_exception(ex)}")
@@ -0,0 +1,146 @@
+# Copyright (c) 2025, NVIDIA CORPORATION.  All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import threading
+import time
+from collections import deque
+from typing import Deque, Optional, Tuple
+
+# The window is this many times of the estimated bandwidth-delay product
+WINDOW_GAIN = 2.0
+
+# The chunk size is adjusted to have about this many chunks in the window
+CHUNKS_PER_WINDOW = 16
+
+# Delivery rate samples are kept for this long, the bandwidth is the max of the samples
+RATE_SAMPLE_PERIOD = 10.0
+
+# Min RTT expires after this long, so a route change is detected
+MIN_RTT_PERIOD = 10.0
+
+# Weight of new samples in smoothed RTT
+RTT_ALPHA = 0.125
+
+
+class AdaptiveWindow:
+    """Flow-control window of a stream, sized from the measured RTT and delivery rate.
+
+    The sender calls on_send() for each chunk and on_ack() for each ACK. The RTT is measured from the send time of
+    the last chunk covered by the ACK. Like BBR, the delivery rate is measured from the last ACK before that chunk
+    was sent, so each sample spans at least a round trip, and ACKs arriving close together don't inflate it.
+
+    Like BBR, the bottleneck bandwidth is the max delivery rate in a recent period and the propagation delay is the
+    min RTT. The window is set to WINDOW_GAIN times their product, within the configured bounds. While the window
+    limits the delivery rate, each round trip doubles it until the bandwidth is reached.
+
+    Optionally, the chunk size is adjusted to the window, so fast links use fewer, larger chunks.
+
+    If adaptive is False, the window and chunk size are fixed, but RTT and rate are still measured for stats.
+    """
+
+    def __init__(
+        self,
+        window_size: int,
+        chunk_size: int,
+        adaptive: bool = False,
+        min_window_size: int = 0,
+        max_window_size: int = 0,
+        max_chunk_size: int = 0,
+    ):
+        self.window_size = window_size
+        self.chunk_size = chunk_size
+        self.adaptive = adaptive
+        self.min_window_size = min_window_size or window_size
+        self.max_window_size = max(max_window_size, self.min_window_size)
+        self.min_chunk_size = chunk_size
+        self.max_chunk_size = max(max_chunk_size, chunk_size)
+
+        self.start_time = time.time()
+        # (end offset, send time, acked offset, ack time) of chunks not acknowledged yet. The acked offset and
+        # time are from the last ACK before the chunk was sent.
+        self.sent: Deque[Tuple[int, float, int, float]] = deque()
+        self.rate_samples: Deque[Tuple[float, float]] = deque()  # (time, bytes per second)
+        self.min_rtt: Optional[float] = None
+        self.min_rtt_time = 0.0
+        self.rtt: Optional[float] = None
+        self.bandwidth: Optional[float] = None
+        self.last_ack_offset = 0
+        self.last_ack_time = self.start_time
+        self.lock = threading.Lock()
+
+    def on_send(self, end_offset: int, now: Optional[float] = None):
+        with self.lock:
+            send_time = time.time() if now is None else now
+            self.sent.append((end_offset, send_time, self.last_ack_offset, self.last_ack_time))
+
+    def on_ack(self, offset: int, now: Optional[float] = None):
+        if now is None:
+            now = time.time()
+        with self.lock:
+            chunk = None
+            while self.sent and self.sent[0][0] <= offset:
+                chunk = self.sent.popleft()
+
+            if chunk:
+                _, send_time, acked_offset, ack_time = chunk
+                self._add_rtt_sample(now - send_time, now)
+                if offset > acked_offset and now > ack_time:
+                    self._add_rate_sample((offset - acked_offset) / (now - ack_time), now)
+
+            if offset > self.last_ack_offset:
+                self.last_ack_offset = offset
+                self.last_ack_time = now
+
+            if self.adaptive:
+                self._update_window()
+
+    def on_resume(self, offset: int):
+        """Forget the chunks sent after the offset, they are lost and sent again"""
+        with self.lock:
+            while self.sent and self.sent[-1][0] > offset:
+                self.sent.pop()
+
+    def _add_rtt_sample(self, rtt: float, now: float):
+        if self.min_rtt is None or rtt <= self.min_rtt or now - self.min_rtt_time > MIN_RTT_PERIOD:
+            self.min_rtt = rtt
+            self.min_rtt_time = now
+
+        if self.rtt is None:
+            self.rtt = rtt
+        else:
+            self.rtt += RTT_ALPHA * (rtt - self.rtt)
+
+    def _add_rate_sample(self, rate: float, now: float):
+        self.rate_samples.append((now, rate))
+        while self.rate_samples and now - self.rate_samples[0][0] > RATE_SAMPLE_PERIOD:
+            self.rate_samples.popleft()
+        self.bandwidth = max(r for _, r in self.rate_samples)
+
+    def _update_window(self):
+        if not self.bandwidth or not self.min_rtt:
+            return
+
+        target = int(WINDOW_GAIN * self.bandwidth * self.min_rtt)
+        self.window_size = min(max(target, self.min_window_size), self.max_window_size)
+
+        if self.max_chunk_size > self.min_chunk_size:
+            # Power of 2 multiples of the min chunk size, so the size doesn't change on every ACK
+            chunk_size = self.min_chunk_size
+            while chunk_size * 2 <= self.window_size // CHUNKS_PER_WINDOW and chunk_size * 2 <= self.max_chunk_size:
+                chunk_size *= 2
+            self.chunk_size = chunk_size
+
+    def get_throughput(self, size: int, now: Optional[float] = None) -> float:
+        """Returns the average throughput of the stream in bytes per second"""
+        duration = (time.time() if now is None else now) - self.start_time
+        return size / duration if duration > 0 else 0.0
@@ -22,7 +22,7 @@ from nvflare.fuel.f3.streaming.byte_receiver import ByteReceiver
 from nvflare.fuel.f3.streaming.byte_streamer import STREAM_CHUNK_SIZE, STREAM_TYPE_BLOB, ByteStreamer
 from nvflare.fuel.f3.streaming.stream_const import EOS
 from nvflare.fuel.f3.streaming.stream_types import Stream, StreamError, StreamFuture
-from nvflare.fuel.f3.streaming.stream_utils import FastBuffer, stream_thread_pool, wrap_view
+from nvflare.fuel.f3.streaming.stream_utils import stream_thread_pool, wrap_view
 from nvflare.fuel.utils.buffer_list import BufferList
 from nvflare.security.logging import secure_format_traceback
 
@@ -59,6 +59,9 @@ class BlobStream(Stream):
 
         return buf
 
+    def is_seekable(self) -> bool:
+        return True
+
     @staticmethod
     def buffer_len(buffer: BytesAlike):
         if not isinstance(buffer, list):
@@ -77,7 +80,8 @@ class BlobTask:
         if self.pre_allocated:
             self.buffer = wrap_view(bytearray(self.size))
         else:
-            self.buffer = FastBuffer()
+            # Size is unknown, chunks are kept and joined at the end, so each chunk is only copied once
+            self.buffer = []
 
     def __str__(self):
         return f"Blob[SID:{self.future.get_stream_id()} Size：{self.size}]"
@@ -142,7 +146,7 @@ class BlobHandler:
             if blob_task.pre_allocated:
                 result = blob_task.buffer
             else:
-                result = blob_task.buffer.to_bytes()
+                result = bytearray().join(blob_task.buffer)
 
             blob_task.future.set_result(result)
         except Exception as ex:
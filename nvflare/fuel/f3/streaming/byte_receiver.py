@@ -17,8 +17,9 @@ from collections import deque
 from typing import Callable, Deque, Dict, Optional, Tuple
 
 from nvflare.fuel.f3.cellnet.core_cell import CoreCell
-from nvflare.fuel.f3.cellnet.defs import MessageHeaderKey
+from nvflare.fuel.f3.cellnet.defs import MessageHeaderKey, ReturnCode
 from nvflare.fuel.f3.cellnet.registry import Callback, Registry
+from nvflare.fuel.f3.cellnet.utils import make_reply
 from nvflare.fuel.f3.comm_config import CommConfigurator
 from nvflare.fuel.f3.connection import BytesAlike
 from nvflare.fuel.f3.message import Message
@@ -28,15 +29,18 @@ from nvflare.fuel.f3.streaming.stream_const import (
     STREAM_ACK_TOPIC,
     STREAM_CHANNEL,
     STREAM_DATA_TOPIC,
+    STREAM_RESUME_TOPIC,
     StreamDataType,
     StreamHeaderKey,
 )
 from nvflare.fuel.f3.streaming.stream_types import Stream, StreamError, StreamFuture
-from nvflare.fuel.f3.streaming.stream_utils import ONE_MB, stream_stats_category, stream_thread_pool
+from nvflare.fuel.f3.streaming.stream_utils import ONE_MB, stream_stats_category, stream_thread_pool, wrap_view
 
 log = logging.getLogger(__name__)
 
 MAX_OUT_SEQ_CHUNKS = 16
+# Upper limit of out-of-seq chunks allowed by the window of the sender
+MAX_WINDOW_OUT_SEQ_CHUNKS = 1024
 # 1/4 of the window size
 ACK_INTERVAL = 1024 * 1024 * 4
 READ_TIMEOUT = 300
@@ -49,7 +53,11 @@ RESULT_EOS = 2
 
 
 class RxTask:
-    """Receiving task for ByteStream"""
+    """Receiving task for ByteStream
+
+    The tasks are keyed by the origin and stream ID. While the reader is waiting, the task is kept so the sender
+    can resume the stream after reconnecting, the grace period is the read timeout.
+    """
 
     rx_task_map = {}
     map_lock = threading.Lock()
@@ -72,6 +80,8 @@ class RxTask:
         self.out_seq_chunks: Dict[int, Tuple[bool, BytesAlike]] = {}
         self.stream_future = None
         self.next_seq = 0
+        self.received_offset = 0  # Bytes received in sequence
+        self.generation = 0
         self.offset = 0
         self.offset_ack = 0
         self.waiter = threading.Event()
@@ -94,21 +104,46 @@ class RxTask:
         error = message.get_header(StreamHeaderKey.ERROR_MSG, None)
 
         with cls.map_lock:
-            task = cls.rx_task_map.get(sid, None)
+            task = cls.rx_task_map.get((origin, sid), None)
             if not task:
                 if error:
                     log.warning(f"Received error for non-existing stream: SID {sid} from {origin}")
                     return None
 
                 task = RxTask(sid, origin, cell)
-                cls.rx_task_map[sid] = task
-            else:
-                if error:
-                    task.stop(StreamError(f"{task} Received error from {origin}: {error}"), notify=False)
-                    return None
+                cls.rx_task_map[(origin, sid)] = task
+                return task
+
+        if error:
+            # Stopping the task removes it from the map so it can't be done while holding the lock
+            task.stop(StreamError(f"{task} Received error from {origin}: {error}"), notify=False)
+            return None
 
         return task
 
+    @classmethod
+    def find_task(cls, origin: str, sid: int) -> Optional["RxTask"]:
+        with cls.map_lock:
+            return cls.rx_task_map.get((origin, sid), None)
+
+    def resume(self, generation: int) -> Tuple[int, int]:
+        """Prepare for the chunks sent again by the resumed sender
+
+        Args:
+            generation: generation of the resumed stream, chunks of older generations are dropped
+
+        Returns: the offset and sequence number to resume from
+        """
+        with self.lock:
+            if generation > self.generation:
+                self.generation = generation
+                # Out-of-seq chunks are after the resume point so they are sent again
+                self.out_seq_chunks.clear()
+                self.last_chunk_received = False
+
+            log.info(f"{self} is resumed from offset {self.received_offset} seq {self.next_seq}")
+            return self.received_offset, self.next_seq
+
     def read(self, size: int) -> BytesAlike:
 
         count = 0
@@ -136,6 +171,11 @@ class RxTask:
         new_stream = False
         with self.lock:
             seq = message.get_header(StreamHeaderKey.SEQUENCE)
+            generation = message.get_header(StreamHeaderKey.GENERATION, 0)
+            if generation < self.generation:
+                log.debug(f"{self} Chunk {seq=} of old generation {generation} ignored")
+                return new_stream
+
             if seq == 0:
                 if self.stream_future:
                     log.warning(f"{self} Received duplicate chunk 0, ignored")
@@ -168,8 +208,16 @@ class RxTask:
             log.warning(f"{self} Duplicate chunk ignored {seq=}")
             return
 
+        # Chunks striped over multiple connections can be out of seq by the number of chunks in the window
+        window_chunks = message.get_header(StreamHeaderKey.WINDOW_CHUNKS)
+        if isinstance(window_chunks, int) and window_chunks > self.max_out_seq:
+            self.max_out_seq = min(window_chunks, MAX_WINDOW_OUT_SEQ_CHUNKS)
+
+        # Chunks are kept as views, so partial reads don't copy them
+        payload = wrap_view(message.payload) if message.payload is not None else None
+
         if seq == self.next_seq:
-            self._append((last_chunk, message.payload))
+            self._append((last_chunk, payload))
 
             # Try to reassemble out-of-seq chunks
             while self.next_seq in self.out_seq_chunks:
@@ -182,7 +230,7 @@ class RxTask:
                 return
             else:
                 if seq not in self.out_seq_chunks:
-                    self.out_seq_chunks[seq] = last_chunk, message.payload
+                    self.out_seq_chunks[seq] = last_chunk, payload
                 else:
                     log.warning(f"{self} Duplicate out-of-seq chunk ignored {seq=}")
 
@@ -195,7 +243,7 @@ class RxTask:
     def stop(self, error: StreamError = None, notify=True):
 
         with RxTask.map_lock:
-            RxTask.rx_task_map.pop(self.sid, None)
+            RxTask.rx_task_map.pop((self.origin, self.sid), None)
 
         if not error:
             return
@@ -283,6 +331,9 @@ class RxTask:
 
         self.chunks.append(buf)
         self.next_seq += 1
+        _, payload = buf
+        if payload is not None:
+            self.received_offset += len(payload)
 
         # Wake up blocking read()
         if not self.waiter.is_set():
@@ -323,6 +374,7 @@ class ByteReceiver:
     def __init__(self, cell: CoreCell):
         self.cell = cell
         self.cell.register_request_cb(channel=STREAM_CHANNEL, topic=STREAM_DATA_TOPIC, cb=self._data_handler)
+        self.cell.register_request_cb(channel=STREAM_CHANNEL, topic=STREAM_RESUME_TOPIC, cb=self._resume_handler)
         self.registry = Registry()
 
     def register_callback(self, channel: str, topic: str, stream_cb: Callable, *args, **kwargs):
@@ -358,6 +410,30 @@ class ByteReceiver:
 
             stream_thread_pool.submit(self._callback_wrapper, task, callback)
 
+    @staticmethod
+    def _resume_handler(message: Message) -> Message:
+
+        sid = message.get_header(StreamHeaderKey.STREAM_ID)
+        origin = message.get_header(MessageHeaderKey.ORIGIN)
+        generation = message.get_header(StreamHeaderKey.GENERATION, 0)
+
+        task = RxTask.find_task(origin, sid)
+        if not task:
+            log.warning(f"Resume request for non-existing stream: SID {sid} from {origin}")
+            return make_reply(ReturnCode.INVALID_REQUEST, f"Stream {sid} doesn't exist or is finished")
+
+        offset, seq = task.resume(generation)
+        reply = make_reply(ReturnCode.OK)
+        reply.add_headers(
+            {
+                StreamHeaderKey.STREAM_ID: sid,
+                StreamHeaderKey.DATA_TYPE: StreamDataType.RESUME_ACK,
+                StreamHeaderKey.OFFSET: offset,
+                StreamHeaderKey.SEQUENCE: seq,
+            }
+        )
+        return reply
+
     @staticmethod
     def _callback_wrapper(task: RxTask, callback: Callback):
         """A wrapper to catch all exceptions in the callback"""
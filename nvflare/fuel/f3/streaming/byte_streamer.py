@@ -13,17 +13,21 @@
 # limitations under the License.
 import logging
 import threading
+import time
 from typing import Callable, Optional
 
 from nvflare.fuel.f3.cellnet.core_cell import CoreCell
-from nvflare.fuel.f3.cellnet.defs import MessageHeaderKey
+from nvflare.fuel.f3.cellnet.defs import MessageHeaderKey, ReturnCode
 from nvflare.fuel.f3.comm_config import CommConfigurator
 from nvflare.fuel.f3.message import Message
+from nvflare.fuel.f3.sfm.constants import HeaderKeys
 from nvflare.fuel.f3.stats_pool import StatsPoolManager
+from nvflare.fuel.f3.streaming.adaptive_window import AdaptiveWindow
 from nvflare.fuel.f3.streaming.stream_const import (
     STREAM_ACK_TOPIC,
     STREAM_CHANNEL,
     STREAM_DATA_TOPIC,
+    STREAM_RESUME_TOPIC,
     StreamDataType,
     StreamHeaderKey,
 )
@@ -39,6 +43,19 @@ from nvflare.fuel.f3.streaming.stream_utils import (
 STREAM_CHUNK_SIZE = 1024 * 1024
 STREAM_WINDOW_SIZE = 16 * STREAM_CHUNK_SIZE
 STREAM_ACK_WAIT = 300
+STREAM_MAX_WINDOW_SIZE = 256 * STREAM_CHUNK_SIZE
+STREAM_RESUME_TIMEOUT = 60.0
+
+# Resume requests are retried with exponential backoff till the connection is re-established
+RESUME_RETRY_INTERVAL = 1.0
+RESUME_MAX_RETRY_INTERVAL = 10.0
+RESUME_REQUEST_TIMEOUT = 10.0
+RESUME_RETRY_CODES = (
+    ReturnCode.TIMEOUT,
+    ReturnCode.TARGET_UNREACHABLE,
+    ReturnCode.COMM_ERROR,
+    ReturnCode.SERVICE_UNAVAILABLE,
+)
 
 STREAM_TYPE_BYTE = "byte"
 STREAM_TYPE_BLOB = "blob"
@@ -49,7 +66,25 @@ COUNTER_NAME_SENT = "sent"
 log = logging.getLogger(__name__)
 
 
+class StreamInterrupted(StreamError):
+    """Sending is interrupted, the stream may be resumed"""
+
+    def __init__(self, msg: str, ack_timeout: bool = False):
+        super().__init__(msg)
+        self.ack_timeout = ack_timeout
+
+
 class TxTask(StreamTaskSpec):
+
+    rtt_pool = StatsPoolManager.add_time_hist_pool("Stream_RTT", "Smoothed RTT of sent streams measured by ACKs")
+
+    throughput_pool = StatsPoolManager.add_hist_pool(
+        "Stream_Throughput",
+        "Throughput of sent streams (MB/s)",
+        marks=(1, 5, 10, 20, 50, 100, 200, 500, 1000, 2000),
+        unit="MB/s",
+    )
+
     def __init__(
         self,
         cell: CoreCell,
@@ -61,6 +96,7 @@ class TxTask(StreamTaskSpec):
         stream: Stream,
         secure: bool,
         optional: bool,
+        stream_type: str = STREAM_TYPE_BYTE,
     ):
         self.cell = cell
         self.chunk_size = chunk_size
@@ -82,25 +118,48 @@ class TxTask(StreamTaskSpec):
         self.offset_ack = 0
         self.secure = secure
         self.optional = optional
+        self.stream_type = stream_type
         self.stopped = False
+        # Incremented on each resume, so the receiver can drop chunks sent before it
+        self.generation = 0
 
         self.stream_future = StreamFuture(self.sid, task_handle=self)
         self.stream_future.set_size(stream.get_size())
 
-        self.window_size = CommConfigurator().get_streaming_window_size(STREAM_WINDOW_SIZE)
-        self.ack_wait = CommConfigurator().get_streaming_ack_wait(STREAM_ACK_WAIT)
+        config = CommConfigurator()
+        self.window_size = config.get_streaming_window_size(STREAM_WINDOW_SIZE)
+        self.ack_wait = config.get_streaming_ack_wait(STREAM_ACK_WAIT)
+        self.resume_timeout = config.get_streaming_resume_timeout(STREAM_RESUME_TIMEOUT)
+        self.window = AdaptiveWindow(
+            self.window_size,
+            chunk_size,
+            adaptive=config.use_streaming_adaptive_window(False),
+            min_window_size=config.get_streaming_min_window_size(self.window_size),
+            max_window_size=config.get_streaming_max_window_size(STREAM_MAX_WINDOW_SIZE),
+            max_chunk_size=config.get_streaming_max_chunk_size(chunk_size),
+        )
 
     def __str__(self):
         return f"Tx[SID:{self.sid} to {self.target} for {self.channel}/{self.topic}]"
 
     def send_loop(self):
-        """Read/send loop to transmit the whole stream with flow control"""
+        """Read/send loop to transmit the whole stream with flow control. The stream is resumed if interrupted"""
+
+        while not self.stopped:
+            try:
+                self._send_chunks()
+            except StreamInterrupted as ex:
+                if not self._resume(ex):
+                    return
+
+    def _send_chunks(self):
 
         while not self.stopped:
             buf = self.stream.read(self.chunk_size)
             if not buf:
                 # End of Stream
                 self.send_pending_buffer(final=True)
+                self._record_stats()
                 self.stop()
                 return
 
@@ -112,8 +171,7 @@ class TxTask(StreamTaskSpec):
                 self.ack_waiter.clear()
 
                 if not self.ack_waiter.wait(timeout=self.ack_wait):
-                    self.stop(StreamError(f"{self} ACK timeouts after {self.ack_wait} seconds"))
-                    return
+                    raise StreamInterrupted(f"{self} ACK timeouts after {self.ack_wait} seconds", ack_timeout=True)
 
                 window = self.offset - self.offset_ack
 
@@ -125,6 +183,7 @@ class TxTask(StreamTaskSpec):
             # For example, if the stream size is chunk size (1M), this avoids sending two chunks.
             if size + self.buffer_size > self.chunk_size:
                 self.send_pending_buffer()
+                self._update_chunk_size(size)
 
             if size == self.chunk_size:
                 self.direct_buf = buf
@@ -159,27 +218,113 @@ class TxTask(StreamTaskSpec):
                 StreamHeaderKey.SEQUENCE: self.seq,
                 StreamHeaderKey.OFFSET: self.offset,
                 StreamHeaderKey.OPTIONAL: self.optional,
+                # Chunks can arrive out of order within the window when striped over connections
+                StreamHeaderKey.WINDOW_CHUNKS: self.window_size // self.chunk_size + 1,
+                # Chunks of the stream are dispatched in order by the receiving connection manager
+                HeaderKeys.ORDER_KEY: self.sid,
             }
         )
 
+        if self.generation:
+            message.set_header(StreamHeaderKey.GENERATION, self.generation)
+
         errors = self.cell.fire_and_forget(
             STREAM_CHANNEL, STREAM_DATA_TOPIC, self.target, message, secure=self.secure, optional=self.optional
         )
         error = errors.get(self.target)
         if error:
-            msg = f"{self} Message sending error to target {self.target}: {error}"
-            self.stop(StreamError(msg))
-            return
+            raise StreamInterrupted(f"{self} Message sending error to target {self.target}: {error}")
 
         # Update state
         self.seq += 1
         self.offset += self.buffer_size
+        self.window.on_send(self.offset)
         self.buffer_size = 0
         self.direct_buf = None
 
         # Update future
         self.stream_future.set_progress(self.offset)
 
+    def _resume(self, interrupted: StreamInterrupted) -> bool:
+        """Ask the receiver for the offset it has received and continue from there.
+
+        The request is retried till the connection is back or the resume timeout expires.
+
+        Returns: True if the stream is resumed, False if the task is stopped
+        """
+        if self.stopped:
+            return False
+
+        reason = str(interrupted)
+        if not self.resume_timeout or not self.stream.is_seekable():
+            self.stop(StreamError(reason))
+            return False
+
+        log.info(f"{self} is interrupted, trying to resume: {reason}")
+        self.generation += 1
+        deadline = time.time() + self.resume_timeout
+        interval = RESUME_RETRY_INTERVAL
+        while True:
+            request = Message(None, None)
+            request.add_headers(
+                {
+                    StreamHeaderKey.STREAM_ID: self.sid,
+                    StreamHeaderKey.DATA_TYPE: StreamDataType.RESUME,
+                    StreamHeaderKey.OFFSET: self.offset,
+                    StreamHeaderKey.GENERATION: self.generation,
+                }
+            )
+            reply = self.cell.send_request(
+                STREAM_CHANNEL,
+                STREAM_RESUME_TOPIC,
+                self.target,
+                request,
+                timeout=RESUME_REQUEST_TIMEOUT,
+                secure=self.secure,
+                optional=True,
+            )
+            rc = reply.get_header(MessageHeaderKey.RETURN_CODE, ReturnCode.OK) if reply else ReturnCode.COMM_ERROR
+            if rc == ReturnCode.OK:
+                break
+
+            if rc not in RESUME_RETRY_CODES:
+                error = reply.get_header(MessageHeaderKey.ERROR, rc)
+                self.stop(StreamError(f"{self} can't be resumed: {error}"))
+                return False
+
+            if self.stopped:
+                return False
+
+            if time.time() + interval > deadline:
+                self.stop(StreamError(f"{self} can't be resumed after {self.resume_timeout} seconds: {reason}"))
+                return False
+
+            log.debug(f"{self} resume request failed with {rc}, retry in {interval} seconds")
+            time.sleep(interval)
+            interval = min(interval * 2, RESUME_MAX_RETRY_INTERVAL)
+
+        offset = reply.get_header(StreamHeaderKey.OFFSET)
+        seq = reply.get_header(StreamHeaderKey.SEQUENCE)
+        if interrupted.ack_timeout and offset >= self.offset:
+            # Nothing is lost, the receiver is not reading the stream
+            self.stop(StreamError(reason))
+            return False
+
+        try:
+            self.stream.seek(offset)
+        except StreamError as ex:
+            self.stop(StreamError(f"{self} can't be resumed: {ex}"))
+            return False
+
+        log.info(f"{self} is resumed from offset {offset}, {self.offset - offset} bytes are sent again")
+        self.seq = seq
+        self.offset = offset
+        self.buffer_size = 0
+        self.direct_buf = None
+        self.window.on_resume(offset)
+        self.stream_future.set_progress(offset)
+        return True
+
     def stop(self, error: Optional[StreamError] = None, notify=True):
 
         if self.stopped:
@@ -232,9 +377,28 @@ class TxTask(StreamTaskSpec):
         if offset > self.offset_ack:
             self.offset_ack = offset
 
+        self.window.on_ack(offset)
+        self.window_size = self.window.window_size
+
         if not self.ack_waiter.is_set():
             self.ack_waiter.set()
 
+    def _update_chunk_size(self, min_size: int):
+        """Switch to the chunk size of the adaptive window. Must be called when the buffer is empty"""
+        chunk_size = self.window.chunk_size
+        if chunk_size == self.chunk_size or chunk_size < min_size:
+            return
+
+        log.debug(f"{self} chunk size is changed from {self.chunk_size} to {chunk_size}")
+        self.chunk_size = chunk_size
+        self.buffer = wrap_view(bytearray(chunk_size))
+
+    def _record_stats(self):
+        category = stream_stats_category(self.cell.my_info.fqcn, self.channel, self.topic, self.stream_type)
+        TxTask.throughput_pool.record_value(category, self.window.get_throughput(self.offset) / ONE_MB)
+        if self.window.rtt is not None:
+            TxTask.rtt_pool.record_value(category, self.window.rtt)
+
     def start_task_thread(self, task_handler: Callable):
         self.task_future = stream_thread_pool.submit(task_handler, self)
 
@@ -274,7 +438,9 @@ class ByteStreamer:
         secure=False,
         optional=False,
     ) -> StreamFuture:
-        tx_task = TxTask(self.cell, self.chunk_size, channel, topic, target, headers, stream, secure, optional)
+        tx_task = TxTask(
+            self.cell, self.chunk_size, channel, topic, target, headers, stream, secure, optional, stream_type
+        )
         with ByteStreamer.map_lock:
             ByteStreamer.tx_task_map[tx_task.sid] = tx_task
 
@@ -17,6 +17,7 @@ STREAM_CHANNEL = STREAM_PREFIX + "STREAM"
 STREAM_DATA_TOPIC = STREAM_PREFIX + "DATA"
 STREAM_ACK_TOPIC = STREAM_PREFIX + "ACK"
 STREAM_CERT_TOPIC = STREAM_PREFIX + "CERT"
+STREAM_RESUME_TOPIC = STREAM_PREFIX + "RESUME"
 
 # End of Stream indicator
 EOS = bytes()
@@ -54,3 +55,5 @@ class StreamHeaderKey:
     STREAM_REQ_ID = STREAM_PREFIX + "ri"
     PAYLOAD_ENCODING = STREAM_PREFIX + "pe"
     OPTIONAL = STREAM_PREFIX + "op"
+    WINDOW_CHUNKS = STREAM_PREFIX + "wc"
+    GENERATION = STREAM_PREFIX + "gn"
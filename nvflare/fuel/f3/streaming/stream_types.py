@@ -11,6 +11,7 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
+import asyncio
 import logging
 import threading
 from abc import ABC, abstractmethod
@@ -74,6 +75,12 @@ class Stream(ABC):
         """Close the stream"""
         self.closed = True
 
+    def is_seekable(self) -> bool:
+        """Returns True if read() continues from the position set by seek(). Only seekable streams can be resumed
+        after a connection loss.
+        """
+        return False
+
     def seek(self, offset: int):
         """Change the stream position to the given byte offset.
         Args:
@@ -165,10 +172,51 @@ class StreamFuture:
         """Attaches a callable that will be called when the future finishes.
 
         Args:
-            done_cb: A callable that will be called with this future completes
+            done_cb: A callable that will be called with this future completes. It's called immediately if the
+                future is already done
         """
         with self.lock:
-            self.done_callbacks.append((done_cb, args, kwargs))
+            if not self.waiter.is_set():
+                self.done_callbacks.append((done_cb, args, kwargs))
+                return
+
+        done_cb(*args, **kwargs)
+
+    def as_aio_future(self, loop: Optional[asyncio.AbstractEventLoop] = None) -> asyncio.Future:
+        """Returns an asyncio future of the loop, which is done when this future is done.
+
+        The asyncio future has no result, use result() after it's done. This allows coroutines to wait for
+        the stream without blocking a thread.
+
+        Args:
+            loop: the event loop, the running loop if not specified
+        """
+        if loop is None:
+            loop = asyncio.get_running_loop()
+        aio_future = loop.create_future()
+
+        def set_done():
+            if not aio_future.done():
+                aio_future.set_result(None)
+
+        def on_done():
+            try:
+                loop.call_soon_threadsafe(set_done)
+            except RuntimeError:
+                # The loop is closed, nobody is waiting
+                pass
+
+        self.add_done_callback(on_done)
+        return aio_future
+
+    async def async_result(self, timeout=None) -> Any:
+        """Same as result() but waits in the event loop"""
+        try:
+            await asyncio.wait_for(self.as_aio_future(), timeout)
+        except asyncio.TimeoutError:
+            raise TimeoutError(f"Future timed out waiting result after {timeout} seconds")
+
+        return self.result(0)
 
     def result(self, timeout=None) -> Any:
         """Return the result of the call that the future represents.
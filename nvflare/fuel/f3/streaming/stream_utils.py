@@ -19,6 +19,7 @@ from concurrent.futures import ThreadPoolExecutor
 
 from nvflare.fuel.f3.connection import BytesAlike
 from nvflare.fuel.f3.mpm import MainProcessMonitor
+from nvflare.fuel.f3.stats_pool import StatsPoolManager
 
 STREAM_THREAD_POOL_SIZE = 128
 ONE_MB = 1024 * 1024
@@ -31,11 +32,22 @@ log = logging.getLogger(__name__)
 
 
 class CheckedExecutor(ThreadPoolExecutor):
-    """This executor ignores task after shutting down"""
+    """This executor ignores task after shutting down.
+
+    The number of queued and running tasks are reported to the gauge pool "stream_thread_pool".
+    """
+
+    queue_stats = StatsPoolManager.add_gauge_pool(
+        "stream_thread_pool", "Tasks queued and running in streaming thread pools", ["queued", "running"]
+    )
 
     def __init__(self, max_workers=None, thread_name_prefix=""):
         super().__init__(max_workers, thread_name_prefix)
         self.stopped = False
+        self.name = thread_name_prefix
+        self.queued = 0
+        self.running = 0
+        self.count_lock = threading.Lock()
 
     def shutdown(self, wait=True):
         self.stopped = True
@@ -45,7 +57,22 @@ class CheckedExecutor(ThreadPoolExecutor):
         if self.stopped:
             log.debug(f"Call {fn} is ignored after streaming shutting down")
         else:
-            super().submit(fn, *args, **kwargs)
+            self._update_counts(1, 0)
+            super().submit(self._run, fn, *args, **kwargs)
+
+    def _run(self, fn, *args, **kwargs):
+        self._update_counts(-1, 1)
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            self._update_counts(0, -1)
+
+    def _update_counts(self, queued_delta: int, running_delta: int):
+        with self.count_lock:
+            self.queued += queued_delta
+            self.running += running_delta
+            CheckedExecutor.queue_stats.set(self.name, "queued", self.queued)
+            CheckedExecutor.queue_stats.set(self.name, "running", self.running)
 
 
 stream_thread_pool = CheckedExecutor(STREAM_THREAD_POOL_SIZE, "stm")
@@ -11,6 +11,8 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
+from nvflare.fuel.utils.fobs.compression import Codec, CompressionPolicy, get_codec_names, register_codec
+from nvflare.fuel.utils.fobs.datum import DatumCache
 from nvflare.fuel.utils.fobs.decomposer import Decomposer
 from nvflare.fuel.utils.fobs.fobs import (
     auto_register_enum_types,
@@ -25,6 +27,7 @@ from nvflare.fuel.utils.fobs.fobs import (
     serialize,
     serialize_stream,
 )
+from nvflare.fuel.utils.fobs.lazy import LazyObject, is_lazy, is_resolved, resolve
 from nvflare.fuel.utils.fobs.lobs import (
     dump_to_bytes,
     dump_to_file,
@@ -35,3 +35,13 @@ class BufListStream:
         self.pos = end
 
         return result
+
+    def readinto(self, buf) -> int:
+        view = memoryview(buf).cast("B")
+        end = min(self.pos + len(view), self.size)
+        size = end - self.pos
+        if size > 0:
+            view[:size] = self.buffer_list.read(self.pos, end)
+        self.pos = end
+
+        return max(size, 0)
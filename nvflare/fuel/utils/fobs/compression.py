@@ -0,0 +1,266 @@
+# Copyright (c) 2025, NVIDIA CORPORATION.  All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Compression codecs for lobs datum sections.
+
+Codecs work on streams of chunks so neither side needs a second full-size buffer. zlib is always available.
+lz4 and zstd are registered if the lz4 and zstandard packages are installed.
+"""
+import zlib
+from abc import ABC, abstractmethod
+from typing import Dict, Iterable, List, Optional, Union
+
+from nvflare.fuel.utils.import_utils import optional_import
+
+CHUNK_SIZE = 1024 * 1024  # 1MB
+
+CODEC_ZLIB = "zlib"
+CODEC_LZ4 = "lz4"
+CODEC_ZSTD = "zstd"
+
+DEFAULT_MIN_SIZE = 1024 * 1024
+DEFAULT_MAX_RATIO = 0.9
+DEFAULT_SAMPLE_SIZE = 64 * 1024
+
+
+class Codec(ABC):
+    """Base class of compression codecs.
+
+    Each codec has a unique name and a unique ID, which is written in the compressed section so the receiver can
+    find the codec to decompress it.
+    """
+
+    @abstractmethod
+    def get_name(self) -> str:
+        pass
+
+    @abstractmethod
+    def get_id(self) -> int:
+        """Returns the ID of the codec, which must be in the range of 1-255"""
+        pass
+
+    @abstractmethod
+    def compress(self, data: memoryview, out: List[bytes]):
+        """Compress the data and append the compressed chunks to the output list.
+
+        Args:
+            data: the data to be compressed
+            out: the list to append compressed chunks to
+
+        Returns: None
+
+        """
+        pass
+
+    @abstractmethod
+    def decompress(self, chunks: Iterable, writer):
+        """Decompress a stream of compressed chunks.
+
+        Decompressed data is written to the writer in pieces of at most CHUNK_SIZE bytes.
+
+        Args:
+            chunks: the compressed chunks
+            writer: an object with a write() method to receive the decompressed data
+
+        Returns: None
+
+        """
+        pass
+
+
+class ZlibCodec(Codec):
+    def __init__(self, level: int = 1):
+        self.level = level
+
+    def get_name(self) -> str:
+        return CODEC_ZLIB
+
+    def get_id(self) -> int:
+        return 1
+
+    def compress(self, data: memoryview, out: List[bytes]):
+        compressor = zlib.compressobj(self.level)
+        for i in range(0, len(data), CHUNK_SIZE):
+            compressed = compressor.compress(data[i : i + CHUNK_SIZE])
+            if compressed:
+                out.append(compressed)
+        out.append(compressor.flush())
+
+    def decompress(self, chunks: Iterable, writer):
+        decompressor = zlib.decompressobj()
+        for chunk in chunks:
+            data = chunk
+            while data:
+                writer.write(decompressor.decompress(data, CHUNK_SIZE))
+                data = decompressor.unconsumed_tail
+        writer.write(decompressor.flush())
+
+
+class Lz4Codec(Codec):
+    def __init__(self, lz4_frame):
+        self.lz4_frame = lz4_frame
+
+    def get_name(self) -> str:
+        return CODEC_LZ4
+
+    def get_id(self) -> int:
+        return 2
+
+    def compress(self, data: memoryview, out: List[bytes]):
+        compressor = self.lz4_frame.LZ4FrameCompressor()
+        out.append(compressor.begin(len(data)))
+        for i in range(0, len(data), CHUNK_SIZE):
+            compressed = compressor.compress(data[i : i + CHUNK_SIZE])
+            if compressed:
+                out.append(compressed)
+        out.append(compressor.flush())
+
+    def decompress(self, chunks: Iterable, writer):
+        decompressor = self.lz4_frame.LZ4FrameDecompressor()
+        for chunk in chunks:
+            writer.write(decompressor.decompress(chunk, CHUNK_SIZE))
+            while not decompressor.needs_input:
+                writer.write(decompressor.decompress(b"", CHUNK_SIZE))
+
+
+class ZstdCodec(Codec):
+    def __init__(self, zstandard, level: int = 3):
+        self.zstandard = zstandard
+        self.level = level
+
+    def get_name(self) -> str:
+        return CODEC_ZSTD
+
+    def get_id(self) -> int:
+        return 3
+
+    def compress(self, data: memoryview, out: List[bytes]):
+        compressor = self.zstandard.ZstdCompressor(level=self.level).compressobj(size=len(data))
+        for i in range(0, len(data), CHUNK_SIZE):
+            compressed = compressor.compress(data[i : i + CHUNK_SIZE])
+            if compressed:
+                out.append(compressed)
+        out.append(compressor.flush())
+
+    def decompress(self, chunks: Iterable, writer):
+        decompressor = self.zstandard.ZstdDecompressor()
+        with decompressor.stream_writer(writer, write_size=CHUNK_SIZE, closefd=False) as stream:
+            for chunk in chunks:
+                stream.write(chunk)
+
+
+_codecs_by_name: Dict[str, Codec] = {}
+_codecs_by_id: Dict[int, Codec] = {}
+
+
+def register_codec(codec: Codec):
+    """Register a compression codec. A codec with the same name or ID is replaced.
+
+    Args:
+        codec: the codec to be registered
+
+    Returns: None
+
+    """
+    if not isinstance(codec, Codec):
+        raise TypeError(f"codec must be Codec but got {type(codec)}")
+
+    codec_id = codec.get_id()
+    if not isinstance(codec_id, int) or not 0 < codec_id < 256:
+        raise ValueError(f"codec ID must be an int in range 1-255 but got {codec_id}")
+
+    _codecs_by_name[codec.get_name()] = codec
+    _codecs_by_id[codec_id] = codec
+
+
+def get_codec(name_or_id: Union[str, int]) -> Optional[Codec]:
+    """Get a registered codec by name or ID
+
+    Args:
+        name_or_id: name or ID of the codec
+
+    Returns: the codec or None if the codec is not registered
+
+    """
+    if isinstance(name_or_id, int):
+        return _codecs_by_id.get(name_or_id)
+    return _codecs_by_name.get(name_or_id)
+
+
+def get_codec_names() -> List[str]:
+    return list(_codecs_by_name.keys())
+
+
+class CompressionPolicy:
+    """The policy of compressing datum sections of a message."""
+
+    def __init__(
+        self,
+        codec: str = CODEC_ZLIB,
+        min_size: int = DEFAULT_MIN_SIZE,
+        max_ratio: float = DEFAULT_MAX_RATIO,
+        sample_size: int = DEFAULT_SAMPLE_SIZE,
+    ):
+        """Constructor of CompressionPolicy
+
+        Args:
+            codec: name of the codec
+            min_size: datums smaller than this are not compressed
+            max_ratio: compressed data is only used if compressed size / original size is not above this ratio
+            sample_size: a sample of this size is compressed first, and the datum is not compressed if the sample
+                doesn't compress well enough. 0 disables sampling.
+        """
+        self.codec = get_codec(codec)
+        if not self.codec:
+            raise ValueError(f"unknown codec {codec}, available codecs: {get_codec_names()}")
+
+        self.min_size = min_size
+        self.max_ratio = max_ratio
+        self.sample_size = sample_size
+
+    def compress(self, data: Union[bytes, bytearray, memoryview]) -> Optional[List[bytes]]:
+        """Compress the data if it pays off.
+
+        Args:
+            data: the data to be compressed
+
+        Returns: a list of compressed chunks or None if the data should be sent uncompressed.
+
+        """
+        size = len(data)
+        if size < self.min_size:
+            return None
+
+        view = memoryview(data).cast("B")
+        if self.sample_size and size > self.sample_size:
+            sample = []
+            self.codec.compress(view[: self.sample_size], sample)
+            if sum(len(c) for c in sample) > self.sample_size * self.max_ratio:
+                return None
+
+        result = []
+        self.codec.compress(view, result)
+        if sum(len(c) for c in result) > size * self.max_ratio:
+            return None
+        return result
+
+
+register_codec(ZlibCodec())
+
+_lz4_frame, _lz4_ok = optional_import(module="lz4.frame")
+if _lz4_ok:
+    register_codec(Lz4Codec(_lz4_frame))
+
+_zstandard, _zstd_ok = optional_import(module="zstandard")
+if _zstd_ok:
+    register_codec(ZstdCodec(_zstandard))
@@ -11,12 +11,22 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
+import hashlib
+import threading
 import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from enum import Enum
-from typing import Any, Dict, Union
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple, Union
+
+from nvflare.fuel.utils.import_utils import optional_import
 
 TEN_MEGA = 10 * 1024 * 1024
 MIN_THRESHOLD = 1024
+DEFAULT_CACHE_SIZE = 1024 * 1024 * 1024  # 1GB
+HASH_READ_SIZE = 1024 * 1024
+
+xxhash, xxhash_ok = optional_import(module="xxhash")
 
 
 class DatumType(Enum):
@@ -39,8 +49,7 @@ class Datum:
         self.datum_id = str(uuid.uuid4())
         self.datum_type = datum_type
         self.value = value
-        self.restore_func = None  # func to restore original object.
-        self.restore_func_data = None  # arg to the restore func
+        self.restore_funcs = []  # list of (func, func_data) to restore original objects.
 
     def set_restore_func(self, func, func_data):
         """Set the restore function and func data.
@@ -53,11 +62,39 @@ class Datum:
 
          Returns: None
 
+        """
+        self.restore_funcs = []
+        self.add_restore_func(func, func_data)
+
+    def add_restore_func(self, func, func_data):
+        """Add a restore function and func data.
+        A datum may have multiple restore funcs when it's referenced at multiple positions (e.g. when identical
+        values are deduplicated by content).
+
+         Args:
+             func: the restore function
+             func_data: arg passed to the restore func when called
+
+         Returns: None
+
         """
         if not callable(func):
             raise ValueError(f"func must be callable but got {type(func)}")
-        self.restore_func = func
-        self.restore_func_data = func_data
+        self.restore_funcs.append((func, func_data))
+
+    def restore(self, manager):
+        """Call and clear all restore functions of the datum.
+
+        Args:
+            manager: the DatumManager passed to the restore functions
+
+        Returns: None
+
+        """
+        restore_funcs = self.restore_funcs
+        self.restore_funcs = []
+        for func, func_data in restore_funcs:
+            func(manager, self, func_data)
 
     @staticmethod
     def blob_datum(blob: Union[bytes, bytearray, memoryview]):
@@ -75,6 +112,118 @@ class Datum:
         return Datum(DatumType.FILE, path)
 
 
+def compute_content_id(datum: Datum) -> str:
+    """Compute the ID of a datum from its type and content.
+
+    The 128-bit digest (xxh3 if xxhash is installed, otherwise blake2b) is formatted as a UUID string, so it can be
+    used as datum ID. The content of a FILE datum is the content of the file.
+
+    Args:
+        datum: the datum
+
+    Returns: the content-based datum ID
+
+    """
+    hasher = xxhash.xxh3_128() if xxhash_ok else hashlib.blake2b(digest_size=16)
+    hasher.update(bytes([datum.datum_type.value]))
+    if datum.datum_type == DatumType.TEXT:
+        hasher.update(datum.value.encode("utf-8"))
+    elif datum.datum_type == DatumType.BLOB:
+        hasher.update(datum.value)
+    else:
+        with open(datum.value, "rb") as f:
+            while True:
+                chunk = f.read(HASH_READ_SIZE)
+                if not chunk:
+                    break
+                hasher.update(chunk)
+    return str(uuid.UUID(bytes=hasher.digest()))
+
+
+class DatumCache:
+    """Cache of datums exchanged with one peer, used to send references instead of datums already delivered.
+
+    The sender records the IDs and sizes of datums delivered to the peer. The receiver keeps the datums it received,
+    so references can be resolved. Both sides evict the least recently used datums when the total size exceeds
+    max_size, so they stay in sync as long as messages are loaded in the order they are dumped, and the receiver's
+    max_size is not smaller than the sender's.
+    """
+
+    def __init__(self, max_size: int = DEFAULT_CACHE_SIZE):
+        """Constructor of DatumCache
+
+        Args:
+            max_size: max total size of cached datums in bytes. Larger datums are never cached.
+        """
+        if not isinstance(max_size, int):
+            raise TypeError(f"max_size must be int but got {type(max_size)}")
+
+        self.max_size = max_size
+        self.size = 0
+        self.entries = OrderedDict()  # datum_id => (size, datum)
+        self.lock = threading.Lock()
+
+    def add(self, datum_id: str, size: int, datum: Datum = None):
+        """Add a datum to the cache, and evict least recently used datums if needed.
+
+        Args:
+            datum_id: ID of the datum
+            size: size of the datum data in bytes
+            datum: the datum. Only needed on the receiver side.
+
+        Returns: None
+
+        """
+        if size > self.max_size:
+            return
+
+        with self.lock:
+            old = self.entries.pop(datum_id, None)
+            if old:
+                self.size -= old[0]
+
+            self.entries[datum_id] = (size, datum)
+            self.size += size
+            while self.size > self.max_size:
+                _, (evicted_size, _) = self.entries.popitem(last=False)
+                self.size -= evicted_size
+
+    def contains(self, datum_id: str) -> bool:
+        """Check whether the datum is cached, without changing its recency"""
+        with self.lock:
+            return datum_id in self.entries
+
+    def touch(self, datum_id: str) -> bool:
+        """Mark the datum as most recently used.
+
+        Returns: whether the datum is cached
+
+        """
+        with self.lock:
+            if datum_id not in self.entries:
+                return False
+            self.entries.move_to_end(datum_id)
+            return True
+
+    def get(self, datum_id: str) -> Optional[Datum]:
+        """Get the cached datum and mark it as most recently used.
+
+        Returns: the datum, or None if not cached or only the ID is cached
+
+        """
+        with self.lock:
+            entry = self.entries.get(datum_id)
+            if not entry:
+                return None
+            self.entries.move_to_end(datum_id)
+            return entry[1]
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.size = 0
+
+
 class DatumRef:
     """A reference to externalized datum. If unwrap is true, the reference will be removed and replaced with the
     content of the datum"""
@@ -85,7 +234,17 @@ class DatumRef:
 
 
 class DatumManager:
-    def __init__(self, threshold=None):
+    def __init__(self, threshold=None, lazy=False, num_workers=None, content_addressed=False):
+        """Constructor of DatumManager
+
+        Args:
+            threshold: min size of bytes/str values to be externalized as datums. Default is 10MB.
+            lazy: if true, objects whose data is in datums are recomposed on first access when deserialized.
+            num_workers: number of threads to prepare datums concurrently. If not specified, datums are prepared
+                on the calling thread.
+            content_addressed: if true, datum IDs are computed from the datum content, so identical values share
+                one datum and have the same ID in every message.
+        """
         if not threshold:
             threshold = TEN_MEGA
 
@@ -95,7 +254,13 @@ class DatumManager:
         if threshold < MIN_THRESHOLD:
             raise ValueError(f"threshold must be at least {MIN_THRESHOLD} but got {threshold}")
 
+        if num_workers is not None and not isinstance(num_workers, int):
+            raise TypeError(f"num_workers must be int but got {type(num_workers)}")
+
         self.threshold = threshold
+        self.lazy = lazy
+        self.num_workers = num_workers or 0
+        self.content_addressed = content_addressed
         self.datums: Dict[str, Datum] = {}
 
         # some decomposers (e.g. Shareable, Learnable, etc.) make a shallow copy of the original object before
@@ -132,6 +297,41 @@ class DatumManager:
     def get_datum(self, datum_id: str):
         return self.datums.get(datum_id)
 
+    def prepare_datums(self, prepare_func: Callable[[Datum], Any]) -> Iterator[Tuple[Datum, Any]]:
+        """Prepare all datums (e.g. encode or compress their values) for writing.
+
+        If num_workers is more than 1, datums are prepared by a thread pool. Only a limited number of datums
+        is prepared ahead of the consumer to bound the memory used by prepared data.
+
+        Args:
+            prepare_func: the function to prepare a datum. It's called with the datum and returns the prepared data.
+
+        Returns: an iterator of (datum, prepared data), in the order the datums were added.
+
+        """
+        datums = list(self.datums.values())
+        if self.num_workers <= 1 or len(datums) <= 1:
+            for d in datums:
+                yield d, prepare_func(d)
+            return
+
+        max_pending = 2 * self.num_workers
+        pending = []
+        with ThreadPoolExecutor(max_workers=self.num_workers, thread_name_prefix="datum") as executor:
+            try:
+                for d in datums:
+                    pending.append((d, executor.submit(prepare_func, d)))
+                    if len(pending) >= max_pending:
+                        d, future = pending.pop(0)
+                        yield d, future.result()
+
+                while pending:
+                    d, future = pending.pop(0)
+                    yield d, future.result()
+            finally:
+                for _, future in pending:
+                    future.cancel()
+
     def externalize(self, data: Any):
         if not isinstance(data, (bytes, bytearray, memoryview, Datum, str)):
             return data
@@ -139,7 +339,7 @@ class DatumManager:
         if isinstance(data, Datum):
             # this is an app-defined datum. we need to keep it as is when deserialized.
             # hence unwrap is set to False in the DatumRef.
-            self.datums[data.datum_id] = data
+            self._add_datum(data)
             return DatumRef(data.datum_id, False)
 
         if len(data) >= self.threshold:
@@ -148,11 +348,21 @@ class DatumManager:
                 d = Datum.text_datum(data)
             else:
                 d = Datum.blob_datum(data)
-            self.datums[d.datum_id] = d
+            d = self._add_datum(d)
             return DatumRef(d.datum_id, True)
         else:
             return data
 
+    def _add_datum(self, datum: Datum) -> Datum:
+        if self.content_addressed:
+            datum.datum_id = compute_content_id(datum)
+            existing = self.datums.get(datum.datum_id)
+            if existing:
+                return existing
+
+        self.datums[datum.datum_id] = datum
+        return datum
+
     def internalize(self, data: Any) -> Any:
         if not isinstance(data, DatumRef):
             return data
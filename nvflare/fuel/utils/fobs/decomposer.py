@@ -18,6 +18,7 @@ from typing import Any, Type, TypeVar
 
 # Generic type supported by the decomposer.
 from nvflare.fuel.utils.fobs.datum import Datum, DatumManager, DatumRef, DatumType
+from nvflare.fuel.utils.fobs.lazy import is_lazy
 
 T = TypeVar("T")
 
@@ -108,7 +109,7 @@ class Externalizer:
         if isinstance(ext_result, DatumRef):
             datum = self.manager.get_datum(ext_result.datum_id)
             if datum:
-                datum.set_restore_func(restore_position, (target, key))
+                datum.add_restore_func(restore_position, (target, key))
 
     def externalize(self, target: Any):
         """Recursively go through object tree (dict or list) and externalize leaf nodes."""
@@ -143,7 +144,8 @@ class Internalizer:
 
     def internalize(self, target) -> Any:
         """Recursively go through object tree (dict or list) and internalize leaf nodes."""
-        if not self.manager:
+        if not self.manager or is_lazy(target):
+            # lazy objects are internalized when resolved
             return target
 
         if isinstance(target, dict):
@@ -158,6 +160,18 @@ class Internalizer:
         return target
 
 
+def has_datum_ref(target: Any) -> bool:
+    """Recursively go through object tree (dict or list) and check if any leaf node is a DatumRef."""
+    if is_lazy(target):
+        return False
+    elif isinstance(target, dict):
+        return any(has_datum_ref(v) for v in target.values())
+    elif isinstance(target, list):
+        return any(has_datum_ref(v) for v in target)
+    else:
+        return isinstance(target, DatumRef)
+
+
 class DictDecomposer(Decomposer):
     """Generic decomposer for subclasses of dict like Shareable"""
 
@@ -11,6 +11,7 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
+import functools
 import importlib
 import inspect
 import logging
@@ -18,7 +19,7 @@ import os
 import sys
 from enum import Enum
 from os.path import dirname, join
-from typing import Any, BinaryIO, Dict, Type, TypeVar, Union
+from typing import Any, BinaryIO, Callable, Dict, Optional, Tuple, Type, TypeVar, Union
 
 import msgpack
 
@@ -30,7 +31,9 @@ from nvflare.fuel.utils.fobs.decomposer import (
     EnumTypeDecomposer,
     Externalizer,
     Internalizer,
+    has_datum_ref,
 )
+from nvflare.fuel.utils.fobs.lazy import LazyObject, resolve
 
 __all__ = [
     "register",
@@ -53,11 +56,17 @@ FOBS_DATA = "__fobs_data__"
 FOBS_DECOMPOSER = "__fobs_dc__"
 
 MAX_CONTENT_LEN = 128
-MSGPACK_TYPES = (type(None), bool, int, float, str, bytes, bytearray, memoryview, list, dict)
+MSGPACK_TYPES = frozenset((type(None), bool, int, float, str, bytes, bytearray, memoryview, list, dict))
 T = TypeVar("T")
 
+ENUM_DECOMPOSER_NAME = get_class_name(EnumTypeDecomposer)
+DATA_DECOMPOSER_NAME = get_class_name(DataClassDecomposer)
+
 log = logging.getLogger(__name__)
 _decomposers: Dict[str, Decomposer] = {}
+# Resolved decomposers by type: type => (type name, bound decompose method, decomposer name).
+# It must be cleared whenever the registration changes.
+_pack_cache: Dict[type, Tuple[str, Callable, str]] = {}
 _decomposers_registered = False
 # If this is enabled, FOBS will try to register generic decomposers automatically
 _enum_auto_registration = True
@@ -87,19 +96,50 @@ def register(decomposer: Union[Decomposer, Type[Decomposer]]) -> None:
         return
 
     _decomposers[name] = instance
+    _pack_cache.clear()
 
 
 class Packer:
     def __init__(self, manager: DatumManager):
         self.manager = manager
-        self.enum_decomposer_name = get_class_name(EnumTypeDecomposer)
-        self.data_decomposer_name = get_class_name(DataClassDecomposer)
+        if manager:
+            self.externalizer = Externalizer(manager)
+            self.internalizer = Internalizer(manager)
+        else:
+            self.externalizer = None
+            self.internalizer = None
 
     def pack(self, obj: Any) -> dict:
 
-        if type(obj) in MSGPACK_TYPES:
+        obj_type = type(obj)
+        if obj_type in MSGPACK_TYPES:
             return obj
 
+        if obj_type is LazyObject:
+            obj = resolve(obj)
+            obj_type = type(obj)
+            if obj_type in MSGPACK_TYPES:
+                return obj
+
+        entry = _pack_cache.get(obj_type)
+        if entry is None:
+            entry = self._resolve_decomposer(obj)
+            if entry is None:
+                return obj
+
+        type_name, decompose, decomposer_name = entry
+        decomposed = decompose(obj, self.manager)
+        if self.externalizer:
+            decomposed = self.externalizer.externalize(decomposed)
+
+        return {FOBS_TYPE: type_name, FOBS_DATA: decomposed, FOBS_DECOMPOSER: decomposer_name}
+
+    @staticmethod
+    def _resolve_decomposer(obj: Any) -> Optional[Tuple[str, Callable, str]]:
+        """Find the decomposer for the type of the object, auto-registering one if allowed, and cache it.
+
+        Returns: the cache entry or None if no decomposer is available.
+        """
         type_name = get_class_name(obj.__class__)
         if type_name not in _decomposers:
             registered = False
@@ -115,16 +155,12 @@ class Packer:
                     registered = True
 
             if not registered:
-                return obj
+                return None
 
         decomposer = _decomposers[type_name]
-
-        decomposed = decomposer.decompose(obj, self.manager)
-        if self.manager:
-            externalizer = Externalizer(self.manager)
-            decomposed = externalizer.externalize(decomposed)
-
-        return {FOBS_TYPE: type_name, FOBS_DATA: decomposed, FOBS_DECOMPOSER: get_class_name(type(decomposer))}
+        entry = (type_name, decomposer.decompose, get_class_name(type(decomposer)))
+        _pack_cache[type(obj)] = entry
+        return entry
 
     def unpack(self, obj: Any) -> Any:
 
@@ -144,7 +180,7 @@ class Packer:
                         registered = True
             else:
                 decomposer_class = load_class(decomposer_name)
-                if decomposer_name == self.enum_decomposer_name or decomposer_name == self.data_decomposer_name:
+                if decomposer_name == ENUM_DECOMPOSER_NAME or decomposer_name == DATA_DECOMPOSER_NAME:
                     # Generic decomposer's __init__ takes the target class as argument
                     decomposer = decomposer_class(cls)
                 else:
@@ -157,11 +193,18 @@ class Packer:
                 raise TypeError(f"Type {type_name} has no decomposer registered")
 
         data = obj[FOBS_DATA]
-        if self.manager:
-            internalizer = Internalizer(self.manager)
-            data = internalizer.internalize(data)
-
         decomposer = _decomposers[type_name]
+        if self.manager and self.manager.lazy and has_datum_ref(data):
+            # defer recomposing objects backed by datums till they are accessed
+            return LazyObject(functools.partial(self._recompose, decomposer, data))
+
+        return self._recompose(decomposer, data)
+
+    def _recompose(self, decomposer: Decomposer, data: Any) -> Any:
+        # nothing to internalize if there are no datums
+        if self.internalizer and self.manager.datums:
+            data = self.internalizer.internalize(data)
+
         return decomposer.recompose(data, self.manager)
 
 
@@ -200,6 +243,7 @@ def auto_register_enum_types(enabled=True) -> None:
     global _enum_auto_registration
 
     _enum_auto_registration = enabled
+    _pack_cache.clear()
 
 
 def auto_register_data_classes(enabled=True) -> None:
@@ -211,6 +255,7 @@ def auto_register_data_classes(enabled=True) -> None:
     global _data_auto_registration
 
     _data_auto_registration = enabled
+    _pack_cache.clear()
 
 
 def register_folder(folder: str, package: str):
@@ -352,4 +397,5 @@ def reset():
     """Reset FOBS to initial state. Used for unit test"""
     global _decomposers, _decomposers_registered
     _decomposers.clear()
+    _pack_cache.clear()
     _decomposers_registered = False
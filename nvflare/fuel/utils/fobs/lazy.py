@@ -0,0 +1,240 @@
+# Copyright (c) 2025, NVIDIA CORPORATION.  All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import copy
+import operator
+import threading
+from typing import Any, Callable
+
+_NOT_RESOLVED = object()
+
+
+class LazyObject:
+    """A proxy of an object that is only recomposed on first access.
+
+    FOBS returns these proxies in lazy mode for objects whose data is in datums (e.g. large arrays or tensors).
+    The proxy behaves like the object: attribute access, item access, operators, isinstance() checks and
+    numpy/torch conversions all resolve the proxy and are forwarded to the object.
+
+    Use resolve() to get the real object.
+    """
+
+    __slots__ = ("_lazy_factory", "_lazy_target", "_lazy_lock", "__weakref__")
+
+    def __init__(self, factory: Callable[[], Any]):
+        object.__setattr__(self, "_lazy_factory", factory)
+        object.__setattr__(self, "_lazy_target", _NOT_RESOLVED)
+        object.__setattr__(self, "_lazy_lock", threading.Lock())
+
+    def _lazy_resolve(self) -> Any:
+        target = object.__getattribute__(self, "_lazy_target")
+        if target is not _NOT_RESOLVED:
+            return target
+
+        with object.__getattribute__(self, "_lazy_lock"):
+            target = object.__getattribute__(self, "_lazy_target")
+            if target is _NOT_RESOLVED:
+                factory = object.__getattribute__(self, "_lazy_factory")
+                target = factory()
+                object.__setattr__(self, "_lazy_target", target)
+                # release the decomposed data
+                object.__setattr__(self, "_lazy_factory", None)
+        return target
+
+    def _lazy_is_resolved(self) -> bool:
+        return object.__getattribute__(self, "_lazy_target") is not _NOT_RESOLVED
+
+    @property
+    def __class__(self):
+        return type(self._lazy_resolve())
+
+    def __getattr__(self, name):
+        return getattr(self._lazy_resolve(), name)
+
+    def __setattr__(self, name, value):
+        setattr(self._lazy_resolve(), name, value)
+
+    def __delattr__(self, name):
+        delattr(self._lazy_resolve(), name)
+
+    def __dir__(self):
+        return dir(self._lazy_resolve())
+
+    def __repr__(self):
+        if not self._lazy_is_resolved():
+            return f"<{LazyObject.__name__} (not resolved) at 0x{id(self):x}>"
+        return repr(self._lazy_resolve())
+
+    def __str__(self):
+        return str(self._lazy_resolve())
+
+    def __bytes__(self):
+        return bytes(self._lazy_resolve())
+
+    def __format__(self, format_spec):
+        return format(self._lazy_resolve(), format_spec)
+
+    def __hash__(self):
+        return hash(self._lazy_resolve())
+
+    def __bool__(self):
+        return bool(self._lazy_resolve())
+
+    def __len__(self):
+        return len(self._lazy_resolve())
+
+    def __iter__(self):
+        return iter(self._lazy_resolve())
+
+    def __reversed__(self):
+        return reversed(self._lazy_resolve())
+
+    def __contains__(self, item):
+        return item in self._lazy_resolve()
+
+    def __getitem__(self, key):
+        return self._lazy_resolve()[key]
+
+    def __setitem__(self, key, value):
+        self._lazy_resolve()[key] = value
+
+    def __delitem__(self, key):
+        del self._lazy_resolve()[key]
+
+    def __call__(self, *args, **kwargs):
+        return self._lazy_resolve()(*args, **kwargs)
+
+    def __int__(self):
+        return int(self._lazy_resolve())
+
+    def __float__(self):
+        return float(self._lazy_resolve())
+
+    def __complex__(self):
+        return complex(self._lazy_resolve())
+
+    def __index__(self):
+        return operator.index(self._lazy_resolve())
+
+    def __neg__(self):
+        return -self._lazy_resolve()
+
+    def __pos__(self):
+        return +self._lazy_resolve()
+
+    def __abs__(self):
+        return abs(self._lazy_resolve())
+
+    def __invert__(self):
+        return ~self._lazy_resolve()
+
+    def __copy__(self):
+        return copy.copy(self._lazy_resolve())
+
+    def __deepcopy__(self, memo):
+        return copy.deepcopy(self._lazy_resolve(), memo)
+
+    def __reduce_ex__(self, protocol):
+        return self._lazy_resolve().__reduce_ex__(protocol)
+
+    def __array__(self, *args, **kwargs):
+        return self._lazy_resolve().__array__(*args, **kwargs)
+
+    @classmethod
+    def __torch_function__(cls, func, types, args=(), kwargs=None):
+        args = [resolve(a) for a in args]
+        kwargs = {k: resolve(v) for k, v in (kwargs or {}).items()}
+        return func(*args, **kwargs)
+
+
+def _make_binary_ops(op):
+    def forward(self, other):
+        return op(self._lazy_resolve(), resolve(other))
+
+    def reflected(self, other):
+        return op(resolve(other), self._lazy_resolve())
+
+    return forward, reflected
+
+
+for _name, _op in (
+    ("add", operator.add),
+    ("sub", operator.sub),
+    ("mul", operator.mul),
+    ("matmul", operator.matmul),
+    ("truediv", operator.truediv),
+    ("floordiv", operator.floordiv),
+    ("mod", operator.mod),
+    ("pow", operator.pow),
+    ("lshift", operator.lshift),
+    ("rshift", operator.rshift),
+    ("and", operator.and_),
+    ("xor", operator.xor),
+    ("or", operator.or_),
+):
+    _forward, _reflected = _make_binary_ops(_op)
+    setattr(LazyObject, f"__{_name}__", _forward)
+    setattr(LazyObject, f"__r{_name}__", _reflected)
+
+for _name, _op in (
+    ("eq", operator.eq),
+    ("ne", operator.ne),
+    ("lt", operator.lt),
+    ("le", operator.le),
+    ("gt", operator.gt),
+    ("ge", operator.ge),
+):
+    setattr(LazyObject, f"__{_name}__", _make_binary_ops(_op)[0])
+
+
+def _make_inplace_op(op):
+    def inplace(self, other):
+        # the name is rebound to the result, which is the resolved object for mutable types
+        return op(self._lazy_resolve(), resolve(other))
+
+    return inplace
+
+
+for _name, _op in (
+    ("iadd", operator.iadd),
+    ("isub", operator.isub),
+    ("imul", operator.imul),
+    ("imatmul", operator.imatmul),
+    ("itruediv", operator.itruediv),
+    ("ifloordiv", operator.ifloordiv),
+    ("imod", operator.imod),
+    ("ipow", operator.ipow),
+    ("ilshift", operator.ilshift),
+    ("irshift", operator.irshift),
+    ("iand", operator.iand),
+    ("ixor", operator.ixor),
+    ("ior", operator.ior),
+):
+    setattr(LazyObject, f"__{_name}__", _make_inplace_op(_op))
+
+
+def is_lazy(obj: Any) -> bool:
+    """Check if the object is a LazyObject proxy"""
+    return type(obj) is LazyObject
+
+
+def is_resolved(obj: Any) -> bool:
+    """Check if the object is resolved. Objects that are not proxies are always resolved"""
+    return not is_lazy(obj) or obj._lazy_is_resolved()
+
+
+def resolve(obj: Any) -> Any:
+    """Get the real object if the object is a LazyObject proxy, otherwise the object itself"""
+    if is_lazy(obj):
+        return obj._lazy_resolve()
+    return obj
@@ -12,14 +12,16 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 import io
+import mmap
 import os.path
 import struct
 import uuid
-from typing import Any, BinaryIO, Union
+from typing import Any, BinaryIO, Iterable, Optional, Union
 
 from nvflare.fuel.utils.config_service import ConfigService
 from nvflare.fuel.utils.fobs.buf_list_stream import BufListStream
-from nvflare.fuel.utils.fobs.datum import Datum, DatumManager, DatumType
+from nvflare.fuel.utils.fobs.compression import CompressionPolicy, get_codec
+from nvflare.fuel.utils.fobs.datum import Datum, DatumCache, DatumManager, DatumType
 from nvflare.fuel.utils.fobs.fobs import deserialize, serialize
 
 HEADER_STRUCT = struct.Struct(">BQ")  # marker(1), size(8)
@@ -29,6 +31,28 @@ MARKER_MAIN = 100
 MARKER_DATUM_TEXT = 101
 MARKER_DATUM_BLOB = 102
 MARKER_DATUM_FILE = 103
+MARKER_DATUM_REF = 104  # reference to a datum the receiver has already got, the section only has the datum ID
+MARKER_DATUM_TEXT_COMPRESSED = 111
+MARKER_DATUM_BLOB_COMPRESSED = 112
+
+DATUM_MARKERS = (
+    MARKER_DATUM_BLOB,
+    MARKER_DATUM_FILE,
+    MARKER_DATUM_TEXT,
+    MARKER_DATUM_BLOB_COMPRESSED,
+    MARKER_DATUM_TEXT_COMPRESSED,
+)
+
+# compressed marker => original marker
+_ORIGINAL_MARKERS = {
+    MARKER_DATUM_TEXT_COMPRESSED: MARKER_DATUM_TEXT,
+    MARKER_DATUM_BLOB_COMPRESSED: MARKER_DATUM_BLOB,
+}
+_COMPRESSED_MARKERS = {v: k for k, v in _ORIGINAL_MARKERS.items()}
+
+# compressed datum data starts with this header, followed by the compressed bytes
+COMPRESSION_HEADER_STRUCT = struct.Struct(">BQ")  # codec ID(1), original size(8)
+COMPRESSION_HEADER_LEN = COMPRESSION_HEADER_STRUCT.size
 
 DATUM_ID_LEN = 16
 MAX_BYTES_PER_READ = 1024 * 1024  # 1MB
@@ -66,7 +90,105 @@ def _write_datum_header(stream: BinaryIO, marker, datum_id: str, value_size: int
     stream.write(datum_id_bytes)
 
 
-def dump_to_stream(obj: Any, stream: BinaryIO, max_value_size=None):
+def _prepare_datum(datum: Datum, policy: Optional[CompressionPolicy]):
+    """Prepare the section of a text or blob datum. This may run on a worker thread.
+
+    Returns: a tuple of (marker, list of buffers to be written as the section data, size of the uncompressed data)
+
+    """
+    if datum.datum_type == DatumType.TEXT:
+        # text representation is platform specific.
+        # we convert it to utf-8 based bytes, which is platform independent.
+        marker = MARKER_DATUM_TEXT
+        data = datum.value.encode("utf-8")
+    elif datum.datum_type == DatumType.BLOB:
+        marker = MARKER_DATUM_BLOB
+        data = datum.value
+    else:
+        # file datums are read when written
+        return MARKER_DATUM_FILE, None, 0
+
+    compressed = policy.compress(data) if policy else None
+    if compressed is None:
+        return marker, [data], len(data)
+
+    compression_header = COMPRESSION_HEADER_STRUCT.pack(policy.codec.get_id(), len(data))
+    return _COMPRESSED_MARKERS[marker], [compression_header] + compressed, len(data)
+
+
+def _write_file_datum(stream: BinaryIO, datum_id: str, file_path: str) -> int:
+    if not os.path.exists(file_path):
+        raise RuntimeError(f"{file_path} does not exist")
+
+    if not os.path.isfile(file_path):
+        raise RuntimeError(f"{file_path} is not a valid file")
+
+    file_size = os.path.getsize(file_path)
+    _write_datum_header(stream, MARKER_DATUM_FILE, datum_id, file_size)
+    with open(file_path, "rb") as f:
+        while True:
+            bytes_read = f.read(MAX_BYTES_PER_READ)
+            if not bytes_read:
+                break
+            stream.write(bytes_read)
+    return file_size
+
+
+class _BufferWriter:
+    """Writes decompressed data into a preallocated buffer"""
+
+    def __init__(self, size: int):
+        self.buffer = bytearray(size)
+        self.view = memoryview(self.buffer)
+        self.pos = 0
+
+    def write(self, data) -> int:
+        size = len(data)
+        end = self.pos + size
+        if end > len(self.buffer):
+            raise RuntimeError(f"decompressed data exceeds expected size {len(self.buffer)}")
+        self.view[self.pos : end] = data
+        self.pos = end
+        return size
+
+    def flush(self):
+        pass
+
+    def get_buffer(self) -> bytearray:
+        self.view.release()
+        if self.pos != len(self.buffer):
+            raise RuntimeError(f"expect {len(self.buffer)} decompressed bytes but got {self.pos}")
+        return self.buffer
+
+
+def _decompress(compression_header, chunks: Iterable) -> bytearray:
+    """Decompress the data of a compressed datum section.
+
+    Args:
+        compression_header: the compression header of the section
+        chunks: the compressed data in chunks
+
+    Returns: the decompressed data
+
+    """
+    codec_id, original_size = COMPRESSION_HEADER_STRUCT.unpack(compression_header)
+    codec = get_codec(codec_id)
+    if not codec:
+        raise RuntimeError(f"unknown compression codec {codec_id}")
+
+    writer = _BufferWriter(original_size)
+    codec.decompress(chunks, writer)
+    return writer.get_buffer()
+
+
+def dump_to_stream(
+    obj: Any,
+    stream: BinaryIO,
+    max_value_size=None,
+    compression=None,
+    num_workers=None,
+    datum_cache: Optional[DatumCache] = None,
+):
     """
     Serialize the specified object to a stream of bytes. If the object contains any datums, they will be included
     into the result.
@@ -83,52 +205,59 @@ def dump_to_stream(obj: Any, stream: BinaryIO, max_value_size=None):
         stream: the stream that serialized data will be written to.
         max_value_size: max size of bytes/str value allowed. If a value exceeds this, it will be converted to datum.
         If not specified, default is 10MB.
+        compression: a codec name or a CompressionPolicy to compress text and binary datums. If not specified,
+        datums are not compressed.
+        num_workers: number of threads to prepare datums (encoding and compression) concurrently. If not specified,
+        datums are prepared on the calling thread.
+        datum_cache: the cache of datums delivered to the receiver. If specified, datum IDs are computed from the
+        datum content, and datums already delivered are sent as references. The receiver must load the data with
+        its own DatumCache for this sender.
 
     Returns: None
 
     """
-    mgr = DatumManager(max_value_size)
+    if isinstance(compression, str):
+        compression = CompressionPolicy(codec=compression)
+
+    mgr = DatumManager(max_value_size, num_workers=num_workers, content_addressed=datum_cache is not None)
     main_body = serialize(obj, mgr)
     header = _Header(MARKER_MAIN, len(main_body))
     stream.write(header.to_bytes())
     stream.write(main_body)
 
     datums = mgr.get_datums()
-    for datum_id, datum in datums.items():
-        if datum.restore_func is not None:
-            # restore original object state
-            restore_func = datum.restore_func
-            func_data = datum.restore_func_data
-            datum.restore_func_data = None
-            datum.restore_func = None
-            restore_func(mgr, datum, func_data)
-
-        if datum.datum_type == DatumType.TEXT:
-            # text representation is platform specific.
-            # we convert it to utf-8 based bytes, which is platform independent.
-            data_bytes = datum.value.encode("utf-8")
-            _write_datum_header(stream, MARKER_DATUM_TEXT, datum_id, len(data_bytes))
-            stream.write(data_bytes)
-        elif datum.datum_type == DatumType.BLOB:
-            _write_datum_header(stream, MARKER_DATUM_BLOB, datum_id, len(datum.value))
-            stream.write(datum.value)
+    for datum in datums.values():
+        # restore original object state
+        datum.restore(mgr)
+
+    # datums already delivered to the receiver are not prepared
+    cached_ids = set()
+    if datum_cache:
+        cached_ids = {datum_id for datum_id in datums.keys() if datum_cache.contains(datum_id)}
+
+    def _prepare(d: Datum):
+        if d.datum_id in cached_ids:
+            return MARKER_DATUM_REF, None, 0
+        return _prepare_datum(d, compression)
+
+    # datums may be prepared concurrently, but sections are always written in the order of the datums
+    for datum, (marker, buffers, size) in mgr.prepare_datums(_prepare):
+        if marker == MARKER_DATUM_REF:
+            if datum_cache.touch(datum.datum_id):
+                _write_datum_header(stream, MARKER_DATUM_REF, datum.datum_id, 0)
+                continue
+            # evicted by earlier datums of this message
+            marker, buffers, size = _prepare_datum(datum, compression)
+
+        if marker == MARKER_DATUM_FILE:
+            size = _write_file_datum(stream, datum.datum_id, datum.value)
         else:
-            # file type:
-            file_path = datum.value
-            if not os.path.exists(file_path):
-                raise RuntimeError(f"{file_path} does not exist")
-
-            if not os.path.isfile(file_path):
-                raise RuntimeError(f"{file_path} is not a valid file")
+            _write_datum_header(stream, marker, datum.datum_id, sum(len(b) for b in buffers))
+            for buffer in buffers:
+                stream.write(buffer)
 
-            file_size = os.path.getsize(file_path)
-            _write_datum_header(stream, MARKER_DATUM_FILE, datum_id, file_size)
-            with open(file_path, "rb") as f:
-                while True:
-                    bytes_read = f.read(MAX_BYTES_PER_READ)
-                    if not bytes_read:
-                        break
-                    stream.write(bytes_read)
+        if datum_cache:
+            datum_cache.add(datum.datum_id, size)
 
 
 def _get_datum_id(stream: BinaryIO, header: _Header):
@@ -185,7 +314,7 @@ def _get_one_section(stream: BinaryIO, expect_datum: bool):
         raise RuntimeError(f"invalid size {header.size}")
 
     if expect_datum:
-        if header.marker not in (MARKER_DATUM_BLOB, MARKER_DATUM_FILE, MARKER_DATUM_TEXT):
+        if header.marker not in DATUM_MARKERS and header.marker != MARKER_DATUM_REF:
             raise RuntimeError(f"expect datum but got {header.marker}")
     else:
         if header.marker != MARKER_MAIN:
@@ -195,16 +324,49 @@ def _get_one_section(stream: BinaryIO, expect_datum: bool):
     if expect_datum:
         datum_id = _get_datum_id(stream, header)
 
-    data = stream.read(header.size)
-    if not data:
+    if header.marker == MARKER_DATUM_REF:
+        return header, datum_id, None
+
+    if header.marker in _ORIGINAL_MARKERS:
+        data = _read_compressed(stream, header.size)
+        header.marker = _ORIGINAL_MARKERS[header.marker]
+        return header, datum_id, data
+
+    if header.marker == MARKER_DATUM_BLOB and hasattr(stream, "readinto"):
+        # read blobs into writable buffers so decomposers (e.g. numpy arrays) can use them without copying
+        data = bytearray(header.size)
+        size = stream.readinto(data)
+    else:
+        data = stream.read(header.size)
+        size = len(data) if data else 0
+
+    if not size:
         raise RuntimeError(f"cannot get {header.size} data bytes")
 
-    if len(data) != header.size:
-        raise RuntimeError(f"expect {header.size} bytes but got {len(data)}")
+    if size != header.size:
+        raise RuntimeError(f"expect {header.size} bytes but got {size}")
 
     return header, datum_id, data
 
 
+def _read_compressed(stream: BinaryIO, size: int) -> bytearray:
+    """Read compressed data from the stream and decompress it chunk by chunk"""
+    compression_header = stream.read(COMPRESSION_HEADER_LEN)
+    if not compression_header or len(compression_header) != COMPRESSION_HEADER_LEN:
+        raise RuntimeError(f"cannot get {COMPRESSION_HEADER_LEN} compression header bytes")
+
+    def read_chunks():
+        remaining = size - COMPRESSION_HEADER_LEN
+        while remaining > 0:
+            chunk = stream.read(min(remaining, MAX_BYTES_PER_READ))
+            if not chunk:
+                raise RuntimeError(f"missing {remaining} bytes of compressed data")
+            remaining -= len(chunk)
+            yield chunk
+
+    return _decompress(compression_header, read_chunks())
+
+
 def _get_datum_dir():
     """When a file datum is received, the data will be stored in a temporary file under a predefined Datum Directory.
     This function returns this predefined Datum Directory. The function also tries to create the directory if
@@ -224,7 +386,7 @@ def _get_datum_dir():
     return dir_name
 
 
-def load_from_stream(stream: BinaryIO):
+def load_from_stream(stream: BinaryIO, lazy=False, datum_cache: Optional[DatumCache] = None):
     """Load/deserialize data from the specified stream into an object.
 
     The data in the stream must be a well-formed serialized data. It has one or more sections:
@@ -233,11 +395,15 @@ def load_from_stream(stream: BinaryIO):
 
     Args:
         stream: the stream that contains data to be deserialized.
+        lazy: if true, objects whose data is in datums (e.g. large arrays) are returned as LazyObject proxies,
+        which are only recomposed on first access.
+        datum_cache: the cache of datums received from the sender. Required if the sender dumped the data with
+        a DatumCache.
 
     Returns: an object
 
     """
-    mgr = DatumManager()
+    mgr = DatumManager(lazy=lazy)
 
     # get main body
     header, _, main_body = _get_one_section(stream, expect_datum=False)
@@ -251,26 +417,160 @@ def load_from_stream(stream: BinaryIO):
             # all done
             break
 
-        if header.marker == MARKER_DATUM_TEXT:
-            # the body is utf-8 encoded bytes
-            text = body.decode("utf-8")
-            datum = Datum.text_datum(text)
-        elif header.marker == MARKER_DATUM_BLOB:
-            datum = Datum.blob_datum(body)
+        if header.marker == MARKER_DATUM_REF:
+            datum = _get_cached_datum(datum_cache, datum_id)
         else:
-            # put the value in a file
-            datum_dir = _get_datum_dir()
-            file_path = os.path.join(datum_dir, f"{datum_id}.dat")
-            with open(file_path, "wb") as f:
-                f.write(body)
-            datum = Datum.file_datum(file_path)
-
-        datum.datum_id = datum_id
+            datum = _make_datum(header.marker, datum_id, body)
+            if datum_cache:
+                _cache_datum(datum_cache, datum, len(body))
         mgr.datums[datum_id] = datum
     return deserialize(main_body, mgr)
 
 
-def dump_to_bytes(obj: Any, buffer_list=False, max_value_size=None):
+def _cache_datum(datum_cache: DatumCache, datum: Datum, size: int):
+    if datum.datum_type == DatumType.BLOB:
+        # the value is shared by all messages referencing it, so it must not be changed by the app.
+        # decomposers copy read-only buffers when they need writable ones.
+        datum.value = memoryview(datum.value).toreadonly()
+    cached = Datum(datum.datum_type, datum.value)
+    cached.datum_id = datum.datum_id
+    datum_cache.add(datum.datum_id, size, cached)
+
+
+def _get_cached_datum(datum_cache: Optional[DatumCache], datum_id: str) -> Datum:
+    if not datum_cache:
+        raise RuntimeError(f"got reference to datum {datum_id} but no datum cache is provided")
+
+    cached = datum_cache.get(datum_id)
+    if not cached:
+        raise RuntimeError(f"got reference to datum {datum_id} but it is not in the datum cache")
+
+    datum = Datum(cached.datum_type, cached.value)
+    datum.datum_id = datum_id
+    return datum
+
+
+def _make_datum(marker, datum_id: str, body) -> Datum:
+    """Create the datum for a datum section.
+
+    Args:
+        marker: the marker of the section
+        datum_id: ID of the datum
+        body: the data of the section
+
+    Returns: a Datum object
+
+    """
+    if marker == MARKER_DATUM_TEXT:
+        # the body is utf-8 encoded bytes
+        text = str(body, "utf-8")
+        datum = Datum.text_datum(text)
+    elif marker == MARKER_DATUM_BLOB:
+        datum = Datum.blob_datum(body)
+    else:
+        # put the value in a file
+        datum_dir = _get_datum_dir()
+        file_path = os.path.join(datum_dir, f"{datum_id}.dat")
+        with open(file_path, "wb") as f:
+            f.write(body)
+        datum = Datum.file_datum(file_path)
+
+    datum.datum_id = datum_id
+    return datum
+
+
+def _index_sections(buffer: memoryview) -> list:
+    """Build the index of all sections in a buffer that contains well-formed serialized data.
+
+    Only the headers are read, so the section data of a mapped file is not paged in.
+
+    Args:
+        buffer: the buffer to be indexed
+
+    Returns: a list of (marker, datum_id, start, end) of each section. The datum_id is None for the main body.
+
+    """
+    sections = []
+    pos = 0
+    total = len(buffer)
+    while pos < total:
+        header = _Header.from_bytes(buffer[pos : pos + HEADER_LEN])
+        pos += HEADER_LEN
+        if header.size <= 0:
+            raise RuntimeError(f"invalid size {header.size}")
+
+        if not sections:
+            if header.marker != MARKER_MAIN:
+                raise RuntimeError(f"expect main but got {header.marker}")
+            datum_id = None
+        else:
+            if header.marker not in DATUM_MARKERS:
+                raise RuntimeError(f"expect datum but got {header.marker}")
+
+            if header.size < DATUM_ID_LEN:
+                raise RuntimeError(f"not enough data for datum ID: expect {DATUM_ID_LEN} bytes but got {header.size}")
+            datum_id = str(uuid.UUID(bytes=bytes(buffer[pos : pos + DATUM_ID_LEN])))
+            pos += DATUM_ID_LEN
+            header.size -= DATUM_ID_LEN
+
+        end = pos + header.size
+        if end > total:
+            raise RuntimeError(f"expect {header.size} bytes but got {total - pos}")
+
+        sections.append((header.marker, datum_id, pos, end))
+        pos = end
+
+    if not sections:
+        raise RuntimeError("invalid lobs content: missing main body")
+
+    return sections
+
+
+def _load_from_mmap(file_path: str, lazy=False) -> Any:
+    """Deserialize data in the specified file by memory-mapping the file.
+
+    The file is mapped copy-on-write. BLOB datums are memoryview slices of the mapping, so their data is only read
+    from disk when accessed, and objects built over them (e.g. numpy arrays) are writable without changing the file.
+    The mapping stays open as long as any of these slices is referenced.
+
+    Args:
+        file_path: the file that contains data to be deserialized.
+        lazy: whether to return LazyObject proxies for objects whose data is in datums.
+
+    Returns: an object
+
+    """
+    with open(file_path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            raise RuntimeError("invalid lobs content: missing main body")
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY)
+
+    buffer = memoryview(mapped)
+    sections = _index_sections(buffer)
+
+    mgr = DatumManager(lazy=lazy)
+    for marker, datum_id, start, end in sections[1:]:
+        body = buffer[start:end]
+        if marker in _ORIGINAL_MARKERS:
+            chunks = (
+                body[i : i + MAX_BYTES_PER_READ] for i in range(COMPRESSION_HEADER_LEN, len(body), MAX_BYTES_PER_READ)
+            )
+            body = _decompress(body[:COMPRESSION_HEADER_LEN], chunks)
+            marker = _ORIGINAL_MARKERS[marker]
+        mgr.datums[datum_id] = _make_datum(marker, datum_id, body)
+
+    _, _, start, end = sections[0]
+    return deserialize(buffer[start:end], mgr)
+
+
+def dump_to_bytes(
+    obj: Any,
+    buffer_list=False,
+    max_value_size=None,
+    compression=None,
+    num_workers=None,
+    datum_cache: Optional[DatumCache] = None,
+):
     """Serialize an object to bytes
 
     Args:
@@ -278,6 +578,10 @@ def dump_to_bytes(obj: Any, buffer_list=False, max_value_size=None):
         max_value_size: the max size allowed for bytes/str value in the object. If a value exceeds this, it will be
         converted to datum. If not specified, default is 10MB.
         buffer_list: If true, returns buffer list to save memory
+        compression: a codec name or a CompressionPolicy to compress datums. If not specified, no compression.
+        num_workers: number of threads to prepare datums concurrently. If not specified, no worker threads are used.
+        datum_cache: the cache of datums delivered to the receiver. If specified, delivered datums are sent as
+        references.
 
     Returns: a bytes object
 
@@ -286,28 +590,33 @@ def dump_to_bytes(obj: Any, buffer_list=False, max_value_size=None):
         bio = BufListStream()
     else:
         bio = io.BytesIO()
-    dump_to_stream(obj, bio, max_value_size)
+    dump_to_stream(obj, bio, max_value_size, compression, num_workers, datum_cache)
     return bio.getvalue()
 
 
-def load_from_bytes(data: Union[bytes, list]) -> Any:
+def load_from_bytes(data: Union[bytes, list], lazy=False, datum_cache: Optional[DatumCache] = None) -> Any:
     """Deserialize the bytes into an object
 
     Args:
         data: the bytes to be deserialized
+        lazy: whether to return LazyObject proxies for objects whose data is in datums.
+        datum_cache: the cache of datums received from the sender, to resolve datum references.
 
     Returns: an object
 
     """
     if isinstance(data, list):
         stream = BufListStream(data)
-    else:
+    elif isinstance(data, bytes):
         stream = io.BytesIO(data)
+    else:
+        # BytesIO would copy the buffer (e.g. a memoryview of a received frame)
+        stream = BufListStream([memoryview(data)])
 
-    return load_from_stream(stream)
+    return load_from_stream(stream, lazy, datum_cache)
 
 
-def dump_to_file(obj: Any, file_path: str, max_value_size=None):
+def dump_to_file(obj: Any, file_path: str, max_value_size=None, compression=None, num_workers=None):
     """Serialize the object and save result to the specified file.
 
     Args:
@@ -315,22 +624,31 @@ def dump_to_file(obj: Any, file_path: str, max_value_size=None):
         file_path: path of the file to store serialized data
         max_value_size: the max size allowed for bytes/str value in the object. If a value exceeds this, it will be
         converted to datum. If not specified, default is 10MB.
+        compression: a codec name or a CompressionPolicy to compress datums. If not specified, no compression.
+        num_workers: number of threads to prepare datums concurrently. If not specified, no worker threads are used.
 
     Returns: None
 
     """
     with open(file_path, "wb") as f:
-        dump_to_stream(obj, f, max_value_size)
+        dump_to_stream(obj, f, max_value_size, compression, num_workers)
 
 
-def load_from_file(file_path: str) -> Any:
+def load_from_file(file_path: str, use_mmap=False, lazy=False) -> Any:
     """Deserialized data in the specified file into an object
 
     Args:
         file_path: the file that contains data to be deserialized.
+        use_mmap: whether to memory-map the file instead of reading it. If true, large binary values are returned as
+        memoryview slices of the mapped file, which are only read from disk when accessed. This makes it cheap to
+        open huge files and only use part of the data.
+        lazy: whether to return LazyObject proxies for objects whose data is in datums.
 
     Returns: an object
 
     """
+    if use_mmap:
+        return _load_from_mmap(file_path, lazy)
+
     with open(file_path, "rb") as f:
-        return load_from_stream(f)
+        return load_from_stream(f, lazy)
@@ -11,6 +11,7 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
+import asyncio
 import threading
 import time
 from typing import Optional
@@ -59,19 +60,54 @@ def conditional_wait(
         else:
             time.sleep(wait_time)
 
-        if time.time() - start >= timeout:
-            return WaiterRC.TIMEOUT
-
-        # check conditions
-        if abort_signal and abort_signal.triggered:
-            return WaiterRC.ABORTED
-
-        if condition_cb:
-            try:
-                rc = condition_cb(**cb_kwargs)
-                if rc != WaiterRC.OK:
-                    # a bad condition is detected by the condition_cb
-                    # we return the rc from the condition_cb
-                    return rc
-            except:
-                return WaiterRC.ERROR
+        rc = _check_conditions(start, timeout, abort_signal, condition_cb, cb_kwargs)
+        if rc != WaiterRC.OK:
+            return rc
+
+
+async def async_conditional_wait(
+    waiter: Optional[asyncio.Future], timeout: float, abort_signal: Signal, condition_cb=None, **cb_kwargs
+):
+    """Same as conditional_wait() but for coroutines, the event loop is not blocked while waiting.
+
+    Args:
+        waiter: the future to wait. If not specified, then use sleep.
+        timeout: the max time to wait
+        abort_signal: signal to abort the wait
+        condition_cb: condition to check during waiting
+        **cb_kwargs: kwargs for the condition_cb
+
+    Returns: same return codes as conditional_wait()
+
+    """
+    wait_time = min(_SMALL_WAIT, timeout)
+    start = time.time()
+    while True:
+        if waiter:
+            done, _ = await asyncio.wait([waiter], timeout=wait_time)
+            if done:
+                return WaiterRC.IS_SET
+        else:
+            await asyncio.sleep(wait_time)
+
+        rc = _check_conditions(start, timeout, abort_signal, condition_cb, cb_kwargs)
+        if rc != WaiterRC.OK:
+            return rc
+
+
+def _check_conditions(start: float, timeout: float, abort_signal: Signal, condition_cb, cb_kwargs: dict) -> int:
+    if time.time() - start >= timeout:
+        return WaiterRC.TIMEOUT
+
+    # check conditions
+    if abort_signal and abort_signal.triggered:
+        return WaiterRC.ABORTED
+
+    if condition_cb:
+        try:
+            # a bad condition is detected by the condition_cb if the rc is not OK
+            return condition_cb(**cb_kwargs)
+        except:
+            return WaiterRC.ERROR
+
+    return WaiterRC.OK
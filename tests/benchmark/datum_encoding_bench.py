@@ -0,0 +1,75 @@
+# Copyright (c) 2025, NVIDIA CORPORATION.  All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Benchmark of fobs.dumps on a synthetic model dict with different numbers of datum workers.
+
+Half of the weights are zeros (like a pruned model), so compression pays off.
+
+Usage:
+    python -m tests.benchmark.datum_encoding_bench [--size-gb 5] [--layer-mb 64] [--workers 1 2 4 8]
+"""
+import argparse
+import time
+
+import numpy as np
+
+from nvflare.apis.shareable import Shareable
+from nvflare.apis.utils.decomposers import flare_decomposers
+from nvflare.app_common.decomposers import common_decomposers
+from nvflare.fuel.utils import fobs
+from nvflare.fuel.utils.fobs.compression import get_codec
+
+
+def _make_model(size_gb: float, layer_mb: int) -> Shareable:
+    layer_size = layer_mb * 1024 * 1024 // 4
+    num_layers = max(1, int(size_gb * 1024 / layer_mb))
+    rng = np.random.default_rng(0)
+    model = Shareable()
+    for i in range(num_layers):
+        weights = rng.standard_normal(layer_size, dtype=np.float32)
+        weights[::2] = 0.0
+        model[f"layer_{i}.weight"] = weights
+    return model
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--size-gb", type=float, default=5.0, help="total size of the model in GB")
+    parser.add_argument("--layer-mb", type=int, default=64, help="size of each layer in MB")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8], help="numbers of workers to test")
+    parser.add_argument("--rounds", type=int, default=1, help="number of rounds to average")
+    args = parser.parse_args()
+
+    flare_decomposers.register()
+    common_decomposers.register()
+    model = _make_model(args.size_gb, args.layer_mb)
+    size_mb = sum(a.nbytes for a in model.values() if isinstance(a, np.ndarray)) / (1024 * 1024)
+
+    print(f"model: {size_mb:.0f} MB")
+    print(f"{'compression':<14}{'workers':>8}{'dumps (s)':>12}{'MB/s':>10}{'speedup':>10}")
+    for compression in [None] + [name for name in ("zlib", "lz4", "zstd") if get_codec(name)]:
+        baseline = None
+        for workers in args.workers:
+            start = time.perf_counter()
+            for _ in range(args.rounds):
+                fobs.dumps(model, buffer_list=True, compression=compression, num_workers=workers)
+            elapsed = (time.perf_counter() - start) / args.rounds
+            baseline = baseline or elapsed
+            print(
+                f"{str(compression):<14}{workers:>8}{elapsed:>12.3f}{size_mb / elapsed:>10.0f}"
+                f"{baseline / elapsed:>10.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+# Copyright (c) 2025, NVIDIA CORPORATION.  All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Benchmark of FOBS Packer throughput (objects per second) for payloads with many small objects.
+
+Usage:
+    python -m tests.benchmark.packer_bench [--count 10000] [--rounds 5]
+"""
+import argparse
+import time
+from datetime import datetime
+from enum import Enum
+
+from nvflare.app_common.abstract.statistics_spec import Bin, Histogram, HistogramType
+from nvflare.app_common.statistics.statisitcs_objects_decomposer import fobs_registration
+from nvflare.fuel.utils import fobs
+
+NUM_BINS = 20
+
+
+class DeviceStatus(Enum):
+    IDLE = "idle"
+    TRAINING = "training"
+
+
+def make_metrics(count: int):
+    """Metric events, each with a timestamp. Returns payload and number of FOBS-decomposed objects"""
+    now = datetime.now()
+    payload = [{"tag": f"loss_{i}", "value": 0.1 * i, "step": i, "time": now} for i in range(count)]
+    return payload, count
+
+
+def make_devices(count: int):
+    """Device reports like the device dicts exchanged for edge training"""
+    now = datetime.now()
+    payload = {
+        f"device_{i}": {
+            "client_name": f"site-{i % 10}",
+            "last_alive": now,
+            "status": DeviceStatus.IDLE,
+            "selection": (i, i + 1),
+            "props": {"os": "android", "memory": 4096},
+        }
+        for i in range(count)
+    }
+    return payload, count * 3
+
+
+def make_statistics(count: int):
+    """Histogram statistics results"""
+    bins = [Bin(float(i), float(i + 1), 10.0) for i in range(NUM_BINS)]
+    payload = {f"feature_{i}": Histogram(HistogramType.STANDARD, list(bins)) for i in range(count // NUM_BINS)}
+    # each Histogram has a type and NUM_BINS bins
+    return payload, (count // NUM_BINS) * (NUM_BINS + 2)
+
+
+PAYLOADS = {
+    "metrics": make_metrics,
+    "devices": make_devices,
+    "statistics": make_statistics,
+}
+
+
+def run(count: int, rounds: int) -> dict:
+    fobs_registration()
+    results = {}
+    for name, make_payload in PAYLOADS.items():
+        payload, num_objects = make_payload(count)
+
+        # warm-up, which also does the auto-registration
+        data = fobs.dumps(payload)
+        fobs.loads(data)
+
+        start = time.perf_counter()
+        for _ in range(rounds):
+            data = fobs.dumps(payload)
+        dump_time = (time.perf_counter() - start) / rounds
+
+        start = time.perf_counter()
+        for _ in range(rounds):
+            fobs.loads(data)
+        load_time = (time.perf_counter() - start) / rounds
+
+        results[name] = {
+            "objects": num_objects,
+            "dumps_objects_per_sec": num_objects / dump_time,
+            "loads_objects_per_sec": num_objects / load_time,
+        }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--count", type=int, default=10000, help="approximate number of entries per payload")
+    parser.add_argument("--rounds", type=int, default=5, help="number of rounds to average")
+    args = parser.parse_args()
+
+    print(f"{'payload':<12}{'objects':>10}{'dumps obj/s':>16}{'loads obj/s':>16}")
+    for name, result in run(args.count, args.rounds).items():
+        print(
+            f"{name:<12}{result['objects']:>10}"
+            f"{result['dumps_objects_per_sec']:>16,.0f}{result['loads_objects_per_sec']:>16,.0f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
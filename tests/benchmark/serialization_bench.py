@@ -0,0 +1,234 @@
+# Copyright (c) 2025, NVIDIA CORPORATION.  All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Throughput and peak-memory benchmark of the FOBS/lobs serialization path.
+
+Each operation is timed over a number of rounds, then run once more under tracemalloc to get the peak memory it
+allocates. tracemalloc sees Python and numpy allocations but not torch allocations. Throughput is computed from
+the serialized size of the payload.
+
+The results are printed as JSON so they can be compared across commits.
+
+Usage:
+    python -m tests.benchmark.serialization_bench [--scale 1.0] [--rounds 3] [--output results.json]
+        [--baseline baseline.json]
+
+With --baseline, the change of throughput and peak memory against a previous result file is printed to stderr.
+"""
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List
+
+import numpy as np
+
+from nvflare.apis.dxo import DXO, DataKind, MetaKey
+from nvflare.apis.shareable import Shareable
+from nvflare.apis.utils.decomposers import flare_decomposers
+from nvflare.app_common.decomposers import common_decomposers
+from nvflare.app_common.decomposers.numpy_decomposers import NumpyArrayDecomposer
+from nvflare.fuel.utils import fobs
+from nvflare.fuel.utils.buffer_list import BufferList
+from nvflare.fuel.utils.fobs import lobs
+from nvflare.fuel.utils.import_utils import optional_import
+
+MB = 1024 * 1024
+
+torch, torch_ok = optional_import(module="torch")
+
+
+class _CountingSink:
+    """A stream that only counts the bytes written, so dump_to_stream is measured without the cost of a buffer"""
+
+    def __init__(self):
+        self.size = 0
+
+    def write(self, data) -> int:
+        size = len(data)
+        self.size += size
+        return size
+
+
+def _make_model(layers: int, layer_bytes: int) -> dict:
+    rng = np.random.default_rng(0)
+    size = max(1, layer_bytes // 4)
+    return {f"layer_{i}.weight": rng.standard_normal(size, dtype=np.float32) for i in range(layers)}
+
+
+def _make_payloads(scale: float) -> Dict[str, Any]:
+    def layers(n):
+        return max(1, int(n * scale))
+
+    payloads = {
+        "model_10x8mb": _make_model(layers(10), 8 * MB),
+        "model_100x1mb": _make_model(layers(100), MB),
+        "model_1000x64kb": _make_model(layers(1000), 64 * 1024),
+    }
+
+    inner = Shareable()
+    inner["model"] = _make_model(layers(50), MB)
+    inner.set_header("round", 1)
+    outer = Shareable()
+    outer["task"] = inner
+    outer["round_result"] = Shareable({"model": _make_model(layers(50), MB)})
+    payloads["nested_shareable"] = outer
+
+    meta = {
+        MetaKey.NUM_STEPS_CURRENT_ROUND: 100,
+        "metrics": {f"metric_{i}": float(i) for i in range(100)},
+        "history": [float(i) for i in range(10000)],
+    }
+    payloads["dxo_with_meta"] = DXO(data_kind=DataKind.WEIGHTS, data=_make_model(layers(100), MB), meta=meta)
+
+    payloads["small_objects"] = [
+        {"name": f"item_{i}", "value": i * 0.5, "tags": ["a", "b"], "flag": bool(i % 2)}
+        for i in range(int(100000 * scale))
+    ]
+    return payloads
+
+
+def _measure(func: Callable, size: int, rounds: int) -> dict:
+    # warm-up, which also does the auto-registration of decomposers
+    func()
+
+    start = time.perf_counter()
+    for _ in range(rounds):
+        func()
+    seconds = (time.perf_counter() - start) / rounds
+
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "mb": size / MB,
+        "seconds": seconds,
+        "mb_per_sec": size / MB / seconds if seconds else None,
+        "peak_mb": peak / MB,
+    }
+
+
+def _bench_payload(name: str, payload: Any, rounds: int) -> List[dict]:
+    data = fobs.dumps(payload)
+    buf_list = fobs.dumps(payload, buffer_list=True)
+    size = len(data)
+
+    ops = {
+        "fobs.dumps": lambda: fobs.dumps(payload),
+        "fobs.loads": lambda: fobs.loads(data),
+        "lobs.dump_to_stream": lambda: lobs.dump_to_stream(payload, _CountingSink()),
+        "BufferList.flatten": lambda: BufferList(buf_list).flatten(),
+    }
+    return [{"payload": name, "op": op, **_measure(func, size, rounds)} for op, func in ops.items()]
+
+
+def _bench_numpy_decomposer(model: dict, rounds: int) -> List[dict]:
+    decomposer = NumpyArrayDecomposer()
+    arrays = list(model.values())
+    size = sum(a.nbytes for a in arrays)
+    decomposed = [decomposer.decompose(a) for a in arrays]
+    ops = {
+        "NumpyArrayDecomposer.decompose": lambda: [decomposer.decompose(a) for a in arrays],
+        "NumpyArrayDecomposer.recompose": lambda: [decomposer.recompose(d) for d in decomposed],
+    }
+    return [{"payload": "model_100x1mb", "op": op, **_measure(func, size, rounds)} for op, func in ops.items()]
+
+
+def _bench_tensor_decomposer(model: dict, rounds: int) -> List[dict]:
+    from nvflare.app_opt.pt.decomposers import TensorDecomposer
+
+    decomposer = TensorDecomposer()
+    tensors = [torch.from_numpy(a) for a in model.values()]
+    size = sum(t.numel() * t.element_size() for t in tensors)
+    decomposed = [decomposer.decompose(t) for t in tensors]
+    ops = {
+        "TensorDecomposer.decompose": lambda: [decomposer.decompose(t) for t in tensors],
+        "TensorDecomposer.recompose": lambda: [decomposer.recompose(d) for d in decomposed],
+    }
+    return [{"payload": "model_100x1mb", "op": op, **_measure(func, size, rounds)} for op, func in ops.items()]
+
+
+def _get_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(scale: float, rounds: int) -> dict:
+    flare_decomposers.register()
+    common_decomposers.register()
+
+    payloads = _make_payloads(scale)
+    results = []
+    for name, payload in payloads.items():
+        results.extend(_bench_payload(name, payload, rounds))
+
+    results.extend(_bench_numpy_decomposer(payloads["model_100x1mb"], rounds))
+    if torch_ok:
+        results.extend(_bench_tensor_decomposer(payloads["model_100x1mb"], rounds))
+
+    return {
+        "commit": _get_commit(),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "torch": torch.__version__ if torch_ok else None,
+        "platform": platform.platform(),
+        "scale": scale,
+        "rounds": rounds,
+        "results": results,
+    }
+
+
+def _compare(report: dict, baseline: dict):
+    baseline_results = {(r["payload"], r["op"]): r for r in baseline["results"]}
+    print(f"compared to {baseline.get('commit')}:", file=sys.stderr)
+    for r in report["results"]:
+        base = baseline_results.get((r["payload"], r["op"]))
+        if not base or not base["mb_per_sec"] or not r["mb_per_sec"]:
+            continue
+        speed = r["mb_per_sec"] / base["mb_per_sec"]
+        memory = r["peak_mb"] - base["peak_mb"]
+        print(f"{r['payload']:<18}{r['op']:<34}{speed:>8.2f}x{memory:>+10.1f} MB", file=sys.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--scale", type=float, default=1.0, help="scale factor of the number of layers/objects")
+    parser.add_argument("--rounds", type=int, default=3, help="number of rounds to average")
+    parser.add_argument("--output", type=str, help="file to write the JSON results to, default is stdout")
+    parser.add_argument("--baseline", type=str, help="JSON results of a previous run to compare to")
+    args = parser.parse_args()
+
+    report = run(args.scale, args.rounds)
+    if args.baseline:
+        with open(args.baseline) as f:
+            _compare(report, json.load(f))
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+
+if __name__ == "__main__":
+    main()
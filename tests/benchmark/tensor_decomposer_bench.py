@@ -0,0 +1,81 @@
+# Copyright (c) 2025, NVIDIA CORPORATION.  All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Micro-benchmark of TensorDecomposer: raw-storage format vs. the legacy numpy/torch.jit format.
+
+Usage:
+    python -m tests.benchmark.tensor_decomposer_bench [--layers 100] [--size 1048576] [--rounds 3]
+"""
+import argparse
+import time
+
+import torch
+
+from nvflare.app_opt.pt.decomposers import TensorDecomposer
+from nvflare.fuel.utils import fobs
+
+
+class _LegacyTensorDecomposer(TensorDecomposer):
+    """The numpy/torch.jit encoding used before the raw-storage format"""
+
+    def decompose(self, target: torch.Tensor, manager=None):
+        if target.dtype == torch.bfloat16:
+            return self._jit_serialize(target)
+        else:
+            return self._numpy_serialize(target)
+
+
+def _make_model(layers: int, size: int, dtype: torch.dtype) -> dict:
+    return {f"layer_{i}.weight": torch.randn(size).to(dtype) for i in range(layers)}
+
+
+def _time_round_trip(model: dict, rounds: int):
+    encode_time = 0.0
+    decode_time = 0.0
+    for _ in range(rounds):
+        start = time.perf_counter()
+        data = fobs.dumps(model, buffer_list=True)
+        encode_time += time.perf_counter() - start
+
+        start = time.perf_counter()
+        fobs.loads(data)
+        decode_time += time.perf_counter() - start
+
+    return encode_time / rounds, decode_time / rounds
+
+
+def _run(decomposer: TensorDecomposer, model: dict, rounds: int):
+    fobs.reset()
+    fobs.register(decomposer)
+    return _time_round_trip(model, rounds)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--layers", type=int, default=100, help="number of tensors in the model")
+    parser.add_argument("--size", type=int, default=1024 * 1024, help="number of elements per tensor")
+    parser.add_argument("--rounds", type=int, default=3, help="number of rounds to average")
+    args = parser.parse_args()
+
+    print(f"{'dtype':<16}{'format':<10}{'MB':>10}{'encode (s)':>14}{'decode (s)':>14}{'MB/s':>12}")
+    for dtype in (torch.float32, torch.float16, torch.bfloat16):
+        model = _make_model(args.layers, args.size, dtype)
+        size_mb = sum(t.numel() * t.element_size() for t in model.values()) / (1024 * 1024)
+        for name, decomposer in (("legacy", _LegacyTensorDecomposer()), ("raw", TensorDecomposer())):
+            encode, decode = _run(decomposer, model, args.rounds)
+            throughput = size_mb / (encode + decode)
+            print(f"{str(dtype):<16}{name:<10}{size_mb:>10.1f}{encode:>14.4f}{decode:>14.4f}{throughput:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
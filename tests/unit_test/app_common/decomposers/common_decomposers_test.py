@@ -12,6 +12,7 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 import os
+from io import BytesIO
 from typing import Any
 
 import numpy as np
@@ -23,6 +24,7 @@ from nvflare.app_common.abstract.fl_model import FLModel, ParamsType
 from nvflare.app_common.abstract.learnable import Learnable
 from nvflare.app_common.abstract.model import ModelLearnable
 from nvflare.app_common.decomposers import common_decomposers
+from nvflare.app_common.decomposers.numpy_decomposers import NumpyArrayDecomposer
 from nvflare.app_common.widgets.event_recorder import _CtxPropReq, _EventReq, _EventStats
 from nvflare.fuel.utils import fobs
 
@@ -108,6 +110,42 @@ class TestCommonDecomposers:
 
         assert (new_npa == npa).all()
 
+    @pytest.mark.parametrize(
+        "npa",
+        [
+            np.arange(12, dtype=np.float32).reshape(3, 4),
+            np.asfortranarray(np.arange(12, dtype=np.int64).reshape(3, 4)),
+            np.arange(24, dtype=">f8").reshape(2, 3, 4)[:, ::2, 1:],
+            np.array([1 + 2j, 3 - 4j]),
+            np.array([True, False]),
+            np.array(["a", "bcd"]),
+            np.array(3.5),
+            np.zeros((0, 5), dtype=np.float16),
+        ],
+    )
+    def test_np_array_raw(self, npa):
+        new_npa = self._run_fobs(npa)
+        assert new_npa.dtype == npa.dtype
+        assert new_npa.shape == npa.shape
+        assert np.array_equal(new_npa, npa)
+        assert new_npa.flags.writeable
+
+    def test_np_array_datum(self):
+        npa = np.random.rand(256, 1024)
+        buf = fobs.dumps({"weights": npa}, max_value_size=1024)
+        new_npa = fobs.loads(buf)["weights"]
+        assert np.array_equal(new_npa, npa)
+        assert new_npa.flags.writeable
+        # the array is built over the received datum buffer
+        assert not new_npa.flags.owndata
+
+    def test_np_array_legacy(self):
+        npa = np.array([[1, 2, 3], [4, 5, 6]])
+        stream = BytesIO()
+        np.save(stream, npa, allow_pickle=False)
+        new_npa = NumpyArrayDecomposer().recompose(stream.getvalue())
+        assert np.array_equal(new_npa, npa)
+
     def test_ctx_prop_req(self):
 
         cpr = _CtxPropReq("data_type", True, False, True)
@@ -0,0 +1,74 @@
+# Copyright (c) 2025, NVIDIA CORPORATION.  All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import pytest
+
+torch = pytest.importorskip("torch")
+
+from nvflare.app_opt.pt.decomposers import TensorDecomposer  # noqa: E402
+from nvflare.fuel.utils import fobs  # noqa: E402
+
+
+class TestTensorDecomposer:
+    @classmethod
+    def setup_class(cls):
+        fobs.register(TensorDecomposer)
+
+    @pytest.mark.parametrize(
+        "tensor",
+        [
+            torch.randn(3, 4),
+            torch.randn(3, 4, dtype=torch.float64).t(),
+            torch.randn(8, 8)[::2, 1:],
+            torch.randn(2, 3, 4, 5).to(memory_format=torch.channels_last),
+            torch.randn(4, 4).to(torch.bfloat16),
+            torch.randn(4, 4).to(torch.float8_e4m3fn),
+            torch.randn(4, dtype=torch.complex64),
+            torch.tensor([True, False]),
+            torch.arange(10, dtype=torch.int64),
+            torch.tensor(2.5),
+            torch.zeros(0, 3),
+        ],
+    )
+    def test_tensor(self, tensor):
+        new_tensor = fobs.loads(fobs.dumps(tensor))
+        assert new_tensor.dtype == tensor.dtype
+        assert new_tensor.shape == tensor.shape
+        # compare bytes, float8 types don't support equality
+        assert torch.equal(self._to_bytes(new_tensor), self._to_bytes(tensor))
+
+    @staticmethod
+    def _to_bytes(tensor):
+        return tensor.contiguous().reshape(-1).view(torch.uint8)
+
+    def test_strides_preserved(self):
+        tensor = torch.randn(2, 3, 4, 5).to(memory_format=torch.channels_last)
+        new_tensor = fobs.loads(fobs.dumps(tensor))
+        assert new_tensor.stride() == tensor.stride()
+
+    def test_tensor_datum(self):
+        model = {"weight": torch.randn(256, 1024), "bias": torch.randn(1024).to(torch.bfloat16)}
+        new_model = fobs.loads(fobs.dumps(model, max_value_size=1024))
+        for k, v in model.items():
+            assert torch.equal(new_model[k], v)
+            # tensors are writable views of the received buffers
+            new_model[k].add_(1)
+
+    @pytest.mark.parametrize("tensor", [torch.randn(3, 4), torch.randn(3, 4).to(torch.bfloat16)])
+    def test_legacy_format(self, tensor):
+        decomposer = TensorDecomposer()
+        if tensor.dtype == torch.bfloat16:
+            data = decomposer._jit_serialize(tensor)
+        else:
+            data = decomposer._numpy_serialize(tensor)
+        assert torch.equal(decomposer.recompose(data), tensor)
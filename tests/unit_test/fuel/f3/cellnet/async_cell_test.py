@@ -0,0 +1,230 @@
+# Copyright (c) 2025, NVIDIA CORPORATION.  All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import asyncio
+import threading
+import time
+
+import pytest
+
+from nvflare.fuel.f3.cellnet.cell import Cell
+from nvflare.fuel.f3.cellnet.core_cell import CoreCell, _CounterName
+from nvflare.fuel.f3.cellnet.defs import CellChannel, MessageHeaderKey, MessagePropKey, ReturnCode
+from nvflare.fuel.f3.endpoint import Endpoint
+from nvflare.fuel.f3.message import Message
+from nvflare.fuel.f3.streaming.stream_types import StreamFuture
+from nvflare.fuel.utils.network_utils import get_open_ports
+from nvflare.fuel.utils.waiter_utils import WaiterRC, async_conditional_wait
+
+SERVER = "server"
+CLIENT = "site-1"
+CORE_CHANNEL = CellChannel.SERVER_MAIN
+STREAM_CHANNEL = "async_test"
+TOPIC = "echo"
+TIMEOUT = 10.0
+
+
+async def _echo(request: Message, prefix: str) -> Message:
+    await asyncio.sleep(0.01)
+    return Message(payload=prefix + request.payload)
+
+
+async def _fail(request: Message) -> Message:
+    raise RuntimeError("bad request")
+
+
+async def _no_reply(request: Message):
+    return None
+
+
+def _count_reply_none(cell: CoreCell) -> int:
+    counters = cell.received_msg_counter_pool.cat_counters.values()
+    return sum(c.get(_CounterName.REPLY_NONE, 0) for c in counters)
+
+
+@pytest.fixture(scope="module")
+def cells():
+    port = get_open_ports(1)[0]
+    server = Cell(SERVER, f"tcp://localhost:{port}", secure=False, credentials={})
+    client = Cell(CLIENT, f"tcp://localhost:{port}", secure=False, credentials={})
+
+    blobs = []
+    blob_received = threading.Event()
+
+    async def receive_blob(future: StreamFuture):
+        blobs.append(bytes(future.result()))
+        blob_received.set()
+
+    for channel in (CORE_CHANNEL, STREAM_CHANNEL):
+        server.register_async_request_cb(channel, TOPIC, _echo, prefix="echo:")
+        server.register_async_request_cb(channel, "fail", _fail)
+    server.register_async_request_cb(CORE_CHANNEL, "none", _no_reply)
+    server.register_async_blob_cb(STREAM_CHANNEL, "blob", receive_blob)
+
+    server.start()
+    client.start()
+    start = time.time()
+    while not client.is_cell_connected(SERVER):
+        if time.time() - start > TIMEOUT:
+            raise TimeoutError("client is not connected")
+        time.sleep(0.1)
+
+    yield server, client, blobs, blob_received
+    client.stop()
+    server.stop()
+
+    # stopped cells are still registered, so the names can be used by other tests
+    for name in (SERVER, CLIENT):
+        CoreCell.ALL_CELLS.pop(name, None)
+
+
+class TestAsyncCell:
+    @pytest.mark.parametrize("channel", [CORE_CHANNEL, STREAM_CHANNEL])
+    def test_send_request(self, cells, channel):
+        _, client, _, _ = cells
+        reply = asyncio.run(client.async_send_request(channel, TOPIC, SERVER, Message(payload="hello"), TIMEOUT))
+
+        assert reply.get_header(MessageHeaderKey.RETURN_CODE, ReturnCode.OK) == ReturnCode.OK
+        assert reply.payload == "echo:hello"
+
+    @pytest.mark.parametrize("channel", [CORE_CHANNEL, STREAM_CHANNEL])
+    def test_concurrent_requests(self, cells, channel):
+        _, client, _, _ = cells
+
+        async def send_all():
+            requests = [
+                client.async_send_request(channel, TOPIC, SERVER, Message(payload=str(i)), TIMEOUT) for i in range(50)
+            ]
+            return await asyncio.gather(*requests)
+
+        replies = asyncio.run(send_all())
+        assert [r.payload for r in replies] == [f"echo:{i}" for i in range(50)]
+
+    @pytest.mark.parametrize("channel", [CORE_CHANNEL, STREAM_CHANNEL])
+    def test_broadcast_request(self, cells, channel):
+        _, client, _, _ = cells
+        replies = asyncio.run(client.async_broadcast_request(channel, TOPIC, [SERVER], Message(payload="all"), TIMEOUT))
+
+        assert list(replies.keys()) == [SERVER]
+        assert replies[SERVER].payload == "echo:all"
+
+    def test_callback_exception(self, cells):
+        _, client, _, _ = cells
+        reply = asyncio.run(client.async_send_request(CORE_CHANNEL, "fail", SERVER, Message(payload="x"), TIMEOUT))
+
+        assert reply.get_header(MessageHeaderKey.RETURN_CODE) == ReturnCode.PROCESS_EXCEPTION
+
+    def test_unreachable_target(self, cells):
+        _, client, _, _ = cells
+        reply = asyncio.run(client.async_send_request(CORE_CHANNEL, TOPIC, "nobody", Message(payload="x"), 1.0))
+
+        assert reply.get_header(MessageHeaderKey.RETURN_CODE) != ReturnCode.OK
+
+    def test_reply_none_counted_once(self, cells):
+        server, client, _, _ = cells
+        count = _count_reply_none(server.core_cell)
+
+        asyncio.run(client.async_send_request(CORE_CHANNEL, TOPIC, SERVER, Message(payload="x"), TIMEOUT))
+        assert _count_reply_none(server.core_cell) == count
+
+        client.fire_and_forget(CORE_CHANNEL, "none", SERVER, Message(payload="x"))
+        start = time.time()
+        while _count_reply_none(server.core_cell) == count and time.time() - start < TIMEOUT:
+            time.sleep(0.01)
+        assert _count_reply_none(server.core_cell) == count + 1
+
+    def test_stream_encoding_not_in_event_loop(self, cells, monkeypatch):
+        _, client, _, _ = cells
+        threads = {}
+        for name in ("_encode_message", "send_blob"):
+
+            def record(*args, _name=name, _func=getattr(client, name)):
+                threads[_name] = threading.get_ident()
+                return _func(*args)
+
+            monkeypatch.setattr(client, name, record)
+
+        async def send():
+            reply = await client.async_send_request(STREAM_CHANNEL, TOPIC, SERVER, Message(payload="x"), TIMEOUT)
+            return reply, threading.get_ident()
+
+        reply, loop_thread = asyncio.run(send())
+        assert reply.payload == "echo:x"
+        assert set(threads) == {"_encode_message", "send_blob"}
+        assert loop_thread not in threads.values()
+
+    def test_send_blob(self, cells):
+        _, client, blobs, blob_received = cells
+        data = bytes(range(256)) * 1000
+
+        sent = asyncio.run(client.async_send_blob(STREAM_CHANNEL, "blob", SERVER, Message(payload=data)))
+
+        assert sent == len(data)
+        assert blob_received.wait(TIMEOUT)
+        assert blobs == [data]
+
+    def test_sync_callback_is_rejected(self, cells):
+        server, _, _, _ = cells
+        with pytest.raises(ValueError):
+            server.register_async_request_cb(CORE_CHANNEL, "sync", lambda request: request)
+
+
+class TestAsyncRequestCb:
+    def test_adhoc_conn_url_in_reply(self, make_core_cell, monkeypatch):
+        core_cell = make_core_cell("async_cb_cell")
+        replies = []
+        monkeypatch.setattr(core_cell, "_reply_request", lambda *args: replies.append(args))
+        request = Message({MessageHeaderKey.ORIGIN: "site-2", MessageHeaderKey.REPLY_EXPECTED: True}, "hi")
+        request.set_prop(MessagePropKey.ENDPOINT, Endpoint("site-2"))
+        request.set_prop(MessagePropKey.CONN_URL, "tcp://localhost:1234")
+
+        asyncio.run(core_cell._run_async_request_cb(request, _echo, (), {"prefix": "echo:"}))
+
+        ((_, reply, endpoint, origin, my_conn_url),) = replies
+        assert reply.payload == "echo:hi"
+        assert (endpoint.name, origin) == ("site-2", "site-2")
+        assert my_conn_url == "tcp://localhost:1234"
+
+
+class TestAsyncWait:
+    def test_future_done_in_thread(self):
+        future = StreamFuture(1)
+
+        async def wait():
+            threading.Timer(0.05, future.set_result, args=(123,)).start()
+            return await future.async_result(TIMEOUT)
+
+        assert asyncio.run(wait()) == 123
+
+    def test_future_already_done(self):
+        future = StreamFuture(1)
+        future.set_result(10)
+
+        called = []
+        future.add_done_callback(lambda: called.append(True))
+        assert called == [True]
+        assert asyncio.run(future.async_result(1.0)) == 10
+
+    def test_future_timeout(self):
+        with pytest.raises(TimeoutError):
+            asyncio.run(StreamFuture(1).async_result(0.1))
+
+    def test_conditional_wait(self):
+        async def wait(set_future: bool):
+            future = asyncio.get_running_loop().create_future()
+            if set_future:
+                future.set_result(True)
+            return await async_conditional_wait(future, 0.2, None)
+
+        assert asyncio.run(wait(True)) == WaiterRC.IS_SET
+        assert asyncio.run(wait(False)) == WaiterRC.TIMEOUT
@@ -0,0 +1,177 @@
+# Copyright (c) 2025, NVIDIA CORPORATION.  All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import os
+import struct
+
+import pytest
+from cryptography.exceptions import InvalidSignature, InvalidTag
+
+from nvflare.fuel.f3.cellnet.cell_cipher import (
+    CHUNK_INFO_FORMAT,
+    CHUNKED_HEADER_LENGTH,
+    GCM_NONCE_LENGTH,
+    GCM_TAG_LENGTH,
+    ChunkedKind,
+    SimpleCellCipher,
+    _encrypt_chunks,
+)
+from nvflare.fuel.f3.cellnet.credential_manager import CERT_CIPHER_MODES, CERT_CONTENT, CredentialManager
+from nvflare.fuel.f3.cellnet.defs import CipherMode, MessageHeaderKey
+from nvflare.fuel.f3.endpoint import Endpoint
+from nvflare.fuel.f3.message import Message
+from nvflare.lighter.utils import Identity, generate_cert, generate_keys
+
+CHUNK_SIZE = 1024
+
+
+@pytest.fixture(scope="module")
+def ciphers():
+    ca_key, ca_pub_key = generate_keys()
+    ca = Identity("ca")
+    ca_cert = generate_cert(ca, ca, ca_key, ca_pub_key, ca=True)
+
+    result = []
+    for name in ("server", "site-1", "site-2"):
+        key, pub_key = generate_keys()
+        cert = generate_cert(Identity(name), ca, ca_key, pub_key)
+        result.append((SimpleCellCipher(ca_cert, key, cert), cert))
+    return result
+
+
+def _join(buffers: list) -> bytes:
+    return b"".join(bytes(b) for b in buffers)
+
+
+class TestChunkedCipher:
+    @pytest.mark.parametrize("size", [0, 1, CHUNK_SIZE - 1, CHUNK_SIZE, 5 * CHUNK_SIZE, 5 * CHUNK_SIZE + 7])
+    @pytest.mark.parametrize("num_workers", [0, 4])
+    def test_round_trip(self, ciphers, size, num_workers):
+        (sender, sender_cert), (receiver, receiver_cert), _ = ciphers
+        data = os.urandom(size)
+
+        encrypted = sender.encrypt_chunked(data, receiver_cert, CHUNK_SIZE, num_workers)
+        num_chunks = max(1, (size + CHUNK_SIZE - 1) // CHUNK_SIZE)
+        assert len(encrypted) == num_chunks + 1
+        assert len(_join(encrypted)) == CHUNKED_HEADER_LENGTH + size + num_chunks * GCM_TAG_LENGTH
+
+        # Received as a single buffer
+        decrypted = receiver.decrypt_chunked(memoryview(_join(encrypted)), sender_cert, num_workers)
+        assert decrypted == data
+
+        # Delivered in memory as the buffer list
+        assert receiver.decrypt_chunked(encrypted, sender_cert) == data
+
+    def test_buffer_list(self, ciphers):
+        (sender, sender_cert), (receiver, receiver_cert), _ = ciphers
+        buffers = [os.urandom(100), memoryview(os.urandom(3000)), bytearray(os.urandom(10))]
+
+        encrypted = sender.encrypt_chunked(buffers, receiver_cert, CHUNK_SIZE)
+        assert receiver.decrypt_chunked(_join(encrypted), sender_cert) == _join(buffers)
+
+    def test_tampered_chunk(self, ciphers):
+        (sender, sender_cert), (receiver, receiver_cert), _ = ciphers
+        encrypted = bytearray(_join(sender.encrypt_chunked(os.urandom(3 * CHUNK_SIZE), receiver_cert, CHUNK_SIZE)))
+        encrypted[CHUNKED_HEADER_LENGTH + CHUNK_SIZE + 10] ^= 1
+
+        with pytest.raises(InvalidTag):
+            receiver.decrypt_chunked(encrypted, sender_cert)
+
+    def test_truncated_message(self, ciphers):
+        (sender, sender_cert), (receiver, receiver_cert), _ = ciphers
+        encrypted = sender.encrypt_chunked(os.urandom(3 * CHUNK_SIZE), receiver_cert, CHUNK_SIZE)
+
+        # Dropping the last chunk makes the previous one the last, which is not authenticated as last
+        with pytest.raises(InvalidTag):
+            receiver.decrypt_chunked(_join(encrypted[:-1]), sender_cert)
+
+    def test_reordered_chunks(self, ciphers):
+        (sender, sender_cert), (receiver, receiver_cert), _ = ciphers
+        encrypted = sender.encrypt_chunked(os.urandom(3 * CHUNK_SIZE), receiver_cert, CHUNK_SIZE)
+        encrypted[1], encrypted[2] = encrypted[2], encrypted[1]
+
+        with pytest.raises(InvalidTag):
+            receiver.decrypt_chunked(_join(encrypted), sender_cert)
+
+    def test_multicast(self, ciphers):
+        (sender, sender_cert), (receiver, receiver_cert), _ = ciphers
+        data = os.urandom(3 * CHUNK_SIZE + 5)
+
+        cipher_text = sender.encrypt_multicast(data, CHUNK_SIZE)
+        first = sender.wrap_multicast(cipher_text, receiver_cert)
+        second = sender.wrap_multicast(cipher_text, receiver_cert)
+
+        # Only the header with the content key is different, the chunks are shared
+        assert first[0] != second[0]
+        assert all(a is b for a, b in zip(first[1:], second[1:]))
+
+        assert receiver.decrypt_chunked(_join(first), sender_cert) == data
+        assert receiver.decrypt_chunked(_join(second), sender_cert) == data
+
+        # A receiver can't decrypt the copy of another one
+        with pytest.raises(Exception):
+            sender.decrypt_chunked(_join(first), receiver_cert)
+
+    @pytest.mark.parametrize("kind", [ChunkedKind.MULTICAST, ChunkedKind.UNICAST])
+    def test_multicast_header_reused(self, ciphers, kind):
+        (sender, sender_cert), (receiver, receiver_cert), (attacker, attacker_cert) = ciphers
+        cipher_text = sender.encrypt_multicast(os.urandom(3 * CHUNK_SIZE), CHUNK_SIZE)
+        assert receiver.decrypt_chunked(sender.wrap_multicast(cipher_text, receiver_cert), sender_cert)
+
+        # The attacker is a receiver too, so it gets the content key from its own copy. It encrypts its own
+        # chunks with the key and puts them after the header of the other receiver.
+        own_header = sender.wrap_multicast(cipher_text, attacker_cert)[0]
+        assert attacker.decrypt_chunked([own_header] + cipher_text.chunks, sender_cert)
+        header = bytearray(sender.wrap_multicast(cipher_text, receiver_cert)[0])
+        nonce = bytes(header[:GCM_NONCE_LENGTH])
+        forged = _encrypt_chunks(cipher_text.key, nonce, b"poisoned model", CHUNK_SIZE, 0)
+
+        # Also as a unicast message, which signs only the encrypted key
+        header[-struct.calcsize(CHUNK_INFO_FORMAT) :] = struct.pack(CHUNK_INFO_FORMAT, CHUNK_SIZE, kind)
+        with pytest.raises(InvalidSignature):
+            receiver.decrypt_chunked([bytes(header)] + forged, sender_cert)
+
+    def test_cbc_still_supported(self, ciphers):
+        (sender, sender_cert), (receiver, receiver_cert), _ = ciphers
+        data = os.urandom(5000)
+
+        assert receiver.decrypt(sender.encrypt(data, receiver_cert), sender_cert) == data
+
+
+class TestCipherModeNegotiation:
+    @staticmethod
+    def _response(modes=None) -> Message:
+        reply = {CERT_CONTENT: b"cert"}
+        if modes is not None:
+            reply[CERT_CIPHER_MODES] = modes
+        return Message({MessageHeaderKey.ORIGIN: "server"}, reply)
+
+    def test_unknown_peer_uses_cbc(self):
+        manager = CredentialManager(Endpoint("site-1"))
+        assert manager.get_cipher_mode("server") == CipherMode.CBC
+
+    def test_old_peer_uses_cbc(self):
+        manager = CredentialManager(Endpoint("site-1"))
+        manager.process_response(self._response())
+        assert manager.get_cipher_mode("server") == CipherMode.CBC
+
+    def test_chunked_gcm_negotiated(self):
+        manager = CredentialManager(Endpoint("site-1"))
+        manager.process_response(self._response([CipherMode.CHUNKED_GCM, CipherMode.CBC]))
+        assert manager.get_cipher_mode("server") == CipherMode.CHUNKED_GCM
+
+    def test_chunked_gcm_disabled_locally(self):
+        manager = CredentialManager(Endpoint("site-1"))
+        manager.cipher_modes = [CipherMode.CBC]
+        manager.process_response(self._response([CipherMode.CHUNKED_GCM, CipherMode.CBC]))
+        assert manager.get_cipher_mode("server") == CipherMode.CBC
@@ -0,0 +1,38 @@
+# Copyright (c) 2025, NVIDIA CORPORATION.  All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import pytest
+
+from nvflare.fuel.f3.cellnet.core_cell import CoreCell
+from nvflare.fuel.f3.stats_pool import StatsPoolManager
+
+
+@pytest.fixture
+def make_core_cell():
+    """Factory of CoreCells which are marked running but not started, so nothing is sent over the network"""
+    cells = []
+    pools = set(StatsPoolManager.pools)
+
+    def make(fqcn: str) -> CoreCell:
+        cell = CoreCell(fqcn, "tcp://localhost:8002", secure=False, credentials={})
+        cell.running = True
+        cells.append(cell)
+        return cell
+
+    yield make
+
+    # Unstarted cells are never cleaned up, so the names can be used by other tests
+    for cell in cells:
+        CoreCell.ALL_CELLS.pop(cell.get_fqcn(), None)
+    for pool in set(StatsPoolManager.pools) - pools:
+        StatsPoolManager.delete_pool(pool)
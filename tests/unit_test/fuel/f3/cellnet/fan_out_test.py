@@ -0,0 +1,201 @@
+# Copyright (c) 2025, NVIDIA CORPORATION.  All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import pytest
+
+from nvflare.fuel.f3.cellnet.core_cell import CoreCell, TargetMessage
+from nvflare.fuel.f3.cellnet.defs import CellPropertyKey, MessageHeaderKey, MessageType, ReturnReason
+from nvflare.fuel.f3.endpoint import Endpoint
+from nvflare.fuel.f3.message import Message
+
+PAYLOAD = b"model" * 1000
+
+
+def _endpoint(name: str, fan_out=True) -> Endpoint:
+    return Endpoint(name, properties={CellPropertyKey.FAN_OUT: True} if fan_out else {})
+
+
+class FakeNetwork:
+    """Next hops of the targets and the messages sent by the cell"""
+
+    def __init__(self, cell: CoreCell, routes: dict):
+        self.routes = routes
+        self.sent = []
+        cell._find_endpoint = self.find_endpoint
+        cell._send_to_endpoint = self.send_to_endpoint
+
+    def find_endpoint(self, target, for_msg):
+        ep = self.routes.get(target)
+        return ("", ep) if ep else ("unreachable", None)
+
+    def send_to_endpoint(self, to_endpoint, message, shared_payload=None):
+        self.sent.append((to_endpoint.name, message))
+        return ""
+
+    def sent_to(self, name: str) -> list:
+        return [m for n, m in self.sent if n == name]
+
+
+@pytest.fixture
+def make_cell(make_core_cell):
+    def make(fqcn: str, routes: dict):
+        cell = make_core_cell(fqcn)
+        return cell, FakeNetwork(cell, routes)
+
+    return make
+
+
+def _broadcast(cell: CoreCell, targets: list, secure=False):
+    message = Message({MessageHeaderKey.SECURE: secure, MessageHeaderKey.REQ_ID: "1"}, PAYLOAD)
+    target_msgs = {t: TargetMessage(t, "ch", "topic", message) for t in targets}
+    return cell._send_target_messages(target_msgs)
+
+
+class TestFanOut:
+    def test_grouped_by_next_hop(self, make_cell):
+        relay = _endpoint("relay")
+        old_relay = _endpoint("old_relay", fan_out=False)
+        routes = {
+            "relay": relay,
+            "relay.c1": relay,
+            "relay.c2": relay,
+            "relay.c3": relay,
+            "old_relay.c1": old_relay,
+            "old_relay.c2": old_relay,
+        }
+        cell, net = make_cell("server", routes)
+
+        errs = _broadcast(cell, list(routes.keys()))
+
+        assert errs == {t: "" for t in routes}
+        to_relay = net.sent_to("relay")
+        assert len(to_relay) == 2
+        fan_out = [m for m in to_relay if m.get_header(MessageHeaderKey.FAN_OUT_TARGETS)]
+        assert len(fan_out) == 1
+        assert fan_out[0].get_header(MessageHeaderKey.FAN_OUT_TARGETS) == ["relay.c1", "relay.c2", "relay.c3"]
+        assert fan_out[0].get_header(MessageHeaderKey.DESTINATION) == "relay"
+
+        # The next hop doesn't support fan-out
+        assert [m.get_header(MessageHeaderKey.DESTINATION) for m in net.sent_to("old_relay")] == [
+            "old_relay.c1",
+            "old_relay.c2",
+        ]
+
+    def test_secure_not_grouped(self, make_cell):
+        relay = _endpoint("relay")
+        cell, net = make_cell("server", {"relay.c1": relay, "relay.c2": relay})
+
+        _broadcast(cell, ["relay.c1", "relay.c2"], secure=True)
+        assert [m.get_header(MessageHeaderKey.DESTINATION) for m in net.sent_to("relay")] == ["relay.c1", "relay.c2"]
+
+    def test_disabled(self, make_cell):
+        relay = _endpoint("relay")
+        cell, net = make_cell("server", {"relay.c1": relay, "relay.c2": relay})
+        cell.fan_out = False
+
+        _broadcast(cell, ["relay.c1", "relay.c2"])
+        assert len(net.sent_to("relay")) == 2
+
+    def test_relay_forwards(self, make_cell):
+        sub_relay = _endpoint("relay.sub")
+        routes = {
+            "relay.sub": sub_relay,
+            "relay.sub.c1": sub_relay,
+            "relay.sub.c2": sub_relay,
+            "relay.c3": _endpoint("relay.c3"),
+            "server": _endpoint("server"),
+        }
+        cell, net = make_cell("relay", routes)
+        targets = ["relay.sub.c1", "relay.sub.c2", "relay.c3", "relay.c4"]
+        route = [("server", 0.0)]
+        message = Message(
+            {
+                MessageHeaderKey.ORIGIN: "server",
+                MessageHeaderKey.DESTINATION: "relay",
+                MessageHeaderKey.REQ_ID: "1",
+                MessageHeaderKey.REPLY_EXPECTED: True,
+                MessageHeaderKey.ROUTE: route,
+                MessageHeaderKey.FAN_OUT_TARGETS: targets,
+            },
+            PAYLOAD,
+        )
+
+        cell._fan_out(_endpoint("server"), "server", MessageType.REQ, message)
+
+        # One copy for the targets behind the sub-relay
+        (to_sub_relay,) = net.sent_to("relay.sub")
+        assert to_sub_relay.get_header(MessageHeaderKey.DESTINATION) == "relay.sub"
+        assert to_sub_relay.get_header(MessageHeaderKey.FAN_OUT_TARGETS) == ["relay.sub.c1", "relay.sub.c2"]
+        assert to_sub_relay.payload is PAYLOAD
+
+        (to_child,) = net.sent_to("relay.c3")
+        assert to_child.get_header(MessageHeaderKey.DESTINATION) == "relay.c3"
+        assert to_child.get_header(MessageHeaderKey.FAN_OUT_TARGETS) is None
+        assert to_child.get_header(MessageHeaderKey.FROM_CELL) == "relay"
+
+        # The route of each copy is separate
+        assert route == [("server", 0.0)]
+        assert len(to_child.get_header(MessageHeaderKey.ROUTE)) == 2
+
+        # The unreachable target is returned to the origin
+        (returned,) = net.sent_to("server")
+        assert returned.get_header(MessageHeaderKey.MSG_TYPE) == MessageType.RETURN
+        assert returned.get_header(MessageHeaderKey.RETURN_REASON) == ReturnReason.CANT_FORWARD
+        assert returned.get_header(MessageHeaderKey.ORIGINAL_HEADERS)[MessageHeaderKey.DESTINATION] == "relay.c4"
+
+    def test_failed_fan_out_returned_for_each_target(self, make_cell):
+        cell, net = make_cell("relay", {"server": _endpoint("server")})
+        message = Message(
+            {
+                MessageHeaderKey.ORIGIN: "server",
+                MessageHeaderKey.DESTINATION: "relay.sub",
+                MessageHeaderKey.REQ_ID: "1",
+                MessageHeaderKey.REPLY_EXPECTED: True,
+                MessageHeaderKey.FAN_OUT_TARGETS: ["relay.sub.c1", "relay.sub.c2"],
+            },
+            PAYLOAD,
+        )
+
+        cell._forward(_endpoint("server"), "server", "relay.sub", MessageType.REQ, message)
+
+        returned = net.sent_to("server")
+        destinations = [m.get_header(MessageHeaderKey.ORIGINAL_HEADERS)[MessageHeaderKey.DESTINATION] for m in returned]
+        assert destinations == ["relay.sub.c1", "relay.sub.c2"]
+        assert all(
+            MessageHeaderKey.FAN_OUT_TARGETS not in m.get_header(MessageHeaderKey.ORIGINAL_HEADERS) for m in returned
+        )
+
+    def test_intercepted_fan_out_returned_for_each_target(self, make_cell):
+        cell, net = make_cell("relay", {"server": _endpoint("server")})
+        cell.set_message_interceptor(lambda message: Message({MessageHeaderKey.RETURN_CODE: "denied"}, None))
+        message = Message(
+            {
+                MessageHeaderKey.MSG_TYPE: MessageType.REQ,
+                MessageHeaderKey.ORIGIN: "server",
+                MessageHeaderKey.DESTINATION: "relay",
+                MessageHeaderKey.REQ_ID: "1",
+                MessageHeaderKey.REPLY_EXPECTED: True,
+                MessageHeaderKey.FAN_OUT_TARGETS: ["relay.c1", "relay.c2"],
+            },
+            PAYLOAD,
+        )
+
+        cell._process_received_msg(_endpoint("server"), None, message)
+
+        returned = net.sent_to("server")
+        destinations = [m.get_header(MessageHeaderKey.ORIGINAL_HEADERS)[MessageHeaderKey.DESTINATION] for m in returned]
+        assert destinations == ["relay.c1", "relay.c2"]
+        for m in returned:
+            assert m.get_header(MessageHeaderKey.MSG_TYPE) == MessageType.RETURN
+            assert m.get_header(MessageHeaderKey.RETURN_REASON) == ReturnReason.INTERCEPT
+            assert m.get_header(MessageHeaderKey.RETURN_CODE) == "denied"
@@ -0,0 +1,171 @@
+# Copyright (c) 2025, NVIDIA CORPORATION.  All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import copy
+from types import SimpleNamespace
+
+import pytest
+
+from nvflare.fuel.f3.cellnet import core_cell
+from nvflare.fuel.f3.cellnet.cell_cipher import SimpleCellCipher
+from nvflare.fuel.f3.cellnet.core_cell import CoreCell, TargetMessage, _SharedPayload
+from nvflare.fuel.f3.cellnet.defs import CipherMode, Encoding, MessageHeaderKey
+from nvflare.fuel.f3.cellnet.utils import decode_payload
+from nvflare.fuel.f3.endpoint import Endpoint
+from nvflare.fuel.f3.message import Message
+from nvflare.lighter.utils import Identity, generate_cert, generate_keys
+
+TARGETS = ["site-1", "site-2", "site-3"]
+
+
+class FakeCredentialManager:
+    """Encrypts with real ciphers, certs are passed as objects instead of PEM"""
+
+    def __init__(self, cipher: SimpleCellCipher, modes: dict):
+        self.cipher = cipher
+        self.modes = modes
+        self.multicasts = 0
+
+    def get_cipher_mode(self, fqcn):
+        return self.modes.get(fqcn, CipherMode.CBC)
+
+    def encrypt_multicast(self, payload):
+        self.multicasts += 1
+        return self.cipher.encrypt_multicast(payload)
+
+    def wrap_multicast(self, target_cert, cipher_text):
+        return self.cipher.wrap_multicast(cipher_text, target_cert)
+
+
+@pytest.fixture(scope="module")
+def pki():
+    ca_key, ca_pub_key = generate_keys()
+    ca = Identity("ca")
+    ca_cert = generate_cert(ca, ca, ca_key, ca_pub_key, ca=True)
+
+    result = {}
+    for name in ["server"] + TARGETS:
+        key, pub_key = generate_keys()
+        cert = generate_cert(Identity(name), ca, ca_key, pub_key)
+        result[name] = (SimpleCellCipher(ca_cert, key, cert), cert)
+    return result
+
+
+def _fake_cell(pki, modes: dict):
+    cipher, _ = pki["server"]
+    return SimpleNamespace(
+        credential_manager=FakeCredentialManager(cipher, modes),
+        cert_ex=SimpleNamespace(get_certificate=lambda fqcn: pki[fqcn][1]),
+    )
+
+
+def _target_message(shared_msg: Message, target: str) -> Message:
+    msg = Message(copy.copy(shared_msg.headers), shared_msg.payload)
+    msg.set_header(MessageHeaderKey.DESTINATION, target)
+    return msg
+
+
+@pytest.fixture
+def encode_counter(monkeypatch):
+    calls = []
+    encode = core_cell.encode_payload
+
+    def counting_encode(message, *args, **kwargs):
+        if message.get_header(MessageHeaderKey.PAYLOAD_ENCODING) is None:
+            calls.append(message)
+        return encode(message, *args, **kwargs)
+
+    monkeypatch.setattr(core_cell, "encode_payload", counting_encode)
+    return calls
+
+
+class TestSharedPayload:
+    def test_encoded_once(self, pki, encode_counter):
+        cell = _fake_cell(pki, {})
+        payload = {"round": 1, "weights": bytes(range(256)) * 100}
+        shared_msg = Message({}, payload)
+        shared = _SharedPayload(shared_msg)
+
+        messages = []
+        for t in TARGETS:
+            msg = _target_message(shared_msg, t)
+            CoreCell._use_shared_payload(cell, shared, msg)
+            messages.append(msg)
+
+        assert len(encode_counter) == 1
+        assert shared_msg.payload is payload
+        assert all(m.get_header(MessageHeaderKey.PAYLOAD_ENCODING) == Encoding.FOBS for m in messages)
+        assert all(m.payload is messages[0].payload for m in messages)
+
+        decode_payload(messages[1])
+        assert messages[1].payload == payload
+
+    def test_encrypted_once(self, pki):
+        # site-3 doesn't support chunked GCM, so it's encrypted separately later
+        modes = {"site-1": CipherMode.CHUNKED_GCM, "site-2": CipherMode.CHUNKED_GCM}
+        cell = _fake_cell(pki, modes)
+        payload = bytes(range(256)) * 100
+        shared_msg = Message({MessageHeaderKey.SECURE: True}, payload)
+        shared = _SharedPayload(shared_msg)
+
+        messages = {}
+        for t in TARGETS:
+            msg = _target_message(shared_msg, t)
+            CoreCell._use_shared_payload(cell, shared, msg)
+            messages[t] = msg
+
+        assert cell.credential_manager.multicasts == 1
+        assert not messages["site-3"].get_header(MessageHeaderKey.ENCRYPTED)
+        assert messages["site-3"].payload is payload
+
+        _, server_cert = pki["server"]
+        for t in ["site-1", "site-2"]:
+            msg = messages[t]
+            assert msg.get_header(MessageHeaderKey.ENCRYPTED)
+            assert msg.get_header(MessageHeaderKey.CIPHER_MODE) == CipherMode.CHUNKED_GCM
+            assert msg.get_header(MessageHeaderKey.CLEAR_PAYLOAD_LEN) == len(payload)
+
+            receiver, _ = pki[t]
+            assert receiver.decrypt_chunked(msg.payload, server_cert) == payload
+
+
+@pytest.fixture
+def sending_cell(make_core_cell, monkeypatch):
+    cell = make_core_cell("shared_server")
+    cell._find_endpoint = lambda target, for_msg: ("", Endpoint(target))
+    sent = []
+    monkeypatch.setattr(cell.communicator, "send", lambda endpoint, app_id, message: sent.append(message))
+    return cell, sent
+
+
+class TestBroadcast:
+    def test_changed_payload_is_encoded_again(self, sending_cell, encode_counter):
+        cell, sent = sending_cell
+        message = Message({}, {"round": 1})
+
+        def broadcast():
+            sent.clear()
+            cell._send_target_messages({t: TargetMessage(t, "ch", "topic", message) for t in TARGETS})
+            for msg in sent:
+                decode_payload(msg)
+            return [msg.payload for msg in sent]
+
+        assert broadcast() == [{"round": 1}] * len(TARGETS)
+
+        # The same message is sent again after changing the payload in place
+        message.payload["round"] = 2
+        assert broadcast() == [{"round": 2}] * len(TARGETS)
+
+        assert len(encode_counter) == 2
+        # Nothing is cached on the message
+        assert set(vars(message)) == {"headers", "payload"}
@@ -0,0 +1,152 @@
+# Copyright (c) 2025, NVIDIA CORPORATION.  All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import json
+import os
+
+import pytest
+
+from nvflare.fuel.f3.cellnet.defs import MessageHeaderKey, MessageType
+from nvflare.fuel.f3.cellnet.tracing import MessageTracer, TraceStage
+from nvflare.fuel.f3.endpoint import Endpoint
+from nvflare.fuel.f3.message import Message
+
+
+def _read_events(tracer: MessageTracer) -> list:
+    with open(tracer.file_name) as f:
+        text = f.read().rstrip()
+    # The closing bracket is missing until the tracer is closed
+    if not text.endswith("]"):
+        text += "]"
+    return json.loads(text)
+
+
+def _message(trace_id=None) -> Message:
+    headers = {
+        MessageHeaderKey.REQ_ID: "req1",
+        MessageHeaderKey.MSG_TYPE: MessageType.REQ,
+        MessageHeaderKey.ORIGIN: "server",
+        MessageHeaderKey.DESTINATION: "site-1",
+        MessageHeaderKey.ROUTE: [("server", 0.0)],
+    }
+    if trace_id:
+        headers[MessageHeaderKey.TRACE_ID] = trace_id
+    return Message(headers, b"data")
+
+
+class TestMessageTracer:
+    def test_disabled(self, tmp_path):
+        tracer = MessageTracer(0.0, str(tmp_path))
+        assert tracer.sample(_message()) is None
+
+        message = _message("req1")
+        assert not tracer.is_traced(message)
+        with tracer.span("server", message, TraceStage.ENCODE):
+            pass
+        tracer.close()
+        assert not os.path.exists(tracer.file_name)
+
+    def test_sample(self, tmp_path):
+        tracer = MessageTracer(1.0, str(tmp_path))
+        assert tracer.sample(_message()) == "req1"
+        assert tracer.sample(Message({}, None))
+
+    def test_spans(self, tmp_path):
+        tracer = MessageTracer(1.0, str(tmp_path))
+        with tracer.span("server", _message(), TraceStage.ENCODE):
+            pass
+        with tracer.span("server", _message("req1"), TraceStage.ENCRYPT):
+            pass
+        tracer.record("site-1", _message("req1"), TraceStage.WIRE, 1.5, 0.25)
+        tracer.close()
+
+        events = _read_events(tracer)
+        assert [e["name"] for e in events] == [TraceStage.ENCRYPT, TraceStage.WIRE]
+        wire = events[1]
+        assert wire["ph"] == "X"
+        assert wire["ts"] == 1500000
+        assert wire["dur"] == 250000
+        assert wire["args"]["trace_id"] == "req1"
+        assert wire["args"]["cell"] == "site-1"
+        assert wire["args"]["hop"] == 1
+
+        # Nothing is written after closing
+        tracer.record("site-1", _message("req1"), TraceStage.WIRE, 1.5, 0.25)
+        assert len(_read_events(tracer)) == 2
+
+    def test_flush(self, tmp_path):
+        tracer = MessageTracer(1.0, str(tmp_path))
+        for _ in range(3):
+            tracer.record("server", _message("req1"), TraceStage.SEND, 1.0, 0.1)
+        tracer.flush()
+        tracer.record("server", _message("req1"), TraceStage.SEND, 1.0, 0.1)
+        tracer.flush()
+
+        assert len(_read_events(tracer)) == 4
+        tracer.close()
+
+
+@pytest.fixture
+def cells(tmp_path, make_core_cell):
+    tracer = MessageTracer(1.0, str(tmp_path))
+    sender = make_core_cell("tracing_server")
+    receiver = make_core_cell("tracing_server.site")
+    for cell in (sender, receiver):
+        cell.tracer = tracer
+    sender._find_endpoint = lambda target, for_msg: ("", Endpoint(target))
+
+    yield sender, receiver, tracer
+
+    tracer.close()
+
+
+class TestCellTracing:
+    def test_stages_recorded(self, cells):
+        sender, receiver, tracer = cells
+        received = []
+        receiver.register_request_cb("test", "topic", lambda request: received.append(request))
+
+        # The receiver is in the same process, so the message is delivered directly
+        errs = sender.fire_and_forget("test", "topic", receiver.get_fqcn(), Message(payload=b"data"))
+        assert errs == {receiver.get_fqcn(): ""}
+        assert len(received) == 1
+        trace_id = received[0].get_header(MessageHeaderKey.TRACE_ID)
+        assert trace_id
+
+        tracer.flush()
+        events = _read_events(tracer)
+        assert {e["args"]["trace_id"] for e in events} == {trace_id}
+        stages = [(e["args"]["cell"], e["name"]) for e in events]
+        assert stages == [
+            (sender.get_fqcn(), TraceStage.ENCODE),
+            (sender.get_fqcn(), TraceStage.ENCRYPT),
+            (receiver.get_fqcn(), TraceStage.WIRE),
+            (receiver.get_fqcn(), TraceStage.FRAME_QUEUE),
+            (receiver.get_fqcn(), TraceStage.DECRYPT),
+            (receiver.get_fqcn(), TraceStage.DECODE),
+            (receiver.get_fqcn(), TraceStage.CALLBACK),
+        ]
+
+    def test_not_sampled(self, cells):
+        sender, receiver, tracer = cells
+        tracer.sample_rate = 0.0
+        received = []
+        receiver.register_request_cb("test", "topic", lambda request: received.append(request))
+
+        # A trace ID of a previously received message is not carried over
+        message = Message({MessageHeaderKey.TRACE_ID: "old"}, b"data")
+        sender.fire_and_forget("test", "topic", receiver.get_fqcn(), message)
+        assert received[0].get_header(MessageHeaderKey.TRACE_ID) is None
+
+        tracer.flush()
+        assert not os.path.exists(tracer.file_name)
@@ -24,6 +24,7 @@ from nvflare.fuel.f3.drivers.connector_info import Mode
 from nvflare.fuel.f3.drivers.net_utils import parse_url
 from nvflare.fuel.f3.endpoint import Endpoint, EndpointMonitor, EndpointState
 from nvflare.fuel.f3.message import Message, MessageReceiver
+from nvflare.fuel.f3.sfm.constants import HandshakeKeys, HeaderKeys
 
 log = logging.getLogger(__name__)
 
@@ -32,6 +33,8 @@ NODE_A = "Communicator A"
 NODE_B = "Communicator B"
 MESSAGE_FROM_A = "Test message from a"
 MESSAGE_FROM_B = "Test message from b"
+PARALLEL_CONNECTIONS = 3
+NUM_MESSAGES = 30
 
 
 class CommState:
@@ -59,7 +62,7 @@ class Receiver(MessageReceiver):
         self.comm_state = comm_state
 
     def process_message(self, endpoint: Endpoint, connection: Connection, app_id: int, message: Message):
-        text = message.payload.decode("utf-8")
+        text = bytes(message.payload).decode("utf-8")
         if endpoint.name == NODE_A:
             assert text == MESSAGE_FROM_A
             self.comm_state.a_received_event.set()
@@ -68,6 +71,17 @@ class Receiver(MessageReceiver):
             self.comm_state.b_received_event.set()
 
 
+class ConnectionRecorder(MessageReceiver):
+    def __init__(self):
+        self.connections = {}  # ordered => list of connection names
+        self.count = 0
+
+    def process_message(self, endpoint: Endpoint, connection: Connection, app_id: int, message: Message):
+        ordered = message.get_header(HeaderKeys.ORDER_KEY) is not None
+        self.connections.setdefault(ordered, []).append(connection.name)
+        self.count += 1
+
+
 def get_comm_a(comm_state):
     local_endpoint = Endpoint(NODE_A, {"foo": "test"})
     comm = Communicator(local_endpoint)
@@ -91,6 +105,7 @@ class TestCommunicator:
             ("tcp", "2000-3000"),
             ("grpc", "3000-4000"),
             ("http", "4000-5000"),
+            ("atcp", "5000-6000"),
         ],
     )
     def test_sfm_message(self, scheme, port_range):
@@ -117,7 +132,9 @@ class TestCommunicator:
             log.info("Waiting for both endpoints to be ready")
             time.sleep(0.1)
 
-        comm_a.send(Endpoint(NODE_B), APP_ID, Message({}, MESSAGE_FROM_A.encode("utf-8")))
+        # payload as a buffer list
+        payload = MESSAGE_FROM_A.encode("utf-8")
+        comm_a.send(Endpoint(NODE_B), APP_ID, Message({}, [payload[:4], memoryview(payload[4:])]))
         comm_b.send(Endpoint(NODE_A), APP_ID, Message({}, MESSAGE_FROM_B.encode("utf-8")))
 
         time.sleep(1)
@@ -126,3 +143,42 @@ class TestCommunicator:
 
         comm_b.stop()
         comm_a.stop()
+
+    def test_parallel_connections(self):
+        comm_state = CommState()
+        comm_a = get_comm_a(comm_state)
+        recorder = ConnectionRecorder()
+        comm_b = Communicator(Endpoint(NODE_B, {HandshakeKeys.MAX_CONNECTIONS: PARALLEL_CONNECTIONS}))
+        comm_b.register_message_receiver(APP_ID, recorder)
+
+        _, url, _ = comm_a.start_listener("tcp", {"ports": "6000-7000"})
+        comm_a.start()
+        for _ in range(PARALLEL_CONNECTIONS):
+            comm_b.add_connector(url, Mode.ACTIVE)
+        comm_b.start()
+
+        try:
+            for _ in range(100):
+                conns_a = comm_a.conn_manager.get_connections(NODE_B)
+                conns_b = comm_b.conn_manager.get_connections(NODE_A)
+                if conns_a and conns_b and len(conns_a) == len(conns_b) == PARALLEL_CONNECTIONS:
+                    break
+                time.sleep(0.1)
+            assert len(comm_a.conn_manager.get_connections(NODE_B)) == PARALLEL_CONNECTIONS
+            assert len(comm_b.conn_manager.get_connections(NODE_A)) == PARALLEL_CONNECTIONS
+
+            # Messages with order key are striped, others stay on one connection
+            for i in range(NUM_MESSAGES):
+                comm_a.send(Endpoint(NODE_B), APP_ID, Message({HeaderKeys.ORDER_KEY: 1}, b"striped"))
+                comm_a.send(Endpoint(NODE_B), APP_ID, Message({}, b"ordered"))
+
+            for _ in range(100):
+                if recorder.count == 2 * NUM_MESSAGES:
+                    break
+                time.sleep(0.1)
+
+            assert len(set(recorder.connections[True])) == PARALLEL_CONNECTIONS
+            assert len(set(recorder.connections[False])) == 1
+        finally:
+            comm_b.stop()
+            comm_a.stop()
@@ -0,0 +1,236 @@
+# Copyright (c) 2025, NVIDIA CORPORATION.  All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import os
+import queue
+import socket
+import threading
+import time
+
+import pytest
+
+from nvflare.fuel.f3.comm_error import CommError
+from nvflare.fuel.f3.connection import ConnState, FrameReceiver
+from nvflare.fuel.f3.drivers import unix_socket_driver
+from nvflare.fuel.f3.drivers.connector_info import ConnectorInfo, Mode
+from nvflare.fuel.f3.drivers.driver import ConnMonitor
+from nvflare.fuel.f3.drivers.driver_params import DriverParams
+from nvflare.fuel.f3.drivers.net_utils import parse_url
+from nvflare.fuel.f3.drivers.shm_driver import (
+    ShmConnection,
+    ShmDriver,
+    ShmRing,
+    _receive_hello,
+    _send_hello,
+    shm_handshake,
+    shm_supported,
+)
+from nvflare.fuel.f3.sfm.prefix import PREFIX_LEN, Prefix
+
+pytestmark = pytest.mark.skipif(not shm_supported(), reason="shared memory driver is not supported")
+
+RING_SIZE = 64 * 1024
+TIMEOUT = 10
+
+
+def _make_frame(payload: bytes) -> bytes:
+    prefix = bytearray(PREFIX_LEN)
+    Prefix(length=PREFIX_LEN + len(payload)).to_buffer(prefix, 0)
+    return bytes(prefix) + payload
+
+
+class Receiver(FrameReceiver):
+    def __init__(self):
+        self.frames = queue.Queue()
+
+    def process_frame(self, frame):
+        self.frames.put(bytes(frame))
+
+
+def _connector(mode=Mode.ACTIVE, params=None):
+    return ConnectorInfo("test", None, params or {}, mode, 0, 0, False, threading.Event())
+
+
+def _connection_pair(ring_size=RING_SIZE):
+    sock_a, sock_b = socket.socketpair(socket.AF_UNIX, socket.SOCK_STREAM)
+    result = {}
+    thread = threading.Thread(target=lambda: result.update(b=shm_handshake(sock_b, ring_size, active=False)))
+    thread.start()
+    tx_a, rx_a = shm_handshake(sock_a, ring_size, active=True)
+    thread.join()
+    tx_b, rx_b = result["b"]
+
+    conn_a = ShmConnection(sock_a, _connector(), tx_a, rx_a)
+    conn_b = ShmConnection(sock_b, _connector(), tx_b, rx_b)
+    receivers = []
+    threads = []
+    for conn in (conn_a, conn_b):
+        receiver = Receiver()
+        conn.register_frame_receiver(receiver)
+        receivers.append(receiver)
+        t = threading.Thread(target=conn.read_loop, daemon=True)
+        t.start()
+        threads.append(t)
+    return (conn_a, conn_b), receivers, threads
+
+
+class TestShmConnection:
+    @pytest.mark.parametrize("size", [0, 100, RING_SIZE - PREFIX_LEN, RING_SIZE, 10 * RING_SIZE + 7])
+    def test_send_frame(self, size):
+        (conn_a, conn_b), (_, receiver_b), threads = _connection_pair()
+        frame = _make_frame(os.urandom(size))
+
+        conn_a.send_frame(frame)
+        assert receiver_b.frames.get(timeout=TIMEOUT) == frame
+
+        conn_a.close()
+        conn_b.close()
+        for t in threads:
+            t.join(TIMEOUT)
+
+    def test_both_directions(self):
+        (conn_a, conn_b), (receiver_a, receiver_b), threads = _connection_pair()
+        frames = [_make_frame(os.urandom(n * 1000)) for n in range(1, 200, 7)]
+
+        def send_all(conn):
+            for f in frames:
+                conn.send_frames([f[:PREFIX_LEN], memoryview(f)[PREFIX_LEN:]])
+
+        senders = [threading.Thread(target=send_all, args=(c,)) for c in (conn_a, conn_b)]
+        for t in senders:
+            t.start()
+
+        for receiver in (receiver_a, receiver_b):
+            assert [receiver.frames.get(timeout=TIMEOUT) for _ in frames] == frames
+
+        for t in senders:
+            t.join(TIMEOUT)
+        conn_a.close()
+        conn_b.close()
+        for t in threads:
+            t.join(TIMEOUT)
+
+    def test_peer_closed_while_sending(self):
+        (conn_a, conn_b), (_, receiver_b), threads = _connection_pair()
+
+        # The receiver is stuck processing the first frame, so the ring fills up
+        blocked = threading.Event()
+        receiver_b.process_frame = lambda frame: blocked.wait(TIMEOUT)
+        conn_a.send_frame(_make_frame(b"first"))
+
+        sender = threading.Thread(target=conn_a.send_frame, args=(_make_frame(bytes(4 * RING_SIZE)),))
+        sender.start()
+        time.sleep(0.2)
+        assert sender.is_alive()
+
+        # The writer waiting for space is woken up when the peer is gone
+        conn_b.close()
+        sender.join(TIMEOUT)
+        assert not sender.is_alive()
+
+        blocked.set()
+        conn_a.close()
+        for t in threads:
+            t.join(TIMEOUT)
+
+
+class TestShmHandshake:
+    @pytest.mark.parametrize("ring_size", [0, -1, 2 * RING_SIZE, "65536", True])
+    def test_bad_ring_size(self, ring_size):
+        sock_a, sock_b = socket.socketpair(socket.AF_UNIX, socket.SOCK_STREAM)
+        fd = ShmRing.create_segment(RING_SIZE)
+        with sock_a, sock_b:
+            try:
+                _send_hello(sock_a, ring_size, fd)
+            finally:
+                os.close(fd)
+
+            with pytest.raises(CommError) as exc_info:
+                _receive_hello(sock_b)
+            assert exc_info.value.code == CommError.BAD_DATA
+
+
+class Monitor(ConnMonitor):
+    def __init__(self):
+        self.connections = queue.Queue()
+
+    def state_change(self, connection):
+        if connection.state == ConnState.CONNECTED:
+            connection.register_frame_receiver(Receiver())
+            self.connections.put(connection)
+
+
+def _start_server(tmp_path):
+    connect_url, listen_url = ShmDriver.get_urls("shm", {"socket_dir": str(tmp_path)})
+    assert connect_url == listen_url
+    params = parse_url(listen_url)
+
+    server = ShmDriver()
+    monitor = Monitor()
+    server.register_conn_monitor(monitor)
+    threading.Thread(target=server.listen, args=(_connector(Mode.PASSIVE, params),), daemon=True).start()
+
+    start = time.time()
+    while not os.path.exists(params["path"]):
+        assert time.time() - start < TIMEOUT
+        time.sleep(0.01)
+    return server, monitor, params
+
+
+class TestShmDriver:
+    def test_listen_and_connect(self, tmp_path):
+        server, server_monitor, params = _start_server(tmp_path)
+        assert params["path"].startswith(str(tmp_path))
+
+        client = ShmDriver()
+        client_monitor = Monitor()
+        client.register_conn_monitor(client_monitor)
+        threading.Thread(target=client.connect, args=(_connector(Mode.ACTIVE, params),), daemon=True).start()
+
+        client_conn = client_monitor.connections.get(timeout=TIMEOUT)
+        server_conn = server_monitor.connections.get(timeout=TIMEOUT)
+        frame = _make_frame(os.urandom(1024 * 1024))
+        client_conn.send_frame(frame)
+        assert server_conn.frame_receiver.frames.get(timeout=TIMEOUT) == frame
+
+        server_conn.send_frame(frame)
+        assert client_conn.frame_receiver.frames.get(timeout=TIMEOUT) == frame
+
+        if hasattr(socket, "SO_PEERCRED"):
+            for conn in (client_conn, server_conn):
+                props = conn.get_conn_properties()
+                assert props[DriverParams.PEER_PID.value] == os.getpid()
+                assert props[DriverParams.PEER_UID.value] == os.getuid()
+
+        client.shutdown()
+        server.shutdown()
+        assert not os.path.exists(params["path"])
+
+    @pytest.mark.skipif(not hasattr(socket, "SO_PEERCRED"), reason="SO_PEERCRED is not supported")
+    def test_other_user_rejected(self, tmp_path, monkeypatch):
+        server, server_monitor, params = _start_server(tmp_path)
+        monkeypatch.setattr(unix_socket_driver, "get_peer_credentials", lambda sock: (1234, os.getuid() + 1, 0))
+
+        client = ShmDriver()
+        with pytest.raises(CommError):
+            client.connect(_connector(Mode.ACTIVE, params))
+
+        # The server closes the connection before the handshake
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        with sock:
+            sock.connect(params["path"])
+            sock.settimeout(TIMEOUT)
+            assert sock.recv(1) == b""
+        assert server_monitor.connections.empty()
+
+        server.shutdown()
@@ -0,0 +1,60 @@
+# Copyright (c) 2025, NVIDIA CORPORATION.  All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import os
+import socket
+import threading
+
+import pytest
+
+from nvflare.fuel.f3.drivers.connector_info import ConnectorInfo, Mode
+from nvflare.fuel.f3.drivers.socket_conn import MAX_IOV, SocketConnection
+from nvflare.fuel.f3.sfm.prefix import PREFIX_LEN, Prefix
+
+
+def _make_frame_buffers(payload_buffers: list) -> list:
+    length = PREFIX_LEN + sum(len(b) for b in payload_buffers)
+    prefix = bytearray(PREFIX_LEN)
+    Prefix(length=length).to_buffer(prefix, 0)
+    return [prefix] + payload_buffers
+
+
+class TestSocketConnection:
+    @pytest.mark.parametrize(
+        "payload_buffers",
+        [
+            [b"small"],
+            [os.urandom(3 * 1024 * 1024), bytearray(b"tail")],
+            [memoryview(os.urandom(100)) for _ in range(MAX_IOV + 10)],
+        ],
+    )
+    def test_send_frames(self, payload_buffers):
+        sock_a, sock_b = socket.socketpair()
+        connector = ConnectorInfo("test", None, {}, Mode.ACTIVE, 0, 0, False, threading.Event())
+        sender = SocketConnection(sock_a, connector)
+        receiver = SocketConnection(sock_b, connector)
+
+        frames = _make_frame_buffers(payload_buffers)
+        thread = threading.Thread(target=sender.send_frames, args=(frames,))
+        thread.start()
+        frame = receiver.read_frame()
+        thread.join()
+
+        assert bytes(frame) == b"".join(bytes(f) for f in frames)
+        sender.close()
+        receiver.close()
+
+    def test_join_small_frames(self):
+        big = bytes(1024 * 1024)
+        result = SocketConnection._join_small_frames([b"a", b"b", big, b"c"])
+        assert result == [b"ab", big, b"c"]
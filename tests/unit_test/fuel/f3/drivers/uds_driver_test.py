@@ -0,0 +1,148 @@
+# Copyright (c) 2025, NVIDIA CORPORATION.  All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import os
+import queue
+import socket
+import threading
+import time
+
+import pytest
+
+from nvflare.fuel.f3.comm_error import CommError
+from nvflare.fuel.f3.connection import ConnState, FrameReceiver
+from nvflare.fuel.f3.drivers import unix_socket_driver
+from nvflare.fuel.f3.drivers.connector_info import ConnectorInfo, Mode
+from nvflare.fuel.f3.drivers.driver import ConnMonitor
+from nvflare.fuel.f3.drivers.driver_params import DriverParams
+from nvflare.fuel.f3.drivers.net_utils import parse_url
+from nvflare.fuel.f3.drivers.uds_driver import UdsDriver, uds_supported
+from nvflare.fuel.f3.drivers.unix_socket_driver import check_peer_credentials, get_peer_credentials
+from nvflare.fuel.f3.sfm.prefix import PREFIX_LEN, Prefix
+
+pytestmark = pytest.mark.skipif(not uds_supported(), reason="Unix domain sockets are not supported")
+
+has_peer_cred = pytest.mark.skipif(not hasattr(socket, "SO_PEERCRED"), reason="SO_PEERCRED is not supported")
+
+TIMEOUT = 10
+
+
+def _make_frame(payload: bytes) -> bytes:
+    prefix = bytearray(PREFIX_LEN)
+    Prefix(length=PREFIX_LEN + len(payload)).to_buffer(prefix, 0)
+    return bytes(prefix) + payload
+
+
+def _connector(mode, params):
+    return ConnectorInfo("test", None, params, mode, 0, 0, False, threading.Event())
+
+
+class Receiver(FrameReceiver):
+    def __init__(self):
+        self.frames = queue.Queue()
+
+    def process_frame(self, frame):
+        self.frames.put(bytes(frame))
+
+
+class Monitor(ConnMonitor):
+    def __init__(self):
+        self.connections = queue.Queue()
+
+    def state_change(self, connection):
+        if connection.state == ConnState.CONNECTED:
+            connection.register_frame_receiver(Receiver())
+            self.connections.put(connection)
+
+
+def _start_server(tmp_path):
+    _, listen_url = UdsDriver.get_urls("uds", {"socket_dir": str(tmp_path)})
+    params = parse_url(listen_url)
+
+    server = UdsDriver()
+    monitor = Monitor()
+    server.register_conn_monitor(monitor)
+    threading.Thread(target=server.listen, args=(_connector(Mode.PASSIVE, params),), daemon=True).start()
+
+    start = time.time()
+    while not os.path.exists(params["path"]):
+        assert time.time() - start < TIMEOUT
+        time.sleep(0.01)
+    return server, monitor, params
+
+
+class TestPeerCredentials:
+    @has_peer_cred
+    def test_socketpair(self):
+        sock_a, sock_b = socket.socketpair(socket.AF_UNIX, socket.SOCK_STREAM)
+        with sock_a, sock_b:
+            assert get_peer_credentials(sock_a) == (os.getpid(), os.getuid(), os.getgid())
+            assert check_peer_credentials(sock_b) == (os.getpid(), os.getuid(), os.getgid())
+
+    @has_peer_cred
+    def test_other_user_rejected(self, monkeypatch):
+        monkeypatch.setattr(unix_socket_driver, "get_peer_credentials", lambda sock: (1234, os.getuid() + 1, 0))
+        sock_a, sock_b = socket.socketpair(socket.AF_UNIX, socket.SOCK_STREAM)
+        with sock_a, sock_b:
+            with pytest.raises(CommError):
+                check_peer_credentials(sock_a)
+
+
+class TestUdsDriver:
+    def test_listen_and_connect(self, tmp_path):
+        server, server_monitor, params = _start_server(tmp_path)
+        assert params["path"].startswith(str(tmp_path))
+        assert os.stat(params["path"]).st_mode & 0o777 == 0o600
+
+        client = UdsDriver()
+        client_monitor = Monitor()
+        client.register_conn_monitor(client_monitor)
+        threading.Thread(target=client.connect, args=(_connector(Mode.ACTIVE, params),), daemon=True).start()
+
+        client_conn = client_monitor.connections.get(timeout=TIMEOUT)
+        server_conn = server_monitor.connections.get(timeout=TIMEOUT)
+        frame = _make_frame(os.urandom(1024 * 1024))
+        client_conn.send_frame(frame)
+        assert server_conn.frame_receiver.frames.get(timeout=TIMEOUT) == frame
+
+        server_conn.send_frame(frame)
+        assert client_conn.frame_receiver.frames.get(timeout=TIMEOUT) == frame
+
+        if hasattr(socket, "SO_PEERCRED"):
+            for conn in (client_conn, server_conn):
+                props = conn.get_conn_properties()
+                assert props[DriverParams.PEER_PID.value] == os.getpid()
+                assert props[DriverParams.PEER_UID.value] == os.getuid()
+
+        client.shutdown()
+        server.shutdown()
+        assert not os.path.exists(params["path"])
+
+    @has_peer_cred
+    def test_other_user_rejected(self, tmp_path, monkeypatch):
+        server, server_monitor, params = _start_server(tmp_path)
+        monkeypatch.setattr(unix_socket_driver, "get_peer_credentials", lambda sock: (1234, os.getuid() + 1, 0))
+
+        client = UdsDriver()
+        with pytest.raises(CommError):
+            client.connect(_connector(Mode.ACTIVE, params))
+
+        # The server closes the connection without creating it
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        with sock:
+            sock.connect(params["path"])
+            sock.settimeout(TIMEOUT)
+            assert sock.recv(1) == b""
+        assert server_monitor.connections.empty()
+
+        server.shutdown()
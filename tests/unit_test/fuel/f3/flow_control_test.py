@@ -0,0 +1,106 @@
+# Copyright (c) 2025, NVIDIA CORPORATION.  All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import asyncio
+import threading
+import time
+
+from nvflare.fuel.f3.flow_control import GAUGE_BYTES, GAUGE_ITEMS, FlowControl, Watermarks
+from nvflare.fuel.f3.stats_pool import GaugePool
+
+
+class TestFlowControl:
+    def test_bytes_watermarks(self):
+        fc = FlowControl("test", Watermarks(high_bytes=100, low_bytes=50))
+        fc.add(60)
+        assert not fc.is_paused()
+        fc.add(60)
+        assert fc.is_paused()
+
+        # Still above the low watermark
+        fc.remove(60)
+        assert fc.is_paused()
+        fc.remove(20)
+        assert not fc.is_paused()
+
+    def test_items_watermarks(self):
+        fc = FlowControl("test", Watermarks(high_items=4))
+        for _ in range(5):
+            fc.add(1)
+        assert fc.is_paused()
+
+        # Default low watermark is half of the high watermark
+        fc.remove(1)
+        fc.remove(1)
+        assert fc.is_paused()
+        fc.remove(1)
+        assert not fc.is_paused()
+
+    def test_disabled(self):
+        fc = FlowControl("test", Watermarks())
+        for _ in range(1000):
+            fc.add(1024 * 1024)
+        assert not fc.is_paused()
+        assert fc.wait(timeout=0)
+
+    def test_parent_pauses_children(self):
+        parent = FlowControl("global", Watermarks(high_bytes=100))
+        child1 = parent.create_child("conn1", Watermarks(high_bytes=1000))
+        child2 = parent.create_child("conn2", Watermarks(high_bytes=1000))
+
+        child1.add(80)
+        child2.add(80)
+        assert parent.queued_bytes == 160
+        assert child1.is_paused() and child2.is_paused()
+
+        # Resumed when the parent is below its low watermark
+        child1.remove(80)
+        assert child2.is_paused()
+        child2.remove(40)
+        assert not child1.is_paused() and not child2.is_paused()
+
+    def test_wait_until_resumed(self):
+        fc = FlowControl("test", Watermarks(high_items=1))
+        fc.add(1)
+        fc.add(1)
+
+        def drain():
+            time.sleep(0.2)
+            fc.remove(1)
+            fc.remove(1)
+
+        threading.Thread(target=drain).start()
+        start = time.time()
+        assert fc.wait(timeout=5)
+        assert time.time() - start >= 0.1
+
+    def test_wait_timeout(self):
+        fc = FlowControl("test", Watermarks(high_items=1), max_wait=0.1)
+        fc.add(1)
+        fc.add(1)
+        assert not fc.wait()
+        assert not asyncio.run(fc.async_wait())
+
+    def test_gauges(self):
+        pool = GaugePool("queue", "test", [])
+        fc = FlowControl("global", Watermarks(), gauge_pool=pool)
+        fc.add(10)
+        fc.add(20)
+        fc.remove(10)
+
+        assert pool.get("global", GAUGE_BYTES) == 20
+        assert pool.get("global", GAUGE_BYTES, peak=True) == 30
+        assert pool.get("global", GAUGE_ITEMS) == 1
+        headers, rows = pool.get_table()
+        assert rows == [["global", "20", "30", "1", "2", "0", "0"]]
+        assert GaugePool.from_dict(pool.to_dict()).get("global", GAUGE_ITEMS, peak=True) == 2
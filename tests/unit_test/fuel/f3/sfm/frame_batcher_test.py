@@ -0,0 +1,265 @@
+# Copyright (c) 2025, NVIDIA CORPORATION.  All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import threading
+import time
+
+import msgpack
+import pytest
+
+from nvflare.fuel.f3.comm_error import CommError
+from nvflare.fuel.f3.connection import Connection
+from nvflare.fuel.f3.drivers.connector_info import ConnectorInfo, Mode
+from nvflare.fuel.f3.endpoint import Endpoint
+from nvflare.fuel.f3.message import MessageReceiver
+from nvflare.fuel.f3.sfm.conn_manager import ConnManager
+from nvflare.fuel.f3.sfm.constants import HeaderKeys, Types
+from nvflare.fuel.f3.sfm.frame_batcher import FLUSH_THREAD_POOL_SIZE, MAX_BATCHED_FRAME_SIZE, BatchFlusher, split_batch
+from nvflare.fuel.f3.sfm.prefix import PREFIX_LEN, Prefix
+from nvflare.fuel.f3.sfm.sfm_conn import SfmConnection
+from nvflare.fuel.f3.sfm.sfm_endpoint import SfmEndpoint
+
+BATCH_SIZE = 4096
+DELAY = 0.2
+
+
+class CaptureConnection(Connection):
+    def __init__(self):
+        super().__init__(ConnectorInfo("test", None, {}, Mode.ACTIVE, 0, 0, False, threading.Event()))
+        self.frames = []
+        self.sent = threading.Event()
+        self.closed = threading.Event()
+        # Sending blocks while this is cleared, like a peer not reading
+        self.unblocked = threading.Event()
+        self.unblocked.set()
+        self.error = None
+
+    def get_conn_properties(self) -> dict:
+        return {}
+
+    def close(self):
+        self.closed.set()
+
+    def send_frame(self, frame):
+        self.unblocked.wait()
+        if self.error:
+            raise self.error
+        self.frames.append(bytes(frame))
+        self.sent.set()
+
+
+def _unpack(frame: bytes) -> list:
+    """Returns (type, headers, payload) of the frames, BATCH frames are split"""
+    prefix = Prefix.from_bytes(frame)
+    if prefix.type == Types.BATCH:
+        result = []
+        for inner in split_batch(frame, prefix):
+            result.extend(_unpack(bytes(inner)))
+        return result
+
+    end = PREFIX_LEN + prefix.header_len
+    headers = msgpack.unpackb(frame[PREFIX_LEN:end]) if prefix.header_len else None
+    return [(prefix.type, headers, frame[end:])]
+
+
+def _sfm_conn():
+    conn = CaptureConnection()
+    sfm_conn = SfmConnection(conn, Endpoint("test"))
+    sfm_conn.enable_batching(BATCH_SIZE, DELAY)
+
+    # The first frame on an idle connection is sent right away, the frames following it are batched
+    sfm_conn.send_data(1, 0, None, b"first")
+    assert len(conn.frames) == 1
+    conn.frames.clear()
+    conn.sent.clear()
+    return sfm_conn, conn
+
+
+class TestFrameBatching:
+    def test_sent_after_delay(self):
+        sfm_conn, conn = _sfm_conn()
+        for i in range(10):
+            sfm_conn.send_data(1, i, {"i": i}, b"x" * i)
+        assert conn.frames == []
+
+        assert conn.sent.wait(DELAY * 20)
+        assert len(conn.frames) == 1
+        assert Prefix.from_bytes(conn.frames[0]).type == Types.BATCH
+        assert _unpack(conn.frames[0]) == [(Types.DATA, {"i": i}, b"x" * i) for i in range(10)]
+
+    def test_idle_connection(self):
+        sfm_conn, conn = _sfm_conn()
+        time.sleep(DELAY * 2)
+
+        sfm_conn.send_data(1, 1, None, b"after idle")
+        assert len(conn.frames) == 1
+        assert _unpack(conn.frames[0]) == [(Types.DATA, None, b"after idle")]
+
+    def test_sent_when_full(self):
+        sfm_conn, conn = _sfm_conn()
+        payload = bytes(1000)
+        for i in range(10):
+            sfm_conn.send_data(1, i, None, payload)
+
+        # The ones filling up the batch are sent right away, the rest after the delay
+        sent = len(conn.frames)
+        assert sent >= 2
+        assert all(len(f) <= BATCH_SIZE for f in conn.frames)
+
+        sfm_conn.flush_batch()
+        frames = [f for frame in conn.frames for f in _unpack(frame)]
+        assert len(conn.frames) == sent + 1
+        assert frames == [(Types.DATA, None, payload)] * 10
+
+    def test_single_frame_not_wrapped(self):
+        sfm_conn, conn = _sfm_conn()
+        sfm_conn.send_data(1, 1, None, b"alone")
+        sfm_conn.flush_batch()
+
+        assert len(conn.frames) == 1
+        assert Prefix.from_bytes(conn.frames[0]).type == Types.DATA
+
+    def test_large_frame_keeps_order(self):
+        sfm_conn, conn = _sfm_conn()
+        large = bytes(MAX_BATCHED_FRAME_SIZE)
+        sfm_conn.send_data(1, 1, None, b"small")
+        sfm_conn.send_data(1, 2, None, [large[:10], memoryview(large)[10:]])
+
+        # The pending small frame is sent before the large one
+        assert len(conn.frames) == 2
+        assert [f[2] for f in _unpack(conn.frames[0]) + _unpack(conn.frames[1])] == [b"small", large]
+
+    def test_buffers_are_copied(self):
+        sfm_conn, conn = _sfm_conn()
+        payload = bytearray(b"before")
+        sfm_conn.send_data(1, 1, None, payload)
+        payload[:] = b"after!"
+        sfm_conn.flush_batch()
+
+        assert _unpack(conn.frames[0])[0][2] == b"before"
+
+    def test_not_batched_by_default(self):
+        conn = CaptureConnection()
+        sfm_conn = SfmConnection(conn, Endpoint("test"))
+        sfm_conn.send_data(1, 1, None, b"data")
+        assert len(conn.frames) == 1
+
+    def test_concurrent_senders(self):
+        sfm_conn, conn = _sfm_conn()
+        num_threads = 8
+        num_frames = 200
+
+        def send(n):
+            for i in range(num_frames):
+                sfm_conn.send_data(1, i, {"t": n, "i": i}, bytes(i))
+
+        threads = [threading.Thread(target=send, args=(n,)) for n in range(num_threads)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        time.sleep(DELAY * 2)
+        sfm_conn.flush_batch()
+
+        frames = [f for frame in conn.frames for f in _unpack(frame)]
+        assert len(frames) == num_threads * num_frames
+        assert len(conn.frames) < len(frames)
+        for n in range(num_threads):
+            assert [h["i"] for _, h, _ in frames if h["t"] == n] == list(range(num_frames))
+
+
+class TestBatchFlusher:
+    def test_blocked_connection(self):
+        blocked_sfm_conn, blocked_conn = _sfm_conn()
+        blocked_conn.unblocked.clear()
+        blocked_sfm_conn.send_data(1, 1, None, b"stuck")
+
+        # The blocked connection only holds one thread of the pool, however often its flush is due
+        for _ in range(FLUSH_THREAD_POOL_SIZE):
+            BatchFlusher.get_instance().schedule(blocked_sfm_conn.flush_batch, 0)
+        time.sleep(DELAY / 4)
+
+        sfm_conn, conn = _sfm_conn()
+        sfm_conn.send_data(1, 1, None, b"heartbeat")
+
+        # The batch of the healthy connection is not held up by the blocked one
+        assert conn.sent.wait(DELAY * 20)
+        assert _unpack(conn.frames[0]) == [(Types.DATA, None, b"heartbeat")]
+        assert not blocked_conn.frames
+
+        blocked_conn.unblocked.set()
+        assert blocked_conn.sent.wait(DELAY * 20)
+        assert _unpack(blocked_conn.frames[0]) == [(Types.DATA, None, b"stuck")]
+
+    def test_failed_flush_closes_connection(self):
+        sfm_conn, conn = _sfm_conn()
+        conn.error = CommError(CommError.CLOSED, "peer is gone")
+        sfm_conn.send_data(1, 1, None, b"lost")
+
+        assert conn.closed.wait(DELAY * 20)
+
+    def test_stopped(self):
+        sfm_conn, conn = _sfm_conn()
+        sfm_conn.send_data(1, 1, None, b"one")
+        sfm_conn.stop_batching()
+
+        # The batched frame is dropped, later frames are sent right away
+        assert not conn.sent.wait(DELAY * 2)
+        sfm_conn.send_data(1, 2, None, b"two")
+        assert _unpack(conn.frames[0]) == [(Types.DATA, None, b"two")]
+
+
+class TestSplitBatch:
+    def test_bad_length(self):
+        sfm_conn, conn = _sfm_conn()
+        sfm_conn.send_data(1, 1, None, b"one")
+        sfm_conn.send_data(1, 2, None, b"two")
+        sfm_conn.flush_batch()
+
+        frame = bytearray(conn.frames[0])
+        Prefix(length=1000).to_buffer(frame, PREFIX_LEN)
+        with pytest.raises(CommError):
+            list(split_batch(frame, Prefix.from_bytes(frame)))
+
+
+class Receiver(MessageReceiver):
+    def __init__(self, count: int):
+        self.payloads = []
+        self.count = count
+        self.done = threading.Event()
+
+    def process_message(self, endpoint, connection, app_id, message):
+        self.payloads.append(bytes(message.payload))
+        if len(self.payloads) == self.count:
+            self.done.set()
+
+
+class TestReceiveBatch:
+    def test_messages_delivered(self):
+        sfm_conn, conn = _sfm_conn()
+        payloads = [f"msg-{i}".encode() for i in range(20)]
+        for p in payloads:
+            sfm_conn.send_data(1, 1, {HeaderKeys.ORDER_KEY: "k"}, p)
+        sfm_conn.flush_batch()
+        assert len(conn.frames) == 1
+
+        manager = ConnManager(Endpoint("local"))
+        receiver = Receiver(len(payloads))
+        manager.register_message_receiver(1, receiver)
+        peer_conn = SfmConnection(CaptureConnection(), manager.local_endpoint)
+        peer_conn.sfm_endpoint = SfmEndpoint(Endpoint("peer"))
+
+        manager.process_frame(peer_conn, conn.frames[0])
+        assert receiver.done.wait(10)
+        assert receiver.payloads == payloads
+        manager.stop()
@@ -0,0 +1,90 @@
+# Copyright (c) 2025, NVIDIA CORPORATION.  All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from nvflare.fuel.f3.sfm.ordered_dispatcher import OrderedDispatcher
+
+NUM_KEYS = 8
+NUM_TASKS = 200
+
+
+def _wait_for_idle(dispatcher: OrderedDispatcher, timeout=10.0):
+    deadline = time.time() + timeout
+    while dispatcher.get_num_keys() and time.time() < deadline:
+        time.sleep(0.01)
+
+
+class TestOrderedDispatcher:
+    def test_order_per_key(self):
+        executor = ThreadPoolExecutor(16)
+        dispatcher = OrderedDispatcher(executor)
+        results = {key: [] for key in range(NUM_KEYS)}
+        running = set()
+        lock = threading.Lock()
+
+        def task(key, seq):
+            with lock:
+                assert key not in running
+                running.add(key)
+            time.sleep(random.random() * 0.001)
+            results[key].append(seq)
+            with lock:
+                running.remove(key)
+
+        for seq in range(NUM_TASKS):
+            for key in range(NUM_KEYS):
+                dispatcher.submit(key, task, key, seq)
+
+        _wait_for_idle(dispatcher)
+        executor.shutdown(wait=True)
+
+        for key in range(NUM_KEYS):
+            assert results[key] == list(range(NUM_TASKS))
+        assert dispatcher.get_num_keys() == 0
+
+    def test_keys_in_parallel(self):
+        executor = ThreadPoolExecutor(4)
+        dispatcher = OrderedDispatcher(executor)
+        barrier = threading.Barrier(3, timeout=5)
+        done = []
+
+        def task(name):
+            barrier.wait()
+            done.append(name)
+
+        # Tasks of different keys and tasks without key must all run at the same time to pass the barrier
+        dispatcher.submit("a", task, "a")
+        dispatcher.submit("b", task, "b")
+        dispatcher.submit(None, task, None)
+        executor.shutdown(wait=True)
+
+        assert len(done) == 3
+
+    def test_error_does_not_block_key(self):
+        executor = ThreadPoolExecutor(2)
+        dispatcher = OrderedDispatcher(executor)
+        results = []
+
+        def fail():
+            raise ValueError("failed")
+
+        dispatcher.submit("k", fail)
+        dispatcher.submit("k", results.append, 1)
+        _wait_for_idle(dispatcher)
+        executor.shutdown(wait=True)
+
+        assert results == [1]
@@ -0,0 +1,182 @@
+# Copyright (c) 2025, NVIDIA CORPORATION.  All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import json
+import random
+import threading
+
+import pytest
+
+from nvflare.fuel.f3.stats_pool import (
+    HDR_NUM_STRIPES,
+    HdrHistPool,
+    HistPool,
+    StatsPoolManager,
+    _hdr_bucket_index,
+    _hdr_bucket_range,
+    new_hdr_time_pool,
+)
+
+# Relative error of the percentiles with the default precision_bits of 6
+MAX_ERROR = 1 / 32
+
+
+@pytest.fixture
+def pool_names():
+    names = []
+    yield names
+    for name in names:
+        StatsPoolManager.delete_pool(name)
+
+
+class TestHdrBuckets:
+    @pytest.mark.parametrize("precision_bits", [1, 3, 6])
+    def test_buckets_are_contiguous(self, precision_bits):
+        prev = 0
+        for ticks in range(100000):
+            index = _hdr_bucket_index(ticks, precision_bits)
+            low, high = _hdr_bucket_range(index, precision_bits)
+            assert low <= ticks < high
+            assert index in (prev, prev + 1)
+            prev = index
+
+    def test_bucket_width(self):
+        for ticks in (100, 10**6, 10**9):
+            low, high = _hdr_bucket_range(_hdr_bucket_index(ticks, 6), 6)
+            assert (high - low) / low <= MAX_ERROR
+
+
+class TestHdrHistPool:
+    def test_percentiles(self):
+        pool = new_hdr_time_pool("test")
+        values = [random.lognormvariate(-7, 1.5) for _ in range(20000)]
+        for v in values:
+            pool.record_value("cat", v)
+
+        values.sort()
+        for p in (50, 90, 99, 99.9):
+            exact = values[int(len(values) * p / 100) - 1]
+            assert abs(pool.get_percentile("cat", p) - exact) / exact <= MAX_ERROR
+
+        h = pool.get_snapshot()["cat"]
+        assert h.count == len(values)
+        assert h.min == values[0]
+        assert h.max == values[-1]
+        assert h.get_percentile(100) == values[-1]
+        assert pool.get_percentile("other", 50) is None
+
+    def test_out_of_range(self):
+        pool = HdrHistPool("test", "", "second", resolution=0.001, max_value=1.0)
+        pool.record_value("cat", -1.0)
+        pool.record_value("cat", 100.0)
+
+        h = pool.get_snapshot()["cat"]
+        assert h.count == 2
+        assert h.get_percentile(0) == -1.0
+        assert h.get_percentile(100) == 100.0
+
+    def test_threads_merged(self):
+        pool = new_hdr_time_pool("test")
+        num_threads = 4
+        num_values = 5000
+
+        def record(n):
+            for _ in range(num_values):
+                pool.record_value(f"cat{n % 2}", 0.001)
+
+        threads = [threading.Thread(target=record, args=(n,)) for n in range(num_threads)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        pool.record_value("cat0", 0.002)
+
+        snapshot = pool.get_snapshot()
+        assert snapshot["cat0"].count == 2 * num_values + 1
+        assert snapshot["cat1"].count == 2 * num_values
+
+    def test_memory_bounded(self):
+        pool = new_hdr_time_pool("test")
+        num_categories = 100
+
+        def record():
+            for i in range(num_categories):
+                pool.record_value(f"cat{i}", 0.001)
+
+        threads = [threading.Thread(target=record) for _ in range(2 * HDR_NUM_STRIPES)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        # Each stripe has at most a histogram per category, which only stores the buckets used
+        histograms = [h for stripe in pool.stripes for h in stripe.histograms.values()]
+        assert len(histograms) <= HDR_NUM_STRIPES * num_categories
+        assert all(len(h.counts) == 1 for h in histograms)
+        assert pool.get_snapshot()["cat0"].count == len(threads)
+
+    def test_interval_snapshot(self):
+        pool = new_hdr_time_pool("test")
+        for _ in range(100):
+            pool.record_value("cat", 0.001)
+        assert pool.get_interval_snapshot()["cat"].count == 100
+
+        for _ in range(10):
+            pool.record_value("cat", 0.5)
+        h = pool.get_interval_snapshot()["cat"]
+        assert h.count == 10
+        assert abs(h.get_percentile(50) - 0.5) / 0.5 <= MAX_ERROR
+        assert abs(h.min - 0.5) / 0.5 <= MAX_ERROR
+
+        assert pool.get_interval_snapshot()["cat"].count == 0
+        assert pool.get_snapshot()["cat"].count == 110
+
+    def test_table(self):
+        pool = new_hdr_time_pool("test")
+        pool.record_value("b", 0.002)
+        pool.record_value("a", 0.001)
+
+        headers, rows = pool.get_table()
+        assert headers == ["category", "count", "avg", "min", "p50", "p90", "p99", "p99.9", "max"]
+        assert [r[0] for r in rows] == ["a", "b"]
+        assert rows[0][1] == "1"
+
+    def test_dict(self):
+        pool = new_hdr_time_pool("test", "times")
+        for v in (0.001, 0.01, 0.1):
+            pool.record_value("cat", v)
+
+        d = json.loads(json.dumps(pool.to_dict()))
+        restored = HdrHistPool.from_dict(d)
+        assert restored.description == "times"
+        h = restored.get_snapshot()["cat"]
+        assert h.count == 3
+        assert h.max == 0.1
+        assert h.get_percentile(50) == pool.get_percentile("cat", 50)
+
+
+class TestStatsPoolManager:
+    def test_add_hdr_time_pool(self, pool_names):
+        pool = StatsPoolManager.add_hdr_time_pool("hdr_test_pool", "test")
+        pool_names.append(pool.name)
+        assert isinstance(pool, HdrHistPool)
+
+        pool.record_value("cat", 0.001)
+        d = StatsPoolManager.to_dict()
+        assert d[pool.name]["type"] == "hdr"
+
+    def test_hist_pool_for_records(self, pool_names, monkeypatch):
+        monkeypatch.setattr(StatsPoolManager, "pool_config", {"save_pools": ["hdr_records_pool"]})
+        pool = StatsPoolManager.add_hdr_time_pool("hdr_records_pool", "test")
+        pool_names.append(pool.name)
+        assert isinstance(pool, HistPool)
@@ -0,0 +1,85 @@
+# Copyright (c) 2025, NVIDIA CORPORATION.  All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import pytest
+
+from nvflare.fuel.f3.streaming.adaptive_window import AdaptiveWindow
+
+MB = 1024 * 1024
+WINDOW = 16 * MB
+MAX_WINDOW = 256 * MB
+
+
+def _simulate(window: AdaptiveWindow, bandwidth: float, rtt: float, duration: float):
+    """Simulate a link with the given bandwidth (bytes/s) and RTT. Returns the time and offset at the end"""
+    now = window.start_time
+    end_time = now + duration
+    sent = 0
+    acked = 0
+    while now < end_time:
+        # Send a window worth of chunks, limited by the bandwidth in one round trip
+        in_flight = min(window.window_size, int(bandwidth * rtt))
+        while sent - acked < in_flight:
+            sent += window.chunk_size
+            window.on_send(sent, now)
+        now += rtt
+        acked = sent
+        window.on_ack(acked, now)
+    return now, sent
+
+
+class TestAdaptiveWindow:
+    def test_fixed_window(self):
+        window = AdaptiveWindow(WINDOW, MB)
+        _simulate(window, bandwidth=1000 * MB, rtt=0.1, duration=2)
+        assert window.window_size == WINDOW
+        assert window.chunk_size == MB
+        assert window.rtt == pytest.approx(0.1)
+
+    def test_window_grows_on_high_latency_link(self):
+        window = AdaptiveWindow(WINDOW, MB, adaptive=True, max_window_size=MAX_WINDOW)
+        _simulate(window, bandwidth=1000 * MB, rtt=0.1, duration=3)
+        # BDP is 100MB, the window is 2 x BDP
+        assert window.window_size == 200 * MB
+
+    def test_window_is_bounded(self):
+        window = AdaptiveWindow(WINDOW, MB, adaptive=True, max_window_size=64 * MB)
+        _simulate(window, bandwidth=1000 * MB, rtt=0.2, duration=3)
+        assert window.window_size == 64 * MB
+
+        window = AdaptiveWindow(WINDOW, MB, adaptive=True, max_window_size=MAX_WINDOW)
+        _simulate(window, bandwidth=10 * MB, rtt=0.01, duration=3)
+        assert window.window_size == WINDOW
+
+    def test_chunk_size(self):
+        window = AdaptiveWindow(WINDOW, MB, adaptive=True, max_window_size=MAX_WINDOW, max_chunk_size=8 * MB)
+        _simulate(window, bandwidth=1000 * MB, rtt=0.1, duration=3)
+        # 200MB / 16 chunks, rounded down to power of 2 and capped
+        assert window.chunk_size == 8 * MB
+
+    def test_acks_close_together(self):
+        window = AdaptiveWindow(4 * MB, MB, adaptive=True, max_window_size=1024 * MB)
+        now, sent = _simulate(window, bandwidth=100 * MB, rtt=0.05, duration=2)
+        # BDP is 5MB
+        assert window.window_size == pytest.approx(10 * MB, rel=0.01)
+
+        # The ACKs of two chunks arrive 0.1ms apart
+        window.on_send(sent + MB, now)
+        window.on_send(sent + 2 * MB, now)
+        window.on_ack(sent + MB, now + 0.05)
+        window.on_ack(sent + 2 * MB, now + 0.0501)
+        assert window.window_size == pytest.approx(10 * MB, rel=0.01)
+
+    def test_throughput(self):
+        window = AdaptiveWindow(WINDOW, MB)
+        assert window.get_throughput(100 * MB, now=window.start_time + 2) == 50 * MB
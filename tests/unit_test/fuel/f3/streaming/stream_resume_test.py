@@ -0,0 +1,187 @@
+# Copyright (c) 2025, NVIDIA CORPORATION.  All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import os
+from types import SimpleNamespace
+
+import pytest
+
+from nvflare.fuel.f3.cellnet.defs import MessageHeaderKey, ReturnCode
+from nvflare.fuel.f3.cellnet.utils import make_reply
+from nvflare.fuel.f3.message import Message
+from nvflare.fuel.f3.streaming import byte_streamer
+from nvflare.fuel.f3.streaming.blob_streamer import BlobStream
+from nvflare.fuel.f3.streaming.byte_receiver import ByteReceiver, RxTask
+from nvflare.fuel.f3.streaming.byte_streamer import TxTask
+from nvflare.fuel.f3.streaming.stream_const import EOS, STREAM_ACK_TOPIC, STREAM_DATA_TOPIC, StreamHeaderKey
+from nvflare.fuel.f3.streaming.stream_types import Stream, StreamError
+
+CHUNK_SIZE = 1024
+SENDER = "site-1"
+RECEIVER = "server"
+
+
+class LossyCell:
+    """Delivers stream messages to the receiving task in memory, like a connection that breaks on given chunks.
+
+    A chunk in fail_seqs is rejected with an error once, a chunk in drop_seqs is lost silently once.
+    """
+
+    def __init__(self, fail_seqs=(), drop_seqs=(), unreachable=0):
+        self.my_info = SimpleNamespace(fqcn=SENDER)
+        self.fail_seqs = set(fail_seqs)
+        self.drop_seqs = set(drop_seqs)
+        self.unreachable = unreachable
+        self.tx_task = None
+        self.rx_task = None
+        self.resume_requests = 0
+
+    def fire_and_forget(self, channel, topic, targets, message, secure=False, optional=False):
+        if topic == STREAM_ACK_TOPIC:
+            self.tx_task.handle_ack(message)
+            return {}
+
+        if topic != STREAM_DATA_TOPIC:
+            return {}
+
+        seq = message.get_header(StreamHeaderKey.SEQUENCE)
+        if seq in self.fail_seqs:
+            self.fail_seqs.remove(seq)
+            return {targets: ReturnCode.COMM_ERROR}
+
+        if seq in self.drop_seqs:
+            self.drop_seqs.remove(seq)
+            return {}
+
+        # The chunk buffer is reused by the sender, so it's copied like it's sent over the wire
+        received = Message(dict(message.headers), bytes(message.payload) if message.payload is not None else None)
+        received.set_header(MessageHeaderKey.ORIGIN, SENDER)
+        self.rx_task = RxTask.find_or_create_task(received, self)
+        if self.rx_task:
+            self.rx_task.process_chunk(received)
+        return {}
+
+    def send_request(self, channel, topic, target, request, timeout=None, secure=False, optional=False):
+        self.resume_requests += 1
+        if self.unreachable:
+            self.unreachable -= 1
+            return make_reply(ReturnCode.TARGET_UNREACHABLE)
+
+        request.set_header(MessageHeaderKey.ORIGIN, SENDER)
+        return ByteReceiver._resume_handler(request)
+
+
+class UnseekableStream(Stream):
+    def __init__(self, data: bytes):
+        super().__init__(len(data))
+        self.data = data
+
+    def read(self, size: int) -> bytes:
+        buf = self.data[self.pos : self.pos + size]
+        self.pos += len(buf)
+        return buf
+
+
+def _send(cell: LossyCell, stream: Stream) -> TxTask:
+    task = TxTask(cell, CHUNK_SIZE, "test", "resume", RECEIVER, None, stream, False, False)
+    cell.tx_task = task
+    task.send_loop()
+    return task
+
+
+def _read_all(rx_task: RxTask) -> bytes:
+    result = bytearray()
+    while True:
+        buf = rx_task.read(CHUNK_SIZE)
+        if buf is EOS:
+            return bytes(result)
+        result.extend(buf)
+
+
+@pytest.fixture(autouse=True)
+def fast_retry(monkeypatch):
+    monkeypatch.setattr(byte_streamer, "RESUME_RETRY_INTERVAL", 0.01)
+
+
+class TestStreamResume:
+    def test_resume_after_send_error(self):
+        data = os.urandom(CHUNK_SIZE * 10 + 100)
+        cell = LossyCell(fail_seqs=[3])
+        task = _send(cell, BlobStream(data, None))
+
+        assert task.stream_future.result(timeout=1) == len(data)
+        assert task.generation == 1
+        assert _read_all(cell.rx_task) == data
+
+    def test_resume_after_lost_chunks(self):
+        data = os.urandom(CHUNK_SIZE * 12)
+        # Chunk 5 is lost, 6 and 7 are received out of sequence before the connection breaks
+        cell = LossyCell(drop_seqs=[5], fail_seqs=[8])
+        task = _send(cell, BlobStream(data, None))
+
+        assert task.stream_future.result(timeout=1) == len(data)
+        assert _read_all(cell.rx_task) == data
+
+    def test_resume_retries_till_reachable(self):
+        data = os.urandom(CHUNK_SIZE * 4)
+        cell = LossyCell(fail_seqs=[1], unreachable=3)
+        task = _send(cell, BlobStream(data, None))
+
+        assert task.stream_future.result(timeout=1) == len(data)
+        assert cell.resume_requests == 4
+        assert _read_all(cell.rx_task) == data
+
+    def test_resume_disabled(self):
+        cell = LossyCell(fail_seqs=[1])
+        task = TxTask(
+            cell, CHUNK_SIZE, "test", "resume", RECEIVER, None, BlobStream(os.urandom(4096), None), False, False
+        )
+        task.resume_timeout = 0
+        cell.tx_task = task
+        task.send_loop()
+
+        with pytest.raises(StreamError):
+            task.stream_future.result(timeout=1)
+        assert cell.resume_requests == 0
+
+    def test_unseekable_stream_is_not_resumed(self):
+        cell = LossyCell(fail_seqs=[1])
+        task = _send(cell, UnseekableStream(os.urandom(4096)))
+
+        with pytest.raises(StreamError):
+            task.stream_future.result(timeout=1)
+        assert cell.resume_requests == 0
+
+    def test_unknown_stream_is_not_resumed(self):
+        # The first chunk never arrives, so the receiver doesn't know the stream
+        cell = LossyCell(fail_seqs=[0])
+        task = _send(cell, BlobStream(os.urandom(4096), None))
+
+        with pytest.raises(StreamError):
+            task.stream_future.result(timeout=1)
+        assert cell.resume_requests == 1
+
+    def test_old_generation_chunks_are_dropped(self):
+        cell = LossyCell()
+        rx_task = RxTask(1, SENDER, cell)
+        for seq in range(2):
+            rx_task.process_chunk(Message({StreamHeaderKey.SEQUENCE: seq}, bytes(10)))
+
+        assert rx_task.resume(1) == (20, 2)
+
+        rx_task.process_chunk(Message({StreamHeaderKey.SEQUENCE: 2}, bytes(10)))
+        assert rx_task.next_seq == 2
+
+        rx_task.process_chunk(Message({StreamHeaderKey.SEQUENCE: 2, StreamHeaderKey.GENERATION: 1}, bytes(10)))
+        assert rx_task.next_seq == 3
+        assert rx_task.received_offset == 30
@@ -0,0 +1,101 @@
+# Copyright (c) 2025, NVIDIA CORPORATION.  All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import os
+
+import pytest
+
+from nvflare.apis.shareable import Shareable
+from nvflare.apis.utils.decomposers import flare_decomposers
+from nvflare.fuel.utils import fobs
+from nvflare.fuel.utils.fobs.compression import CHUNK_SIZE, CompressionPolicy, get_codec
+from nvflare.fuel.utils.fobs.lobs import MARKER_DATUM_BLOB_COMPRESSED, MARKER_DATUM_TEXT_COMPRESSED
+
+DATA_SIZE = 3 * CHUNK_SIZE + 123
+MAX_VALUE_SIZE = 1024
+
+
+class _Writer:
+    def __init__(self):
+        self.pieces = []
+
+    def write(self, data):
+        self.pieces.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+
+def _compressible(size: int) -> bytes:
+    return (b"federated learning " * (size // 19 + 1))[:size]
+
+
+def _available_codecs():
+    return [name for name in ("zlib", "lz4", "zstd") if get_codec(name)]
+
+
+class TestCompression:
+    @classmethod
+    def setup_class(cls):
+        flare_decomposers.register()
+
+    @pytest.mark.parametrize("codec_name", _available_codecs())
+    def test_codec_round_trip(self, codec_name):
+        codec = get_codec(codec_name)
+        data = _compressible(DATA_SIZE)
+        compressed = []
+        codec.compress(memoryview(data), compressed)
+
+        writer = _Writer()
+        codec.decompress(iter(compressed), writer)
+        assert b"".join(writer.pieces) == data
+        assert max(len(p) for p in writer.pieces) <= CHUNK_SIZE
+        assert get_codec(codec.get_id()) is codec
+
+    def test_policy_skips_incompressible_data(self):
+        policy = CompressionPolicy(min_size=1024)
+        assert policy.compress(os.urandom(DATA_SIZE)) is None
+        assert policy.compress(_compressible(100)) is None
+        assert policy.compress(_compressible(DATA_SIZE)) is not None
+
+    def test_unknown_codec(self):
+        with pytest.raises(ValueError):
+            CompressionPolicy(codec="no_such_codec")
+
+    @pytest.mark.parametrize("codec_name", _available_codecs())
+    def test_lobs_round_trip(self, codec_name, tmp_path):
+        data = Shareable()
+        data["blob"] = _compressible(DATA_SIZE)
+        data["text"] = _compressible(DATA_SIZE).decode()
+        data["random"] = os.urandom(DATA_SIZE)
+        policy = CompressionPolicy(codec=codec_name, min_size=MAX_VALUE_SIZE)
+
+        plain = fobs.dumps(data, max_value_size=MAX_VALUE_SIZE)
+        compressed = fobs.dumps(data, max_value_size=MAX_VALUE_SIZE, compression=policy)
+        assert len(compressed) < len(plain) - DATA_SIZE
+        assert bytes([MARKER_DATUM_BLOB_COMPRESSED]) in compressed
+        assert bytes([MARKER_DATUM_TEXT_COMPRESSED]) in compressed
+        assert fobs.loads(compressed) == data
+
+        file_path = str(tmp_path / "data.lobs")
+        fobs.dumpf(data, file_path, max_value_size=MAX_VALUE_SIZE, compression=policy)
+        assert fobs.loadf(file_path) == data
+        assert fobs.loadf(file_path, use_mmap=True) == data
+
+    def test_codec_name(self):
+        data = Shareable()
+        data["blob"] = _compressible(DATA_SIZE)
+        compressed = fobs.dumps(data, max_value_size=MAX_VALUE_SIZE, compression="zlib")
+        assert len(compressed) < DATA_SIZE // 10
+        assert fobs.loads(compressed) == data
@@ -12,10 +12,14 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import os
+import random
+import time
+
 from nvflare.apis.shareable import Shareable
 from nvflare.apis.utils.decomposers import flare_decomposers
 from nvflare.fuel.utils import fobs
-from nvflare.fuel.utils.fobs.datum import DatumManager
+from nvflare.fuel.utils.fobs.datum import Datum, DatumCache, DatumManager, compute_content_id
 
 BLOB_SIZE = 1024 * 1024  # 1M
 
@@ -39,3 +43,33 @@ class TestDatum:
 
         data = fobs.deserialize(buf, manager)
         assert isinstance(data["data"]["blob1"], bytes)
+
+    def test_prepare_datums_order(self):
+        manager = DatumManager(num_workers=4)
+        for i in range(50):
+            d = Datum.blob_datum(bytes([i]))
+            manager.datums[d.datum_id] = d
+
+        def prepare(d):
+            time.sleep(random.random() / 1000)
+            return d.value[0]
+
+        prepared = [p for _, p in manager.prepare_datums(prepare)]
+        assert prepared == list(range(50))
+
+    def test_content_id(self):
+        blob = os.urandom(BLOB_SIZE)
+        assert compute_content_id(Datum.blob_datum(blob)) == compute_content_id(Datum.blob_datum(bytearray(blob)))
+        assert compute_content_id(Datum.blob_datum(b"abc")) != compute_content_id(Datum.text_datum("abc"))
+        assert compute_content_id(Datum.blob_datum(b"abc")) != compute_content_id(Datum.blob_datum(b"abd"))
+
+    def test_datum_cache(self):
+        cache = DatumCache(max_size=10)
+        cache.add("a", 4)
+        cache.add("b", 4)
+        assert cache.touch("a")
+        cache.add("c", 4)
+        assert cache.contains("a") and cache.contains("c")
+        assert not cache.contains("b")
+        cache.add("d", 11)
+        assert not cache.contains("d")
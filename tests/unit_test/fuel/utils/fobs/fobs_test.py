@@ -81,6 +81,19 @@ class TestFobs:
         new_class = fobs.loads(buf)
         assert new_class.name == TestFobs.NAME
 
+    def test_decomposer_cache_reset(self):
+        fobs.reset()
+        test_class = ExampleDataClass(TestFobs.NAME)
+        # first serialization caches the auto-registered data class decomposer
+        new_class = fobs.loads(fobs.dumps(test_class))
+        assert new_class.name == TestFobs.NAME
+
+        fobs.reset()
+        fobs.register(ExampleDataClassDecomposer)
+        buf = fobs.dumps(test_class)
+        new_class = fobs.loads(buf)
+        assert new_class.name == TestFobs.NAME.upper()
+
     def test_buffer_list(self):
         buf = fobs.dumps(TestFobs.test_data, buffer_list=True)
         data = fobs.loads(buf)
@@ -106,3 +119,14 @@ class ExampleClassDecomposer(Decomposer):
 
     def recompose(self, data: Any, manager: DatumManager = None) -> ExampleClass:
         return ExampleClass(data)
+
+
+class ExampleDataClassDecomposer(Decomposer):
+    def supported_type(self):
+        return ExampleDataClass
+
+    def decompose(self, target: ExampleDataClass, manager: DatumManager = None) -> Any:
+        return target.name.upper()
+
+    def recompose(self, data: Any, manager: DatumManager = None) -> ExampleDataClass:
+        return ExampleDataClass(data)
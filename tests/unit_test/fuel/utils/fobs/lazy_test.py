@@ -0,0 +1,91 @@
+# Copyright (c) 2025, NVIDIA CORPORATION.  All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import numpy as np
+
+from nvflare.apis.dxo import DXO, DataKind, from_shareable
+from nvflare.apis.fl_constant import ReturnCode
+from nvflare.apis.shareable import Shareable
+from nvflare.apis.utils.decomposers import flare_decomposers
+from nvflare.app_common.decomposers import numpy_decomposers
+from nvflare.fuel.utils import fobs
+from nvflare.fuel.utils.fobs.lazy import LazyObject
+
+MAX_VALUE_SIZE = 1024
+
+
+class TestLazy:
+    @classmethod
+    def setup_class(cls):
+        flare_decomposers.register()
+        numpy_decomposers.register()
+
+    @staticmethod
+    def _make_shareable():
+        weights = {"large": np.random.rand(64, 64), "small": np.arange(4)}
+        shareable = DXO(data_kind=DataKind.WEIGHTS, data=weights).to_shareable()
+        shareable.set_return_code(ReturnCode.OK)
+        return shareable, weights
+
+    def test_lazy_load(self):
+        shareable, weights = self._make_shareable()
+        buf = fobs.dumps(shareable, max_value_size=MAX_VALUE_SIZE)
+        result = fobs.loads(buf, lazy=True)
+
+        assert isinstance(result, Shareable)
+        assert result.get_return_code() == ReturnCode.OK
+        data = from_shareable(result).data
+        large = data["large"]
+        assert fobs.is_lazy(large)
+        assert not fobs.is_lazy(data["small"])
+        assert not fobs.is_resolved(large)
+
+        assert isinstance(large, np.ndarray)
+        assert fobs.is_resolved(large)
+        assert np.array_equal(fobs.resolve(large), weights["large"])
+
+    def test_lazy_operations(self):
+        shareable, weights = self._make_shareable()
+        data = from_shareable(fobs.loads(fobs.dumps(shareable, max_value_size=MAX_VALUE_SIZE), lazy=True)).data
+        large = data["large"]
+        expected = weights["large"]
+
+        assert large.shape == expected.shape
+        assert np.array_equal(large * 2, expected * 2)
+        assert np.array_equal(expected + large, expected * 2)
+        assert np.array_equal(np.asarray(large), expected)
+        assert np.allclose(np.sum(large), np.sum(expected))
+        assert large[1, 2] == expected[1, 2]
+
+    def test_lazy_reserialize(self):
+        shareable, weights = self._make_shareable()
+        result = fobs.loads(fobs.dumps(shareable, max_value_size=MAX_VALUE_SIZE), lazy=True)
+        result = fobs.loads(fobs.dumps(result, max_value_size=MAX_VALUE_SIZE))
+        data = from_shareable(result).data
+        assert not fobs.is_lazy(data["large"])
+        assert np.array_equal(data["large"], weights["large"])
+
+    def test_lazy_object(self):
+        calls = []
+
+        def factory():
+            calls.append(1)
+            return [1, 2, 3]
+
+        obj = LazyObject(factory)
+        assert not calls
+        assert len(obj) == 3
+        assert obj + [4] == [1, 2, 3, 4]
+        obj.append(4)
+        assert fobs.resolve(obj) == [1, 2, 3, 4]
+        assert len(calls) == 1
@@ -0,0 +1,134 @@
+# Copyright (c) 2025, NVIDIA CORPORATION.  All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import os
+
+import pytest
+
+from nvflare.apis.shareable import Shareable
+from nvflare.apis.utils.decomposers import flare_decomposers
+from nvflare.fuel.utils import fobs
+from nvflare.fuel.utils.fobs import CompressionPolicy
+
+BLOB_SIZE = 64 * 1024
+MAX_VALUE_SIZE = 1024
+
+
+class TestLobs:
+
+    test_data = Shareable()
+    test_data["name"] = "lobs"
+    test_data["blob"] = os.urandom(BLOB_SIZE)
+    test_data["text"] = "x" * BLOB_SIZE
+    test_data["nested"] = {"number": 123, "blob": bytearray(os.urandom(BLOB_SIZE))}
+
+    @classmethod
+    def setup_class(cls):
+        flare_decomposers.register()
+
+    def test_file(self, tmp_path):
+        file_path = str(tmp_path / "data.lobs")
+        fobs.dumpf(TestLobs.test_data, file_path, max_value_size=MAX_VALUE_SIZE)
+        assert fobs.loadf(file_path) == TestLobs.test_data
+
+    def test_mmap(self, tmp_path):
+        file_path = str(tmp_path / "data.lobs")
+        fobs.dumpf(TestLobs.test_data, file_path, max_value_size=MAX_VALUE_SIZE)
+        data = fobs.loadf(file_path, use_mmap=True)
+        assert data == TestLobs.test_data
+        assert isinstance(data["blob"], memoryview)
+        assert isinstance(data["text"], str)
+
+    def test_mmap_copy_on_write(self, tmp_path):
+        file_path = str(tmp_path / "data.lobs")
+        fobs.dumpf(TestLobs.test_data, file_path, max_value_size=MAX_VALUE_SIZE)
+        data = fobs.loadf(file_path, use_mmap=True)
+        data["blob"][0] ^= 0xFF
+        assert fobs.loadf(file_path) == TestLobs.test_data
+
+    def test_mmap_no_datum(self, tmp_path):
+        file_path = str(tmp_path / "data.lobs")
+        fobs.dumpf({"number": 1}, file_path)
+        assert fobs.loadf(file_path, use_mmap=True) == {"number": 1}
+
+    def test_mmap_invalid(self, tmp_path):
+        file_path = str(tmp_path / "data.lobs")
+        fobs.dumpf(TestLobs.test_data, file_path, max_value_size=MAX_VALUE_SIZE)
+        with open(file_path, "r+b") as f:
+            f.truncate(os.path.getsize(file_path) - 1)
+        with pytest.raises(RuntimeError):
+            fobs.loadf(file_path, use_mmap=True)
+
+        open(file_path, "wb").close()
+        with pytest.raises(RuntimeError):
+            fobs.loadf(file_path, use_mmap=True)
+
+    @pytest.mark.parametrize("compression", [None, "zlib"])
+    def test_num_workers(self, compression):
+        data = Shareable()
+        for i in range(20):
+            data[f"blob_{i}"] = bytes([i]) * BLOB_SIZE
+            data[f"text_{i}"] = str(i) * BLOB_SIZE
+
+        expected = fobs.dumps(data, max_value_size=MAX_VALUE_SIZE, compression=compression)
+        result = fobs.dumps(data, max_value_size=MAX_VALUE_SIZE, compression=compression, num_workers=4)
+        # datum IDs are random, so only the size of the result can be compared
+        assert len(result) == len(expected)
+        assert fobs.loads(result) == data
+
+    def test_identical_datums(self):
+        blob = os.urandom(BLOB_SIZE)
+        data = Shareable()
+        data["blob1"] = blob
+        data["blob2"] = bytes(blob)
+        plain = fobs.dumps(data, max_value_size=MAX_VALUE_SIZE)
+        result = fobs.dumps(data, max_value_size=MAX_VALUE_SIZE, datum_cache=fobs.DatumCache())
+        assert len(result) < len(plain) - BLOB_SIZE + 100
+        assert data["blob1"] == blob and data["blob2"] == blob
+        assert fobs.loads(result, datum_cache=fobs.DatumCache()) == data
+
+    def test_datum_cache(self):
+        sender_cache = fobs.DatumCache()
+        receiver_cache = fobs.DatumCache()
+        first = fobs.dumps(TestLobs.test_data, max_value_size=MAX_VALUE_SIZE, datum_cache=sender_cache)
+        second = fobs.dumps(TestLobs.test_data, max_value_size=MAX_VALUE_SIZE, datum_cache=sender_cache)
+        assert len(first) > 3 * BLOB_SIZE
+        assert len(second) < BLOB_SIZE
+
+        assert fobs.loads(first, datum_cache=receiver_cache) == TestLobs.test_data
+        data = fobs.loads(second, datum_cache=receiver_cache)
+        assert data == TestLobs.test_data
+        assert data["blob"].readonly
+
+        with pytest.raises(RuntimeError):
+            fobs.loads(second)
+
+    def test_datum_cache_eviction(self):
+        # each cache can only hold 2 blobs
+        sender_cache = fobs.DatumCache(max_size=2 * BLOB_SIZE)
+        receiver_cache = fobs.DatumCache(max_size=2 * BLOB_SIZE)
+        blobs = [os.urandom(BLOB_SIZE) for _ in range(4)]
+        for indices in [(0, 1), (2, 0), (1, 3), (3, 0, 1), (1, 2)]:
+            data = Shareable()
+            for i in indices:
+                data[f"blob_{i}"] = blobs[i]
+            result = fobs.dumps(data, max_value_size=MAX_VALUE_SIZE, datum_cache=sender_cache)
+            assert fobs.loads(result, datum_cache=receiver_cache) == data
+
+    @pytest.mark.parametrize("compression", [None, CompressionPolicy(min_size=MAX_VALUE_SIZE)])
+    def test_load_from_view(self, compression):
+        data = fobs.dumps(TestLobs.test_data, max_value_size=MAX_VALUE_SIZE, compression=compression)
+        assert fobs.loads(bytearray(data)) == TestLobs.test_data
+        result = fobs.loads(memoryview(bytearray(data)))
+        assert result == TestLobs.test_data
+        assert isinstance(result["blob"], bytearray)